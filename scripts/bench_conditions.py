@@ -0,0 +1,111 @@
+"""
+Microbenchmark: interpreted vs compiled story conditions.
+
+Evaluates the same choice conditions, choice requirements and branch
+conditions with the interpreter the chapters used before
+(story_mode.conditions) and with the compiled predicates, and prints the
+time per evaluation.
+
+Usage: python scripts/bench_conditions.py [evaluations]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from story_mode.conditions import (  # noqa: E402
+    compile_branch_conditions, compile_condition, compile_requirements
+)
+
+
+def interpret_condition(condition, player_data):
+    """BranchingChapter._check_condition before compilation."""
+    if "stat" in condition:
+        stat = condition["stat"]
+        value = condition["value"]
+        operator = condition.get("operator", ">=")
+
+        player_stat = player_data.get("attributes", {}).get(stat, 0)
+
+        if operator == ">=":
+            return player_stat >= value
+        elif operator == ">":
+            return player_stat > value
+        elif operator == "<=":
+            return player_stat <= value
+        elif operator == "<":
+            return player_stat < value
+        elif operator == "==":
+            return player_stat == value
+        elif operator == "!=":
+            return player_stat != value
+
+    return True
+
+
+def interpret_requirements(requirements, player_data):
+    """BaseChapter.get_available_choices requirement check before compilation."""
+    for stat, value in requirements.items():
+        if player_data.get(stat, 0) < value:
+            return False
+    return True
+
+
+def interpret_branch(conditions, chapter_id, player_data):
+    """BranchingChapter.get_next_chapter branch check before compilation."""
+    story_progress = player_data.get("story_progress", {})
+    chapter_choices = story_progress.get("story_choices", {}).get(chapter_id, {})
+    for condition_key, condition_value in conditions.items():
+        if condition_key.startswith("choice_"):
+            choice_index = int(condition_key.split("_")[1])
+            if chapter_choices.get(f"dialogue_{choice_index}_choice") != condition_value:
+                return False
+        elif condition_key == "attribute":
+            if player_data.get(condition_value.get("name"), 0) < condition_value.get("threshold", 0):
+                return False
+        elif condition_key == "affinity":
+            character_relationships = story_progress.get("character_relationships", {})
+            if character_relationships.get(condition_value.get("character"), 0) < condition_value.get("threshold", 0):
+                return False
+    return True
+
+
+PLAYER = {
+    "level": 4, "exp": 1200, "tusd": 300,
+    "attributes": {"power": 6, "knowledge": 3, "charisma": 8},
+    "story_progress": {
+        "story_choices": {"3_1_festival": {"dialogue_0_choice": 1, "dialogue_2_choice": 0}},
+        "character_relationships": {"Kaito": 40, "Yuki": 10},
+    },
+}
+
+CASES = [
+    ("choice condition", {"stat": "charisma", "operator": ">=", "value": 5},
+     interpret_condition, compile_condition),
+    ("choice condition (unknown operator)", {"stat": "power", "operator": "~", "value": 5},
+     interpret_condition, compile_condition),
+    ("choice requirements", {"level": 3, "exp": 1000, "tusd": 500},
+     interpret_requirements, compile_requirements),
+    ("branch conditions", {"attribute": {"name": "level", "threshold": 2},
+                           "affinity": {"character": "Kaito", "threshold": 30},
+                           "choice_2": 1},
+     lambda conditions, player: interpret_branch(conditions, "3_1_festival", player),
+     lambda conditions: compile_branch_conditions(conditions, "3_1_festival")),
+]
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"{'case':40} {'interpreted':>14} {'compiled':>14} {'speedup':>8}")
+    for name, spec, interpret, compiler in CASES:
+        check = compiler(spec)
+        assert check(PLAYER) == interpret(spec, PLAYER), name
+        interpreted = min(timeit.repeat(lambda: interpret(spec, PLAYER), number=number, repeat=5)) / number
+        compiled = min(timeit.repeat(lambda: check(PLAYER), number=number, repeat=5)) / number
+        print(f"{name:40} {interpreted * 1e9:11.0f} ns {compiled * 1e9:11.0f} ns {interpreted / compiled:7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
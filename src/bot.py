@@ -5,7 +5,12 @@ This module initializes and runs the Discord bot with all its features.
 """
 
 import os
+import time
 import asyncio
+
+# Imported before everything else so the import phase covers the modules below
+from utils.startup import startup_profile
+
 import discord
 from discord.ext import commands
 import logging
@@ -16,6 +21,22 @@ from typing import Optional
 from datetime import datetime, timedelta
 
 from events.events_manager import EventsManager
+from story_mode.content_registry import get_content_registry
+from utils.command_sync import sync_command_tree
+from utils.cluster import ClusterConfig, ClusterCoordinator
+from utils.interaction_guard import GuardedCommandTree, finish_deadline_guard
+from utils.interaction_router import interaction_router
+from utils.metrics import (
+    METRICS_ENABLED,
+    METRICS_PORT,
+    MetricsServer,
+    after_prefix_command,
+    before_prefix_command,
+    finish_interaction_trace,
+    instrument_discord_http
+)
+
+startup_profile.mark_imports_done()
 
 # Set up logging
 logger = get_logger('tokugawa_bot')
@@ -87,7 +108,7 @@ else:
     # No privileged intents used
 
 # Create a custom bot class with setup_hook for loading extensions
-class TokugawaBot(commands.Bot):
+class TokugawaBot(commands.AutoShardedBot):
     """Main bot class for Academia Tokugawa."""
     
     def __init__(self):
@@ -95,52 +116,109 @@ class TokugawaBot(commands.Bot):
         intents.message_content = True
         intents.members = True
         
+        # Shard range assigned by the cluster supervisor; all shards when run standalone
+        cluster = ClusterConfig.from_env()
         super().__init__(
             command_prefix='!',
             intents=intents,
-            help_command=None
+            help_command=None,
+            tree_cls=GuardedCommandTree,
+            **cluster.bot_kwargs()
         )
         
+        self.cluster = cluster
         self.db = db_provider
+        self.content = None
         self.events_manager = None
+        # Runs cluster-wide singletons (events scheduling) in exactly one worker
+        self.coordinator = ClusterCoordinator()
         self.start_time = None
+
+        # Command latency metrics and the /metrics + /health endpoint
+        self.before_invoke(before_prefix_command)
+        self.after_invoke(after_prefix_command)
+        instrument_discord_http(self.http)
+        self.metrics_server = MetricsServer(self, port=cluster.metrics_port(METRICS_PORT)) if METRICS_ENABLED else None
     
     async def setup_hook(self):
         """Set up the bot when it starts."""
         try:
-            # Initialize database
-            if not await self.db.init_db():
+            # Start the metrics endpoint first so /health reports while the bot starts
+            if self.metrics_server:
+                with startup_profile.phase('metrics_server'):
+                    await self.metrics_server.start()
+
+            # Table checks and static content loading are independent; run them together
+            async def init_database():
+                with startup_profile.phase('database'):
+                    return await self.db.init_db()
+
+            async def load_content():
+                # Load static content once; cogs share it instead of loading their own copy
+                with startup_profile.phase('content'):
+                    self.content = await asyncio.to_thread(get_content_registry)
+
+            db_ready, _ = await asyncio.gather(init_database(), load_content())
+            if not db_ready:
                 raise Exception("Failed to initialize database")
             
             # Load extensions
-            for filename in os.listdir('src/cogs'):
-                if filename.endswith('.py') and not filename.startswith('__'):
-                    try:
-                        await self.load_extension(f'cogs.{filename[:-3]}')
-                        logger.info(f"Loaded extension: {filename}")
-                    except Exception as e:
-                        logger.error(f"Failed to load extension {filename}: {e}")
+            with startup_profile.phase('extensions'):
+                await self._load_extensions()
             
-            # Initialize events manager
+            # Initialize events manager; only the scheduler lease holder runs it
             self.events_manager = EventsManager(self)
+            self.coordinator.register('events', self.events_manager.start, self.events_manager.stop)
+            await self.coordinator.start()
             
             # Set start time
             self.start_time = datetime.now()
             
+            startup_profile.complete()
             logger.info("Bot setup completed successfully")
         except Exception as e:
             logger.error(f"Error during bot setup: {e}")
             raise
+
+    async def _load_extensions(self):
+        """Load all cogs concurrently; the cogs do not depend on each other."""
+        names = [
+            f'cogs.{filename[:-3]}' for filename in sorted(os.listdir('src/cogs'))
+            if filename.endswith('.py') and not filename.startswith('__')
+        ]
+        await asyncio.gather(*(self._load_extension_timed(name) for name in names))
+
+    async def _load_extension_timed(self, name: str):
+        """Load one extension and record how long it took."""
+        started = time.perf_counter()
+        try:
+            await self.load_extension(name)
+            logger.info(f"Loaded extension: {name}")
+        except Exception as e:
+            logger.error(f"Failed to load extension {name}: {e}")
+        finally:
+            startup_profile.record_extension(name, time.perf_counter() - started)
     
+    async def on_interaction(self, interaction: discord.Interaction):
+        """Dispatch routed buttons and modals to their cog handlers."""
+        await interaction_router.dispatch(interaction)
+
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        """Record the duration of a completed application command."""
+        finish_deadline_guard(interaction)
+        finish_interaction_trace(interaction)
+
     async def close(self):
         """Clean up resources when the bot shuts down."""
         try:
+            if self.metrics_server:
+                await self.metrics_server.stop()
+
             # Close database connections
             await self.db.close()
             
-            # Clean up events
-            if self.events_manager:
-                await self.events_manager.cleanup()
+            # Stop cluster-wide services and hand the scheduler lease to another worker
+            await self.coordinator.stop()
             
             await super().close()
             logger.info("Bot shutdown completed successfully")
@@ -154,6 +232,9 @@ bot = TokugawaBot()
 # Make sure the bot is syncing application commands
 async def on_app_command_error(interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
     """Error handler for application commands."""
+    finish_deadline_guard(interaction, error)
+    finish_interaction_trace(interaction, error)
+
     if isinstance(error, discord.app_commands.CommandInvokeError):
         # If the original error is a NotFound error (interaction expired)
         if isinstance(error.original, discord.NotFound) and error.original.code == 10062:
@@ -196,7 +277,7 @@ async def on_ready():
     """Event triggered when the bot is ready and connected to Discord."""
     global commands_synced
 
-    logger.info(f'Bot is ready! Logged in as {bot.user.name}')
+    logger.info(f'Bot is ready! Logged in as {bot.user.name} ({bot.cluster.name}, shards {bot.shard_ids})')
 
     # Initialize database
     try:
@@ -213,8 +294,11 @@ async def on_ready():
         logger.error(f"Exception args: {e.args}")
         logger.warning("Continuing bot execution despite database errors")
 
-    # Sync commands with guild only if they haven't been synced already
-    if not commands_synced:
+    # Sync commands with guild only if they haven't been synced already; in cluster
+    # mode only the worker owning shard 0 syncs
+    if not bot.cluster.is_primary:
+        logger.info("Command sync is handled by the primary cluster, skipping")
+    elif not commands_synced:
         await sync_commands()
         commands_synced = True
         logger.info("Commands synced successfully")
@@ -226,9 +310,26 @@ async def ping(ctx):
     """Simple command to check if the bot is responsive."""
     await ctx.send('Pong! 🏓')
 
+@bot.command(name='sincronizar')
+@commands.check_any(commands.is_owner(), commands.has_permissions(administrator=True))
+async def force_sync(ctx):
+    """Force a command tree sync, ignoring the stored tree hashes."""
+    if await sync_commands(force=True):
+        await ctx.send("Comandos sincronizados com o Discord. ✅")
+    else:
+        await ctx.send("Falha ao sincronizar os comandos. Verifique os logs.")
+
 # Function to sync commands with guild
-async def sync_commands():
-    """Sync commands with guild if GUILD_ID is provided."""
+async def sync_commands(force: bool = False) -> bool:
+    """
+    Sync commands globally and with the guild if GUILD_ID is provided.
+
+    Each scope is only sent to Discord when its command tree hash differs from
+    the one stored at the last sync, unless force is set.
+
+    Returns:
+        False if the global or the guild sync failed
+    """
     try:
         # Log all commands in the command tree before syncing
         logger.info("Commands in command tree before syncing:")
@@ -237,37 +338,42 @@ async def sync_commands():
 
         # Always sync commands globally first to ensure all commands are registered
         logger.info("Syncing commands globally...")
-        global_commands = await bot.tree.sync()
-        logger.info(f"Synced {len(global_commands)} commands globally")
-        for cmd in global_commands:
-            logger.info(f"Command synced globally: /{cmd.name}")
+        global_commands = await sync_command_tree(bot, force=force)
+        if global_commands is not None:
+            for cmd in global_commands:
+                logger.info(f"Command synced globally: /{cmd.name}")
 
         # Then sync to guild if GUILD_ID is provided
+        guild_synced = True
         if GUILD_ID:
             try:
                 guild = discord.Object(id=int(GUILD_ID))
                 # Sync commands to the guild
-                commands = await bot.tree.sync(guild=guild)
-                logger.info(f"Successfully synced {len(commands)} commands to guild ID: {GUILD_ID}")
+                commands = await sync_command_tree(bot, guild=guild, force=force)
+                if commands is not None:
+                    logger.info(f"Successfully synced {len(commands)} commands to guild ID: {GUILD_ID}")
 
-                # Log each command that was synced
-                for cmd in commands:
-                    logger.info(f"Command synced: /{cmd.name}")
+                    # Log each command that was synced
+                    for cmd in commands:
+                        logger.info(f"Command synced: /{cmd.name}")
 
-                # If no commands were synced, log a warning
-                if not commands:
-                    logger.warning("No commands were synced to the guild. Using global commands instead.")
+                    # If no commands were synced, log a warning
+                    if not commands:
+                        logger.warning("No commands were synced to the guild. Using global commands instead.")
             except Exception as e:
+                guild_synced = False
                 logger.error(f"Failed to sync commands to guild: {e}")
                 logger.error(f"Exception type: {type(e).__name__}")
                 logger.error(f"Exception args: {e.args}")
                 logger.info("Using globally synced commands as fallback")
         else:
             logger.info("No GUILD_ID provided. Using globally synced commands.")
+        return guild_synced
     except Exception as e:
         logger.error(f"Failed to sync commands: {e}")
         logger.error(f"Exception type: {type(e).__name__}")
         logger.error(f"Exception args: {e.args}")
+        return False
 
 # Run the bot
 async def main():
@@ -0,0 +1,15 @@
+"""
+Cluster supervisor for Academia Tokugawa.
+
+Starts one bot worker per shard range and restarts workers that crash. See
+utils/cluster.py for the configuration variables.
+
+    CLUSTER_WORKERS=4 python src/cluster.py
+"""
+
+import asyncio
+
+from utils.cluster import run_supervisor
+
+if __name__ == '__main__':
+    asyncio.run(run_supervisor())
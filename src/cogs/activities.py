@@ -1,6 +1,5 @@
 import asyncio
 import discord
-import json
 import logging
 import random
 from datetime import datetime, timedelta
@@ -20,6 +19,9 @@ from utils.game_mechanics.duel.duel_narrator import DuelNarrator
 from utils.game_mechanics.events.random_event import RandomEvent
 from utils.game_mechanics.events.training_event import TrainingEvent
 from utils.persistence import db_provider
+from utils.persistence.player_session import commit_sessions, load_sessions, track_round_trips
+from utils.user_lanes import serialized_per_user, user_lanes
+from utils.cluster import is_cluster_leader
 
 logger = logging.getLogger('tokugawa_bot')
 
@@ -51,6 +53,9 @@ class Activities(commands.Cog):
     @tasks.loop(minutes=5)
     async def clear_cooldowns(self):
         """Clear expired cooldowns."""
+        # Cooldowns live in DynamoDB; one worker in the cluster is enough to clean them
+        if not is_cluster_leader(self.bot):
+            return
         try:
             await self.clear_expired_cooldowns()
         except Exception as e:
@@ -65,139 +70,133 @@ class Activities(commands.Cog):
     activity_group = app_commands.Group(name="atividade", description="Comandos de atividades da Academia Tokugawa")
 
     @activity_group.command(name="treinar", description="Treinar para ganhar experiência e melhorar atributos")
+    @serialized_per_user()
     async def slash_train(self, interaction: discord.Interaction):
         """Slash command version of the train command."""
         try:
-            # Check if player exists
-            player = await db_provider.get_player(interaction.user.id)
-            if not player:
-                await interaction.response.send_message(
-                    f"{interaction.user.mention}, você ainda não está registrado na Academia Tokugawa. Use /registro ingressar para criar seu personagem.",
-                    ephemeral=True)
-                return
-
-            # Check cooldown
-            cooldown = await self._check_cooldown(interaction.user.id, "treinar")
-            if cooldown:
-                await interaction.response.send_message(
-                    f"{interaction.user.mention}, você precisa descansar antes de treinar novamente. Tempo restante: {cooldown}",
-                    ephemeral=True)
-                return
+            async with db_provider.player_session(interaction.user.id, "treinar", load_equipped=True) as session:
+                # Check if player exists
+                player = session.player
+                if not player:
+                    await interaction.response.send_message(
+                        f"{interaction.user.mention}, você ainda não está registrado na Academia Tokugawa. Use /registro ingressar para criar seu personagem.",
+                        ephemeral=True)
+                    return
 
-            # Create a random training event using the new SOLID architecture
-            training_event = TrainingEvent.create_random_training_event()
-            training_result = training_event.trigger(player)
+                # Check cooldown
+                cooldown = self._format_cooldown(session.cooldown_remaining("treinar"))
+                if cooldown:
+                    await interaction.response.send_message(
+                        f"{interaction.user.mention}, você precisa descansar antes de treinar novamente. Tempo restante: {cooldown}",
+                        ephemeral=True)
+                    return
 
-            # Get the outcome, experience and attribute gains from the event
-            outcome = training_event.get_description()
-            exp_gain = training_result["exp_gain"]
-            attribute_gain = training_result.get("attribute_gain",
-                                                 random.choice(["dexterity", "intellect", "charisma", "power_stat"]))
+                # Create a random training event using the new SOLID architecture
+                training_event = TrainingEvent.create_random_training_event()
+                training_result = training_event.trigger(player)
+
+                # Get the outcome, experience and attribute gains from the event
+                outcome = training_event.get_description()
+                exp_gain = training_result["exp_gain"]
+                attribute_gain = training_result.get("attribute_gain",
+                                                     random.choice(["dexterity", "intellect", "charisma", "power_stat"]))
+
+                # Check if player has equipped accessories that boost experience
+                inventory = session.equipped_items
+
+                accessory_boost_applied = False
+                accessory_name = ""
+                original_exp = exp_gain
+
+                for item_id, item in inventory.items():
+                    if item.get("type") == "accessory" and item.get("equipped", False) and "exp_boost" in item.get("effects", {}):
+                        # Apply experience boost from accessory
+                        exp_boost = item["effects"]["exp_boost"]
+                        exp_gain = int(exp_gain * exp_boost)
+                        accessory_boost_applied = True
+                        accessory_name = item["name"]
+                        logger.info(
+                            f"Player {player.get('name', 'Unknown')} gained {exp_gain} exp (boosted from {original_exp}) due to equipped accessory {item['name']}")
+
+                # Update player data using the new ExperienceCalculator
+                new_exp = player.get("exp", 0) + exp_gain
+                new_level = ExperienceCalculator.calculate_level(new_exp)
+                level_up = new_level > player.get("level", 1)
 
-            # Check if player has equipped accessories that boost experience
-            inventory = player.get('inventory', {})
-            if isinstance(inventory, str):
-                try:
-                    inventory = json.loads(inventory)
-                except Exception:
-                    inventory = {}
-            if not isinstance(inventory, dict):
-                inventory = {}
-
-            accessory_boost_applied = False
-            accessory_name = ""
-            original_exp = exp_gain
-
-            for item_id, item in inventory.items():
-                if item["type"] == "accessory" and item.get("equipped", False) and "exp_boost" in item["effects"]:
-                    # Apply experience boost from accessory
-                    exp_boost = item["effects"]["exp_boost"]
-                    exp_gain = int(exp_gain * exp_boost)
-                    accessory_boost_applied = True
-                    accessory_name = item["name"]
-                    logger.info(
-                        f"Player {player.get('name', 'Unknown')} gained {exp_gain} exp (boosted from {original_exp}) due to equipped accessory {item['name']}")
-
-            # Update player data using the new ExperienceCalculator
-            new_exp = player.get("exp", 0) + exp_gain
-            new_level = ExperienceCalculator.calculate_level(new_exp)
-            level_up = new_level > player.get("level", 1)
-
-            # Prepare update data
-            update_data = {
-                "exp": new_exp,
-                attribute_gain: player.get(attribute_gain, 5) + 1,  # Increase the chosen attribute
-                "tusd": player.get("tusd", 0) + 10  # Add TUSD reward for training
-            }
+                # Prepare update data
+                update_data = {
+                    "exp": new_exp,
+                    attribute_gain: player.get(attribute_gain, 5) + 1,  # Increase the chosen attribute
+                    "tusd": player.get("tusd", 0) + 10  # Add TUSD reward for training
+                }
 
-            if level_up:
-                update_data["level"] = new_level
-                # Full HP recovery on level up
-                update_data["hp"] = player.get("max_hp", 100)
-                # Bonus TUSD for level up
-                update_data["tusd"] = player.get("tusd", 0) + (
-                            new_level * 50) + 10  # Add base TUSD reward plus level up bonus
-
-            # Apply HP loss for training (5-15% of max HP)
-            if "hp" in player and "max_hp" in player:
-                hp_loss = random.randint(5, 15)
-                hp_loss_amount = int(player["max_hp"] * (hp_loss / 100))
-                current_hp = player.get("hp", player["max_hp"])
-                update_data["hp"] = max(1, current_hp - hp_loss_amount)
-
-            # Update player in database
-            success = await db_provider.update_player(interaction.user.id, **update_data)
-
-            if success:
-                # Set cooldown
-                await self._set_cooldown(interaction.user.id, "treinar")
-
-                # Create embed for training result
-                embed = create_basic_embed(
-                    title="Treinamento Concluído!",
-                    description=outcome,
-                    color=0x00FF00
-                )
-
-                # Add experience gain
-                if accessory_boost_applied:
-                    embed.add_field(
-                        name="Experiência Ganha",
-                        value=f"+{exp_gain} EXP (Bônus de {accessory_name}: +{exp_gain - original_exp} EXP)",
-                        inline=True
-                    )
-                else:
-                    embed.add_field(
-                        name="Experiência Ganha",
-                        value=f"+{exp_gain} EXP",
-                        inline=True
+                if level_up:
+                    update_data["level"] = new_level
+                    # Full HP recovery on level up
+                    update_data["hp"] = player.get("max_hp", 100)
+                    # Bonus TUSD for level up
+                    update_data["tusd"] = player.get("tusd", 0) + (
+                                new_level * 50) + 10  # Add base TUSD reward plus level up bonus
+
+                # Apply HP loss for training (5-15% of max HP)
+                if "hp" in player and "max_hp" in player:
+                    hp_loss = random.randint(5, 15)
+                    hp_loss_amount = int(player["max_hp"] * (hp_loss / 100))
+                    current_hp = player.get("hp", player["max_hp"])
+                    update_data["hp"] = max(1, current_hp - hp_loss_amount)
+
+                # Apply stats and cooldown in a single transaction
+                player.update(update_data)
+                session.set_cooldown("treinar", COOLDOWN_DURATIONS["treinar"])
+                success = await session.commit()
+
+                if success:
+                    # Create embed for training result
+                    embed = create_basic_embed(
+                        title="Treinamento Concluído!",
+                        description=outcome,
+                        color=0x00FF00
                     )
 
-                # Add attribute gain
-                attribute_names = {
-                    "dexterity": "Destreza 🏃‍♂️",
-                    "intellect": "Intelecto 🧠",
-                    "charisma": "Carisma 💬",
-                    "power_stat": "Poder ⚡"
-                }
-                embed.add_field(
-                    name="Atributo Melhorado",
-                    value=f"{attribute_names[attribute_gain]} +1",
-                    inline=True
-                )
+                    # Add experience gain
+                    if accessory_boost_applied:
+                        embed.add_field(
+                            name="Experiência Ganha",
+                            value=f"+{exp_gain} EXP (Bônus de {accessory_name}: +{exp_gain - original_exp} EXP)",
+                            inline=True
+                        )
+                    else:
+                        embed.add_field(
+                            name="Experiência Ganha",
+                            value=f"+{exp_gain} EXP",
+                            inline=True
+                        )
 
-                # Add level up message if applicable
-                if level_up:
+                    # Add attribute gain
+                    attribute_names = {
+                        "dexterity": "Destreza 🏃‍♂️",
+                        "intellect": "Intelecto 🧠",
+                        "charisma": "Carisma 💬",
+                        "power_stat": "Poder ⚡"
+                    }
                     embed.add_field(
-                        name="Nível Aumentado!",
-                        value=f"Você subiu para o nível {new_level}!\n+{new_level * 50} TUSD",
-                        inline=False
+                        name="Atributo Melhorado",
+                        value=f"{attribute_names[attribute_gain]} +1",
+                        inline=True
                     )
 
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-            else:
-                await interaction.response.send_message(
-                    "Ocorreu um erro durante o treinamento. Por favor, tente novamente mais tarde.", ephemeral=True)
+                    # Add level up message if applicable
+                    if level_up:
+                        embed.add_field(
+                            name="Nível Aumentado!",
+                            value=f"Você subiu para o nível {new_level}!\n+{new_level * 50} TUSD",
+                            inline=False
+                        )
+
+                    await interaction.response.send_message(embed=embed, ephemeral=True)
+                else:
+                    await interaction.response.send_message(
+                        "Ocorreu um erro durante o treinamento. Por favor, tente novamente mais tarde.", ephemeral=True)
         except discord.errors.NotFound:
             # If the interaction has expired, log it but don't try to respond
             logger.warning(f"Interaction expired for user {interaction.user.id} when using /atividade treinar")
@@ -209,135 +208,120 @@ class Activities(commands.Cog):
             except discord.errors.NotFound:
                 pass
 
-    @activity_group.command(name="explorar", description="Explorar a academia em busca de eventos aleatórios")
+    @activity_group.command(name="explorar", description="Explorar a academia em busca de eventos aleatórios",
+                             extras={"defer_ephemeral": False})
+    @serialized_per_user()
     async def slash_explore(self, interaction: discord.Interaction):
         """Slash command version of the explore command."""
         try:
-            # Check if player exists
-            player = await db_provider.get_player(interaction.user.id)
-            if not player:
-                await interaction.response.send_message(
-                    f"{interaction.user.mention}, você ainda não está registrado na Academia Tokugawa. Use /registro ingressar para criar seu personagem.",
-                    ephemeral=True)
-                return
+            async with db_provider.player_session(interaction.user.id, "explorar") as session:
+                # Check if player exists
+                player = session.player
+                if not player:
+                    await interaction.response.send_message(
+                        f"{interaction.user.mention}, você ainda não está registrado na Academia Tokugawa. Use /registro ingressar para criar seu personagem.",
+                        ephemeral=True)
+                    return
 
-            # Garantir que o inventário é um dicionário
-            inventory = player.get('inventory', {})
-            if isinstance(inventory, str):
-                try:
-                    inventory = json.loads(inventory)
-                except Exception:
-                    inventory = {}
-            if not isinstance(inventory, dict):
-                inventory = {}
-            player['inventory'] = inventory
+                # Check cooldown
+                remaining = session.cooldown_remaining("explorar")
+                if remaining:
+                    await interaction.response.send_message(
+                        f"{interaction.user.mention}, você precisa esperar {int(remaining.total_seconds() / 60)} minutos antes de explorar novamente.",
+                        ephemeral=True
+                    )
+                    return
 
-            # Check cooldown
-            cooldowns = await db_provider.get_cooldowns(str(interaction.user.id))
-            for cooldown in cooldowns:
-                if cooldown['SK'] == 'COOLDOWN#explore':
-                    expiry = datetime.fromisoformat(cooldown['expiry'])
-                    if datetime.now() < expiry:
-                        remaining = expiry - datetime.now()
-                        await interaction.response.send_message(
-                            f"{interaction.user.mention}, você precisa esperar {int(remaining.total_seconds() / 60)} minutos antes de explorar novamente.",
-                            ephemeral=True
-                        )
-                        return
+                # Create a random event using the enhanced RandomEvent class
+                random_event = RandomEvent.create_random_event()
 
-            # Create a random event using the enhanced RandomEvent class
-            random_event = RandomEvent.create_random_event()
-
-            # Trigger the event for the player
-            event_result = random_event.trigger(player)
-
-            # Process event effects
-            update_data = {}
-
-            # Experience change
-            if "exp_change" in event_result:
-                update_data["exp"] = player.get("exp", 0) + event_result["exp_change"]
-
-            # TUSD change
-            if "tusd_change" in event_result:
-                update_data["tusd"] = max(0, player.get("tusd", 0) + event_result[
-                    "tusd_change"])  # Ensure TUSD doesn't go below 0
-
-            # Primary attribute change
-            if "attribute_change" in event_result:
-                attribute = event_result["attribute_change"]
-                value = event_result["attribute_value"]
-                current_value = player.get(attribute, 5)  # Default to 5 if not found
-                update_data[attribute] = max(1, min(10, current_value + value))  # Keep between 1 and 10
-
-            # Secondary attribute change (usually negative)
-            if "secondary_attribute_change" in event_result:
-                attribute = event_result["secondary_attribute_change"]
-                value = event_result["secondary_attribute_value"]
-                current_value = player.get(attribute, 5)  # Default to 5 if not found
-                update_data[attribute] = max(1, min(10, current_value + value))  # Keep between 1 and 10
-
-            # All attributes boost
-            if "all_attributes_change" in event_result:
-                value = event_result["all_attributes_change"]
-                for attr in ["dexterity", "intellect", "charisma", "power_stat"]:
-                    current_value = player.get(attr, 5)  # Default to 5 if not found
-                    update_data[attr] = max(1, min(10, current_value + value))  # Keep between 1 and 10
-
-            # Check for level up
-            if "exp" in update_data:
-                new_level = calculate_level_from_exp(update_data["exp"])
-                if new_level > player.get("level", 1):
-                    update_data["level"] = new_level
-                    # Full HP recovery on level up
-                    update_data["hp"] = player.get("max_hp", 100)
-                    # Bonus TUSD for level up
-                    if "tusd" in update_data:
-                        update_data["tusd"] += new_level * 50
-                    else:
-                        update_data["tusd"] = player.get("tusd", 0) + (new_level * 50)
+                # Trigger the event for the player
+                event_result = random_event.trigger(player)
 
-            # Apply HP loss for training (5-15% of max HP)
-            if "hp" in player and "max_hp" in player:
-                hp_loss = random.randint(5, 15)
-                hp_loss_amount = int(player["max_hp"] * (hp_loss / 100))
-                current_hp = player.get("hp", player["max_hp"])
-                update_data["hp"] = max(1, current_hp - hp_loss_amount)
-
-            # Handle item rewards
-            if "item_reward" in event_result:
-                logger.info(f"Player {player.get('name', 'Unknown')} received item: {event_result['item_reward']}")
-                # Add item to inventory
-                item_id = f"item_{datetime.now().timestamp()}"
-                inventory[item_id] = event_result['item_reward']
-                update_data['inventory'] = json.dumps(inventory)
-
-            # Update player in database
-            success = await db_provider.update_player(interaction.user.id, **update_data)
-
-            if success:
-                # Set cooldown
-                await db_provider.store_cooldown(
-                    str(interaction.user.id),
-                    'explore',
-                    datetime.now() + timedelta(minutes=30)
-                )
-
-                # Create embed for event
-                embed = create_event_embed(event_result)
-
-                # Add level up message if applicable
-                if "level" in update_data:
-                    embed.add_field(
-                        name="Nível Aumentado!",
-                        value=f"Você subiu para o nível {update_data['level']}!\n+{update_data['level'] * 50} TUSD",
-                        inline=False
-                    )
+                # Process event effects
+                update_data = {}
 
-                await interaction.response.send_message(embed=embed)
-            else:
-                await interaction.response.send_message(
-                    "Ocorreu um erro durante a exploração. Por favor, tente novamente mais tarde.")
+                # Experience change
+                if "exp_change" in event_result:
+                    update_data["exp"] = player.get("exp", 0) + event_result["exp_change"]
+
+                # TUSD change
+                if "tusd_change" in event_result:
+                    update_data["tusd"] = max(0, player.get("tusd", 0) + event_result[
+                        "tusd_change"])  # Ensure TUSD doesn't go below 0
+
+                # Primary attribute change
+                if "attribute_change" in event_result:
+                    attribute = event_result["attribute_change"]
+                    value = event_result["attribute_value"]
+                    current_value = player.get(attribute, 5)  # Default to 5 if not found
+                    update_data[attribute] = max(1, min(10, current_value + value))  # Keep between 1 and 10
+
+                # Secondary attribute change (usually negative)
+                if "secondary_attribute_change" in event_result:
+                    attribute = event_result["secondary_attribute_change"]
+                    value = event_result["secondary_attribute_value"]
+                    current_value = player.get(attribute, 5)  # Default to 5 if not found
+                    update_data[attribute] = max(1, min(10, current_value + value))  # Keep between 1 and 10
+
+                # All attributes boost
+                if "all_attributes_change" in event_result:
+                    value = event_result["all_attributes_change"]
+                    for attr in ["dexterity", "intellect", "charisma", "power_stat"]:
+                        current_value = player.get(attr, 5)  # Default to 5 if not found
+                        update_data[attr] = max(1, min(10, current_value + value))  # Keep between 1 and 10
+
+                # Check for level up
+                if "exp" in update_data:
+                    new_level = calculate_level_from_exp(update_data["exp"])
+                    if new_level > player.get("level", 1):
+                        update_data["level"] = new_level
+                        # Full HP recovery on level up
+                        update_data["hp"] = player.get("max_hp", 100)
+                        # Bonus TUSD for level up
+                        if "tusd" in update_data:
+                            update_data["tusd"] += new_level * 50
+                        else:
+                            update_data["tusd"] = player.get("tusd", 0) + (new_level * 50)
+
+                # Apply HP loss for training (5-15% of max HP)
+                if "hp" in player and "max_hp" in player:
+                    hp_loss = random.randint(5, 15)
+                    hp_loss_amount = int(player["max_hp"] * (hp_loss / 100))
+                    current_hp = player.get("hp", player["max_hp"])
+                    update_data["hp"] = max(1, current_hp - hp_loss_amount)
+
+                # Handle item rewards
+                if "item_reward" in event_result:
+                    logger.info(f"Player {player.get('name', 'Unknown')} received item: {event_result['item_reward']}")
+                    # Grant the item in the same transaction as the stat changes
+                    item_id = f"item_{datetime.now().timestamp()}"
+                    item_reward = event_result['item_reward']
+                    if not isinstance(item_reward, dict):
+                        item_reward = {"name": str(item_reward), "description": str(item_reward)}
+                    session.add_item(item_id, item_reward)
+
+                # Apply stats and cooldown in a single transaction
+                player.update(update_data)
+                session.set_cooldown("explorar", COOLDOWN_DURATIONS["explorar"])
+                success = await session.commit()
+
+                if success:
+                    # Create embed for event
+                    embed = create_event_embed(event_result)
+
+                    # Add level up message if applicable
+                    if "level" in update_data:
+                        embed.add_field(
+                            name="Nível Aumentado!",
+                            value=f"Você subiu para o nível {update_data['level']}!\n+{update_data['level'] * 50} TUSD",
+                            inline=False
+                        )
+
+                    await interaction.response.send_message(embed=embed)
+                else:
+                    await interaction.response.send_message(
+                        "Ocorreu um erro durante a exploração. Por favor, tente novamente mais tarde.")
         except discord.errors.NotFound:
             # If the interaction has expired, log it but don't try to respond
             logger.warning(f"Interaction expired for user {interaction.user.id} when using /atividade explorar")
@@ -419,115 +403,110 @@ class Activities(commands.Cog):
                 # Mark duel as active
                 self.active_duels[interaction.user.id] = opponent.id
 
-                # Calculate duel outcome using the new DuelCalculator
-                calculator = DuelCalculator()
-                duel_result = calculator.calculate_outcome(challenger, opponent_player, duel_type)
-
-                # Generate narration using the new DuelNarrator
-                narration = DuelNarrator.generate_narration(duel_result)
-                duel_result["narration"] = narration
-
-                # Update winner and loser
-                winner_id = duel_result["winner"]["user_id"]
-                loser_id = duel_result["loser"]["user_id"]
-
-                # Update winner
-                winner_update = {
-                    "exp": duel_result["winner"]["exp"] + duel_result["exp_reward"],
-                    "tusd": duel_result["winner"]["tusd"] + duel_result["tusd_reward"]
-                }
+                async with user_lanes.hold(interaction.user.id, opponent.id, name="duelar"), \
+                        track_round_trips("duelar"):
+                    # Re-read both players in one parallel round; the challenge may be a minute old
+                    sessions = await load_sessions((interaction.user.id, opponent.id), "duelar")
+                    challenger_session, opponent_session = sessions
+                    if not challenger_session.exists or not opponent_session.exists:
+                        await button_interaction.response.send_message("Ocorreu um erro durante o duelo. Por favor, tente novamente mais tarde.")
+                        self.active_duels.pop(interaction.user.id, None)
+                        return
+                    sessions_by_id = {session.user_id: session for session in sessions}
+
+                    # Calculate duel outcome using the new DuelCalculator
+                    calculator = DuelCalculator()
+                    duel_result = calculator.calculate_outcome(challenger_session.player, opponent_session.player, duel_type)
+
+                    # Generate narration using the new DuelNarrator
+                    narration = DuelNarrator.generate_narration(duel_result)
+                    duel_result["narration"] = narration
+
+                    # Update winner and loser
+                    winner_id = duel_result["winner"]["user_id"]
+                    loser_id = duel_result["loser"]["user_id"]
+                    winner_session = sessions_by_id[str(winner_id)]
+                    loser_session = sessions_by_id[str(loser_id)]
+
+                    # Update winner
+                    winner_update = {
+                        "exp": duel_result["winner"]["exp"] + duel_result["exp_reward"],
+                        "tusd": duel_result["winner"]["tusd"] + duel_result["tusd_reward"]
+                    }
 
-                # Check for level up
-                new_level = calculate_level_from_exp(winner_update["exp"])
-                if new_level > duel_result["winner"]["level"]:
-                    winner_update["level"] = new_level
-                    # Full HP recovery on level up
-                    winner_update["hp"] = player["max_hp"]
-                    # Add level up bonus
-                    winner_update["tusd"] += new_level * 50
-
-                # Check for bonus rewards
-                if "bonus_rewards" in duel_result and duel_result["bonus_rewards"] and "item" in duel_result[
-                    "bonus_rewards"]:
-                    # Get winner's inventory
-                    winner_player = await db_provider.get_player(winner_id)
-                    if winner_player and "inventory" in winner_player:
-                        inventory = winner_player["inventory"]
-
-                        # Get bonus item details
+                    # Check for level up
+                    new_level = calculate_level_from_exp(winner_update["exp"])
+                    if new_level > duel_result["winner"]["level"]:
+                        winner_update["level"] = new_level
+                        # Full HP recovery on level up
+                        winner_update["hp"] = winner_session.player.get("max_hp", 100)
+                        # Add level up bonus
+                        winner_update["tusd"] += new_level * 50
+
+                    # Check for bonus rewards
+                    if "bonus_rewards" in duel_result and duel_result["bonus_rewards"] and "item" in duel_result[
+                        "bonus_rewards"]:
+                        # Grant the bonus item in the same transaction as the stat changes
                         bonus_item = duel_result["bonus_rewards"]
                         item_id = bonus_item["item"]
+                        winner_session.add_item(str(item_id), {
+                            "name": bonus_item["item_name"],
+                            "description": bonus_item["item_description"],
+                            "quantity": 1,
+                            "type": "consumable",
+                            "rarity": "uncommon",
+                            "category": "duel_reward"
+                        })
+
+                    # Update loser (half exp, no TUSD, and HP loss)
+                    loser_update = {
+                        "exp": duel_result["loser"]["exp"] + (duel_result["exp_reward"] // 2)
+                    }
 
-                        # Check if item already exists in inventory
-                        if str(item_id) in inventory:
-                            # Increment quantity
-                            inventory[str(item_id)]["quantity"] += 1
-                        else:
-                            # Add new item to inventory
-                            inventory_item = {
-                                "id": item_id,
-                                "name": bonus_item["item_name"],
-                                "description": bonus_item["item_description"],
-                                "quantity": 1,
-                                "type": "consumable",
-                                "rarity": "uncommon",
-                                "category": "duel_reward"
-                            }
-                            inventory[str(item_id)] = inventory_item
-
-                        # Add inventory to winner update
-                        winner_update["inventory"] = json.dumps(inventory)
-
-                # Update loser (half exp, no TUSD, and HP loss)
-                loser_update = {
-                    "exp": duel_result["loser"]["exp"] + (duel_result["exp_reward"] // 2)
-                }
-
-                # Apply HP loss to loser if HP system is available
-                if 'hp' in duel_result["loser"] and 'max_hp' in duel_result["loser"]:
-                    current_hp = duel_result["loser"]["hp"]
-                    hp_loss = duel_result.get("hp_loss", 10)  # Default to 10 if not specified
-                    new_hp = max(1, current_hp - hp_loss)  # Ensure HP doesn't go below 1
-                    loser_update["hp"] = new_hp
-
-                # Check for level up
-                new_level = calculate_level_from_exp(loser_update["exp"])
-                if new_level > duel_result["loser"]["level"]:
-                    loser_update["level"] = new_level
-
-                # Update players in database
-                winner_success = await db_provider.update_player(winner_id, **winner_update)
-                loser_success = await db_provider.update_player(loser_id, **loser_update)
-
-                if winner_success and loser_success:
-                    # Set cooldown for challenger
-                    await self._set_cooldown(interaction.user.id, "duelar")
-
-                    # Create duel result embed
-                    embed = create_duel_embed(duel_result)
-
-                    # Add level up messages if applicable
-                    if "level" in winner_update:
-                        embed.add_field(
-                            name=f"{duel_result['winner']['name']} Subiu de Nível!",
-                            value=f"Novo nível: {winner_update['level']}",
-                            inline=False
-                        )
-
-                    if "level" in loser_update:
-                        embed.add_field(
-                            name=f"{duel_result['loser']['name']} Subiu de Nível!",
-                            value=f"Novo nível: {loser_update['level']}",
-                            inline=False
-                        )
-
-                    await button_interaction.response.send_message(embed=embed)
-
-                    # Dispatch an event for the duel completion
-                    self.bot.dispatch("duel_complete", duel_result)
-                else:
-                    await button_interaction.response.send_message(
-                        "Ocorreu um erro durante o duelo. Por favor, tente novamente mais tarde.")
+                    # Apply HP loss to loser if HP system is available
+                    if 'hp' in duel_result["loser"] and 'max_hp' in duel_result["loser"]:
+                        current_hp = duel_result["loser"]["hp"]
+                        hp_loss = duel_result.get("hp_loss", 10)  # Default to 10 if not specified
+                        new_hp = max(1, current_hp - hp_loss)  # Ensure HP doesn't go below 1
+                        loser_update["hp"] = new_hp
+
+                    # Check for level up
+                    new_level = calculate_level_from_exp(loser_update["exp"])
+                    if new_level > duel_result["loser"]["level"]:
+                        loser_update["level"] = new_level
+
+                    # Apply both players' changes and the challenger's cooldown in a single transaction
+                    winner_session.player.update(winner_update)
+                    loser_session.player.update(loser_update)
+                    challenger_session.set_cooldown("duelar", COOLDOWN_DURATIONS["duelar"])
+                    success = await commit_sessions(winner_session, loser_session)
+
+                    if success:
+                        # Create duel result embed
+                        embed = create_duel_embed(duel_result)
+
+                        # Add level up messages if applicable
+                        if "level" in winner_update:
+                            embed.add_field(
+                                name=f"{duel_result['winner']['name']} Subiu de Nível!",
+                                value=f"Novo nível: {winner_update['level']}",
+                                inline=False
+                            )
+
+                        if "level" in loser_update:
+                            embed.add_field(
+                                name=f"{duel_result['loser']['name']} Subiu de Nível!",
+                                value=f"Novo nível: {loser_update['level']}",
+                                inline=False
+                            )
+
+                        await button_interaction.response.send_message(embed=embed)
+
+                        # Dispatch an event for the duel completion
+                        self.bot.dispatch("duel_complete", duel_result)
+                    else:
+                        await button_interaction.response.send_message(
+                            "Ocorreu um erro durante o duelo. Por favor, tente novamente mais tarde.")
 
                 # Remove active duel
                 if interaction.user.id in self.active_duels:
@@ -597,7 +576,8 @@ class Activities(commands.Cog):
             logger.error(f"Error in handle_duel: {e}")
             return False
 
-    @activity_group.command(name="duelar", description="Desafiar outro jogador para um duelo")
+    @activity_group.command(name="duelar", description="Desafiar outro jogador para um duelo",
+                             extras={"defer_ephemeral": False})
     @app_commands.choices(duel_type=[
         app_commands.Choice(name="Físico", value="physical"),
         app_commands.Choice(name="Mental", value="mental"),
@@ -633,136 +613,143 @@ class Activities(commands.Cog):
         except Exception as e:
             logger.error(f"Error in slash_duel: {e}")
 
-    @activity_group.command(name="evento", description="Participar do evento atual da academia")
+    @activity_group.command(name="evento", description="Participar do evento atual da academia",
+                             extras={"defer_ephemeral": False})
+    @serialized_per_user()
     async def slash_event(self, interaction: discord.Interaction):
         """Slash command version of the event command."""
         try:
-            # Check if player exists
-            player = db_provider.get_player(interaction.user.id)
-            if not player:
-                await interaction.response.send_message(
-                    f"{interaction.user.mention}, você ainda não está registrado na Academia Tokugawa. Use /registro ingressar para criar seu personagem.")
-                return
-
-            # Check cooldown
-            cooldown = await self._check_cooldown(interaction.user.id, "evento")
-            if cooldown:
-                await interaction.response.send_message(
-                    f"{interaction.user.mention}, você precisa esperar antes de participar de outro evento. Tempo restante: {cooldown}")
-                return
+            async with db_provider.player_session(interaction.user.id, "evento") as session:
+                # Check if player exists
+                player = session.player
+                if not player:
+                    await interaction.response.send_message(
+                        f"{interaction.user.mention}, você ainda não está registrado na Academia Tokugawa. Use /registro ingressar para criar seu personagem.")
+                    return
 
-            # Create a random event using the new SOLID architecture
-            random_event = RandomEvent.create_random_event()
-            event_result = random_event.trigger(player)
+                # Check cooldown
+                cooldown = self._format_cooldown(session.cooldown_remaining("evento"))
+                if cooldown:
+                    await interaction.response.send_message(
+                        f"{interaction.user.mention}, você precisa esperar antes de participar de outro evento. Tempo restante: {cooldown}")
+                    return
 
-            # Process the event result
-            update_data = {}
+                # Create a random event using the new SOLID architecture
+                random_event = RandomEvent.create_random_event()
+                event_result = random_event.trigger(player)
 
-            # Experience change
-            if "exp_change" in event_result:
-                exp_change = event_result["exp_change"]
-                new_exp = player["exp"] + exp_change
-                update_data["exp"] = new_exp
+                # Process the event result
+                update_data = {}
 
-                # Check for level up
-                new_level = ExperienceCalculator.calculate_level(new_exp)
-                if new_level > player["level"]:
-                    update_data["level"] = new_level
-                    # Full HP recovery on level up
-                    update_data["hp"] = player["max_hp"]
-                    # Bonus TUSD for level up
-                    update_data["tusd"] = player.get("tusd", 0) + (new_level * 50)
-
-            # TUSD change
-            if "tusd_change" in event_result and "tusd" not in update_data:
-                tusd_change = event_result["tusd_change"]
-                update_data["tusd"] = player.get("tusd", 0) + tusd_change
-
-            # Attribute change
-            if "attribute_change" in event_result:
-                attribute = event_result["attribute_change"]
-                value = event_result.get("attribute_value", 1)
-                update_data[attribute] = player.get(attribute, 0) + value
-
-            # Update player in database
-            success = db_provider.update_player(interaction.user.id, **update_data)
-
-            if success:
-                # Set cooldown
-                await self._set_cooldown(interaction.user.id, "evento")
-
-                # Create embed for event result
-                embed = create_event_embed(
-                    title=random_event.get_title(),
-                    description=random_event.get_description(),
-                    event_type=random_event.get_type()
-                )
-
-                # Add fields for changes
+                # Experience change
                 if "exp_change" in event_result:
-                    embed.add_field(
-                        name="Experiência",
-                        value=f"{'+' if event_result['exp_change'] >= 0 else ''}{event_result['exp_change']} EXP",
-                        inline=True
-                    )
+                    exp_change = event_result["exp_change"]
+                    new_exp = player["exp"] + exp_change
+                    update_data["exp"] = new_exp
+
+                    # Check for level up
+                    new_level = ExperienceCalculator.calculate_level(new_exp)
+                    if new_level > player["level"]:
+                        update_data["level"] = new_level
+                        # Full HP recovery on level up
+                        update_data["hp"] = player["max_hp"]
+                        # Bonus TUSD for level up
+                        update_data["tusd"] = player.get("tusd", 0) + (new_level * 50)
 
-                if "tusd_change" in event_result:
-                    embed.add_field(
-                        name="TUSD",
-                        value=f"{'+' if event_result['tusd_change'] >= 0 else ''}{event_result['tusd_change']} TUSD",
-                        inline=True
-                    )
+                # TUSD change
+                if "tusd_change" in event_result and "tusd" not in update_data:
+                    tusd_change = event_result["tusd_change"]
+                    update_data["tusd"] = player.get("tusd", 0) + tusd_change
 
+                # Attribute change
                 if "attribute_change" in event_result:
-                    attribute_names = {
-                        "dexterity": "Destreza",
-                        "intellect": "Intelecto",
-                        "charisma": "Carisma",
-                        "power_stat": "Poder"
-                    }
-                    attribute_name = attribute_names.get(event_result["attribute_change"],
-                                                         event_result["attribute_change"])
-                    embed.add_field(
-                        name=attribute_name,
-                        value=f"+{event_result.get('attribute_value', 1)}",
-                        inline=True
+                    attribute = event_result["attribute_change"]
+                    value = event_result.get("attribute_value", 1)
+                    update_data[attribute] = player.get(attribute, 0) + value
+
+                # Apply stats and cooldown in a single transaction
+                player.update(update_data)
+                session.set_cooldown("evento", COOLDOWN_DURATIONS["evento"])
+                success = await session.commit()
+
+                if success:
+                    # Create embed for event result
+                    embed = create_event_embed(
+                        title=random_event.get_title(),
+                        description=random_event.get_description(),
+                        event_type=random_event.get_type()
                     )
 
-                if "item_reward" in event_result:
-                    embed.add_field(
-                        name="Item",
-                        value=f"Você recebeu: {event_result['item_reward']}",
-                        inline=False
-                    )
+                    # Add fields for changes
+                    if "exp_change" in event_result:
+                        embed.add_field(
+                            name="Experiência",
+                            value=f"{'+' if event_result['exp_change'] >= 0 else ''}{event_result['exp_change']} EXP",
+                            inline=True
+                        )
 
-                await interaction.response.send_message(embed=embed)
+                    if "tusd_change" in event_result:
+                        embed.add_field(
+                            name="TUSD",
+                            value=f"{'+' if event_result['tusd_change'] >= 0 else ''}{event_result['tusd_change']} TUSD",
+                            inline=True
+                        )
 
-                # If the event triggers a duel, start it
-                if event_result.get("trigger_duel", False):
-                    # This would be implemented in a future update
-                    await interaction.followup.send(
-                        "Um duelo foi desencadeado pelo evento! Esta funcionalidade será implementada em breve.")
-            else:
-                await interaction.response.send_message(
-                    "Ocorreu um erro ao processar o evento. Por favor, tente novamente mais tarde.")
+                    if "attribute_change" in event_result:
+                        attribute_names = {
+                            "dexterity": "Destreza",
+                            "intellect": "Intelecto",
+                            "charisma": "Carisma",
+                            "power_stat": "Poder"
+                        }
+                        attribute_name = attribute_names.get(event_result["attribute_change"],
+                                                             event_result["attribute_change"])
+                        embed.add_field(
+                            name=attribute_name,
+                            value=f"+{event_result.get('attribute_value', 1)}",
+                            inline=True
+                        )
+
+                    if "item_reward" in event_result:
+                        embed.add_field(
+                            name="Item",
+                            value=f"Você recebeu: {event_result['item_reward']}",
+                            inline=False
+                        )
+
+                    await interaction.response.send_message(embed=embed)
+
+                    # If the event triggers a duel, start it
+                    if event_result.get("trigger_duel", False):
+                        # This would be implemented in a future update
+                        await interaction.followup.send(
+                            "Um duelo foi desencadeado pelo evento! Esta funcionalidade será implementada em breve.")
+                else:
+                    await interaction.response.send_message(
+                        "Ocorreu um erro ao processar o evento. Por favor, tente novamente mais tarde.")
         except discord.errors.NotFound:
             # If the interaction has expired, log it but don't try to respond
             logger.warning(f"Interaction expired for user {interaction.user.id} when using /atividade evento")
         except Exception as e:
             logger.error(f"Error in slash_event: {e}")
 
+    @staticmethod
+    def _format_cooldown(remaining):
+        """Format the remaining time of a cooldown, or None if it is not active."""
+        if not remaining:
+            return None
+        minutes = int(remaining.total_seconds() // 60)
+        seconds = int(remaining.total_seconds() % 60)
+        return f"{minutes}m {seconds}s"
+
     async def _check_cooldown(self, user_id, command):
         """Check if a command is on cooldown for a user."""
         try:
             # Get cooldown directly for this user and command
             cooldown = await db_provider.get_cooldown(str(user_id), command)
 
-            if cooldown:
-                if datetime.now() < cooldown:
-                    remaining = cooldown - datetime.now()
-                    minutes = int(remaining.total_seconds() // 60)
-                    seconds = int(remaining.total_seconds() % 60)
-                    return f"{minutes}m {seconds}s"
+            if cooldown and datetime.now() < cooldown:
+                return self._format_cooldown(cooldown - datetime.now())
             return None
         except Exception as e:
             logger.error(f"Error checking cooldown: {e}")
@@ -778,226 +765,212 @@ class Activities(commands.Cog):
             logger.error(f"Error setting cooldown: {e}")
 
     @commands.command(name="treinar")
+    @serialized_per_user()
     async def train(self, ctx):
         """Treinar para ganhar experiência e melhorar atributos."""
         try:
-            # Check if player exists
-            player = await db_provider.get_player(ctx.author.id)
-            if not player:
-                await ctx.send(
-                    f"{ctx.author.mention}, você ainda não está registrado na Academia Tokugawa. Use !ingressar para criar seu personagem.")
-                return
-
-            # Check cooldown
-            cooldown = await self._check_cooldown(ctx.author.id, "treinar")
-            if cooldown:
-                await ctx.send(
-                    f"{ctx.author.mention}, você precisa descansar antes de treinar novamente. Tempo restante: {cooldown}")
-                return
+            async with db_provider.player_session(ctx.author.id, "treinar", load_equipped=True) as session:
+                # Check if player exists
+                player = session.player
+                if not player:
+                    await ctx.send(
+                        f"{ctx.author.mention}, você ainda não está registrado na Academia Tokugawa. Use !ingressar para criar seu personagem.")
+                    return
 
-            # Create a random training event using the new SOLID architecture
-            training_event = TrainingEvent.create_random_training_event()
-            training_result = training_event.trigger(player)
+                # Check cooldown
+                cooldown = self._format_cooldown(session.cooldown_remaining("treinar"))
+                if cooldown:
+                    await ctx.send(
+                        f"{ctx.author.mention}, você precisa descansar antes de treinar novamente. Tempo restante: {cooldown}")
+                    return
 
-            # Get the outcome, experience and attribute gains from the event
-            outcome = training_event.get_description()
-            exp_gain = training_result["exp_gain"]
-            attribute_gain = training_result.get("attribute_gain",
-                                                 random.choice(["dexterity", "intellect", "charisma", "power_stat"]))
+                # Create a random training event using the new SOLID architecture
+                training_event = TrainingEvent.create_random_training_event()
+                training_result = training_event.trigger(player)
+
+                # Get the outcome, experience and attribute gains from the event
+                outcome = training_event.get_description()
+                exp_gain = training_result["exp_gain"]
+                attribute_gain = training_result.get("attribute_gain",
+                                                     random.choice(["dexterity", "intellect", "charisma", "power_stat"]))
+
+                # Check if player has equipped accessories that boost experience
+                inventory = session.equipped_items
+
+                accessory_boost_applied = False
+                accessory_name = ""
+                original_exp = exp_gain
+
+                for item_id, item in inventory.items():
+                    if item.get("type") == "accessory" and item.get("equipped", False) and "exp_boost" in item.get("effects", {}):
+                        # Apply experience boost from accessory
+                        exp_boost = item["effects"]["exp_boost"]
+                        exp_gain = int(exp_gain * exp_boost)
+                        accessory_boost_applied = True
+                        accessory_name = item["name"]
+                        logger.info(
+                            f"Player {player.get('name', 'Unknown')} gained {exp_gain} exp (boosted from {original_exp}) due to equipped accessory {item['name']}")
+
+                # Update player data using the new ExperienceCalculator
+                new_exp = player.get("exp", 0) + exp_gain
+                new_level = ExperienceCalculator.calculate_level(new_exp)
+                level_up = new_level > player.get("level", 1)
 
-            # Check if player has equipped accessories that boost experience
-            inventory = player.get('inventory', {})
-            if isinstance(inventory, str):
-                try:
-                    inventory = json.loads(inventory)
-                except Exception:
-                    inventory = {}
-            if not isinstance(inventory, dict):
-                inventory = {}
-
-            accessory_boost_applied = False
-            accessory_name = ""
-            original_exp = exp_gain
-
-            for item_id, item in inventory.items():
-                if item["type"] == "accessory" and item.get("equipped", False) and "exp_boost" in item["effects"]:
-                    # Apply experience boost from accessory
-                    exp_boost = item["effects"]["exp_boost"]
-                    exp_gain = int(exp_gain * exp_boost)
-                    accessory_boost_applied = True
-                    accessory_name = item["name"]
-                    logger.info(
-                        f"Player {player.get('name', 'Unknown')} gained {exp_gain} exp (boosted from {original_exp}) due to equipped accessory {item['name']}")
-
-            # Update player data using the new ExperienceCalculator
-            new_exp = player.get("exp", 0) + exp_gain
-            new_level = ExperienceCalculator.calculate_level(new_exp)
-            level_up = new_level > player.get("level", 1)
-
-            # Prepare update data
-            update_data = {
-                "exp": new_exp,
-                attribute_gain: player.get(attribute_gain, 5) + 1,  # Increase the chosen attribute
-                "tusd": player.get("tusd", 0) + 10  # Add TUSD reward for training
-            }
+                # Prepare update data
+                update_data = {
+                    "exp": new_exp,
+                    attribute_gain: player.get(attribute_gain, 5) + 1,  # Increase the chosen attribute
+                    "tusd": player.get("tusd", 0) + 10  # Add TUSD reward for training
+                }
 
-            if level_up:
-                update_data["level"] = new_level
-                # Full HP recovery on level up
-                update_data["hp"] = player.get("max_hp", 100)
-                # Bonus TUSD for level up
-                update_data["tusd"] = player.get("tusd", 0) + (
-                            new_level * 50) + 10  # Add base TUSD reward plus level up bonus
-
-            # Apply HP loss for training (5-15% of max HP)
-            if "hp" in player and "max_hp" in player:
-                hp_loss = random.randint(5, 15)
-                hp_loss_percentage = Decimal(hp_loss) / Decimal(100)
-                hp_loss_amount = int(player["max_hp"] * hp_loss_percentage)
-                current_hp = player.get("hp", player["max_hp"])
-                update_data["hp"] = max(1, current_hp - hp_loss_amount)
-
-            # Update player in database
-            success = await db_provider.update_player(ctx.author.id, **update_data)
-
-            if success:
-                # Set cooldown
-                await self._set_cooldown(ctx.author.id, "treinar")
-
-                # Create embed for training result
-                embed = create_basic_embed(
-                    title="Treinamento Concluído!",
-                    description=outcome,
-                    color=0x00FF00
-                )
-
-                # Add experience gain
-                if accessory_boost_applied:
-                    embed.add_field(
-                        name="Experiência Ganha",
-                        value=f"+{exp_gain} EXP (Bônus de {accessory_name}: +{exp_gain - original_exp} EXP)",
-                        inline=True
-                    )
-                else:
-                    embed.add_field(
-                        name="Experiência Ganha",
-                        value=f"+{exp_gain} EXP",
-                        inline=True
+                if level_up:
+                    update_data["level"] = new_level
+                    # Full HP recovery on level up
+                    update_data["hp"] = player.get("max_hp", 100)
+                    # Bonus TUSD for level up
+                    update_data["tusd"] = player.get("tusd", 0) + (
+                                new_level * 50) + 10  # Add base TUSD reward plus level up bonus
+
+                # Apply HP loss for training (5-15% of max HP)
+                if "hp" in player and "max_hp" in player:
+                    hp_loss = random.randint(5, 15)
+                    hp_loss_percentage = Decimal(hp_loss) / Decimal(100)
+                    hp_loss_amount = int(player["max_hp"] * hp_loss_percentage)
+                    current_hp = player.get("hp", player["max_hp"])
+                    update_data["hp"] = max(1, current_hp - hp_loss_amount)
+
+                # Apply stats and cooldown in a single transaction
+                player.update(update_data)
+                session.set_cooldown("treinar", COOLDOWN_DURATIONS["treinar"])
+                success = await session.commit()
+
+                if success:
+                    # Create embed for training result
+                    embed = create_basic_embed(
+                        title="Treinamento Concluído!",
+                        description=outcome,
+                        color=0x00FF00
                     )
 
-                # Add attribute gain
-                attribute_names = {
-                    "dexterity": "Destreza 🏃‍♂️",
-                    "intellect": "Intelecto 🧠",
-                    "charisma": "Carisma 💬",
-                    "power_stat": "Poder ⚡"
-                }
-                embed.add_field(
-                    name="Atributo Melhorado",
-                    value=f"{attribute_names[attribute_gain]} +1",
-                    inline=True
-                )
+                    # Add experience gain
+                    if accessory_boost_applied:
+                        embed.add_field(
+                            name="Experiência Ganha",
+                            value=f"+{exp_gain} EXP (Bônus de {accessory_name}: +{exp_gain - original_exp} EXP)",
+                            inline=True
+                        )
+                    else:
+                        embed.add_field(
+                            name="Experiência Ganha",
+                            value=f"+{exp_gain} EXP",
+                            inline=True
+                        )
 
-                # Add level up message if applicable
-                if level_up:
+                    # Add attribute gain
+                    attribute_names = {
+                        "dexterity": "Destreza 🏃‍♂️",
+                        "intellect": "Intelecto 🧠",
+                        "charisma": "Carisma 💬",
+                        "power_stat": "Poder ⚡"
+                    }
                     embed.add_field(
-                        name="Nível Aumentado!",
-                        value=f"Você subiu para o nível {new_level}!\n+{new_level * 50} TUSD",
-                        inline=False
+                        name="Atributo Melhorado",
+                        value=f"{attribute_names[attribute_gain]} +1",
+                        inline=True
                     )
 
-                await ctx.send(embed=embed)
-            else:
-                await ctx.send("Ocorreu um erro durante o treinamento. Por favor, tente novamente mais tarde.")
+                    # Add level up message if applicable
+                    if level_up:
+                        embed.add_field(
+                            name="Nível Aumentado!",
+                            value=f"Você subiu para o nível {new_level}!\n+{new_level * 50} TUSD",
+                            inline=False
+                        )
+
+                    await ctx.send(embed=embed)
+                else:
+                    await ctx.send("Ocorreu um erro durante o treinamento. Por favor, tente novamente mais tarde.")
         except Exception as e:
             logger.error(f"Error in train command: {e}", exc_info=True)
             await ctx.send("Ocorreu um erro durante o treinamento. Por favor, tente novamente mais tarde.")
 
     @commands.command(name="explorar")
+    @serialized_per_user()
     async def explore(self, ctx):
         """Explorar a academia em busca de eventos aleatórios."""
         try:
-            # Check if player exists
-            player = await db_provider.get_player(ctx.author.id)
-            if not player:
-                await ctx.send(
-                    f"{ctx.author.mention}, você ainda não está registrado na Academia Tokugawa. Use !ingressar para criar seu personagem.")
-                return
-
-            # LOG: Mostrar dados do player e inventário
-            logger.info(f"[EXPLORAR] Player lido: {player}")
-
-            # Garantir que o inventário é um dicionário
-            inventory = player.get('inventory', {})
-            if isinstance(inventory, str):
-                try:
-                    inventory = json.loads(inventory)
-                except Exception:
-                    inventory = {}
-            if not isinstance(inventory, dict):
-                inventory = {}
-            player['inventory'] = inventory
-
-            # Check cooldown
-            cooldown = await self._check_cooldown(ctx.author.id, "explorar")
-            if cooldown:
-                await ctx.send(
-                    f"{ctx.author.mention}, você precisa descansar antes de explorar novamente. Tempo restante: {cooldown}")
-                return
-
-            # Create a random event using the enhanced RandomEvent class
-            random_event = RandomEvent.create_random_event()
-
-            # Trigger the event for the player
-            event_result = random_event.trigger(player)
+            async with db_provider.player_session(ctx.author.id, "explorar") as session:
+                # Check if player exists
+                player = session.player
+                if not player:
+                    await ctx.send(
+                        f"{ctx.author.mention}, você ainda não está registrado na Academia Tokugawa. Use !ingressar para criar seu personagem.")
+                    return
 
-            # Process event effects
-            update_data = {}
+                # LOG: Mostrar dados do player e inventário
+                logger.info(f"[EXPLORAR] Player lido: {player}")
 
-            # Experience change
-            if "exp_change" in event_result:
-                update_data["exp"] = player.get("exp", 0) + event_result["exp_change"]
+                # Check cooldown
+                cooldown = self._format_cooldown(session.cooldown_remaining("explorar"))
+                if cooldown:
+                    await ctx.send(
+                        f"{ctx.author.mention}, você precisa descansar antes de explorar novamente. Tempo restante: {cooldown}")
+                    return
 
-            # TUSD change
-            if "tusd_change" in event_result:
-                update_data["tusd"] = max(0, player.get("tusd", 0) + event_result[
-                    "tusd_change"])  # Ensure TUSD doesn't go below 0
+                # Create a random event using the enhanced RandomEvent class
+                random_event = RandomEvent.create_random_event()
 
-            # Attribute changes
-            if "attribute_changes" in event_result:
-                for attr, change in event_result["attribute_changes"].items():
-                    current_value = player.get(attr, 5)  # Default to 5 if not found
-                    update_data[attr] = max(1, min(10, current_value + change))  # Keep between 1 and 10
+                # Trigger the event for the player
+                event_result = random_event.trigger(player)
 
-            # Handle item rewards
-            if "item_reward" in event_result:
-                logger.info(f"Player {player.get('name', 'Unknown')} received item: {event_result['item_reward']}")
-                # Add item to inventory
-                item_id = f"item_{datetime.now().timestamp()}"
-                inventory[item_id] = event_result['item_reward']
-                update_data['inventory'] = json.dumps(inventory)
+                # Process event effects
+                update_data = {}
 
-            # Update player in database
-            success = await db_provider.update_player(ctx.author.id, **update_data)
+                # Experience change
+                if "exp_change" in event_result:
+                    update_data["exp"] = player.get("exp", 0) + event_result["exp_change"]
 
-            if success:
-                # Set cooldown
-                await self._set_cooldown(ctx.author.id, "explorar")
+                # TUSD change
+                if "tusd_change" in event_result:
+                    update_data["tusd"] = max(0, player.get("tusd", 0) + event_result[
+                        "tusd_change"])  # Ensure TUSD doesn't go below 0
 
-                # Create embed for event
-                embed = create_event_embed(event_result)
+                # Attribute changes
+                if "attribute_changes" in event_result:
+                    for attr, change in event_result["attribute_changes"].items():
+                        current_value = player.get(attr, 5)  # Default to 5 if not found
+                        update_data[attr] = max(1, min(10, current_value + change))  # Keep between 1 and 10
 
-                # Add level up message if applicable
-                if "level" in update_data:
-                    embed.add_field(
-                        name="Nível Aumentado!",
-                        value=f"Você subiu para o nível {update_data['level']}!\n+{update_data['level'] * 50} TUSD",
-                        inline=False
-                    )
+                # Handle item rewards
+                if "item_reward" in event_result:
+                    logger.info(f"Player {player.get('name', 'Unknown')} received item: {event_result['item_reward']}")
+                    # Grant the item in the same transaction as the stat changes
+                    item_id = f"item_{datetime.now().timestamp()}"
+                    item_reward = event_result['item_reward']
+                    if not isinstance(item_reward, dict):
+                        item_reward = {"name": str(item_reward), "description": str(item_reward)}
+                    session.add_item(item_id, item_reward)
+
+                # Apply stats and cooldown in a single transaction
+                player.update(update_data)
+                session.set_cooldown("explorar", COOLDOWN_DURATIONS["explorar"])
+                success = await session.commit()
+
+                if success:
+                    # Create embed for event
+                    embed = create_event_embed(event_result)
+
+                    # Add level up message if applicable
+                    if "level" in update_data:
+                        embed.add_field(
+                            name="Nível Aumentado!",
+                            value=f"Você subiu para o nível {update_data['level']}!\n+{update_data['level'] * 50} TUSD",
+                            inline=False
+                        )
 
-                await ctx.send(embed=embed)
-            else:
-                await ctx.send("Ocorreu um erro durante a exploração. Por favor, tente novamente mais tarde.")
+                    await ctx.send(embed=embed)
+                else:
+                    await ctx.send("Ocorreu um erro durante a exploração. Por favor, tente novamente mais tarde.")
         except Exception as e:
             logger.error(f"Error in explore command: {e}", exc_info=True)
             await ctx.send("Ocorreu um erro durante a exploração. Por favor, tente novamente mais tarde.")
@@ -1078,104 +1051,98 @@ class Activities(commands.Cog):
 
             # Process response
             if response.content.lower() in ["sim", "yes"]:
-                # Calculate duel outcome using the new DuelCalculator
-                calculator = DuelCalculator()
-                duel_result = calculator.calculate_outcome(challenger, opponent_player, duel_type)
-
-                # Generate narration using the new DuelNarrator
-                narration = DuelNarrator.generate_narration(duel_result)
-                duel_result["narration"] = narration
-
-                # Update winner and loser
-                winner_id = duel_result["winner"]["user_id"]
-                loser_id = duel_result["loser"]["user_id"]
-
-                # Update winner
-                winner_update = {
-                    "exp": duel_result["winner"]["exp"] + duel_result["exp_reward"],
-                    "tusd": duel_result["winner"]["tusd"] + duel_result["tusd_reward"]
-                }
+                async with user_lanes.hold(ctx.author.id, opponent.id, name="duelar"), \
+                        track_round_trips("duelar"):
+                    # Re-read both players in one parallel round; the challenge may be a minute old
+                    sessions = await load_sessions((ctx.author.id, opponent.id), "duelar")
+                    challenger_session, opponent_session = sessions
+                    if not challenger_session.exists or not opponent_session.exists:
+                        await ctx.send("Ocorreu um erro durante o duelo. Por favor, tente novamente mais tarde.")
+                        return
+                    sessions_by_id = {session.user_id: session for session in sessions}
+
+                    # Calculate duel outcome using the new DuelCalculator
+                    calculator = DuelCalculator()
+                    duel_result = calculator.calculate_outcome(challenger_session.player, opponent_session.player, duel_type)
+
+                    # Generate narration using the new DuelNarrator
+                    narration = DuelNarrator.generate_narration(duel_result)
+                    duel_result["narration"] = narration
+
+                    # Update winner and loser
+                    winner_id = duel_result["winner"]["user_id"]
+                    loser_id = duel_result["loser"]["user_id"]
+                    winner_session = sessions_by_id[str(winner_id)]
+                    loser_session = sessions_by_id[str(loser_id)]
+
+                    # Update winner
+                    winner_update = {
+                        "exp": duel_result["winner"]["exp"] + duel_result["exp_reward"],
+                        "tusd": duel_result["winner"]["tusd"] + duel_result["tusd_reward"]
+                    }
 
-                # Check for level up using the new ExperienceCalculator
-                new_level = ExperienceCalculator.calculate_level(winner_update["exp"])
-                if new_level > duel_result["winner"]["level"]:
-                    winner_update["level"] = new_level
-                    # Full HP recovery on level up
-                    winner_update["hp"] = player["max_hp"]
-                    # Add level up bonus
-                    winner_update["tusd"] += new_level * 50
-
-                # Check for bonus rewards
-                if "bonus_rewards" in duel_result and duel_result["bonus_rewards"] and "item" in duel_result[
-                    "bonus_rewards"]:
-                    # Get winner's inventory
-                    winner_player = await db_provider.get_player(winner_id)
-                    if winner_player and "inventory" in winner_player:
-                        inventory = winner_player["inventory"]
-
-                        # Get bonus item details
+                    # Check for level up using the new ExperienceCalculator
+                    new_level = ExperienceCalculator.calculate_level(winner_update["exp"])
+                    if new_level > duel_result["winner"]["level"]:
+                        winner_update["level"] = new_level
+                        # Full HP recovery on level up
+                        winner_update["hp"] = winner_session.player.get("max_hp", 100)
+                        # Add level up bonus
+                        winner_update["tusd"] += new_level * 50
+
+                    # Check for bonus rewards
+                    if "bonus_rewards" in duel_result and duel_result["bonus_rewards"] and "item" in duel_result[
+                        "bonus_rewards"]:
+                        # Grant the bonus item in the same transaction as the stat changes
                         bonus_item = duel_result["bonus_rewards"]
                         item_id = bonus_item["item"]
+                        winner_session.add_item(str(item_id), {
+                            "name": bonus_item["item_name"],
+                            "description": bonus_item["item_description"],
+                            "quantity": 1,
+                            "type": "consumable",
+                            "rarity": "uncommon",
+                            "category": "duel_reward"
+                        })
+
+                    # Update loser (half exp, no TUSD)
+                    loser_update = {
+                        "exp": duel_result["loser"]["exp"] + (duel_result["exp_reward"] // 2)
+                    }
 
-                        # Check if item already exists in inventory
-                        if str(item_id) in inventory:
-                            # Increment quantity
-                            inventory[str(item_id)]["quantity"] += 1
-                        else:
-                            # Add new item to inventory
-                            inventory_item = {
-                                "id": item_id,
-                                "name": bonus_item["item_name"],
-                                "description": bonus_item["item_description"],
-                                "quantity": 1,
-                                "type": "consumable",
-                                "rarity": "uncommon",
-                                "category": "duel_reward"
-                            }
-                            inventory[str(item_id)] = inventory_item
-
-                        # Add inventory to winner update
-                        winner_update["inventory"] = json.dumps(inventory)
-
-                # Update loser (half exp, no TUSD)
-                loser_update = {
-                    "exp": duel_result["loser"]["exp"] + (duel_result["exp_reward"] // 2)
-                }
-
-                # Check for level up using the new ExperienceCalculator
-                new_level = ExperienceCalculator.calculate_level(loser_update["exp"])
-                if new_level > duel_result["loser"]["level"]:
-                    loser_update["level"] = new_level
-
-                # Update players in database
-                winner_success = await db_provider.update_player(winner_id, **winner_update)
-                loser_success = await db_provider.update_player(loser_id, **loser_update)
-
-                if winner_success and loser_success:
-                    # Set cooldown for challenger
-                    await self._set_cooldown(ctx.author.id, "duelar")
-
-                    # Create duel result embed
-                    embed = create_duel_embed(duel_result)
-
-                    # Add level up messages if applicable
-                    if "level" in winner_update:
-                        embed.add_field(
-                            name=f"{duel_result['winner']['name']} Subiu de Nível!",
-                            value=f"Novo nível: {winner_update['level']}",
-                            inline=False
-                        )
-
-                    if "level" in loser_update:
-                        embed.add_field(
-                            name=f"{duel_result['loser']['name']} Subiu de Nível!",
-                            value=f"Novo nível: {loser_update['level']}",
-                            inline=False
-                        )
-
-                    await ctx.send(embed=embed)
-                else:
-                    await ctx.send("Ocorreu um erro durante o duelo. Por favor, tente novamente mais tarde.")
+                    # Check for level up using the new ExperienceCalculator
+                    new_level = ExperienceCalculator.calculate_level(loser_update["exp"])
+                    if new_level > duel_result["loser"]["level"]:
+                        loser_update["level"] = new_level
+
+                    # Apply both players' changes and the challenger's cooldown in a single transaction
+                    winner_session.player.update(winner_update)
+                    loser_session.player.update(loser_update)
+                    challenger_session.set_cooldown("duelar", COOLDOWN_DURATIONS["duelar"])
+                    success = await commit_sessions(winner_session, loser_session)
+
+                    if success:
+                        # Create duel result embed
+                        embed = create_duel_embed(duel_result)
+
+                        # Add level up messages if applicable
+                        if "level" in winner_update:
+                            embed.add_field(
+                                name=f"{duel_result['winner']['name']} Subiu de Nível!",
+                                value=f"Novo nível: {winner_update['level']}",
+                                inline=False
+                            )
+
+                        if "level" in loser_update:
+                            embed.add_field(
+                                name=f"{duel_result['loser']['name']} Subiu de Nível!",
+                                value=f"Novo nível: {loser_update['level']}",
+                                inline=False
+                            )
+
+                        await ctx.send(embed=embed)
+                    else:
+                        await ctx.send("Ocorreu um erro durante o duelo. Por favor, tente novamente mais tarde.")
             else:
                 await ctx.send(f"{opponent.mention} recusou o desafio de duelo.")
 
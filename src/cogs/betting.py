@@ -12,6 +12,8 @@ from datetime import datetime, timedelta
 
 from utils.persistence.db_provider import db_provider
 from utils.logging_config import get_logger
+from utils.user_lanes import serialized_per_user, user_lanes
+from utils.name_resolver import resolve_names, resolve_user
 
 logger = get_logger('tokugawa_bot.betting')
 
@@ -22,6 +24,7 @@ class BettingCog(commands.Cog):
         self.bot = bot
     
     @app_commands.command(name="apostar", description="Aposte em um duelo ou evento")
+    @serialized_per_user()
     async def slash_bet(self, interaction: discord.Interaction, tipo: str, id: str, valor: int):
         """Place a bet on a duel or event."""
         try:
@@ -107,7 +110,8 @@ class BettingCog(commands.Cog):
             logger.error(f"Error in slash_my_bets: {e}")
             await interaction.response.send_message("Ocorreu um erro ao buscar suas apostas. Por favor, tente novamente.", ephemeral=True)
     
-    @app_commands.command(name="ranking_apostas", description="Veja o ranking de apostadores")
+    @app_commands.command(name="ranking_apostas", description="Veja o ranking de apostadores",
+                          extras={"defer_ephemeral": False})
     async def slash_betting_ranking(self, interaction: discord.Interaction):
         """Show betting ranking."""
         try:
@@ -133,10 +137,13 @@ class BettingCog(commands.Cog):
                 color=discord.Color.gold()
             )
             
-            for i, (user_id, stats) in enumerate(sorted_stats[:10], 1):
-                user = await self.bot.fetch_user(int(user_id))
+            # Resolve every name at once from the caches instead of one REST call per row
+            top_stats = sorted_stats[:10]
+            names = await resolve_names(self.bot, [user_id for user_id, _ in top_stats], interaction.guild)
+            
+            for i, (user_id, stats) in enumerate(top_stats, 1):
                 embed.add_field(
-                    name=f"{i}. {user.name}",
+                    name=f"{i}. {names[str(user_id)]}",
                     value=f"Total apostado: {stats['total_amount']} moedas\nApostas: {stats['total_bets']}",
                     inline=False
                 )
@@ -164,14 +171,15 @@ class BettingCog(commands.Cog):
                 # Distribute winnings
                 for bet in winning_bets:
                     user_id = bet.get('data', {}).get('user_id')
-                    player = await db_provider.get_player(user_id)
+                    async with user_lanes.hold(user_id, name="bet_duel_payout"):
+                        player = await db_provider.get_player(user_id)
+                        if player:
+                            player['coins'] = player.get('coins', 0) + winning_amount
+                            await db_provider.update_player(user_id, **player)
                     if player:
-                        player['coins'] = player.get('coins', 0) + winning_amount
-                        await db_provider.update_player(user_id, **player)
-                        
                         # Notify user
                         try:
-                            user = await self.bot.fetch_user(int(user_id))
+                            user = await resolve_user(self.bot, user_id)
                             await user.send(f"Você ganhou {winning_amount} moedas na aposta do duelo {duel_id}!")
                         except:
                             pass
@@ -213,14 +221,15 @@ class BettingCog(commands.Cog):
                 # Distribute winnings
                 for bet in winning_bets:
                     user_id = bet.get('data', {}).get('user_id')
-                    player = await db_provider.get_player(user_id)
+                    async with user_lanes.hold(user_id, name="bet_event_payout"):
+                        player = await db_provider.get_player(user_id)
+                        if player:
+                            player['coins'] = player.get('coins', 0) + winning_amount
+                            await db_provider.update_player(user_id, **player)
                     if player:
-                        player['coins'] = player.get('coins', 0) + winning_amount
-                        await db_provider.update_player(user_id, **player)
-                        
                         # Notify user
                         try:
-                            user = await self.bot.fetch_user(int(user_id))
+                            user = await resolve_user(self.bot, user_id)
                             await user.send(f"Você ganhou {winning_amount} moedas na aposta do evento {event_id}!")
                         except:
                             pass
@@ -23,7 +23,8 @@ class Clubs(commands.Cog):
     club_group = app_commands.Group(name="clube", description="Comandos de clubes da Academia Tokugawa")
 
     @club_group.command(name="teste",
-                        description="Comando de teste para verificar se os comandos estão sendo sincronizados")
+                        description="Comando de teste para verificar se os comandos estão sendo sincronizados",
+                        extras={"defer_ephemeral": False})
     async def slash_test(self, interaction: discord.Interaction):
         """Test command to verify that commands are being synced."""
         try:
@@ -87,7 +88,8 @@ class Clubs(commands.Cog):
         except Exception as e:
             logger.error(f"Error in slash_club: {e}")
 
-    @club_group.command(name="lista", description="Exibe a lista de todos os clubes disponíveis")
+    @club_group.command(name="lista", description="Exibe a lista de todos os clubes disponíveis",
+                        extras={"defer_ephemeral": False})
     async def slash_all_clubs(self, interaction: discord.Interaction):
         """Slash command version of the all_clubs command."""
         try:
@@ -163,7 +165,8 @@ class Clubs(commands.Cog):
 
         await ctx.send(embed=embed)
 
-    @app_commands.command(name="info", description="Mostra informações sobre um clube")
+    @app_commands.command(name="info", description="Mostra informações sobre um clube",
+                          extras={"auto_defer": False})
     async def slash_club_info(self, interaction: discord.Interaction, clube: str):
         """Mostra informações sobre um clube."""
         try:
@@ -183,7 +186,8 @@ class Clubs(commands.Cog):
 
         await interaction.followup.send(embed=embed, ephemeral=True)
 
-    @app_commands.command(name="listar", description="Lista todos os clubes disponíveis")
+    @app_commands.command(name="listar", description="Lista todos os clubes disponíveis",
+                          extras={"auto_defer": False})
     async def slash_list_clubs(self, interaction: discord.Interaction):
         """Lista todos os clubes disponíveis."""
         try:
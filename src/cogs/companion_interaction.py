@@ -1,13 +1,15 @@
+import copy
 import discord
 import logging
 from discord import app_commands
 from discord.ext import commands
 
-from story_mode.story_mode import StoryMode
+from story_mode.content_registry import content_for
 from utils.command_registrar import CommandRegistrar
 from utils.embeds import create_basic_embed
 from utils.persistence import db_provider
-from utils.config import STORY_MODE_DIR
+from utils.user_lanes import serialized_per_user
+from utils.persistence.dynamodb_story import save_story_progress_delta, with_story_progress
 
 logger = logging.getLogger('tokugawa_bot')
 
@@ -19,14 +21,16 @@ class CompanionInteractionCog(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.story_mode = StoryMode(STORY_MODE_DIR)
+        self.content = content_for(bot)
+        self.story_mode = self.content.story_mode
         logger.info("CompanionInteractionCog initialized")
 
     def cog_load(self):
         """Called when the cog is loaded."""
         logger.info("CompanionInteractionCog loaded")
 
-    @app_commands.command(name="companheiros", description="Visualizar seus companheiros disponíveis e recrutados")
+    @app_commands.command(name="companheiros", description="Visualizar seus companheiros disponíveis e recrutados",
+                          extras={"auto_defer": False})
     async def slash_view_companions(self, interaction: discord.Interaction):
         """
         Slash command to view available and recruited companions.
@@ -38,7 +42,7 @@ class CompanionInteractionCog(commands.Cog):
             return
 
         user_id = interaction.user.id
-        player_data = await db_provider.get_player(user_id)
+        player_data = await with_story_progress(await db_provider.get_player(user_id), user_id)
 
         if not player_data:
             await interaction.followup.send("Você precisa criar um personagem primeiro! Use /registrar", ephemeral=True)
@@ -119,10 +123,12 @@ class CompanionInteractionCog(commands.Cog):
 
         await interaction.followup.send(embed=embed, ephemeral=True)
 
-    @app_commands.command(name="recrutar", description="Recrutar um companheiro disponível")
+    @app_commands.command(name="recrutar", description="Recrutar um companheiro disponível",
+                          extras={"auto_defer": False})
     @app_commands.describe(
         nome="Nome do companheiro que deseja recrutar"
     )
+    @serialized_per_user()
     async def slash_recruit_companion(self, interaction: discord.Interaction, nome: str):
         """
         Slash command to recruit a companion.
@@ -134,14 +140,15 @@ class CompanionInteractionCog(commands.Cog):
             return
 
         user_id = interaction.user.id
-        player_data = await db_provider.get_player(user_id)
+        player_data = await with_story_progress(await db_provider.get_player(user_id), user_id)
+        progress_before = copy.deepcopy((player_data or {}).get("story_progress", {}))
 
         if not player_data:
             await interaction.followup.send("Você precisa criar um personagem primeiro! Use /registrar", ephemeral=True)
             return
 
         # Find companion by name
-        companion = self.story_mode.companion_system.get_companion_by_name(nome)
+        companion = self.content.companion_system.get_companion_by_name(nome)
 
         if not companion:
             await interaction.followup.send(f"Companheiro '{nome}' não encontrado.", ephemeral=True)
@@ -170,7 +177,7 @@ class CompanionInteractionCog(commands.Cog):
 
         # Update player data in database
         player_data["story_progress"] = result["player_data"]["story_progress"]
-        await db_provider.update_player(user_id, player_data)
+        await save_story_progress_delta(str(user_id), progress_before, player_data["story_progress"])
 
         # Create success embed
         embed = create_basic_embed(
@@ -196,10 +203,12 @@ class CompanionInteractionCog(commands.Cog):
 
         await interaction.followup.send(embed=embed, ephemeral=True)
 
-    @app_commands.command(name="ativar_companheiro", description="Ativar um companheiro recrutado")
+    @app_commands.command(name="ativar_companheiro", description="Ativar um companheiro recrutado",
+                          extras={"auto_defer": False})
     @app_commands.describe(
         nome="Nome do companheiro que deseja ativar"
     )
+    @serialized_per_user()
     async def slash_activate_companion(self, interaction: discord.Interaction, nome: str):
         """
         Slash command to activate a recruited companion.
@@ -211,14 +220,15 @@ class CompanionInteractionCog(commands.Cog):
             return
 
         user_id = interaction.user.id
-        player_data = await db_provider.get_player(user_id)
+        player_data = await with_story_progress(await db_provider.get_player(user_id), user_id)
+        progress_before = copy.deepcopy((player_data or {}).get("story_progress", {}))
 
         if not player_data:
             await interaction.followup.send("Você precisa criar um personagem primeiro! Use /registrar", ephemeral=True)
             return
 
         # Find companion by name
-        companion = self.story_mode.companion_system.get_companion_by_name(nome)
+        companion = self.content.companion_system.get_companion_by_name(nome)
 
         if not companion:
             await interaction.followup.send(f"Companheiro '{nome}' não encontrado.", ephemeral=True)
@@ -239,7 +249,7 @@ class CompanionInteractionCog(commands.Cog):
 
         # Update player data in database
         player_data["story_progress"] = result["player_data"]["story_progress"]
-        await db_provider.update_player(user_id, player_data)
+        await save_story_progress_delta(str(user_id), progress_before, player_data["story_progress"])
 
         # Create success embed
         embed = create_basic_embed(
@@ -266,7 +276,9 @@ class CompanionInteractionCog(commands.Cog):
 
         await interaction.followup.send(embed=embed, ephemeral=True)
 
-    @app_commands.command(name="desativar_companheiro", description="Desativar seu companheiro atual")
+    @app_commands.command(name="desativar_companheiro", description="Desativar seu companheiro atual",
+                          extras={"auto_defer": False})
+    @serialized_per_user()
     async def slash_deactivate_companion(self, interaction: discord.Interaction):
         """
         Slash command to deactivate the current active companion.
@@ -278,7 +290,8 @@ class CompanionInteractionCog(commands.Cog):
             return
 
         user_id = interaction.user.id
-        player_data = await db_provider.get_player(user_id)
+        player_data = await with_story_progress(await db_provider.get_player(user_id), user_id)
+        progress_before = copy.deepcopy((player_data or {}).get("story_progress", {}))
 
         if not player_data:
             await interaction.followup.send("Você precisa criar um personagem primeiro! Use /registrar", ephemeral=True)
@@ -299,7 +312,7 @@ class CompanionInteractionCog(commands.Cog):
 
         # Update player data in database
         player_data["story_progress"] = result["player_data"]["story_progress"]
-        await db_provider.update_player(user_id, player_data)
+        await save_story_progress_delta(str(user_id), progress_before, player_data["story_progress"])
 
         # Create success embed
         embed = create_basic_embed(
@@ -317,7 +330,8 @@ class CompanionInteractionCog(commands.Cog):
 
         await interaction.followup.send(embed=embed, ephemeral=True)
 
-    @app_commands.command(name="status_companheiro", description="Ver detalhes de um companheiro recrutado")
+    @app_commands.command(name="status_companheiro", description="Ver detalhes de um companheiro recrutado",
+                          extras={"auto_defer": False})
     @app_commands.describe(
         nome="Nome do companheiro"
     )
@@ -332,14 +346,14 @@ class CompanionInteractionCog(commands.Cog):
             return
 
         user_id = interaction.user.id
-        player_data = await db_provider.get_player(user_id)
+        player_data = await with_story_progress(await db_provider.get_player(user_id), user_id)
 
         if not player_data:
             await interaction.followup.send("Você precisa criar um personagem primeiro! Use /registrar", ephemeral=True)
             return
 
         # Find companion by name
-        companion = self.story_mode.companion_system.get_companion_by_name(nome)
+        companion = self.content.companion_system.get_companion_by_name(nome)
 
         if not companion:
             await interaction.followup.send(f"Companheiro '{nome}' não encontrado.", ephemeral=True)
@@ -419,11 +433,13 @@ class CompanionInteractionCog(commands.Cog):
 
         await interaction.followup.send(embed=embed, ephemeral=True)
 
-    @app_commands.command(name="completar_missao", description="Completar uma missão de companheiro")
+    @app_commands.command(name="completar_missao", description="Completar uma missão de companheiro",
+                          extras={"auto_defer": False})
     @app_commands.describe(
         nome="Nome do companheiro",
         id_missao="ID da missão a ser completada"
     )
+    @serialized_per_user()
     async def slash_complete_mission(self, interaction: discord.Interaction, nome: str, id_missao: str):
         """
         Slash command to complete a companion mission.
@@ -435,14 +451,15 @@ class CompanionInteractionCog(commands.Cog):
             return
 
         user_id = interaction.user.id
-        player_data = await db_provider.get_player(user_id)
+        player_data = await with_story_progress(await db_provider.get_player(user_id), user_id)
+        progress_before = copy.deepcopy((player_data or {}).get("story_progress", {}))
 
         if not player_data:
             await interaction.followup.send("Você precisa criar um personagem primeiro! Use /registrar", ephemeral=True)
             return
 
         # Find companion by name
-        companion = self.story_mode.companion_system.get_companion_by_name(nome)
+        companion = self.content.companion_system.get_companion_by_name(nome)
 
         if not companion:
             await interaction.followup.send(f"Companheiro '{nome}' não encontrado.", ephemeral=True)
@@ -463,7 +480,7 @@ class CompanionInteractionCog(commands.Cog):
 
         # Update player data in database
         player_data["story_progress"] = result["player_data"]["story_progress"]
-        await db_provider.update_player(user_id, player_data)
+        await save_story_progress_delta(str(user_id), progress_before, player_data["story_progress"])
 
         # Create success embed
         embed = create_basic_embed(
@@ -494,10 +511,12 @@ class CompanionInteractionCog(commands.Cog):
         await interaction.followup.send(embed=embed, ephemeral=True)
 
     @app_commands.command(name="sincronizar",
-                          description="Usar uma habilidade de sincronização com seu companheiro ativo")
+                          description="Usar uma habilidade de sincronização com seu companheiro ativo",
+                          extras={"auto_defer": False})
     @app_commands.describe(
         id_habilidade="ID da habilidade de sincronização a ser usada"
     )
+    @serialized_per_user()
     async def slash_sync_ability(self, interaction: discord.Interaction, id_habilidade: str):
         """
         Slash command to use a sync ability with the active companion.
@@ -509,7 +528,8 @@ class CompanionInteractionCog(commands.Cog):
             return
 
         user_id = interaction.user.id
-        player_data = await db_provider.get_player(user_id)
+        player_data = await with_story_progress(await db_provider.get_player(user_id), user_id)
+        progress_before = copy.deepcopy((player_data or {}).get("story_progress", {}))
 
         if not player_data:
             await interaction.followup.send("Você precisa criar um personagem primeiro! Use /registrar", ephemeral=True)
@@ -530,7 +550,7 @@ class CompanionInteractionCog(commands.Cog):
 
         # Update player data in database
         player_data["story_progress"] = result["player_data"]["story_progress"]
-        await db_provider.update_player(user_id, player_data)
+        await save_story_progress_delta(str(user_id), progress_before, player_data["story_progress"])
 
         # Create success embed
         embed = create_basic_embed(
@@ -1,36 +1,61 @@
 import discord
 import io
+import os
+import asyncio
 import logging
-import matplotlib.pyplot as plt
-import numpy as np
+import functools
 from collections import Counter, defaultdict
 from discord import app_commands
 from discord.ext import commands
 from typing import Dict, List, Any
 
 from story_mode.narrative_logger import get_narrative_logger
-from story_mode.story_mode import StoryMode
+from story_mode.content_registry import content_for
 from utils.embeds import create_basic_embed
 from utils.persistence import db_provider
-from utils.config import STORY_MODE_DIR
+from utils.persistence.dynamodb_story import (
+    get_all_story_progress, merge_story_progress, story_progress_by_player, with_story_progress
+)
+from utils.persistence.table_export import EXPORT_DIR, load_snapshot, snapshot_age
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Community statistics are read from a players snapshot younger than this (seconds)
+SNAPSHOT_MAX_AGE = int(os.getenv('DASHBOARD_SNAPSHOT_MAX_AGE', '3600'))
+
+
+@functools.lru_cache(maxsize=None)
+def _pyplot():
+    """Import matplotlib on first chart instead of at cog load (it dominates startup)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    """Import numpy on first use."""
+    import numpy as np
+    return np
+
 
 class DecisionDashboard(commands.Cog):
     """Cog for the Decision Dashboard functionality."""
 
     def __init__(self, bot):
         self.bot = bot
-        self.story_mode = StoryMode(STORY_MODE_DIR)
+        self.content = content_for(bot)
+        self.story_mode = self.content.story_mode
         self.narrative_logger = get_narrative_logger()
         logger.info("DecisionDashboardCog initialized")
 
     # Group for dashboard commands
     dashboard_group = app_commands.Group(name="dashboard", description="Dashboard de Comparação de Decisões")
 
-    @dashboard_group.command(name="escolhas", description="Compare suas escolhas narrativas com a comunidade")
+    @dashboard_group.command(name="escolhas", description="Compare suas escolhas narrativas com a comunidade",
+                             extras={"auto_defer": False})
     async def slash_choice_comparison(self, interaction: discord.Interaction, chapter_id: str = None):
         """
         Shows a comparison of the player's narrative choices with the community.
@@ -44,7 +69,8 @@ class DecisionDashboard(commands.Cog):
             await interaction.response.defer(ephemeral=True)
 
             # Get player data
-            player = await db_provider.get_player(interaction.user.id)
+            player = await with_story_progress(await db_provider.get_player(interaction.user.id),
+                                               str(interaction.user.id))
             if not player:
                 await interaction.followup.send(
                     f"{interaction.user.mention}, você ainda não está registrado na Academia Tokugawa. "
@@ -75,7 +101,8 @@ class DecisionDashboard(commands.Cog):
             logger.error(f"Error in slash_choice_comparison: {e}")
             await interaction.followup.send(f"Ocorreu um erro ao gerar o dashboard: {str(e)}")
 
-    @dashboard_group.command(name="caminhos", description="Visualize os caminhos narrativos mais populares")
+    @dashboard_group.command(name="caminhos", description="Visualize os caminhos narrativos mais populares",
+                             extras={"auto_defer": False})
     async def slash_path_analysis(self, interaction: discord.Interaction):
         """
         Shows an analysis of narrative paths through the story.
@@ -85,7 +112,8 @@ class DecisionDashboard(commands.Cog):
             await interaction.response.defer(ephemeral=True)
 
             # Get player data
-            player = await db_provider.get_player(interaction.user.id)
+            player = await with_story_progress(await db_provider.get_player(interaction.user.id),
+                                               str(interaction.user.id))
             if not player:
                 await interaction.followup.send(
                     f"{interaction.user.mention}, você ainda não está registrado na Academia Tokugawa. "
@@ -114,7 +142,8 @@ class DecisionDashboard(commands.Cog):
             logger.error(f"Error in slash_path_analysis: {e}")
             await interaction.followup.send(f"Ocorreu um erro ao gerar o dashboard: {str(e)}")
 
-    @dashboard_group.command(name="faccoes", description="Compare estatísticas de facções e alianças")
+    @dashboard_group.command(name="faccoes", description="Compare estatísticas de facções e alianças",
+                             extras={"auto_defer": False})
     async def slash_faction_stats(self, interaction: discord.Interaction):
         """
         Shows statistics about factions and alliances.
@@ -124,7 +153,8 @@ class DecisionDashboard(commands.Cog):
             await interaction.response.defer(ephemeral=True)
 
             # Get player data
-            player = await db_provider.get_player(interaction.user.id)
+            player = await with_story_progress(await db_provider.get_player(interaction.user.id),
+                                               str(interaction.user.id))
             if not player:
                 await interaction.followup.send(
                     f"{interaction.user.mention}, você ainda não está registrado na Academia Tokugawa. "
@@ -153,7 +183,8 @@ class DecisionDashboard(commands.Cog):
             logger.error(f"Error in slash_faction_stats: {e}")
             await interaction.followup.send(f"Ocorreu um erro ao gerar o dashboard: {str(e)}")
 
-    @dashboard_group.command(name="estilo", description="Analise seu estilo de jogo")
+    @dashboard_group.command(name="estilo", description="Analise seu estilo de jogo",
+                             extras={"auto_defer": False})
     async def slash_gameplay_style(self, interaction: discord.Interaction):
         """
         Analyzes the player's gameplay style based on their choices.
@@ -163,7 +194,8 @@ class DecisionDashboard(commands.Cog):
             await interaction.response.defer(ephemeral=True)
 
             # Get player data
-            player = await db_provider.get_player(interaction.user.id)
+            player = await with_story_progress(await db_provider.get_player(interaction.user.id),
+                                               str(interaction.user.id))
             if not player:
                 await interaction.followup.send(
                     f"{interaction.user.mention}, você ainda não está registrado na Academia Tokugawa. "
@@ -195,7 +227,8 @@ class DecisionDashboard(commands.Cog):
             logger.error(f"Error in slash_gameplay_style: {e}")
             await interaction.followup.send(f"Ocorreu um erro ao gerar o dashboard: {str(e)}")
 
-    @dashboard_group.command(name="analytics", description="Visualize estatísticas de fluxo narrativo")
+    @dashboard_group.command(name="analytics", description="Visualize estatísticas de fluxo narrativo",
+                             extras={"auto_defer": False})
     async def slash_narrative_analytics(self, interaction: discord.Interaction, chapter_id: str = None):
         """
         Shows analytics from the narrative logger.
@@ -209,7 +242,8 @@ class DecisionDashboard(commands.Cog):
             await interaction.response.defer(ephemeral=True)
 
             # Get player data
-            player = await db_provider.get_player(interaction.user.id)
+            player = await with_story_progress(await db_provider.get_player(interaction.user.id),
+                                               str(interaction.user.id))
             if not player:
                 await interaction.followup.send(
                     f"{interaction.user.mention}, você ainda não está registrado na Academia Tokugawa. "
@@ -333,6 +367,32 @@ class DecisionDashboard(commands.Cog):
             logger.error(f"Error in slash_narrative_analytics: {e}")
             await interaction.followup.send(f"Ocorreu um erro ao gerar o dashboard: {str(e)}")
 
+    async def _get_all_players(self) -> List[Dict[str, Any]]:
+        """Get all players with their story progress, preferring recent snapshots over scanning the live tables."""
+        loop = asyncio.get_event_loop()
+        if self._snapshot_is_fresh("players"):
+            snapshot = await loop.run_in_executor(None, load_snapshot, "players", EXPORT_DIR)
+            players = [item for item in snapshot.values() if item.get("SK") == "PROFILE"]
+        else:
+            players = await db_provider.get_all_players()
+
+        # Story progress lives in its own items of the main table, not in the player item
+        if self._snapshot_is_fresh("story"):
+            snapshot = await loop.run_in_executor(None, load_snapshot, "story", EXPORT_DIR)
+            progress = story_progress_by_player(snapshot.values())
+        else:
+            progress = await get_all_story_progress()
+
+        for player in players:
+            user_id = str(player.get("user_id") or player.get("PK", "").split("#", 1)[-1])
+            player["story_progress"] = merge_story_progress(player.get("story_progress"), progress.get(user_id, {}))
+        return players
+
+    @staticmethod
+    def _snapshot_is_fresh(table_name: str) -> bool:
+        age = snapshot_age(table_name, EXPORT_DIR)
+        return age is not None and age <= SNAPSHOT_MAX_AGE
+
     def _get_player_choices(self, player: Dict[str, Any], chapter_id: str = None) -> Dict[str, Any]:
         """Get the player's narrative choices."""
         choices = player.get("story_progress", {}).get("choices", {})
@@ -342,7 +402,7 @@ class DecisionDashboard(commands.Cog):
 
     async def _get_community_choices(self, chapter_id: str = None) -> Dict[str, Dict[str, Counter]]:
         """Get the community's narrative choices."""
-        all_players = await db_provider.get_all_players()
+        all_players = await self._get_all_players()
         community_choices = defaultdict(lambda: defaultdict(Counter))
 
         for player in all_players:
@@ -358,7 +418,7 @@ class DecisionDashboard(commands.Cog):
 
     async def _get_community_paths(self) -> Dict[str, int]:
         """Get the community's narrative paths."""
-        all_players = await db_provider.get_all_players()
+        all_players = await self._get_all_players()
         path_counts = Counter()
 
         for player in all_players:
@@ -374,7 +434,7 @@ class DecisionDashboard(commands.Cog):
 
     async def _get_community_faction_data(self) -> Dict[str, Dict[str, int]]:
         """Get the community's faction data."""
-        all_players = await db_provider.get_all_players()
+        all_players = await self._get_all_players()
         faction_stats = defaultdict(lambda: defaultdict(int))
 
         for player in all_players:
@@ -423,7 +483,7 @@ class DecisionDashboard(commands.Cog):
 
     async def _get_community_style_data(self) -> Dict[str, float]:
         """Get the community's gameplay style data."""
-        all_players = await db_provider.get_all_players()
+        all_players = await self._get_all_players()
         community_styles = defaultdict(float)
         total_players = 0
 
@@ -456,6 +516,8 @@ class DecisionDashboard(commands.Cog):
         Returns:
             Tuple of (embed, file) for the visualization
         """
+        plt = _pyplot()
+
         # Create a new figure
         plt.figure(figsize=(10, 6))
 
@@ -552,6 +614,8 @@ class DecisionDashboard(commands.Cog):
         Returns:
             Tuple of (embed, file) for the visualization
         """
+        plt = _pyplot()
+
         # Create a new figure
         plt.figure(figsize=(10, 6))
 
@@ -644,6 +708,8 @@ class DecisionDashboard(commands.Cog):
         Returns:
             Tuple of (embed, file) for the visualization
         """
+        plt = _pyplot()
+
         # Create a new figure
         plt.figure(figsize=(10, 6))
 
@@ -711,6 +777,9 @@ class DecisionDashboard(commands.Cog):
         Returns:
             Tuple of (embed, file) for the visualization
         """
+        plt = _pyplot()
+        np = _numpy()
+
         # Create a new figure
         plt.figure(figsize=(10, 6))
 
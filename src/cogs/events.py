@@ -19,7 +19,8 @@ class EventsCog(commands.Cog):
     
     @app_commands.command(
         name="eventos",
-        description="Mostra informações sobre os eventos atuais"
+        description="Mostra informações sobre os eventos atuais",
+        extras={"defer_ephemeral": False}
     )
     async def show_events(self, interaction: discord.Interaction):
         """Show information about current events."""
@@ -80,7 +81,8 @@ class EventsCog(commands.Cog):
     
     @app_commands.command(
         name="torneio",
-        description="Gerencia sua participação no torneio semanal"
+        description="Gerencia sua participação no torneio semanal",
+        extras={"defer_ephemeral": False}
     )
     @app_commands.describe(
         action="Ação a ser realizada (participar/status)"
@@ -163,7 +165,8 @@ class EventsCog(commands.Cog):
     
     @app_commands.command(
         name="evento",
-        description="Gerencia sua participação em eventos especiais"
+        description="Gerencia sua participação em eventos especiais",
+        extras={"defer_ephemeral": False}
     )
     @app_commands.describe(
         action="Ação a ser realizada (participar/status)"
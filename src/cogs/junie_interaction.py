@@ -2,15 +2,39 @@ import logging
 from discord.ext import commands
 
 from utils.persistence import db_provider
+from utils.message_triggers import SUGGESTION_TTL, TriggerMatcher, ChannelRateLimiter, trigger_stats
+from utils.ttl_cache import TTLCache
 
 logger = logging.getLogger('tokugawa_bot')
 
+JUNIE_TRIGGER = 'junie'
+
+# Messages must mention Junie and contain one of these question phrases
+junie_triggers = TriggerMatcher({
+    JUNIE_TRIGGER: (
+        ["junie"],
+        ["o que", "que devo", "o que devo", "o que fazer", "que fazer", "me ajude",
+         "me ajuda", "sugestão", "sugestao", "what should", "help me"]
+    )
+})
+
+# Unregistered users are cached briefly so /registro ingressar takes effect soon
+UNREGISTERED_TTL = 30
+
+UNREGISTERED_REPLY = (
+    "Olá! Parece que você ainda não está registrado na Academia Tokugawa. "
+    "Use `/registro ingressar` para criar seu personagem e começar sua jornada!"
+)
+
 
 class JunieInteraction(commands.Cog):
     """Cog for handling interactions with Junie."""
 
     def __init__(self, bot):
         self.bot = bot
+        # Recent suggestions per user and automatic reply budget per channel
+        self.suggestions = TTLCache(SUGGESTION_TTL)
+        self.rate_limiter = ChannelRateLimiter()
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -20,27 +44,36 @@ class JunieInteraction(commands.Cog):
             return
 
         # Check if the message mentions "Junie" and contains a question
-        content = message.content.lower()
-        if "junie" in content and any(q in content for q in
-                                      ["o que", "que devo", "o que devo", "o que fazer", "que fazer", "me ajude",
-                                       "me ajuda", "sugestão", "sugestao", "what should", "help me"]):
-            logger.info(f"Detected Junie interaction from {message.author.name}: {message.content}")
+        if junie_triggers.match(message.content) is None:
+            return
+
+        logger.info(f"Detected Junie interaction from {message.author.name}: {message.content}")
+
+        if not self.rate_limiter.allow(message.channel.id):
+            trigger_stats.record(JUNIE_TRIGGER, 'rate_limited')
+            return
+
+        reply = self.suggestions.get(message.author.id)
+        if reply is not None:
+            trigger_stats.record(JUNIE_TRIGGER, 'cache_hits')
+        else:
+            trigger_stats.record(JUNIE_TRIGGER, 'cache_misses')
 
             # Get player data
             player = await db_provider.get_player(message.author.id)
 
             if not player:
                 # Player is not registered
-                await message.reply(
-                    "Olá! Parece que você ainda não está registrado na Academia Tokugawa. Use `/registro ingressar` para criar seu personagem e começar sua jornada!"
-                )
-                return
-
-            # Determine suggestion based on player state
-            suggestion = self.get_suggestion_for_player(player)
-
-            # Reply with the suggestion
-            await message.reply(suggestion)
+                reply = UNREGISTERED_REPLY
+                self.suggestions.set(message.author.id, reply, ttl=UNREGISTERED_TTL)
+            else:
+                # Determine suggestion based on player state
+                reply = self.get_suggestion_for_player(player)
+                self.suggestions.set(message.author.id, reply)
+
+        # Reply with the suggestion
+        await message.reply(reply)
+        trigger_stats.record(JUNIE_TRIGGER, 'replied')
 
     def get_suggestion_for_player(self, player):
         """Get a suggestion for the player based on their state."""
@@ -7,6 +7,7 @@ from discord.ext import commands
 
 from story_mode.club_rivalry_system import ClubSystem
 from utils.persistence import db_provider
+from utils.user_lanes import serialized_per_user
 
 
 class MoralChoices(commands.Cog):
@@ -24,8 +25,10 @@ class MoralChoices(commands.Cog):
 
     @app_commands.command(
         name="dilema",
-        description="Enfrenta um dilema moral que testará seus valores e afetará sua reputação na Academia Tokugawa."
+        description="Enfrenta um dilema moral que testará seus valores e afetará sua reputação na Academia Tokugawa.",
+        extras={"defer_ephemeral": False}
     )
+    @serialized_per_user()
     async def slash_dilema(self, interaction: discord.Interaction):
         """Comando para enfrentar um dilema moral."""
         user_id = interaction.user.id
@@ -83,6 +86,7 @@ class MoralChoices(commands.Cog):
     def _create_dilema_choice_callback(self, user_id: int, choice_index: int):
         """Cria um callback para os botões de escolha do dilema."""
 
+        @serialized_per_user()
         async def dilema_choice_callback(interaction: discord.Interaction):
             # Verificar se o usuário é o mesmo que iniciou o dilema
             if interaction.user.id != user_id:
@@ -199,6 +203,7 @@ class MoralChoices(commands.Cog):
             app_commands.Choice(name="Investigar", value="investigar")
         ]
     )
+    @serialized_per_user()
     async def slash_atividade_moral(
             self,
             interaction: discord.Interaction,
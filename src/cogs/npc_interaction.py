@@ -4,11 +4,12 @@ import os
 from discord import app_commands
 from discord.ext import commands
 
-from story_mode.story_mode import StoryMode
+from story_mode.content_registry import content_for
 from utils.command_registrar import CommandRegistrar
 from utils.embeds import create_basic_embed
 from utils.persistence import db_provider
-from utils.config import STORY_MODE_DIR
+from utils.user_lanes import serialized_per_user
+from utils.persistence.dynamodb_story import update_story_progress, with_story_progress
 
 logger = logging.getLogger('tokugawa_bot')
 
@@ -20,18 +21,21 @@ class NPCInteractionCog(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.story_mode = StoryMode(STORY_MODE_DIR)
+        self.content = content_for(bot)
+        self.story_mode = self.content.story_mode
         logger.info("NPCInteractionCog initialized")
 
     def cog_load(self):
         """Called when the cog is loaded."""
         logger.info("NPCInteractionCog loaded")
 
-    @app_commands.command(name="falar", description="Falar com um personagem do jogo")
+    @app_commands.command(name="falar", description="Falar com um personagem do jogo",
+                          extras={"auto_defer": False})
     @app_commands.describe(
         personagem="Nome do personagem com quem deseja falar",
         assunto="Assunto sobre o qual deseja falar (opcional)"
     )
+    @serialized_per_user()
     async def slash_talk_to_npc(self, interaction: discord.Interaction, personagem: str, assunto: str = None):
         """
         Slash command to talk to an NPC.
@@ -43,14 +47,14 @@ class NPCInteractionCog(commands.Cog):
             return
 
         user_id = interaction.user.id
-        player_data = await db_provider.get_player(user_id)
+        player_data = await with_story_progress(await db_provider.get_player(user_id), user_id)
 
         if not player_data:
             await interaction.followup.send("Você precisa criar um personagem primeiro! Use /registrar", ephemeral=True)
             return
 
         # Get the NPC
-        npc = self.story_mode.npc_manager.get_npc_by_name(personagem)
+        npc = self.content.npc_manager.get_npc_by_name(personagem)
 
         if not npc:
             await interaction.followup.send(f"Personagem '{personagem}' não encontrado.", ephemeral=True)
@@ -108,7 +112,7 @@ class NPCInteractionCog(commands.Cog):
                 player_data["story_progress"]["npc_interactions"][npc_name] = npc_interactions
 
                 # Update player data in database
-                await db_provider.update_player(user_id, story_progress=player_data["story_progress"])
+                await update_story_progress(str(user_id), {"npc_interactions": player_data["story_progress"]["npc_interactions"]})
 
                 await interaction.followup.send(embed=embed, ephemeral=True)
                 return
@@ -163,7 +167,7 @@ class NPCInteractionCog(commands.Cog):
         player_data["story_progress"]["npc_interactions"][npc_name] = npc_interactions
 
         # Update player data in database
-        await db_provider.update_player(user_id, story_progress=player_data["story_progress"])
+        await update_story_progress(str(user_id), {"npc_interactions": player_data["story_progress"]["npc_interactions"]})
 
         # Create embed for the dialogue
         # Get current affinity level for the footer
@@ -224,7 +228,10 @@ class NPCInteractionCog(commands.Cog):
                     }
 
                     # Update player data
-                    await db_provider.update_player(user_id, story_progress=story_progress)
+                    await update_story_progress(str(user_id), {
+                        "seen_images": story_progress["seen_images"],
+                        "image_registry": story_progress["image_registry"]
+                    })
                 else:
                     logger.error(f"Welcome image not found at {image_path}")
 
@@ -260,14 +267,18 @@ class NPCInteractionCog(commands.Cog):
                     }
 
                     # Update player data
-                    await db_provider.update_player(user_id, story_progress=story_progress)
+                    await update_story_progress(str(user_id), {
+                        "seen_images": story_progress["seen_images"],
+                        "image_registry": story_progress["image_registry"]
+                    })
                 else:
                     logger.error(f"Professor Quantum intro image not found at {image_path}")
 
         # Send the dialogue
         await interaction.followup.send(embed=embed, ephemeral=True)
 
-    @app_commands.command(name="registros", description="Ver imagens registradas durante o jogo")
+    @app_commands.command(name="registros", description="Ver imagens registradas durante o jogo",
+                          extras={"auto_defer": False})
     @app_commands.describe(
         id="ID da imagem que deseja ver (opcional)"
     )
@@ -282,7 +293,7 @@ class NPCInteractionCog(commands.Cog):
             return
 
         user_id = interaction.user.id
-        player_data = await db_provider.get_player(user_id)
+        player_data = await with_story_progress(await db_provider.get_player(user_id), user_id)
 
         if not player_data:
             await interaction.followup.send("Você precisa criar um personagem primeiro! Use /registrar", ephemeral=True)
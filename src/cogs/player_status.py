@@ -5,8 +5,15 @@ from typing import Any
 from discord import app_commands
 from discord.ext import commands
 
-from utils.embeds import create_player_embed, create_inventory_embed, create_leaderboard_embed
+from utils.embeds import create_player_embed, create_inventory_embed
+from utils.interaction_router import component_view, encode_custom_id, interaction_router, route
+from utils.leaderboard import render_leaderboard
 from utils.persistence.db_provider import db_provider
+from utils.ranking_formatter import RankingFormatter
+from utils.ranking_history import (
+    MAX_SUBJECT_LENGTH, PERIOD_TITLES, board_title, latest_key, position_changes, previous_period_key,
+    ranking_history, subject_board
+)
 
 logger = logging.getLogger('tokugawa_bot')
 
@@ -17,6 +24,14 @@ class PlayerStatus(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    def cog_load(self):
+        """Called when the cog is loaded."""
+        interaction_router.add_cog(self)
+
+    def cog_unload(self):
+        """Called when the cog is unloaded."""
+        interaction_router.remove_cog(self)
+
     # Group for player status commands
     status_group = app_commands.Group(name="status", description="Comandos de status da Academia Tokugawa")
 
@@ -134,11 +149,8 @@ class PlayerStatus(commands.Cog):
             elif limit > 25:
                 limit = 25
 
-            # Get top players
-            top_players = await db_provider.get_top_players(limit)
-
-            # Create and send leaderboard embed
-            embed = await create_leaderboard_embed(top_players)
+            # Served from memory until a ranked field changes
+            embed = await render_leaderboard('level', db_provider.get_top_players, limit)
             await interaction.response.send_message(embed=embed, ephemeral=True)
         except discord.errors.NotFound:
             # If the interaction has expired, log it but don't try to respond
@@ -146,6 +158,60 @@ class PlayerStatus(commands.Cog):
         except Exception as e:
             logger.error(f"Error in slash_leaderboard: {e}")
 
+    async def _history_page(self, board: str, period: str, key: str):
+        """Build the embed and "previous" button of a stored ranking snapshot."""
+        entries = await ranking_history.load(board, period, key)
+        previous_key = previous_period_key(period, key)
+        previous = await ranking_history.load(board, period, previous_key) if entries else None
+        embed = RankingFormatter.format_snapshot(
+            f"{board_title(board)} · {PERIOD_TITLES[period]} ({key})",
+            entries or [],
+            position_changes(entries or [], previous),
+            footer="Setas comparam com o período anterior" if previous is not None else None
+        )
+        view = component_view(discord.ui.Button(
+            style=discord.ButtonStyle.secondary,
+            label="◀ Anterior",
+            custom_id=encode_custom_id('ranking', 'prev', board, period, previous_key),
+            disabled=previous is None
+        ))
+        return embed, view
+
+    @status_group.command(name="historico", description="Exibe rankings de períodos anteriores")
+    @app_commands.choices(
+        ranking=[
+            app_commands.Choice(name="Reputação", value="reputation"),
+            app_commands.Choice(name="TUSD", value="tusd"),
+            app_commands.Choice(name="Clubes", value="clubs")
+        ],
+        periodo=[app_commands.Choice(name=title, value=period) for period, title in PERIOD_TITLES.items()]
+    )
+    async def slash_ranking_history(self, interaction: discord.Interaction, ranking: str = "reputation",
+                                    periodo: str = "daily", materia: str = None):
+        """Show the newest snapshot of a ranking; older ones are paged with a button."""
+        try:
+            board = ranking
+            if materia:
+                board = subject_board(materia)
+                if board is None:
+                    await interaction.response.send_message(
+                        f"Matéria inválida: use até {MAX_SUBJECT_LENGTH} caracteres, sem ':'.", ephemeral=True)
+                    return
+            embed, view = await self._history_page(board, periodo, latest_key(periodo))
+            await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+        except discord.errors.NotFound:
+            logger.warning(f"Interaction expired for user {interaction.user.id} when using /status historico")
+        except Exception as e:
+            logger.error(f"Error in slash_ranking_history: {e}")
+
+    @route('ranking', 'prev')
+    async def on_ranking_previous(self, interaction: discord.Interaction, board: str, period: str, key: str):
+        """Show the snapshot before the one on screen (ranking:prev:<board>:<period>:<key>)."""
+        if period not in PERIOD_TITLES:
+            return
+        embed, view = await self._history_page(board, period, key)
+        await interaction.response.edit_message(embed=embed, view=view)
+
     @commands.command(name="status")
     async def status(self, ctx, member: discord.Member = None):
         """Exibe o status do jogador."""
@@ -230,11 +296,8 @@ class PlayerStatus(commands.Cog):
         elif limit > 25:
             limit = 25
 
-        # Get top players
-        top_players = await db_provider.get_top_players(limit)
-
-        # Create and send leaderboard embed
-        embed = await create_leaderboard_embed(top_players)
+        # Served from memory until a ranked field changes
+        embed = await render_leaderboard('level', db_provider.get_top_players, limit)
         await ctx.send(embed=embed, ephemeral=True)
 
     @commands.command(name="perfil")
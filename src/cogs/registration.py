@@ -9,9 +9,33 @@ from story_mode.club_rivalry_system import ClubSystem
 from utils.embeds import create_basic_embed, create_player_embed
 from utils.game_mechanics import STRENGTH_LEVELS
 from utils.persistence import db_provider
+from utils.interaction_router import component_view, encode_custom_id, interaction_router, route
+from utils.name_resolver import name_resolver
 
 logger = logging.getLogger('tokugawa_bot')
 
+# Editable character fields: button label, modal title, input label and placeholder, player attribute
+EDITABLE_FIELDS = {
+    "nome": {
+        "label": "Alterar Nome",
+        "input": "Novo Nome",
+        "placeholder": "Digite o novo nome do personagem",
+        "attribute": "name",
+        "subject": "O nome",
+        "success": "Nome alterado com sucesso para: {value}",
+        "allow_digits": True
+    },
+    "poder": {
+        "label": "Alterar Poder",
+        "input": "Novo Poder",
+        "placeholder": "Digite o novo nome do poder",
+        "attribute": "power",
+        "subject": "O nome do poder",
+        "success": "Nome do poder alterado com sucesso para: {value}",
+        "allow_digits": False
+    }
+}
+
 
 class RegistrationCog(commands.Cog):
     """Cog for handling player registration and character information editing."""
@@ -23,8 +47,13 @@ class RegistrationCog(commands.Cog):
 
     def cog_load(self):
         """Called when the cog is loaded."""
+        interaction_router.add_cog(self)
         logger.info("RegistrationCog loaded")
 
+    def cog_unload(self):
+        """Called when the cog is unloaded."""
+        interaction_router.remove_cog(self)
+
     # Group for registration commands
     registration_group = app_commands.Group(name="registro", description="Comandos de registro da Academia Tokugawa")
 
@@ -252,7 +281,8 @@ class RegistrationCog(commands.Cog):
 
         await ctx.send(embed=help_embed)
 
-    @app_commands.command(name="alterar_registro", description="Altere informações do seu personagem")
+    @app_commands.command(name="alterar_registro", description="Altere informações do seu personagem",
+                          extras={"auto_defer": False})
     async def alterar_registro(self, interaction: discord.Interaction):
         """Comando para alterar informações do personagem."""
         try:
@@ -268,18 +298,13 @@ class RegistrationCog(commands.Cog):
                 return
             
             # Create view with buttons for each option
-            view = discord.ui.View()
-            
-            # Add buttons for each option
-            view.add_item(discord.ui.Button(
-                style=discord.ButtonStyle.primary,
-                label="Alterar Nome",
-                custom_id="alterar_nome"
-            ))
-            view.add_item(discord.ui.Button(
-                style=discord.ButtonStyle.primary,
-                label="Alterar Poder",
-                custom_id="alterar_poder"
+            view = component_view(*(
+                discord.ui.Button(
+                    style=discord.ButtonStyle.primary,
+                    label=field["label"],
+                    custom_id=encode_custom_id('registration', 'edit', name)
+                )
+                for name, field in EDITABLE_FIELDS.items()
             ))
             
             # Send message with buttons
@@ -302,113 +327,73 @@ class RegistrationCog(commands.Cog):
             except discord.errors.NotFound:
                 pass
 
-    @commands.Cog.listener()
-    async def on_interaction(self, interaction: discord.Interaction):
-        """Handle button interactions."""
-        if not interaction.type == discord.InteractionType.component:
+    @route('registration', 'edit')
+    async def on_edit_field(self, interaction: discord.Interaction, field_name: str):
+        """Open the modal of an "Alterar ..." button (registration:edit:<field>)."""
+        field = EDITABLE_FIELDS.get(field_name)
+        if field is None:
+            await interaction.response.send_message("Opção inválida.", ephemeral=True)
             return
-            
-        if interaction.data["custom_id"] == "alterar_nome":
-            # Create modal for name input
-            modal = discord.ui.Modal(title="Alterar Nome")
-            modal.add_item(discord.ui.TextInput(
-                label="Novo Nome",
-                placeholder="Digite o novo nome do personagem",
-                min_length=3,
-                max_length=100,
-                required=True
-            ))
-            
-            async def modal_callback(interaction: discord.Interaction):
-                try:
-                    nome = interaction.data["components"][0]["components"][0]["value"]
-                    
-                    # Validate input
-                    if not nome:
-                        await interaction.response.send_message("O nome não pode estar vazio.", ephemeral=True)
-                        return
-                        
-                    if len(nome) < 3:
-                        await interaction.response.send_message("O nome deve ter pelo menos 3 caracteres.", ephemeral=True)
-                        return
-                        
-                    if len(nome) > 100:
-                        await interaction.response.send_message("O nome é muito longo. Máximo de 100 caracteres.", ephemeral=True)
-                        return
-                    
-                    # Update player name
-                    await db_provider.update_player(interaction.user.id, name=nome)
-                    
-                    await interaction.response.send_message(
-                        f"Nome alterado com sucesso para: {nome}",
-                        ephemeral=True
-                    )
-                    
-                except Exception as e:
-                    logger.error(f"Error in alterar_nome modal: {str(e)}")
-                    try:
-                        await interaction.response.send_message(
-                            "Ocorreu um erro ao processar o diálogo. Por favor, tente novamente.",
-                            ephemeral=True
-                        )
-                    except discord.errors.NotFound:
-                        pass
-            
-            modal.callback = modal_callback
-            await interaction.response.send_modal(modal)
-            
-        elif interaction.data["custom_id"] == "alterar_poder":
-            # Create modal for power input
-            modal = discord.ui.Modal(title="Alterar Poder")
-            modal.add_item(discord.ui.TextInput(
-                label="Novo Poder",
-                placeholder="Digite o novo nome do poder",
-                min_length=3,
-                max_length=100,
-                required=True
-            ))
-            
-            async def modal_callback(interaction: discord.Interaction):
-                try:
-                    poder = interaction.data["components"][0]["components"][0]["value"]
-                    
-                    # Validate input
-                    if not poder:
-                        await interaction.response.send_message("O nome do poder não pode estar vazio.", ephemeral=True)
-                        return
-                        
-                    if len(poder) < 3:
-                        await interaction.response.send_message("O nome do poder deve ter pelo menos 3 caracteres.", ephemeral=True)
-                        return
-                        
-                    if len(poder) > 100:
-                        await interaction.response.send_message("O nome do poder é muito longo. Máximo de 100 caracteres.", ephemeral=True)
-                        return
-                        
-                    if any(char.isdigit() for char in poder):
-                        await interaction.response.send_message("O nome do poder não pode conter números.", ephemeral=True)
-                        return
-                    
-                    # Update player power
-                    await db_provider.update_player(interaction.user.id, power=poder)
-                    
-                    await interaction.response.send_message(
-                        f"Nome do poder alterado com sucesso para: {poder}",
-                        ephemeral=True
-                    )
-                    
-                except Exception as e:
-                    logger.error(f"Error in alterar_poder modal: {str(e)}")
-                    try:
-                        await interaction.response.send_message(
-                            "Ocorreu um erro ao processar o diálogo. Por favor, tente novamente.",
-                            ephemeral=True
-                        )
-                    except discord.errors.NotFound:
-                        pass
-            
-            modal.callback = modal_callback
-            await interaction.response.send_modal(modal)
+
+        # The submission is handled by on_save_field through the modal's custom_id
+        modal = discord.ui.Modal(
+            title=field["label"],
+            timeout=600,
+            custom_id=encode_custom_id('registration', 'save', field_name)
+        )
+        modal.add_item(discord.ui.TextInput(
+            label=field["input"],
+            placeholder=field["placeholder"],
+            min_length=3,
+            max_length=100,
+            required=True
+        ))
+        await interaction.response.send_modal(modal)
+
+    @route('registration', 'save')
+    async def on_save_field(self, interaction: discord.Interaction, field_name: str):
+        """Validate and store a submitted field (registration:save:<field>)."""
+        field = EDITABLE_FIELDS.get(field_name)
+        if field is None:
+            return
+
+        try:
+            value = interaction.data["components"][0]["components"][0]["value"]
+            subject = field["subject"]
+
+            # Validate input
+            if not value:
+                await interaction.response.send_message(f"{subject} não pode estar vazio.", ephemeral=True)
+                return
+
+            if len(value) < 3:
+                await interaction.response.send_message(f"{subject} deve ter pelo menos 3 caracteres.", ephemeral=True)
+                return
+
+            if len(value) > 100:
+                await interaction.response.send_message(f"{subject} é muito longo. Máximo de 100 caracteres.", ephemeral=True)
+                return
+
+            if not field["allow_digits"] and any(char.isdigit() for char in value):
+                await interaction.response.send_message(f"{subject} não pode conter números.", ephemeral=True)
+                return
+
+            # Update player
+            await db_provider.update_player(interaction.user.id, **{field["attribute"]: value})
+            if field["attribute"] == "name":
+                name_resolver.invalidate(interaction.user.id)
+
+            await interaction.response.send_message(field["success"].format(value=value), ephemeral=True)
+
+        except Exception as e:
+            logger.error(f"Error in alterar_{field_name} modal: {str(e)}")
+            try:
+                await interaction.response.send_message(
+                    "Ocorreu um erro ao processar o diálogo. Por favor, tente novamente.",
+                    ephemeral=True
+                )
+            except discord.errors.NotFound:
+                pass
 
 
 async def setup(bot):
@@ -431,7 +416,8 @@ async def setup(bot):
         logger.info(f"Registration_group already registered: /{cog.registration_group.name}")
 
     # Add the slash_register command directly to the bot's command tree
-    @bot.tree.command(name="registrar", description="Iniciar o processo de registro na Academia Tokugawa")
+    @bot.tree.command(name="registrar", description="Iniciar o processo de registro na Academia Tokugawa",
+                      extras={"defer_ephemeral": False})
     async def direct_slash_register(interaction: discord.Interaction):
         """Direct slash command for registration."""
         try:
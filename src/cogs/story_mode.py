@@ -1,3 +1,4 @@
+import copy
 import discord
 import logging
 import os
@@ -10,14 +11,27 @@ import json
 from story_mode.club_system import ClubSystem
 from story_mode.consequences import DynamicConsequencesSystem
 from story_mode.relationship_system import RelationshipSystem
-from story_mode.story_mode import StoryMode
-from story_mode.image_manager import ImageManager
+from story_mode.chapter_cache import chapter_cache
+from story_mode.content_registry import CHAPTERS_DIR, content_for
+from story_mode.dialogue_presenter import page_at
 from story_mode.progress import DefaultStoryProgressManager
 from utils.embeds import create_basic_embed, create_event_embed
-from utils.json_utils import dumps as json_dumps
 from utils.persistence import db_provider
-from utils.persistence.dynamodb_story import get_story_progress, update_story_progress
-from utils.config import STORY_MODE_DIR
+from utils.user_lanes import serialized_per_user
+from utils.interaction_router import (
+    component_view,
+    encode_custom_id,
+    interaction_router,
+    legacy_route,
+    route
+)
+from utils.persistence.dynamodb_story import (
+    get_story_position,
+    get_story_progress,
+    save_story_progress_delta,
+    set_story_position,
+    with_story_progress
+)
 
 logger = logging.getLogger('tokugawa_bot')
 
@@ -30,39 +44,57 @@ class StoryModeCog(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.story_mode = StoryMode(STORY_MODE_DIR)
+        self.content = content_for(bot)
+        self.story_mode = self.content.story_mode
         self.progress_manager = DefaultStoryProgressManager()
         self.active_sessions = {}  # user_id -> session_data
         self.club_system = ClubSystem()
         self.consequences_system = DynamicConsequencesSystem()
         self.relationship_system = RelationshipSystem()
-        self.image_manager = ImageManager()
+        self.image_manager = self.content.image_manager
 
         logger.info("StoryModeCog initialized")
 
     def cog_load(self):
         """Called when the cog is loaded."""
+        interaction_router.add_cog(self)
         logger.info("StoryModeCog loaded")
 
+    def cog_unload(self):
+        """Called when the cog is unloaded."""
+        interaction_router.remove_cog(self)
+
     async def _load_chapter(self, chapter_id: str) -> Optional[Dict[str, Any]]:
         """
         Load chapter data from JSON file.
         """
         try:
-            chapter_file = os.path.join(STORY_MODE_DIR, "chapters", f"{chapter_id}.json")
+            chapter_file = os.path.join(CHAPTERS_DIR, f"{chapter_id}.json")
             if not os.path.exists(chapter_file):
                 logger.error(f"Chapter file not found: {chapter_file}")
                 return None
             
-            with open(chapter_file, 'r', encoding='utf-8') as f:
-                chapter_data = json.load(f)
-            
-            return chapter_data
+            # Parsed once and kept in memory; edits to the file are picked up
+            return chapter_cache.get(chapter_file)
         except Exception as e:
             logger.error(f"Error loading chapter {chapter_id}: {e}")
             return None
 
+    async def _persist_story_result(self, user_id: int, before: Dict[str, Any], club_before: Any,
+                                    result_player_data: Dict[str, Any]) -> None:
+        """
+        Persist what the story engine changed.
+
+        Story progress is written as a delta to the story progress item instead of
+        rewriting the whole document in the player item.
+        """
+        await save_story_progress_delta(str(user_id), before, result_player_data.get("story_progress", {}))
+
+        if "club_id" in result_player_data and result_player_data["club_id"] != club_before:
+            await db_provider.update_player(user_id, club_id=result_player_data["club_id"])
+
     @commands.command(name="start_story")
+    @serialized_per_user()
     async def start_story(self, ctx):
         """
         Start the story mode.
@@ -107,6 +139,7 @@ class StoryModeCog(commands.Cog):
             await ctx.send("An error occurred while starting the story.")
     
     @commands.command(name="continue_story")
+    @serialized_per_user()
     async def continue_story(self, ctx):
         """
         Continue the story from where you left off.
@@ -174,7 +207,9 @@ class StoryModeCog(commands.Cog):
             logger.error(f"Error in story_progress: {e}")
             await ctx.send("An error occurred while retrieving your story progress.")
 
-    @app_commands.command(name="historia", description="Inicia ou continua o modo história")
+    @app_commands.command(name="historia", description="Inicia ou continua o modo história",
+                          extras={"auto_defer": False})
+    @serialized_per_user()
     async def slash_start_story(self, interaction: discord.Interaction):
         """
         Slash command to start or continue the story mode.
@@ -201,7 +236,10 @@ class StoryModeCog(commands.Cog):
                 await interaction.followup.send("Erro interno: dados do jogador inválidos. Por favor, contate um administrador.", ephemeral=True)
                 return
 
-        # Start or continue the story
+        # Start or continue the story from the current story progress
+        player_data = await with_story_progress(player_data, user_id)
+        progress_before = copy.deepcopy(player_data.get("story_progress", {}))
+        club_before = player_data.get("club_id")
         result = await self.story_mode.start_story(player_data)
         logger.info(
             f"start_story result: user_id={result.get('user_id')}, "
@@ -223,14 +261,8 @@ class StoryModeCog(commands.Cog):
             logger.error(f"start_story returned incomplete result: {result}")
             return
 
-        # Update player data in database
-        update_data = {"story_progress": json_dumps(result["player_data"]["story_progress"])}
-
-        # Also update club_id if it's in the player data
-        if "club_id" in result["player_data"]:
-            update_data["club_id"] = result["player_data"]["club_id"]
-
-        await db_provider.update_player(user_id, **update_data)
+        # Persist only what changed in the story progress
+        await self._persist_story_result(user_id, progress_before, club_before, result["player_data"])
 
         # Store session data
         self.active_sessions[user_id] = {
@@ -267,7 +299,8 @@ class StoryModeCog(commands.Cog):
         if "available_events" in result and result["available_events"]:
             await self._notify_about_events(interaction.channel, user_id, result["available_events"])
 
-    @app_commands.command(name="status_historia", description="Mostra o status atual do seu progresso no modo história")
+    @app_commands.command(name="status_historia", description="Mostra o status atual do seu progresso no modo história",
+                          extras={"auto_defer": False})
     async def slash_story_status(self, interaction: discord.Interaction):
         """
         Slash command to show the current status of the player's story progress.
@@ -279,7 +312,7 @@ class StoryModeCog(commands.Cog):
             return  # Let the command tree error handler handle this
 
         user_id = interaction.user.id
-        player_data = await db_provider.get_player(user_id)
+        player_data = await with_story_progress(await db_provider.get_player(user_id), user_id)
 
         if not player_data:
             await interaction.followup.send("Você precisa criar um personagem primeiro! Use /registrar", ephemeral=True)
@@ -357,11 +390,13 @@ class StoryModeCog(commands.Cog):
 
         await interaction.followup.send(embed=embed, ephemeral=True)
 
-    @app_commands.command(name="relacionamento", description="Mostra ou altera seu relacionamento com um personagem")
+    @app_commands.command(name="relacionamento", description="Mostra ou altera seu relacionamento com um personagem",
+                          extras={"auto_defer": False})
     @app_commands.describe(
         personagem="Nome do personagem",
         afinidade="Quantidade de pontos de afinidade para adicionar (opcional)"
     )
+    @serialized_per_user()
     async def slash_relacionamento(self, interaction: discord.Interaction, personagem: str = None,
                                    afinidade: int = None):
         """
@@ -374,7 +409,7 @@ class StoryModeCog(commands.Cog):
             return  # Let the command tree error handler handle this
 
         user_id = interaction.user.id
-        player_data = await db_provider.get_player(user_id)
+        player_data = await with_story_progress(await db_provider.get_player(user_id), user_id)
 
         if not player_data:
             await interaction.followup.send("Você precisa criar um personagem primeiro! Use /registrar", ephemeral=True)
@@ -412,20 +447,16 @@ class StoryModeCog(commands.Cog):
                                                 ephemeral=True)
                 return
 
+            progress_before = copy.deepcopy(player_data.get("story_progress", {}))
+            club_before = player_data.get("club_id")
             result = await self.story_mode.update_affinity(player_data, personagem, afinidade)
 
             if "error" in result:
                 await interaction.followup.send(f"Erro ao atualizar afinidade: {result['error']}", ephemeral=True)
                 return
 
-            # Update player data in database
-            update_data = {"story_progress": json_dumps(result["player_data"]["story_progress"])}
-
-            # Also update club_id if it's in the player data
-            if "club_id" in result["player_data"]:
-                update_data["club_id"] = result["player_data"]["club_id"]
-
-            await db_provider.update_player(user_id, **update_data)
+            # Persist only what changed in the story progress
+            await self._persist_story_result(user_id, progress_before, club_before, result["player_data"])
 
             affinity_result = result["affinity_result"]
 
@@ -505,8 +536,11 @@ class StoryModeCog(commands.Cog):
             embed.add_field(name="Criado por", value=interaction.user.mention, inline=True)
             
             # Create view
-            view = discord.ui.View()
-            view.add_item(discord.ui.Button(label="Participar", style=discord.ButtonStyle.primary, custom_id=f"join_event_{event_id}"))
+            view = component_view(discord.ui.Button(
+                label="Participar",
+                style=discord.ButtonStyle.primary,
+                custom_id=encode_custom_id('event', 'join', event_id)
+            ))
             
             # Send announcement
             message = await interaction.channel.send(embed=embed, view=view)
@@ -531,14 +565,11 @@ class StoryModeCog(commands.Cog):
             logger.error(f"Error in slash_start_event: {e}")
             await interaction.response.send_message("Ocorreu um erro ao criar o evento. Por favor, tente novamente.", ephemeral=True)
     
-    @commands.Cog.listener()
-    async def on_interaction(self, interaction: discord.Interaction):
-        """Handle button interactions."""
+    @route('event', 'join')
+    @legacy_route('join_event_')
+    async def on_event_join(self, interaction: discord.Interaction, event_id: str):
+        """Handle the "Participar" button of an event announcement."""
         try:
-            if not interaction.data.get('custom_id', '').startswith('join_event_'):
-                return
-            
-            event_id = interaction.data['custom_id'].split('_')[2]
             event = await db_provider.get_event(event_id)
             
             if not event:
@@ -569,15 +600,48 @@ class StoryModeCog(commands.Cog):
             await interaction.response.send_message("Você se juntou ao evento com sucesso!", ephemeral=True)
             
         except Exception as e:
-            logger.error(f"Error in on_interaction: {e}")
+            logger.error(f"Error in on_event_join: {e}")
             await interaction.response.send_message("Ocorreu um erro ao processar sua interação. Por favor, tente novamente.", ephemeral=True)
 
-    async def _send_dialogue_or_choices(self, ctx_or_interaction, chapter_data, player_data):
+    def _choices_view(self, user_id: int, chapter_id: Optional[str], choices) -> discord.ui.View:
+        """
+        Build the choice buttons, or a continue button when there are no choices.
+
+        The buttons carry the player, chapter and choice in their custom_id and are
+        handled by the interaction router, so they survive restarts.
+        """
+        chapter_id = chapter_id or ''
+        if not choices:
+            return component_view(discord.ui.Button(
+                label="Continuar",
+                custom_id=encode_custom_id('story', 'continue', user_id, chapter_id),
+                style=discord.ButtonStyle.primary
+            ))
+        return component_view(*(
+            discord.ui.Button(
+                label=choice.get("text", f"Opção {i+1}"),
+                custom_id=encode_custom_id('story', 'choice', user_id, chapter_id, i),
+                style=discord.ButtonStyle.primary
+            )
+            for i, choice in enumerate(choices)
+        ))
+
+    @staticmethod
+    def _current_chapter_id(chapter_data, player_data) -> Optional[str]:
+        """Chapter the player is in, as encoded in the story buttons."""
+        chapter_id = player_data.get("story_progress", {}).get("current_chapter")
+        if chapter_id is None and hasattr(chapter_data, 'chapter_id'):
+            chapter_id = chapter_data.chapter_id
+        return chapter_id
+
+    async def _send_dialogue_or_choices(self, ctx_or_interaction, chapter_data, player_data,
+                                        user_id: Optional[int] = None):
         """Send current dialogue or choices to the channel."""
         try:
             # Handle both Context and Interaction objects
             is_interaction = isinstance(ctx_or_interaction, discord.Interaction)
-            user_id = ctx_or_interaction.user.id if is_interaction else ctx_or_interaction.author.id
+            if user_id is None:
+                user_id = ctx_or_interaction.user.id if is_interaction else ctx_or_interaction.author.id
             send_message = ctx_or_interaction.followup.send if is_interaction else ctx_or_interaction.send
             
             # Get current dialogue index
@@ -588,184 +652,172 @@ class StoryModeCog(commands.Cog):
             if hasattr(chapter_data, 'get_available_choices'):
                 # Get available choices from the StoryChapter object
                 available_choices = chapter_data.get_available_choices(player_data)
-                
+                view = self._choices_view(user_id, self._current_chapter_id(chapter_data, player_data),
+                                          available_choices)
                 if available_choices:
-                    # Create choice buttons
-                    view = discord.ui.View()
-                    for i, choice in enumerate(available_choices):
-                        button = discord.ui.Button(
-                            label=choice.get("text", f"Opção {i+1}"),
-                            custom_id=f"choice_{i}",
-                            style=discord.ButtonStyle.primary
-                        )
-                        button.callback = self._create_choice_callback(user_id, i)
-                        view.add_item(button)
-                    
                     await send_message("Escolha uma opção:", view=view)
                 else:
                     # If no choices available, show continue button
-                    view = discord.ui.View()
-                    continue_button = discord.ui.Button(
-                        label="Continuar",
-                        custom_id="continue",
-                        style=discord.ButtonStyle.primary
-                    )
-                    continue_button.callback = self._create_continue_callback(user_id)
-                    view.add_item(continue_button)
                     await send_message("Pressione continuar para seguir:", view=view)
             else:
                 # Handle dictionary format
                 dialogues = chapter_data.get("dialogues", [])
                 
                 if current_dialogue_index < len(dialogues):
-                    current_dialogue = dialogues[current_dialogue_index]
-                    await send_message(current_dialogue.get("text", ""))
-                    
-                    story_progress["current_dialogue_index"] = current_dialogue_index + 1
-                    await db_provider.update_player(user_id, {"story_progress": story_progress})
+                    # Send the scene from the cursor as one page; "Próximo" edits it in place
+                    chapter_id = self._current_chapter_id(chapter_data, player_data)
+                    embed, view, reached_choices = self._dialogue_page(
+                        user_id, chapter_id, chapter_data, current_dialogue_index)
+                    await send_message(embed=embed, view=view)
                     
-                    if current_dialogue_index + 1 < len(dialogues):
-                        await self._send_dialogue_or_choices(ctx_or_interaction, chapter_data, player_data)
-                    else:
-                        await self._show_choices(ctx_or_interaction, chapter_data, player_data)
+                    if reached_choices:
+                        story_progress["current_dialogue_index"] = len(dialogues)
+                        await self._dialogue_checkpoint(user_id, len(dialogues))
                 else:
-                    await self._show_choices(ctx_or_interaction, chapter_data, player_data)
+                    await self._show_choices(ctx_or_interaction, chapter_data, player_data, user_id)
                     
         except Exception as e:
             logger.error(f"Error in _send_dialogue_or_choices: {str(e)}")
             await send_message("Ocorreu um erro ao processar o diálogo. Por favor, tente novamente.")
 
-    def _create_choice_callback(self, user_id: int, choice_index: int):
+    def _dialogue_page(self, user_id: int, chapter_id: Optional[str], chapter_data: Dict[str, Any], start: int):
         """
-        Creates a callback function for a choice button.
+        Render the dialogue page that begins at start.
+
+        Returns:
+            Tuple of (embed, view, reached_choices). The view holds a "Próximo"
+            button, or the scene's choices on its last page.
         """
+        dialogues = chapter_data.get("dialogues", [])
+        page = page_at(dialogues, start)
+        embed = create_basic_embed(
+            title=chapter_data.get("title", "História"),
+            description=page["text"],
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text=f"Academia Tokugawa • Página {page['number']}/{page['total']}")
+
+        if page["end"] < len(dialogues):
+            view = component_view(discord.ui.Button(
+                label="Próximo",
+                custom_id=encode_custom_id('story', 'page', user_id, chapter_id or '', page["end"]),
+                style=discord.ButtonStyle.secondary
+            ))
+            return embed, view, False
+        return embed, self._choices_view(user_id, chapter_id, chapter_data.get("choices", [])), True
+
+    async def _dialogue_checkpoint(self, user_id: int, dialogue_index: int):
+        """Store the dialogue cursor once the scene reaches its choices."""
+        await set_story_position(str(user_id), dialogue_index=dialogue_index)
+
+    @route('story', 'page')
+    @serialized_per_user()
+    async def on_story_page(self, interaction: discord.Interaction, user_id: str, chapter_id: str, start: str):
+        """Show the next dialogue page (story:page:<user_id>:<chapter_id>:<start>)."""
+        if interaction.user.id != int(user_id):
+            await interaction.response.send_message("Esta não é a sua história!", ephemeral=True)
+            return
 
-        async def choice_callback(interaction: discord.Interaction):
-            # Check if the user who clicked is the same as the user who started the story
-            if interaction.user.id != user_id:
-                await interaction.response.send_message("Esta não é a sua história!", ephemeral=True)
-                return
+        # Buttons from an earlier chapter are no longer valid
+        current_chapter = (await get_story_position(user_id)).get("current_chapter")
+        if not chapter_id or (current_chapter and chapter_id != current_chapter):
+            await interaction.response.send_message("Esta página não faz mais parte da sua história atual.",
+                                                    ephemeral=True)
+            return
 
-            try:
-                await interaction.response.defer(ephemeral=True)
-            except discord.errors.NotFound:
-                logger.error("A interação expirou antes que pudesse ser processada.")
-                return
+        chapter_data = await self._load_chapter(chapter_id)
+        if not chapter_data:
+            await interaction.response.send_message("Este capítulo não está mais disponível.", ephemeral=True)
+            return
 
-            # Get player data
-            player_data = await db_provider.get_player(user_id)
+        embed, view, reached_choices = self._dialogue_page(int(user_id), chapter_id, chapter_data, int(start))
+        await interaction.response.edit_message(embed=embed, view=view)
 
-            if not player_data:
-                await interaction.followup.send("Erro: Dados do jogador não encontrados.", ephemeral=True)
-                return
+        if reached_choices:
+            await self._dialogue_checkpoint(int(user_id), len(chapter_data.get("dialogues", [])))
 
-            # Process the choice
-            result = await self.story_mode.process_choice(player_data, choice_index)
+    @route('story', 'choice')
+    @serialized_per_user()
+    async def on_story_choice(self, interaction: discord.Interaction, user_id: str, chapter_id: str, index: str):
+        """Handle a story choice button (story:choice:<user_id>:<chapter_id>:<index>)."""
+        await self._advance_story(interaction, int(user_id), chapter_id, int(index), continuing=False)
 
-            if "error" in result:
-                await interaction.followup.send(f"Erro ao processar escolha: {result['error']}", ephemeral=True)
-                return
+    @route('story', 'continue')
+    @serialized_per_user()
+    async def on_story_continue(self, interaction: discord.Interaction, user_id: str, chapter_id: str):
+        """Handle a story continue button (story:continue:<user_id>:<chapter_id>)."""
+        # Continue is equivalent to choice 0
+        await self._advance_story(interaction, int(user_id), chapter_id, 0, continuing=True)
 
-            # Update player data in database
-            update_data = {"story_progress": json_dumps(result["player_data"]["story_progress"])}
-
-            # Also update club_id if it's in the player data
-            if "club_id" in result["player_data"]:
-                update_data["club_id"] = result["player_data"]["club_id"]
-
-            await db_provider.update_player(user_id, **update_data)
-
-            # Send next dialogue or choices
-            await self._send_dialogue_or_choices(interaction.channel, result["chapter_data"], result["player_data"])
-
-            # Check for available events
-            if "available_events" in result and result["available_events"]:
-                await self._notify_about_events(interaction.channel, user_id, result["available_events"])
-
-            # Check if chapter is complete
-            if "chapter_complete" in result and result["chapter_complete"]:
-                if "story_complete" in result and result["story_complete"]:
-                    embed = create_basic_embed(
-                        title="História Concluída",
-                        description="Parabéns! Você concluiu a história principal do jogo.",
-                        color=discord.Color.gold()
-                    )
-                    await interaction.channel.send(embed=embed)
-                elif "next_chapter_id" in result:
-                    embed = create_basic_embed(
-                        title="Capítulo Concluído",
-                        description=f"Você concluiu este capítulo da história. O próximo capítulo está disponível.",
-                        color=discord.Color.green()
-                    )
-                    await interaction.channel.send(embed=embed)
-
-        return choice_callback
-
-    def _create_continue_callback(self, user_id: int):
+    async def _advance_story(self, interaction: discord.Interaction, user_id: int, chapter_id: str,
+                             choice_index: int, continuing: bool):
         """
-        Creates a callback function for a continue button.
+        Process a choice or continue button and send what comes next.
+
+        Choices are answered in the channel; continuing answers the interaction.
         """
+        # Check if the user who clicked is the same as the user who started the story
+        if interaction.user.id != user_id:
+            await interaction.response.send_message("Esta não é a sua história!", ephemeral=True)
+            return
 
-        async def continue_callback(interaction: discord.Interaction):
-            # Check if the user who clicked is the same as the user who started the story
-            if interaction.user.id != user_id:
-                await interaction.response.send_message("Esta não é a sua história!", ephemeral=True)
-                return
+        try:
+            await interaction.response.defer(ephemeral=True)
+        except discord.errors.NotFound:
+            logger.error("A interação expirou antes que pudesse ser processada.")
+            return
 
-            try:
-                await interaction.response.defer(ephemeral=True)
-            except discord.errors.NotFound:
-                logger.error("A interação expirou antes que pudesse ser processada.")
-                return
+        # Get player data with the current story progress
+        player_data = await with_story_progress(await db_provider.get_player(user_id), user_id)
 
-            # Get player data
-            player_data = await db_provider.get_player(user_id)
+        if not player_data:
+            await interaction.followup.send("Erro: Dados do jogador não encontrados.", ephemeral=True)
+            return
 
-            if not player_data:
-                await interaction.followup.send("Erro: Dados do jogador não encontrados.", ephemeral=True)
-                return
+        # Buttons from an earlier chapter are no longer valid
+        current_chapter = player_data.get("story_progress", {}).get("current_chapter")
+        if chapter_id and current_chapter and chapter_id != current_chapter:
+            await interaction.followup.send("Esta escolha não faz mais parte da sua história atual.", ephemeral=True)
+            return
 
-            # Process the choice (continue is equivalent to choice 0)
-            result = await self.story_mode.process_choice(player_data, 0)
+        # Process the choice
+        progress_before = copy.deepcopy(player_data.get("story_progress", {}))
+        club_before = player_data.get("club_id")
+        result = await self.story_mode.process_choice(player_data, choice_index)
 
-            if "error" in result:
-                await interaction.followup.send(f"Erro ao continuar: {result['error']}", ephemeral=True)
-                return
+        if "error" in result:
+            message = "Erro ao continuar" if continuing else "Erro ao processar escolha"
+            await interaction.followup.send(f"{message}: {result['error']}", ephemeral=True)
+            return
+
+        # Persist only what changed in the story progress
+        await self._persist_story_result(user_id, progress_before, club_before, result["player_data"])
+
+        # Send next dialogue or choices
+        target = interaction if continuing else interaction.channel
+        await self._send_dialogue_or_choices(target, result["chapter_data"], result["player_data"], user_id)
 
-            # Update player data in database
-            update_data = {"story_progress": json_dumps(result["player_data"]["story_progress"])}
-
-            # Also update club_id if it's in the player data
-            if "club_id" in result["player_data"]:
-                update_data["club_id"] = result["player_data"]["club_id"]
-
-            await db_provider.update_player(user_id, **update_data)
-
-            # Send next dialogue or choices
-            await self._send_dialogue_or_choices(interaction, result["chapter_data"], result["player_data"])
-
-            # Check for available events
-            if "available_events" in result and result["available_events"]:
-                await self._notify_about_events(interaction.channel, user_id, result["available_events"])
-
-            # Check if chapter is complete
-            if "chapter_complete" in result and result["chapter_complete"]:
-                if "story_complete" in result and result["story_complete"]:
-                    embed = create_basic_embed(
-                        title="História Concluída",
-                        description="Parabéns! Você concluiu a história principal do jogo.",
-                        color=discord.Color.gold()
-                    )
-                    await interaction.followup.send(embed=embed)
-                elif "next_chapter_id" in result:
-                    embed = create_basic_embed(
-                        title="Capítulo Concluído",
-                        description=f"Você concluiu este capítulo da história. O próximo capítulo está disponível.",
-                        color=discord.Color.green()
-                    )
-                    await interaction.followup.send(embed=embed)
-
-        return continue_callback
+        # Check for available events
+        if "available_events" in result and result["available_events"]:
+            await self._notify_about_events(interaction.channel, user_id, result["available_events"])
+
+        # Check if chapter is complete
+        if "chapter_complete" in result and result["chapter_complete"]:
+            send = interaction.followup.send if continuing else interaction.channel.send
+            if "story_complete" in result and result["story_complete"]:
+                embed = create_basic_embed(
+                    title="História Concluída",
+                    description="Parabéns! Você concluiu a história principal do jogo.",
+                    color=discord.Color.gold()
+                )
+                await send(embed=embed)
+            elif "next_chapter_id" in result:
+                embed = create_basic_embed(
+                    title="Capítulo Concluído",
+                    description=f"Você concluiu este capítulo da história. O próximo capítulo está disponível.",
+                    color=discord.Color.green()
+                )
+                await send(embed=embed)
 
     async def _notify_about_events(self, channel, user_id: int, available_events):
         """
@@ -950,12 +1002,13 @@ class StoryModeCog(commands.Cog):
 
         await ctx.send(embed=embed)
 
-    async def _show_choices(self, ctx_or_interaction, chapter_data, player_data):
+    async def _show_choices(self, ctx_or_interaction, chapter_data, player_data, user_id: Optional[int] = None):
         """Show available choices to the player."""
         try:
             # Handle both Context and Interaction objects
             is_interaction = isinstance(ctx_or_interaction, discord.Interaction)
-            user_id = ctx_or_interaction.user.id if is_interaction else ctx_or_interaction.author.id
+            if user_id is None:
+                user_id = ctx_or_interaction.user.id if is_interaction else ctx_or_interaction.author.id
             send_message = ctx_or_interaction.followup.send if is_interaction else ctx_or_interaction.send
 
             # Get available choices
@@ -964,29 +1017,11 @@ class StoryModeCog(commands.Cog):
             else:
                 choices = chapter_data.get("choices", [])
 
+            view = self._choices_view(user_id, self._current_chapter_id(chapter_data, player_data), choices)
             if choices:
-                # Create choice buttons
-                view = discord.ui.View()
-                for i, choice in enumerate(choices):
-                    button = discord.ui.Button(
-                        label=choice.get("text", f"Opção {i+1}"),
-                        custom_id=f"choice_{i}",
-                        style=discord.ButtonStyle.primary
-                    )
-                    button.callback = self._create_choice_callback(user_id, i)
-                    view.add_item(button)
-                
                 await send_message("Escolha uma opção:", view=view)
             else:
                 # If no choices available, show continue button
-                view = discord.ui.View()
-                continue_button = discord.ui.Button(
-                    label="Continuar",
-                    custom_id="continue",
-                    style=discord.ButtonStyle.primary
-                )
-                continue_button.callback = self._create_continue_callback(user_id)
-                view.add_item(continue_button)
                 await send_message("Pressione continuar para seguir:", view=view)
 
         except Exception as e:
@@ -3,15 +3,21 @@ Base module for event handling in Academia Tokugawa.
 This module provides common functionality and base classes for all events.
 """
 
+import copy
 import logging
 import discord
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+from utils.persistence.dynamodb_shared_state import load_shared_state, update_shared_state
 
 logger = logging.getLogger('tokugawa_bot.events')
 
 class BaseEvent:
     """Base class for all events."""
+
+    # Attributes kept in the shared state store so every cluster worker sees them
+    shared_attributes: Tuple[str, ...] = ()
     
     def __init__(self, bot, channel_id: Optional[int] = None):
         self.bot = bot
@@ -29,21 +35,24 @@ class BaseEvent:
     
     async def send_announcement(self, title: str, description: str, color: int = 0x00FF00) -> Optional[discord.Message]:
         """Send an announcement to the event channel."""
+        embed = discord.Embed(
+            title=title,
+            description=description,
+            color=color
+        )
+        return await self.send_embed(embed)
+
+    async def send_embed(self, embed: discord.Embed) -> Optional[discord.Message]:
+        """Send a prepared embed to the event channel."""
         if not self.channel_id:
             logger.error("No channel ID set for event announcement")
             return None
-            
+
         channel = self.bot.get_channel(self.channel_id)
         if not channel:
             logger.error(f"Could not find channel with ID {self.channel_id}")
             return None
-            
-        embed = discord.Embed(
-            title=title,
-            description=description,
-            color=color
-        )
-        
+
         try:
             return await channel.send(embed=embed)
         except Exception as e:
@@ -58,6 +67,64 @@ class BaseEvent:
             color=color
         )
     
+    @property
+    def state_name(self) -> str:
+        return f"events:{type(self).__name__}"
+
+    def _export_state(self) -> Dict[str, Any]:
+        return {name: copy.deepcopy(getattr(self, name)) for name in self.shared_attributes}
+
+    def _import_state(self, data: Dict[str, Any]):
+        for name in self.shared_attributes:
+            if name not in data:
+                continue
+            value = data[name]
+            # Timestamps are stored as ISO strings
+            if name.endswith('_time') and isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            setattr(self, name, value)
+
+    async def refresh_state(self):
+        """Load the latest shared state written by any cluster worker."""
+        if not self.shared_attributes:
+            return
+        try:
+            data, _ = await load_shared_state(self.state_name)
+            if data is not None:
+                self._import_state(data)
+        except Exception as e:
+            logger.error(f"Error loading shared state {self.state_name}: {e}")
+
+    async def mutate_state(self, mutate: Callable[[], Any], require_shared: bool = False) -> Any:
+        """
+        Apply a change on top of the latest shared state and publish it.
+
+        mutate changes this object's shared attributes and returns a result; it
+        may run more than once if another worker writes concurrently. If the
+        store is unavailable the change is applied locally only, unless
+        require_shared is set: then the local state is left as it was and the
+        error is raised, so changes with side effects (payouts) can be retried.
+        """
+        outcome = {}
+        before = self._export_state() if require_shared else None
+
+        def apply(current):
+            if current is not None:
+                self._import_state(current)
+            outcome['result'] = mutate()
+            return self._export_state(), outcome['result']
+
+        try:
+            return await update_shared_state(self.state_name, apply)
+        except Exception as e:
+            if require_shared:
+                logger.error(f"Error updating shared state {self.state_name}, change not applied: {e}")
+                self._import_state(before)
+                raise
+            logger.error(f"Error updating shared state {self.state_name}, keeping the change local: {e}")
+            # The change may already be applied locally by the failed attempt
+            return outcome['result'] if 'result' in outcome else mutate()
+
     async def cleanup(self):
         """Clean up event resources."""
         pass 
\ No newline at end of file
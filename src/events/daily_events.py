@@ -9,13 +9,17 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 
 from .base_events import BaseEvent
-from utils.persistence.db_provider import db_provider
+from utils.daily_stats import daily_stats
+from utils.leaderboard import club_directory
+from utils.ranking_formatter import RankingFormatter
 
 logger = logging.getLogger('tokugawa_bot.events.daily')
 
 class DailyEvents(BaseEvent):
     """Handles daily events and announcements."""
     
+    shared_attributes = ('daily_subject',)
+
     def __init__(self, bot):
         super().__init__(bot)
         self.daily_subject = {}
@@ -24,14 +28,17 @@ class DailyEvents(BaseEvent):
     async def send_daily_announcements(self):
         """Send daily morning announcements."""
         try:
-            # Get top players
-            top_players = await db_provider.get_top_players(limit=5)
-            
+            # Yesterday's snapshot and the one before it; no players table scan
+            digest = await daily_stats.digest()
+            if digest is None:
+                logger.warning("No daily stats snapshot for yesterday; skipping daily announcements")
+                return
+
             # Create announcement message
             announcement = "**Bom dia, Academia Tokugawa!**\n\n"
             announcement += "**Top 5 Jogadores:**\n"
             
-            for i, player in enumerate(top_players, 1):
+            for i, player in enumerate(digest['top'], 1):
                 announcement += f"{i}. {player['name']} (Nível {player['level']})\n"
             
             # Send announcement
@@ -40,6 +47,15 @@ class DailyEvents(BaseEvent):
                 description=announcement,
                 color=0xFFD700  # Gold
             )
+
+            # Day-over-day rankings need the snapshot of the day before
+            if digest['baseline']:
+                club_names = await club_directory.names(
+                    [club['club_id'] for club in digest['clubs']] + [player['club_id'] for player in digest['gainers']])
+                await self.send_embed(RankingFormatter.format_diario(
+                    digest['gainers'], club_names, digest['most_active'], digest['clubs']))
+            else:
+                logger.info("No daily stats snapshot for the day before yesterday; skipping daily rankings")
             
             logger.info("Sent daily morning announcements")
             
@@ -73,7 +89,11 @@ class DailyEvents(BaseEvent):
             
             # Select random subject
             selected = random.choice(subjects)
-            self.daily_subject = selected
+
+            def choose():
+                self.daily_subject = selected
+
+            await self.mutate_state(choose)
             
             logger.info(f"Selected daily subject: {selected['subject']}")
             
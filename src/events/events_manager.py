@@ -11,6 +11,8 @@ from typing import Dict, Any, Optional
 from .daily_events import DailyEvents
 from .weekly_events import WeeklyEvents
 from .special_events import SpecialEvents
+from utils.daily_stats import daily_stats
+from utils.ranking_history import ranking_history
 
 logger = logging.getLogger('tokugawa_bot.events.manager')
 
@@ -68,12 +70,17 @@ class EventsManager:
         try:
             while self.is_running:
                 current_time = datetime.now()
+
+                # Participants may have joined through other cluster workers
+                await self.refresh_state()
                 
                 # Check for special events
                 await self.special_events.check_for_special_events()
                 
                 # Handle daily events
                 if current_time.hour == 0 and current_time.minute == 0:
+                    # The digest of the day that just ended is diffed from this snapshot
+                    await daily_stats.capture(current_time)
                     await self.daily_events.send_daily_announcements()
                     await self.daily_events.select_daily_subject()
                     await self.daily_events.announce_daily_subject()
@@ -82,6 +89,9 @@ class EventsManager:
                 # Handle weekly events
                 if current_time.weekday() == 0 and current_time.hour == 0 and current_time.minute == 0:
                     await self.weekly_events.start_weekly_tournament()
+
+                # Ranking snapshots of the day, week and month that just ended
+                await ranking_history.capture_due(current_time)
                 
                 # Check for ending events
                 if self.weekly_events.current_tournament and current_time > self.weekly_events.tournament_end_time:
@@ -99,9 +109,20 @@ class EventsManager:
             logger.error(f"Error in event loop: {e}")
             self.is_running = False
     
+    async def refresh_state(self):
+        """Load the shared event state written by any cluster worker."""
+        await asyncio.gather(
+            self.daily_events.refresh_state(),
+            self.weekly_events.refresh_state(),
+            self.special_events.refresh_state()
+        )
+
     async def get_current_events(self) -> Dict[str, Any]:
         """Get information about current events."""
         try:
+            # Only the scheduler worker runs the event loop; read what it published
+            await self.refresh_state()
+
             events = {
                 'daily': {
                     'subject': self.daily_events.daily_subject
@@ -16,6 +16,8 @@ logger = logging.getLogger('tokugawa_bot.events.special')
 class SpecialEvents(BaseEvent):
     """Handles special events and seasonal activities."""
     
+    shared_attributes = ('current_event', 'event_participants', 'event_start_time', 'event_end_time')
+
     def __init__(self, bot):
         super().__init__(bot)
         self.current_event = None
@@ -48,7 +50,8 @@ class SpecialEvents(BaseEvent):
             
             # Check if current date matches any special date
             current_month_day = (current_date.month, current_date.day)
-            if current_month_day in special_dates:
+            # The check runs every minute; start the event only once
+            if current_month_day in special_dates and not self.current_event:
                 await self.start_special_event(special_dates[current_month_day])
             
         except Exception as e:
@@ -57,9 +60,13 @@ class SpecialEvents(BaseEvent):
     async def start_special_event(self, event_data: Dict[str, Any]):
         """Start a new special event."""
         try:
-            self.current_event = event_data
-            self.event_start_time = datetime.now()
-            self.event_end_time = self.event_start_time + timedelta(hours=event_data['duration'])
+            def begin():
+                self.current_event = event_data
+                self.event_participants = []
+                self.event_start_time = datetime.now()
+                self.event_end_time = self.event_start_time + timedelta(hours=event_data['duration'])
+
+            await self.mutate_state(begin)
             
             # Announce event
             await self.send_announcement(
@@ -79,25 +86,30 @@ class SpecialEvents(BaseEvent):
     async def add_event_participant(self, user_id: int, username: str) -> bool:
         """Add a participant to the current special event."""
         try:
-            if not self.current_event:
-                return False
-            
-            if datetime.now() > self.event_end_time:
-                return False
-            
-            # Check if user is already participating
-            if any(p['user_id'] == user_id for p in self.event_participants):
-                return False
-            
-            # Add participant
-            self.event_participants.append({
-                'user_id': user_id,
-                'username': username,
-                'joined_at': datetime.now()
-            })
-            
-            logger.info(f"Added special event participant: {username}")
-            return True
+            def join() -> bool:
+                if not self.current_event:
+                    return False
+                
+                if datetime.now() > self.event_end_time:
+                    return False
+                
+                # Check if user is already participating
+                if any(p['user_id'] == user_id for p in self.event_participants):
+                    return False
+                
+                # Add participant
+                self.event_participants.append({
+                    'user_id': user_id,
+                    'username': username,
+                    'joined_at': datetime.now().isoformat()
+                })
+                return True
+
+            # Participants may join through any cluster worker
+            added = await self.mutate_state(join)
+            if added:
+                logger.info(f"Added special event participant: {username}")
+            return added
             
         except Exception as e:
             logger.error(f"Error adding special event participant: {e}")
@@ -106,38 +118,50 @@ class SpecialEvents(BaseEvent):
     async def end_special_event(self):
         """End the current special event and award prizes."""
         try:
-            if not self.current_event:
+            def close():
+                # Reset the shared event and keep what it looked like at the end
+                if not self.current_event:
+                    return None
+                ended = (self.current_event, list(self.event_participants))
+                self.current_event = None
+                self.event_participants = []
+                self.event_start_time = None
+                self.event_end_time = None
+                return ended
+
+            try:
+                # Pay out only once the reset is shared, or another worker would end it again
+                ended = await self.mutate_state(close, require_shared=True)
+            except Exception:
+                logger.warning("Could not persist the end of the special event, retrying on the next check")
+                return
+            if not ended:
                 return
+            event, participants = ended
             
             # Award prizes to all participants
-            for participant in self.event_participants:
+            for participant in participants:
                 await db_provider.add_points(
                     participant['user_id'],
-                    self.current_event['prize']
+                    event['prize']
                 )
             
             # Create results message
-            results = f"**Resultados do {self.current_event['name']}**\n\n"
-            results += f"Total de participantes: {len(self.event_participants)}\n"
-            results += f"Prêmio por participante: {self.current_event['prize']} pontos\n\n"
+            results = f"**Resultados do {event['name']}**\n\n"
+            results += f"Total de participantes: {len(participants)}\n"
+            results += f"Prêmio por participante: {event['prize']} pontos\n\n"
             results += "**Participantes:**\n"
             
-            for participant in self.event_participants:
+            for participant in participants:
                 results += f"• {participant['username']}\n"
             
             # Announce results
             await self.send_announcement(
-                title=f"🎉 {self.current_event['name']} - Resultados",
+                title=f"🎉 {event['name']} - Resultados",
                 description=results,
                 color=0x800080  # Purple
             )
             
-            # Reset event
-            self.current_event = None
-            self.event_participants = []
-            self.event_start_time = None
-            self.event_end_time = None
-            
             logger.info("Ended special event")
             
         except Exception as e:
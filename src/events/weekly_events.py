@@ -16,6 +16,9 @@ logger = logging.getLogger('tokugawa_bot.events.weekly')
 class WeeklyEvents(BaseEvent):
     """Handles weekly events and tournaments."""
     
+    shared_attributes = ('current_tournament', 'tournament_participants',
+                         'tournament_start_time', 'tournament_end_time')
+
     def __init__(self, bot):
         super().__init__(bot)
         self.current_tournament = None
@@ -52,9 +55,15 @@ class WeeklyEvents(BaseEvent):
             ]
             
             # Select random tournament type
-            self.current_tournament = random.choice(tournament_types)
-            self.tournament_start_time = datetime.now()
-            self.tournament_end_time = self.tournament_start_time + timedelta(hours=self.current_tournament['duration'])
+            tournament = random.choice(tournament_types)
+
+            def begin():
+                self.current_tournament = tournament
+                self.tournament_participants = []
+                self.tournament_start_time = datetime.now()
+                self.tournament_end_time = self.tournament_start_time + timedelta(hours=tournament['duration'])
+
+            await self.mutate_state(begin)
             
             # Announce tournament
             await self.send_announcement(
@@ -74,26 +83,31 @@ class WeeklyEvents(BaseEvent):
     async def add_tournament_participant(self, user_id: int, username: str) -> bool:
         """Add a participant to the current tournament."""
         try:
-            if not self.current_tournament:
-                return False
-            
-            if datetime.now() > self.tournament_end_time:
-                return False
-            
-            # Check if user is already participating
-            if any(p['user_id'] == user_id for p in self.tournament_participants):
-                return False
-            
-            # Add participant
-            self.tournament_participants.append({
-                'user_id': user_id,
-                'username': username,
-                'score': 0,
-                'joined_at': datetime.now()
-            })
-            
-            logger.info(f"Added tournament participant: {username}")
-            return True
+            def join() -> bool:
+                if not self.current_tournament:
+                    return False
+                
+                if datetime.now() > self.tournament_end_time:
+                    return False
+                
+                # Check if user is already participating
+                if any(p['user_id'] == user_id for p in self.tournament_participants):
+                    return False
+                
+                # Add participant
+                self.tournament_participants.append({
+                    'user_id': user_id,
+                    'username': username,
+                    'score': 0,
+                    'joined_at': datetime.now().isoformat()
+                })
+                return True
+
+            # Participants may join through any cluster worker
+            added = await self.mutate_state(join)
+            if added:
+                logger.info(f"Added tournament participant: {username}")
+            return added
             
         except Exception as e:
             logger.error(f"Error adding tournament participant: {e}")
@@ -102,18 +116,23 @@ class WeeklyEvents(BaseEvent):
     async def update_tournament_score(self, user_id: int, score: int) -> bool:
         """Update a participant's tournament score."""
         try:
-            if not self.current_tournament:
-                return False
-            
-            # Find participant
-            participant = next((p for p in self.tournament_participants if p['user_id'] == user_id), None)
-            if not participant:
-                return False
-            
-            # Update score
-            participant['score'] = score
-            logger.info(f"Updated tournament score for {participant['username']}: {score}")
-            return True
+            def set_score() -> bool:
+                if not self.current_tournament:
+                    return False
+                
+                # Find participant
+                participant = next((p for p in self.tournament_participants if p['user_id'] == user_id), None)
+                if not participant:
+                    return False
+                
+                # Update score
+                participant['score'] = score
+                return True
+
+            updated = await self.mutate_state(set_score)
+            if updated:
+                logger.info(f"Updated tournament score for {user_id}: {score}")
+            return updated
             
         except Exception as e:
             logger.error(f"Error updating tournament score: {e}")
@@ -122,40 +141,52 @@ class WeeklyEvents(BaseEvent):
     async def end_tournament(self):
         """End the current tournament and announce results."""
         try:
-            if not self.current_tournament:
+            def close():
+                # Reset the shared tournament and keep what it looked like at the end
+                if not self.current_tournament:
+                    return None
+                ended = (self.current_tournament, list(self.tournament_participants))
+                self.current_tournament = None
+                self.tournament_participants = []
+                self.tournament_start_time = None
+                self.tournament_end_time = None
+                return ended
+
+            try:
+                # Pay out only once the reset is shared, or another worker would end it again
+                ended = await self.mutate_state(close, require_shared=True)
+            except Exception:
+                logger.warning("Could not persist the end of the tournament, retrying on the next check")
                 return
+            if not ended:
+                return
+            tournament, participants = ended
             
             # Sort participants by score
             sorted_participants = sorted(
-                self.tournament_participants,
+                participants,
                 key=lambda x: x['score'],
                 reverse=True
             )
             
             # Create results message
-            results = f"**Resultados do {self.current_tournament['name']}**\n\n"
+            results = f"**Resultados do {tournament['name']}**\n\n"
             
             for i, participant in enumerate(sorted_participants[:3], 1):
                 results += f"{i}. {participant['username']} - {participant['score']} pontos\n"
             
             # Award prizes
             for i, participant in enumerate(sorted_participants[:3], 1):
-                prize = self.current_tournament['prize'] // (2 ** (i - 1))
+                prize = tournament['prize'] // (2 ** (i - 1))
                 await db_provider.add_points(participant['user_id'], prize)
             
             # Announce results
             await self.send_announcement(
-                title=f"🏆 {self.current_tournament['name']} - Resultados",
+                title=f"🏆 {tournament['name']} - Resultados",
                 description=results,
                 color=0xFFD700  # Gold
             )
             
-            # Reset tournament
-            self.current_tournament = None
-            self.tournament_participants = []
-            self.tournament_start_time = None
-            self.tournament_end_time = None
-            
             logger.info("Ended weekly tournament")
             
         except Exception as e:
@@ -2,6 +2,9 @@ from typing import Dict, List, Any, Optional, Union
 import json
 import logging
 from .interfaces import Chapter
+from .conditions import (
+    compile_branch_conditions, compile_condition, compile_or_reject, compile_requirements
+)
 import re
 
 from story_mode.image_manager import ImageManager
@@ -33,6 +36,24 @@ class BaseChapter(Chapter):
         self.next_chapter = chapter_data.get("next_chapter")
         self.data = chapter_data  # Store the full chapter data
         self._parse_chapter_id()
+        # Compiled requirement checks, one list per choice list and lined up with its choices
+        self._dialogue_checks = [
+            self._compile_choice_requirements(dialogue.get("choices", []) if isinstance(dialogue, dict) else [])
+            for dialogue in self.dialogues
+        ]
+        self._indexed_checks = {
+            key: self._compile_choice_requirements(value)
+            for key, value in self.data.items() if key.startswith("choices_")
+        }
+        self._chapter_checks = self._compile_choice_requirements(self.choices)
+
+    def _compile_choice_requirements(self, choices: Any) -> List[Optional[Any]]:
+        """Compile the requirements of a list of choices (None for choices without requirements)."""
+        return [
+            compile_or_reject(compile_requirements, choice["requirements"], where=f"chapter {self.chapter_id}")
+            if isinstance(choice, dict) and "requirements" in choice else None
+            for choice in (choices if isinstance(choices, list) else [])
+        ]
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -161,32 +182,26 @@ class BaseChapter(Chapter):
         # Get current dialogue
         if current_dialogue_index < len(self.dialogues):
             current_dialogue = self.dialogues[current_dialogue_index]
+            checks = self._dialogue_checks[current_dialogue_index]
         else:
             # If we're past the dialogues, check if there are indexed choices for this index
             choice_key = f"choices_{current_dialogue_index}"
             if choice_key in self.data:
                 current_dialogue = {"choices": self.data[choice_key]}
+                checks = self._indexed_checks[choice_key]
             else:
                 # If no indexed choices, use chapter-level choices
                 current_dialogue = {"choices": self.choices}
+                checks = self._chapter_checks
 
         # Get choices from current dialogue
         dialogue_choices = current_dialogue.get("choices", [])
 
         # Filter choices based on requirements
         available_choices = []
-        for choice in dialogue_choices:
-            if "requirements" in choice:
-                # Check if player meets all requirements
-                requirements = choice["requirements"]
-                meets_requirements = True
-                for stat, value in requirements.items():
-                    if player_data.get(stat, 0) < value:
-                        meets_requirements = False
-                        break
-                if meets_requirements:
-                    available_choices.append(choice)
-            else:
+        for choice, check in zip(dialogue_choices, checks):
+            # Check if player meets all requirements
+            if check is None or check(player_data):
                 available_choices.append(choice)
 
         return available_choices
@@ -705,6 +720,19 @@ class BranchingChapter(BaseChapter):
         self.branches = data.get("branches", {})
         # For branching chapters with scenes structure (like mystery_chapter.json)
         self.scenes = data.get("scenes", [])
+        where = f"chapter {chapter_id}"
+        self._branch_checks = [
+            (branch_data.get("next_chapter"),
+             compile_or_reject(compile_branch_conditions, branch_data.get("conditions", {}), chapter_id,
+                               where=f"{where} branch {branch_id}"))
+            for branch_id, branch_data in self.branches.items()
+        ]
+        # Compiled choice conditions, lined up with data["choices"] (None for unconditional choices)
+        self._choice_conditions = [
+            compile_or_reject(compile_condition, choice["condition"], where=where)
+            if isinstance(choice, dict) and "condition" in choice else None
+            for choice in data.get("choices", [])
+        ]
 
     def start(self, player_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -854,39 +882,10 @@ class BranchingChapter(BaseChapter):
         """
         Returns the next chapter based on the player's choices.
         """
-        story_progress = player_data.get("story_progress", {})
-        chapter_choices = story_progress.get("story_choices", {}).get(self.chapter_id, {})
-
         # Check if any branch conditions are met
-        for branch_id, branch_data in self.branches.items():
-            conditions = branch_data.get("conditions", {})
-            conditions_met = True
-
-            for condition_key, condition_value in conditions.items():
-                if condition_key.startswith("choice_"):
-                    # Check choice condition
-                    choice_index = int(condition_key.split("_")[1])
-                    if chapter_choices.get(f"dialogue_{choice_index}_choice") != condition_value:
-                        conditions_met = False
-                        break
-                elif condition_key == "attribute":
-                    # Check attribute condition
-                    attribute = condition_value.get("name")
-                    threshold = condition_value.get("threshold", 0)
-                    if player_data.get(attribute, 0) < threshold:
-                        conditions_met = False
-                        break
-                elif condition_key == "affinity":
-                    # Check affinity condition
-                    character = condition_value.get("character")
-                    threshold = condition_value.get("threshold", 0)
-                    character_relationships = story_progress.get("character_relationships", {})
-                    if character_relationships.get(character, 0) < threshold:
-                        conditions_met = False
-                        break
-
-            if conditions_met:
-                return branch_data.get("next_chapter")
+        for next_chapter, conditions_met in self._branch_checks:
+            if conditions_met(player_data):
+                return next_chapter
 
         # If no branch conditions are met, use the default next chapter
         return super().get_next_chapter(player_data)
@@ -920,47 +919,11 @@ class BranchingChapter(BaseChapter):
             return choices
 
         available_choices = []
-        for choice in choices:
-            if "condition" in choice:
-                if self._check_condition(choice["condition"], player_data):
-                    available_choices.append(choice)
-            else:
+        for choice, check in zip(choices, self._choice_conditions):
+            if check is None or check(player_data):
                 available_choices.append(choice)
         return available_choices
 
-    def _check_condition(self, condition: Dict[str, Any], player_data: Dict[str, Any]) -> bool:
-        """
-        Check if a condition is met based on player data.
-        
-        Args:
-            condition: The condition to check
-            player_data: Player data to check against
-            
-        Returns:
-            True if condition is met, False otherwise
-        """
-        if "stat" in condition:
-            stat = condition["stat"]
-            value = condition["value"]
-            operator = condition.get("operator", ">=")
-            
-            player_stat = player_data.get("attributes", {}).get(stat, 0)
-            
-            if operator == ">=":
-                return player_stat >= value
-            elif operator == ">":
-                return player_stat > value
-            elif operator == "<=":
-                return player_stat <= value
-            elif operator == "<":
-                return player_stat < value
-            elif operator == "==":
-                return player_stat == value
-            elif operator == "!=":
-                return player_stat != value
-                
-        return True
-
     def get_requirements(self) -> Dict[str, Any]:
         """Get chapter requirements."""
         return self.data.get("requirements", {})
@@ -0,0 +1,174 @@
+"""
+In-memory chapter cache with mtime-based hot reload.
+
+Story interactions load the current chapter on every step. ChapterCache keeps
+parsed chapters in an LRU keyed by file path and re-checks the file's mtime
+and size at most every CHECK_INTERVAL seconds. An edited chapter is parsed and
+validated off to the side and swapped in as a whole, so readers see either the
+old or the new version, never a mix. An edit that does not parse, or that
+breaks a chapter which passed validation, is rejected and the last good
+version keeps being served.
+
+Cached chapters are shared by every caller and must not be modified.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+from utils.content_bundle import load_json
+from .chapter_validator import ChapterValidator
+
+logger = logging.getLogger('tokugawa_bot')
+
+# Chapters kept in memory
+MAX_CHAPTERS = int(os.environ.get('CHAPTER_CACHE_SIZE', '256'))
+
+# Seconds between mtime checks of a cached chapter
+CHECK_INTERVAL = float(os.environ.get('CHAPTER_CACHE_CHECK_INTERVAL', '2'))
+
+
+class _Entry(NamedTuple):
+    mtime_ns: int
+    size: int
+    chapter: Dict[str, Any]
+    valid: bool
+    checked_at: float
+
+
+class ChapterCacheStats:
+    """Thread-safe chapter cache counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.counts = {'hits': 0, 'misses': 0, 'reloads': 0, 'rejected': 0, 'evictions': 0}
+
+    def record(self, event: str):
+        with self._lock:
+            self.counts[event] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the current counters."""
+        with self._lock:
+            return dict(self.counts)
+
+
+def _stat(path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+class ChapterCache:
+    """LRU of parsed chapter files, reloaded when the file changes."""
+
+    def __init__(self, max_entries: int = MAX_CHAPTERS, check_interval: float = CHECK_INTERVAL):
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self.stats = ChapterCacheStats()
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _parse(self, path: str, stat: Optional[os.stat_result]) -> Dict[str, Any]:
+        """
+        Read a chapter file.
+
+        Raises:
+            ValueError: If the file is not a chapter object
+        """
+        chapter = load_json(path, stat=stat)
+        if not isinstance(chapter, dict):
+            raise ValueError(f"Chapter file {path} does not contain an object")
+        return chapter
+
+    def _store(self, path: str, entry: _Entry):
+        with self._lock:
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.record('evictions')
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the parsed chapter stored at a path.
+
+        Returns:
+            The chapter (shared; do not modify), or None if the file is missing
+
+        Raises:
+            OSError, ValueError: If a chapter that is not cached cannot be read
+        """
+        path = os.fspath(path)
+        now = time.monotonic()
+        entry = self._entries.get(path)
+        if entry is not None and now - entry.checked_at < self.check_interval:
+            self.stats.record('hits')
+            with self._lock:
+                if path in self._entries:
+                    self._entries.move_to_end(path)
+            return entry.chapter
+
+        stat = _stat(path)
+        if entry is not None:
+            if stat is None:
+                # Deleted chapters are dropped
+                self.invalidate(path)
+                return None
+            if (stat.st_mtime_ns, stat.st_size) == (entry.mtime_ns, entry.size):
+                self.stats.record('hits')
+                self._store(path, entry._replace(checked_at=now))
+                return entry.chapter
+            try:
+                chapter = self._parse(path, stat)
+                valid = ChapterValidator.validate_chapter(chapter, path)
+                if entry.valid and not valid:
+                    raise ValueError("the edit fails validation")
+            except Exception as e:
+                logger.error(f"Rejected edited chapter {path}, keeping the loaded version: {e}")
+                self.stats.record('rejected')
+                # Remember the rejected version so it is not parsed again on every check
+                self._store(path, entry._replace(mtime_ns=stat.st_mtime_ns, size=stat.st_size, checked_at=now))
+                return entry.chapter
+            self.stats.record('reloads')
+            logger.info(f"Reloaded edited chapter {path}")
+            self._store(path, _Entry(stat.st_mtime_ns, stat.st_size, chapter, valid, now))
+            return chapter
+
+        self.stats.record('misses')
+        chapter = self._parse(path, stat)
+        if stat is not None:
+            # Chapters that fail validation are still served, as before the cache
+            valid = ChapterValidator.validate_chapter(chapter, path)
+            self._store(path, _Entry(stat.st_mtime_ns, stat.st_size, chapter, valid, now))
+        return chapter
+
+    def invalidate(self, path: Optional[str] = None):
+        """Drop one cached chapter, or every chapter when no path is given."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.fspath(path), None)
+
+
+chapter_cache = ChapterCache()
+
+
+def get_chapter_cache_stats() -> Dict[str, Any]:
+    """Get chapter cache metrics."""
+    snapshot = chapter_cache.stats.snapshot()
+    snapshot['cached'] = len(chapter_cache)
+    return snapshot
@@ -1,13 +1,28 @@
 from typing import Dict, List, Any
-import json
 import os
 import logging
 from pathlib import Path
 from .interfaces import Chapter, ChapterLoader
 from .chapter import StoryChapter, ChallengeChapter, BranchingChapter
+from .requirement_index import ChapterRequirements, IndexedRequirements
+from utils.content_bundle import list_json, load_json
 
 logger = logging.getLogger('tokugawa_bot')
 
+
+def _chapter_requirements(chapter_id: str, chapter: Chapter) -> ChapterRequirements:
+    """Normalize a chapter's requirements (see FileChapterLoader._is_chapter_available)."""
+    requirements = chapter.get_requirements()
+    if not requirements:
+        return ChapterRequirements()
+    # New player chapters only depend on the player having no completed chapter
+    if requirements.get("is_new_player", False):
+        return ChapterRequirements(new_player_only=True)
+    return ChapterRequirements(
+        prerequisites=frozenset(requirements.get("chapters", [])),
+        thresholds=dict(requirements.get("stats", {}))
+    )
+
 class FileChapterLoader(ChapterLoader):
     """
     Implementation of ChapterLoader that loads chapters from JSON files.
@@ -15,6 +30,7 @@ class FileChapterLoader(ChapterLoader):
     def __init__(self, data_dir: str):
         self.data_dir = Path(data_dir)
         self.chapters: Dict[str, Chapter] = {}
+        self._requirements = IndexedRequirements(lambda: self.chapters, _chapter_requirements)
         self._load_chapters()
 
     def _load_chapters(self) -> None:
@@ -24,20 +40,18 @@ class FileChapterLoader(ChapterLoader):
         if not main_chapter_dir.exists():
             logger.warning(f"Main chapter directory not found: {main_chapter_dir}")
         else:
-            for filename in os.listdir(main_chapter_dir):
-                if filename.endswith(".json"):
-                    try:
-                        chapter_id = filename.replace(".json", "")
-                        with open(main_chapter_dir / filename, 'r') as f:
-                            chapter_data = json.load(f)
-                            chapter_data["chapter_id"] = chapter_id
-                            chapter = self._create_chapter(chapter_data)
-                            if chapter:
-                                self.chapters[chapter_id] = chapter
-                            else:
-                                logger.error(f"Failed to create chapter {chapter_id}")
-                    except Exception as e:
-                        logger.error(f"Error loading chapter {filename}: {e}")
+            for path in list_json(main_chapter_dir):
+                try:
+                    chapter_id = path.stem
+                    chapter_data = load_json(path)
+                    chapter_data["chapter_id"] = chapter_id
+                    chapter = self._create_chapter(chapter_data)
+                    if chapter:
+                        self.chapters[chapter_id] = chapter
+                    else:
+                        logger.error(f"Failed to create chapter {chapter_id}")
+                except Exception as e:
+                    logger.error(f"Error loading chapter {path.name}: {e}")
 
         # Load club chapters
         club_chapter_dir = self.data_dir / "clubs"
@@ -47,20 +61,18 @@ class FileChapterLoader(ChapterLoader):
             for club_dir in os.listdir(club_chapter_dir):
                 club_path = club_chapter_dir / club_dir
                 if club_path.is_dir():
-                    for filename in os.listdir(club_path):
-                        if filename.endswith(".json"):
-                            try:
-                                chapter_id = f"club_{club_dir}_{filename.replace('.json', '')}"
-                                with open(club_path / filename, 'r') as f:
-                                    chapter_data = json.load(f)
-                                    chapter_data["chapter_id"] = chapter_id
-                                    chapter = self._create_chapter(chapter_data)
-                                    if chapter:
-                                        self.chapters[chapter_id] = chapter
-                                    else:
-                                        logger.error(f"Failed to create club chapter {chapter_id}")
-                            except Exception as e:
-                                logger.error(f"Error loading club chapter {filename}: {e}")
+                    for path in list_json(club_path):
+                        try:
+                            chapter_id = f"club_{club_dir}_{path.stem}"
+                            chapter_data = load_json(path)
+                            chapter_data["chapter_id"] = chapter_id
+                            chapter = self._create_chapter(chapter_data)
+                            if chapter:
+                                self.chapters[chapter_id] = chapter
+                            else:
+                                logger.error(f"Failed to create club chapter {chapter_id}")
+                        except Exception as e:
+                            logger.error(f"Error loading club chapter {path.name}: {e}")
 
     def _create_chapter(self, chapter_data: Dict[str, Any]) -> Chapter:
         """Create a chapter instance based on its type."""
@@ -96,11 +108,12 @@ class FileChapterLoader(ChapterLoader):
 
     def get_available_chapters(self, player_data: Dict[str, Any]) -> List[str]:
         """Get a list of chapter IDs available to the player."""
-        available_chapters = []
-        for chapter_id, chapter in self.chapters.items():
-            if self._is_chapter_available(chapter, player_data):
-                available_chapters.append(chapter_id)
-        return available_chapters
+        # Same rules as _is_chapter_available, answered from the requirement index
+        return self._requirements.get().available(
+            player_data.get("story_progress", {}).get("completed_chapters", []),
+            player_data.get("attributes", {}),
+            exclude_completed=True
+        )
 
     def _is_chapter_available(self, chapter: Chapter, player_data: Dict[str, Any]) -> bool:
         """Check if a chapter is available to the player."""
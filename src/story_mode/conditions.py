@@ -0,0 +1,317 @@
+"""
+Compiled conditions for chapter choices and branches.
+
+Choice conditions, choice requirements and branch conditions used to be
+interpreted on every evaluation: operator strings were looked up and the
+condition dicts walked again each time a player opened a choice list. The
+compilers below turn them into trees of closures once, when the chapter is
+loaded:
+
+- each comparison becomes a function generated from a per-operator code
+  template, compiled once at import, so a check is a single call with the
+  operator and lookups inlined;
+- constant parts are folded (conditions without a stat, unknown operators,
+  empty groups and groups decided by a constant child);
+- the children of "all"/"any" groups are ordered so the check most likely to
+  decide the group, per unit of cost, runs first. Likelihoods are static
+  estimates from the operator and threshold, not measured pass rates.
+
+Conditions are side-effect free, so reordering them does not change results.
+
+Choice condition format (``choice["condition"]``)::
+
+    {"stat": "charisma", "operator": ">=", "value": 5}
+    {"all": [<condition>, ...]}, {"any": [<condition>, ...]}, {"not": <condition>}
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional
+
+logger = logging.getLogger('tokugawa_bot')
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+OPERATORS = (">=", ">", "<=", "<", "==", "!=")
+
+# Where compared player values come from; ``key`` and ``scope`` are bound per condition
+_SOURCES = {
+    "attribute": 'player_data.get("attributes", {}).get(key, 0)',
+    "field": 'player_data.get(key, 0)',
+    "affinity": 'player_data.get("story_progress", {}).get("character_relationships", {}).get(key, 0)',
+    "choice": 'player_data.get("story_progress", {}).get("story_choices", {}).get(scope, {}).get(key)',
+}
+
+_LEAF_TEMPLATE = """
+def make(key, value, scope):
+    def test(player_data):
+        return {source} {operator} value
+    return test
+"""
+
+
+def _build_leaf_factories():
+    factories = {}
+    for source_name, source in _SOURCES.items():
+        for symbol in OPERATORS:
+            namespace = {}
+            exec(compile(_LEAF_TEMPLATE.format(source=source, operator=symbol),
+                         f"<condition {source_name} {symbol}>", "exec"), namespace)
+            factories[source_name, symbol] = namespace["make"]
+    return factories
+
+
+_LEAF_FACTORIES = _build_leaf_factories()
+
+
+class _Node(NamedTuple):
+    test: Predicate
+    # Estimated probability that the test passes
+    selectivity: float
+    # Relative evaluation cost
+    cost: float = 1.0
+    # True/False when the result does not depend on the player
+    constant: Optional[bool] = None
+
+
+def _always(player_data: Dict[str, Any]) -> bool:
+    return True
+
+
+def _never(player_data: Dict[str, Any]) -> bool:
+    return False
+
+
+_TRUE = _Node(_always, 1.0, 0.0, True)
+_FALSE = _Node(_never, 0.0, 0.0, False)
+
+
+class ConditionStats:
+    """Thread-safe condition compiler counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.compiled = 0
+            self.folded = 0
+            self.rejected = 0
+
+    def record(self, node: _Node):
+        with self._lock:
+            self.compiled += 1
+            if node.constant is not None:
+                self.folded += 1
+
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the current counters."""
+        with self._lock:
+            return {'compiled': self.compiled, 'folded': self.folded, 'rejected': self.rejected}
+
+
+condition_stats = ConditionStats()
+
+
+def _estimate(symbol: str, value: Any) -> float:
+    """Rough pass probability of comparing a player value (default 0) to a constant."""
+    if symbol == "==":
+        return 0.1
+    if symbol == "!=":
+        return 0.9
+    if symbol in (">=", ">") and isinstance(value, (int, float)) and value <= 0:
+        # Thresholds at or below the default value are almost always met
+        return 0.9
+    return 0.5
+
+
+def _compare(source: str, key: Any, symbol: str, value: Any, scope: Any = None,
+             selectivity: Optional[float] = None, cost: float = 1.0) -> _Node:
+    test = _LEAF_FACTORIES[source, symbol](key, value, scope)
+    return _Node(test, _estimate(symbol, value) if selectivity is None else selectivity, cost)
+
+
+def _all(nodes: List[_Node]) -> _Node:
+    """Conjunction: constant-folded, most likely failure per unit of cost first."""
+    if any(node.constant is False for node in nodes):
+        return _FALSE
+    nodes = [node for node in nodes if node.constant is None]
+    if not nodes:
+        return _TRUE
+    if len(nodes) == 1:
+        return nodes[0]
+    nodes.sort(key=lambda node: node.cost / max(1.0 - node.selectivity, 1e-9))
+    tests = tuple(node.test for node in nodes)
+    selectivity = 1.0
+    for node in nodes:
+        selectivity *= node.selectivity
+
+    if len(tests) == 2:
+        first, second = tests
+
+        def test(player_data):
+            return first(player_data) and second(player_data)
+    else:
+        def test(player_data):
+            for check in tests:
+                if not check(player_data):
+                    return False
+            return True
+    return _Node(test, selectivity, sum(node.cost for node in nodes))
+
+
+def _any(nodes: List[_Node]) -> _Node:
+    """Disjunction: constant-folded, most likely success per unit of cost first."""
+    if any(node.constant is True for node in nodes):
+        return _TRUE
+    nodes = [node for node in nodes if node.constant is None]
+    if not nodes:
+        return _FALSE
+    if len(nodes) == 1:
+        return nodes[0]
+    nodes.sort(key=lambda node: node.cost / max(node.selectivity, 1e-9))
+    tests = tuple(node.test for node in nodes)
+    miss = 1.0
+    for node in nodes:
+        miss *= 1.0 - node.selectivity
+
+    def test(player_data):
+        for check in tests:
+            if check(player_data):
+                return True
+        return False
+    return _Node(test, 1.0 - miss, sum(node.cost for node in nodes))
+
+
+def _not(node: _Node) -> _Node:
+    if node.constant is not None:
+        return _FALSE if node.constant else _TRUE
+    inner = node.test
+
+    def test(player_data):
+        return not inner(player_data)
+    return _Node(test, 1.0 - node.selectivity, node.cost)
+
+
+def _condition_node(condition: Mapping[str, Any]) -> _Node:
+    if not isinstance(condition, Mapping):
+        raise ValueError(f"condition must be an object, got {type(condition).__name__}")
+    if "all" in condition:
+        return _all([_condition_node(child) for child in condition["all"]])
+    if "any" in condition:
+        return _any([_condition_node(child) for child in condition["any"]])
+    if "not" in condition:
+        return _not(_condition_node(condition["not"]))
+    if "stat" not in condition:
+        return _TRUE
+    if "value" not in condition:
+        raise ValueError(f"condition on {condition['stat']!r} has no value")
+    symbol = condition.get("operator", ">=")
+    if symbol not in OPERATORS:
+        # Unknown operators never blocked a choice
+        return _TRUE
+    return _compare("attribute", condition["stat"], symbol, condition["value"])
+
+
+def _finish(node: _Node) -> Predicate:
+    condition_stats.record(node)
+    return node.test
+
+
+def compile_condition(condition: Mapping[str, Any]) -> Predicate:
+    """
+    Compile a choice condition into a predicate over player data.
+
+    Args:
+        condition: The condition (see the module docstring for the format)
+
+    Returns:
+        A function taking player data and returning whether the condition holds
+
+    Raises:
+        ValueError: If the condition is malformed
+    """
+    return _finish(_condition_node(condition))
+
+
+def compile_requirements(requirements: Mapping[str, Any]) -> Predicate:
+    """
+    Compile choice requirements: every player value must reach its minimum.
+
+    Args:
+        requirements: Mapping of top-level player field to minimum value
+
+    Returns:
+        A function taking player data and returning whether all minimums are met
+    """
+    if not isinstance(requirements, Mapping):
+        raise ValueError(f"requirements must be an object, got {type(requirements).__name__}")
+    minimums = tuple(requirements.items())
+    if not minimums:
+        return _finish(_TRUE)
+
+    def test(player_data):
+        for stat, value in minimums:
+            if player_data.get(stat, 0) < value:
+                return False
+        return True
+    return _finish(_Node(test, 0.5 ** len(minimums), len(minimums)))
+
+
+def compile_branch_conditions(conditions: Mapping[str, Any], chapter_id: str) -> Predicate:
+    """
+    Compile the conditions of a BranchingChapter branch.
+
+    Supported keys are ``choice_<n>`` (the choice made at dialogue n),
+    ``attribute`` ({"name", "threshold"}) and ``affinity`` ({"character",
+    "threshold"}); other keys are ignored.
+
+    Args:
+        conditions: The branch conditions
+        chapter_id: The chapter whose recorded choices are checked
+
+    Returns:
+        A function taking player data and returning whether the branch applies
+
+    Raises:
+        ValueError: If a condition is malformed
+    """
+    nodes = []
+    for key, value in conditions.items():
+        if key.startswith("choice_"):
+            try:
+                choice_key = f"dialogue_{int(key.split('_')[1])}_choice"
+            except (IndexError, ValueError):
+                raise ValueError(f"invalid choice condition {key!r}")
+            # A choice usually has a handful of options
+            nodes.append(_compare("choice", choice_key, "==", value, chapter_id, selectivity=0.2, cost=2.0))
+        elif key == "attribute":
+            nodes.append(_compare("field", value.get("name"), ">=", value.get("threshold", 0)))
+        elif key == "affinity":
+            nodes.append(_compare("affinity", value.get("character"), ">=", value.get("threshold", 0), cost=2.0))
+    return _finish(_all(nodes))
+
+
+def compile_or_reject(compiler: Callable[..., Predicate], spec: Any, *args, where: str = "") -> Predicate:
+    """
+    Compile a condition, replacing a malformed one with a predicate that never holds.
+
+    Content errors are logged at load time instead of failing every evaluation.
+    """
+    try:
+        return compiler(spec, *args)
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        logger.error(f"Invalid condition{' in ' + where if where else ''}: {e}")
+        condition_stats.record_rejected()
+        return _never
+
+
+def get_condition_stats() -> Dict[str, Any]:
+    """Get condition compiler metrics."""
+    return condition_stats.snapshot()
@@ -0,0 +1,191 @@
+"""
+Process-wide registry of static story content.
+
+Chapters, NPCs, companions, seasonal events, images and shop items are loaded
+once during bot startup and shared by every cog instead of each cog building
+its own StoryMode (and with it a validator, the story data and an
+ImageManager). The registry is read-only after it is built: the mappings it
+exposes are MappingProxyType views, and content documents must be copied
+before they are modified.
+"""
+
+import logging
+import time
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Union
+
+from utils.config import STORY_MODE_DIR
+from utils.content_bundle import list_json, load_json
+from .companions import CompanionSystem
+from .image_manager import ImageManager
+from .npc import NPCManager
+from .seasonal_events import SeasonalEventSystem
+from .story_mode import StoryMode
+
+logger = logging.getLogger('tokugawa_bot')
+
+# Shop item definitions, one JSON list per category
+ITEMS_DIR = Path("data/economy/items")
+
+# Main story chapters, one JSON file per chapter (the directory ChapterLoader reads)
+CHAPTERS_DIR = Path("data/story_mode/narrative/chapters")
+
+
+class ContentRegistry:
+    """Immutable container for the content shared by all cogs."""
+
+    __slots__ = ('_data_dir', '_story_mode', '_image_manager', '_chapters', '_npc_manager',
+                 '_companion_system', '_seasonal_events', '_items', '_build_seconds')
+
+    def __init__(self, data_dir: Path, story_mode: StoryMode, image_manager: ImageManager,
+                 chapters: Dict[str, Dict[str, Any]], npc_manager: NPCManager,
+                 companion_system: CompanionSystem, seasonal_events: SeasonalEventSystem,
+                 items: Dict[str, Dict[str, Any]], build_seconds: float = 0.0):
+        object.__setattr__(self, '_data_dir', data_dir)
+        object.__setattr__(self, '_story_mode', story_mode)
+        object.__setattr__(self, '_image_manager', image_manager)
+        object.__setattr__(self, '_chapters', MappingProxyType(dict(chapters)))
+        object.__setattr__(self, '_npc_manager', npc_manager)
+        object.__setattr__(self, '_companion_system', companion_system)
+        object.__setattr__(self, '_seasonal_events', seasonal_events)
+        object.__setattr__(self, '_items', MappingProxyType(dict(items)))
+        object.__setattr__(self, '_build_seconds', build_seconds)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ContentRegistry is read-only")
+
+    @property
+    def data_dir(self) -> Path:
+        return self._data_dir
+
+    @property
+    def story_mode(self) -> StoryMode:
+        return self._story_mode
+
+    @property
+    def image_manager(self) -> ImageManager:
+        return self._image_manager
+
+    @property
+    def chapters(self) -> Mapping[str, Dict[str, Any]]:
+        return self._chapters
+
+    @property
+    def npc_manager(self) -> NPCManager:
+        return self._npc_manager
+
+    @property
+    def companion_system(self) -> CompanionSystem:
+        return self._companion_system
+
+    @property
+    def seasonal_events(self) -> SeasonalEventSystem:
+        return self._seasonal_events
+
+    @property
+    def items(self) -> Mapping[str, Dict[str, Any]]:
+        return self._items
+
+    @property
+    def build_seconds(self) -> float:
+        return self._build_seconds
+
+    def get_chapter(self, chapter_id: str) -> Optional[Dict[str, Any]]:
+        """Get a chapter document by ID."""
+        return self._chapters.get(chapter_id)
+
+    def get_item(self, item_id: Union[str, int]) -> Optional[Dict[str, Any]]:
+        """Get a shop item definition by ID."""
+        return self._items.get(str(item_id))
+
+
+def _load_json_dir(directory: Path) -> Dict[str, Any]:
+    """Load every JSON file in a directory, keyed by file stem."""
+    documents = {}
+    for path in list_json(directory):
+        try:
+            # Registry documents are read-only, so the bundle's decoded copy is shared
+            documents[path.stem] = load_json(path, shared=True)
+        except Exception as e:
+            logger.error(f"Error loading content file {path}: {e}")
+    return documents
+
+
+def _load_items(items_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """Load shop items from the category files (lists of item definitions)."""
+    items = {}
+    for name, document in _load_json_dir(items_dir).items():
+        if not isinstance(document, list):
+            continue
+        for item in document:
+            if isinstance(item, dict) and 'id' in item:
+                items[str(item['id'])] = item
+    return items
+
+
+def build_content_registry(data_dir: Union[str, Path] = STORY_MODE_DIR,
+                           items_dir: Union[str, Path] = ITEMS_DIR,
+                           chapters_dir: Union[str, Path] = CHAPTERS_DIR) -> ContentRegistry:
+    """
+    Load all static content and build a registry.
+
+    Args:
+        data_dir: Story mode data directory
+        items_dir: Directory with the shop item category files
+        chapters_dir: Directory with the chapter files
+
+    Returns:
+        ContentRegistry: The loaded content
+    """
+    started = time.perf_counter()
+    data_dir = Path(data_dir)
+
+    image_manager = ImageManager()
+    story_mode = StoryMode(str(data_dir), image_manager=image_manager)
+
+    npc_manager = NPCManager()
+    npcs_dir = data_dir / "npcs"
+    if npcs_dir.is_dir():
+        for path in list_json(npcs_dir):
+            npc_manager.load_npcs_from_file(str(path))
+
+    registry = ContentRegistry(
+        data_dir=data_dir,
+        story_mode=story_mode,
+        image_manager=image_manager,
+        chapters=_load_json_dir(Path(chapters_dir)),
+        npc_manager=npc_manager,
+        companion_system=CompanionSystem(),
+        seasonal_events=SeasonalEventSystem(),
+        items=_load_items(Path(items_dir)),
+        build_seconds=time.perf_counter() - started
+    )
+    logger.info(
+        f"Content registry built in {registry.build_seconds:.3f}s: {len(registry.chapters)} chapters, "
+        f"{len(npc_manager.npcs)} NPCs, {len(registry.items)} items"
+    )
+    return registry
+
+
+_registry: Optional[ContentRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_content_registry() -> ContentRegistry:
+    """Get the process-wide content registry, building it on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = build_content_registry()
+    return _registry
+
+
+def content_for(bot) -> ContentRegistry:
+    """Get the registry injected into the bot, or the process-wide one."""
+    registry = getattr(bot, 'content', None)
+    if isinstance(registry, ContentRegistry):
+        return registry
+    return get_content_registry()
@@ -0,0 +1,75 @@
+"""
+Paged dialogue presentation.
+
+Consecutive dialogue lines of a scene are packed into pages that fit in one
+embed, so a scene costs one message plus one edit per page instead of one
+message per line. The cursor of the page being read travels in the "next"
+button; the stored dialogue cursor is only written at checkpoints (when the
+scene reaches its choices).
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Discord limit for an embed description
+DESCRIPTION_LIMIT = 4096
+
+# Lines per page so a scene is read in steps rather than as one wall of text
+LINES_PER_PAGE = 8
+
+LINE_SEPARATOR = "\n\n"
+
+
+def format_line(dialogue: Dict[str, Any], limit: int = DESCRIPTION_LIMIT) -> str:
+    """Render one dialogue line, prefixed with the speaker if there is one."""
+    text = dialogue.get("text", "")
+    speaker = dialogue.get("npc") or dialogue.get("speaker")
+    line = f"**{speaker}:** {text}" if speaker else text
+    if len(line) > limit:
+        line = line[:limit - 1] + "…"
+    return line
+
+
+def paginate(dialogues: Sequence[Dict[str, Any]], start: int = 0, lines_per_page: int = LINES_PER_PAGE,
+             char_limit: int = DESCRIPTION_LIMIT) -> List[Tuple[int, int]]:
+    """
+    Split dialogues[start:] into pages.
+
+    Returns:
+        List of (start, end) index ranges; every page holds at least one line
+    """
+    pages = []
+    page_start, chars = start, 0
+    for index in range(start, len(dialogues)):
+        size = len(format_line(dialogues[index], char_limit))
+        if index > page_start:
+            size += len(LINE_SEPARATOR)
+        if index > page_start and (index - page_start >= lines_per_page or chars + size > char_limit):
+            pages.append((page_start, index))
+            page_start, size = index, size - len(LINE_SEPARATOR)
+            chars = 0
+        chars += size
+    if page_start < len(dialogues):
+        pages.append((page_start, len(dialogues)))
+    return pages
+
+
+def page_at(dialogues: Sequence[Dict[str, Any]], start: int, lines_per_page: int = LINES_PER_PAGE,
+            char_limit: int = DESCRIPTION_LIMIT) -> Dict[str, Any]:
+    """
+    Describe the page that begins at start.
+
+    Returns:
+        Dictionary with start, end, text, number and total (page numbers are 1-based)
+    """
+    remaining = paginate(dialogues, start, lines_per_page, char_limit)
+    before = len(paginate(dialogues[:start], 0, lines_per_page, char_limit))
+    if not remaining:
+        return {"start": start, "end": start, "text": "", "number": before, "total": before}
+    end = remaining[0][1]
+    return {
+        "start": start,
+        "end": end,
+        "text": LINE_SEPARATOR.join(format_line(d, char_limit) for d in dialogues[start:end]),
+        "number": before + 1,
+        "total": before + len(remaining)
+    }
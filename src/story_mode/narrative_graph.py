@@ -0,0 +1,368 @@
+"""
+Directed graph of the story: chapters, scenes and the choices between them.
+
+Every chapter contributes an entry node, one node per scene and an end node:
+
+- the entry leads to the first scene, plus the targets of chapter-level
+  choices. A chapter without scenes leads straight to its end too, unless
+  its choices are its only transitions;
+- each scene choice is an edge to its next_chapter, its next_scene or, when
+  it names neither, the chapter end. A scene without choices ends the chapter;
+- the end leads to next_chapter and the conditional_next_chapter targets.
+
+Choices are edges, so two choices leading to the same place are two paths.
+Targets that do not exist become "missing" nodes. An end node without
+outgoing edges is an ending of the story.
+
+All analyses run in time linear in nodes plus edges: strongly connected
+components are found with an iterative Tarjan, and path counts come from
+dynamic programming over the condensation DAG with Python big integers, so
+content with astronomically many paths is counted exactly. Inside a cycle
+the count treats each pass through the loop as one visit; analyze() flags
+when a loop makes the real number of playthroughs unbounded.
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+CHAPTER = "chapter"
+SCENE = "scene"
+END = "end"
+MISSING = "missing"
+
+
+def strongly_connected_components(edges: List[List[int]]) -> Tuple[List[int], List[List[int]]]:
+    """
+    Tarjan's algorithm without recursion.
+
+    Args:
+        edges: Successors of each node (repeated successors are allowed)
+
+    Returns:
+        (component of each node, components) with components in reverse
+        topological order: every edge leaving a component points to one
+        listed before it
+    """
+    count = len(edges)
+    index = [0] * count  # 0 = not visited yet
+    low = [0] * count
+    on_stack = [False] * count
+    stack: List[int] = []
+    component_of = [-1] * count
+    components: List[List[int]] = []
+    counter = 1
+
+    for root in range(count):
+        if index[root]:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, 0)]
+        while work:
+            node, position = work[-1]
+            successors = edges[node]
+            if position < len(successors):
+                work[-1] = (node, position + 1)
+                successor = successors[position]
+                if not index[successor]:
+                    index[successor] = low[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack[successor] = True
+                    work.append((successor, 0))
+                elif on_stack[successor] and index[successor] < low[node]:
+                    low[node] = index[successor]
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[node] < low[parent]:
+                    low[parent] = low[node]
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component_of[member] = len(components)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return component_of, components
+
+
+def _paths_to_sinks(edges: List[List[int]], component_of: List[int], components: List[List[int]],
+                    is_sink) -> List[int]:
+    """Paths from each component to a sink node, counting edges between components with multiplicity."""
+    paths = [0] * len(components)
+    for number, component in enumerate(components):
+        if len(component) == 1 and is_sink(component[0]):
+            paths[number] = 1
+            continue
+        total = 0
+        for node in component:
+            for successor in edges[node]:
+                target = component_of[successor]
+                if target != number:
+                    total += paths[target]
+        paths[number] = total
+    return paths
+
+
+class NarrativeAnalysis(NamedTuple):
+    """Result of NarrativeGraph.analyze()."""
+
+    starts: List[str]
+    reachable: Set[str]
+    unreachable_chapters: List[str]
+    # Chapters nothing links to, other than the starts (see unlinked_chapters())
+    unlinked_chapters: List[str]
+    # Distinct paths from the starts to an ending
+    total_paths: int
+    # Some path runs through a loop, so playthroughs are unbounded
+    unbounded: bool
+    endings: List[str]
+    # Reachable nodes from which no ending can be reached
+    dead_ends: List[str]
+    # Loops (nodes of each cycle), reachable or not
+    cycles: List[List[str]]
+    # Paths from a start to an ending that pass through each reachable node
+    paths_through: Dict[str, int]
+
+
+class NarrativeGraph:
+    """Directed multigraph of chapters, scenes and transitions."""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.kinds: List[str] = []
+        self.chapter_of: List[Optional[str]] = []
+        self.edges: List[List[int]] = []
+        self._index: Dict[str, int] = {}
+        self._members: Dict[str, List[int]] = {}
+        self._components = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def node(self, name: str, kind: str = CHAPTER, chapter: Optional[str] = None) -> int:
+        """Get a node by name, creating it if needed."""
+        number = self._index.get(name)
+        if number is None:
+            number = self._index[name] = len(self.names)
+            self.names.append(name)
+            self.kinds.append(kind)
+            self.chapter_of.append(chapter)
+            self.edges.append([])
+            self._components = None
+            if kind != MISSING:
+                self._members.setdefault(chapter, []).append(number)
+        elif kind != MISSING and self.kinds[number] == MISSING:
+            # Referenced before it was defined
+            self.kinds[number] = kind
+            self.chapter_of[number] = chapter
+            self._members.setdefault(chapter, []).append(number)
+        return number
+
+    def add_edge(self, source: int, target: int):
+        self.edges[source].append(target)
+        self._components = None
+
+    def _chapter_node(self, chapter_id: Any) -> int:
+        return self.node(str(chapter_id), MISSING)
+
+    @classmethod
+    def from_chapters(cls, chapters: Mapping[str, Mapping[str, Any]]) -> 'NarrativeGraph':
+        """
+        Build the graph of a set of chapters.
+
+        Args:
+            chapters: Chapter data by chapter ID
+
+        Returns:
+            The graph
+        """
+        graph = cls()
+        for chapter_id in chapters:
+            graph.node(chapter_id, CHAPTER, chapter_id)
+        for chapter_id, chapter_data in chapters.items():
+            if isinstance(chapter_data, Mapping):
+                graph._add_chapter(chapter_id, chapter_data)
+        return graph
+
+    def _add_chapter(self, chapter_id: str, chapter_data: Mapping[str, Any]):
+        entry = self.node(chapter_id, CHAPTER, chapter_id)
+        end = self.node(f"{chapter_id}:end", END, chapter_id)
+
+        scenes = [scene for scene in chapter_data.get("scenes", []) if isinstance(scene, Mapping)]
+        scene_nodes = {scene.get("scene_id"): self.node(f"{chapter_id}:{scene.get('scene_id')}", SCENE, chapter_id)
+                       for scene in scenes}
+        if scenes:
+            self.add_edge(entry, scene_nodes[scenes[0].get("scene_id")])
+
+        for scene in scenes:
+            source = scene_nodes[scene.get("scene_id")]
+            choices = [choice for choice in scene.get("choices", []) if isinstance(choice, Mapping)]
+            if not choices:
+                self.add_edge(source, end)
+            for choice in choices:
+                if choice.get("next_chapter"):
+                    self.add_edge(source, self._chapter_node(choice["next_chapter"]))
+                elif choice.get("next_scene") is not None:
+                    target = scene_nodes.get(choice["next_scene"])
+                    if target is None:
+                        target = self.node(f"{chapter_id}:{choice['next_scene']}", MISSING, chapter_id)
+                    self.add_edge(source, target)
+                else:
+                    self.add_edge(source, end)
+
+        # Chapter-level choices (chapters without scenes)
+        choice_lists = [chapter_data.get("choices", [])]
+        choice_lists.extend(dialogue.get("choices", []) for dialogue in chapter_data.get("dialogues", [])
+                            if isinstance(dialogue, Mapping))
+        for dialogues in chapter_data.get("additional_dialogues", {}).values():
+            choice_lists.extend(dialogue.get("choices", []) for dialogue in dialogues if isinstance(dialogue, Mapping))
+        for choices in choice_lists:
+            for choice in choices:
+                if isinstance(choice, Mapping) and choice.get("next_chapter"):
+                    self.add_edge(entry, self._chapter_node(choice["next_chapter"]))
+
+        if chapter_data.get("next_chapter"):
+            self.add_edge(end, self._chapter_node(chapter_data["next_chapter"]))
+        for conditions in chapter_data.get("conditional_next_chapter", {}).values():
+            targets = conditions.values() if isinstance(conditions, Mapping) else [conditions]
+            for target in targets:
+                if target and isinstance(target, str):
+                    self.add_edge(end, self._chapter_node(target))
+
+        # Without scenes the chapter ends right away, unless its choices are the only ways out
+        if not scenes and (self.edges[end] or not self.edges[entry]):
+            self.add_edge(entry, end)
+
+    def components(self) -> Tuple[List[int], List[List[int]]]:
+        """Strongly connected components (cached until the graph changes)."""
+        if self._components is None:
+            self._components = strongly_connected_components(self.edges)
+        return self._components
+
+    def _is_ending(self, node: int) -> bool:
+        return not self.edges[node] and self.kinds[node] != MISSING
+
+    def is_cyclic(self, component: List[int]) -> bool:
+        return len(component) > 1 or component[0] in self.edges[component[0]]
+
+    def unlinked_chapters(self) -> List[str]:
+        """
+        Chapters nothing else leads to: one chapter of each such component.
+
+        These are not starts of the story; apart from the real first chapter
+        they can only be entered by code (events, arcs) or not at all.
+        """
+        component_of, components = self.components()
+        entered = [False] * len(components)
+        for node, successors in enumerate(self.edges):
+            for successor in successors:
+                if component_of[successor] != component_of[node]:
+                    entered[component_of[successor]] = True
+        starts = []
+        for node in range(len(self.names)):
+            component = component_of[node]
+            if self.kinds[node] == CHAPTER and not entered[component]:
+                # One start per component: the first chapter defined in it
+                entered[component] = True
+                starts.append(self.names[node])
+        return starts
+
+    def reachable(self, starts: Iterable[str]) -> Set[str]:
+        """Names of every node reachable from the given start nodes."""
+        seen = [False] * len(self.names)
+        queue = deque()
+        for name in starts:
+            number = self._index.get(name)
+            if number is not None and not seen[number]:
+                seen[number] = True
+                queue.append(number)
+        while queue:
+            for successor in self.edges[queue.popleft()]:
+                if not seen[successor]:
+                    seen[successor] = True
+                    queue.append(successor)
+        return {self.names[node] for node in range(len(self.names)) if seen[node]}
+
+    def analyze(self, starts: Iterable[str]) -> NarrativeAnalysis:
+        """
+        Count paths, find dead ends and cycles, and measure paths through each node.
+
+        Args:
+            starts: Start nodes, usually the story's first chapter
+
+        Returns:
+            NarrativeAnalysis
+        """
+        starts = [name for name in starts if name in self._index]
+        component_of, components = self.components()
+        to_ending = _paths_to_sinks(self.edges, component_of, components, self._is_ending)
+
+        # Paths from the starts into each component, sources first
+        from_start = [0] * len(components)
+        for name in starts:
+            from_start[component_of[self._index[name]]] += 1
+        for number in range(len(components) - 1, -1, -1):
+            if not from_start[number]:
+                continue
+            for node in components[number]:
+                for successor in self.edges[node]:
+                    target = component_of[successor]
+                    if target != number:
+                        from_start[target] += from_start[number]
+
+        reachable = [from_start[component_of[node]] > 0 for node in range(len(self.names))]
+        cyclic = [self.is_cyclic(component) for component in components]
+        through = [from_start[number] * to_ending[number] for number in range(len(components))]
+
+        return NarrativeAnalysis(
+            starts=list(starts),
+            reachable={self.names[node] for node in range(len(self.names)) if reachable[node]},
+            unreachable_chapters=[self.names[node] for node in range(len(self.names))
+                                  if self.kinds[node] == CHAPTER and not reachable[node]],
+            unlinked_chapters=[name for name in self.unlinked_chapters() if name not in starts],
+            total_paths=sum(to_ending[component_of[self._index[name]]] for name in starts),
+            unbounded=any(cyclic[number] and through[number] for number in range(len(components))),
+            endings=[self.names[node] for node in range(len(self.names)) if reachable[node] and self._is_ending(node)],
+            dead_ends=[self.names[node] for node in range(len(self.names))
+                       if reachable[node] and not to_ending[component_of[node]]],
+            cycles=[[self.names[node] for node in reversed(component)]
+                    for number, component in enumerate(components) if cyclic[number]],
+            paths_through={self.names[node]: through[component_of[node]]
+                           for node in range(len(self.names)) if reachable[node]}
+        )
+
+    def chapter_paths(self, chapter_id: str) -> int:
+        """
+        Distinct paths through one chapter, from its entry to any transition out of it.
+
+        A chapter that ends the story counts its ending as one way out.
+        """
+        entry = self._index.get(chapter_id)
+        if entry is None:
+            return 0
+        local = {node: number for number, node in enumerate(self._members.get(chapter_id, []))}
+        exit_node = len(local)
+        edges: List[List[int]] = [[] for _ in range(exit_node + 1)]
+        for node, number in local.items():
+            if not self.edges[node]:
+                edges[number].append(exit_node)
+            for successor in self.edges[node]:
+                # Entering a chapter (even this one again) leaves the current pass
+                inside = successor in local and successor != entry
+                edges[number].append(local[successor] if inside else exit_node)
+
+        component_of, components = strongly_connected_components(edges)
+        paths = _paths_to_sinks(edges, component_of, components, lambda node: node == exit_node)
+        return paths[component_of[local[entry]]]
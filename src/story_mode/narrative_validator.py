@@ -4,11 +4,15 @@ import os
 import logging
 import re
 import sys
-from collections import defaultdict, deque
+from collections import defaultdict
 from .chapter_validator import ChapterValidator
+from .narrative_graph import NarrativeGraph
 
 logger = logging.getLogger('tokugawa_bot')
 
+# Where new players begin the story
+DEFAULT_START_CHAPTERS = ["1_1_arrival"]
+
 class NarrativePathValidator:
     """
     Validates narrative paths in story mode chapters to ensure integrity and correctness.
@@ -18,6 +22,9 @@ class NarrativePathValidator:
     2. Broken references - detecting references to non-existent chapters
     3. Variable usage - validating that variables used in conditions are properly defined
     4. Path coverage - generating reports on narrative path coverage
+
+    Path counts, reachability, dead ends and cycles come from a NarrativeGraph
+    of the loaded chapters.
     """
 
     def __init__(self, chapters_dir: str):
@@ -35,6 +42,8 @@ class NarrativePathValidator:
         self.variable_usages = defaultdict(list)
         self.variable_definitions = defaultdict(list)
         self.path_coverage = {}
+        self.graph = None
+        self.analysis = None
 
     def load_chapters(self) -> bool:
         """
@@ -55,6 +64,10 @@ class NarrativePathValidator:
                     with open(file_path, 'r', encoding='utf-8') as f:
                         chapter_data = json.load(f)
 
+                    # Files hold either one chapter (with chapter_id) or a mapping of chapters
+                    if isinstance(chapter_data.get("chapter_id"), str):
+                        chapter_data = {chapter_data["chapter_id"]: chapter_data}
+
                     # Store the mapping between chapter IDs and their source files
                     for chapter_id in chapter_data.keys():
                         self.chapters_data[chapter_id] = chapter_data[chapter_id]
@@ -83,6 +96,8 @@ class NarrativePathValidator:
         self.variable_usages = defaultdict(list)
         self.variable_definitions = defaultdict(list)
         self.path_coverage = {chapter_id: {"total_paths": 0, "covered_paths": 0} for chapter_id in self.chapters_data}
+        self.graph = NarrativeGraph.from_chapters(self.chapters_data)
+        self.analysis = None
 
         all_valid = True
 
@@ -139,6 +154,10 @@ class NarrativePathValidator:
             for dialogue in chapter_data.get("dialogues", []):
                 self._process_choices(dialogue.get("choices", []), chapter_id)
 
+            # Check scene choices
+            for scene in chapter_data.get("scenes", []):
+                self._process_choices(scene.get("choices", []), chapter_id)
+
             # Check additional dialogues
             for dialogue_id, dialogues in chapter_data.get("additional_dialogues", {}).items():
                 for dialogue in dialogues:
@@ -179,6 +198,9 @@ class NarrativePathValidator:
             chapter_id: ID of the current chapter
         """
         for choice in choices:
+            if not isinstance(choice, dict):
+                continue
+
             # Check next_chapter reference
             if "next_chapter" in choice:
                 next_chapter = choice["next_chapter"]
@@ -203,9 +225,8 @@ class NarrativePathValidator:
         """
         valid = True
 
-        # Count total possible paths
-        total_paths = self._count_total_paths(chapter_data)
-        self.path_coverage[chapter_id]["total_paths"] = total_paths
+        # Count the distinct paths through the chapter
+        self.path_coverage[chapter_id]["total_paths"] = self.graph.chapter_paths(chapter_id)
 
         # Validate next_chapter
         if "next_chapter" in chapter_data:
@@ -229,6 +250,11 @@ class NarrativePathValidator:
             if not self._validate_choices(dialogue.get("choices", []), chapter_id):
                 valid = False
 
+        # Validate scene choices
+        for scene in chapter_data.get("scenes", []):
+            if not self._validate_choices(scene.get("choices", []), chapter_id):
+                valid = False
+
         # Validate additional dialogues
         for dialogue_id, dialogues in chapter_data.get("additional_dialogues", {}).items():
             for dialogue in dialogues:
@@ -279,7 +305,7 @@ class NarrativePathValidator:
 
         for choice in choices:
             # Validate next_chapter reference
-            if "next_chapter" in choice:
+            if isinstance(choice, dict) and "next_chapter" in choice:
                 next_chapter = choice["next_chapter"]
                 if next_chapter not in self.defined_chapters:
                     logger.error(f"Chapter {chapter_id} choice references non-existent chapter: {next_chapter}")
@@ -287,46 +313,6 @@ class NarrativePathValidator:
 
         return valid
 
-    def _count_total_paths(self, chapter_data: Dict[str, Any]) -> int:
-        """
-        Count the total number of possible paths through a chapter.
-
-        Args:
-            chapter_data: Chapter data dictionary
-
-        Returns:
-            Total number of possible paths
-        """
-        # This is a simplified count - a more accurate count would require traversing all possible combinations
-        path_count = 0
-
-        # Count direct next_chapter
-        if "next_chapter" in chapter_data:
-            path_count += 1
-
-        # Count conditional next chapters
-        if "conditional_next_chapter" in chapter_data:
-            conditional = chapter_data["conditional_next_chapter"]
-            for var_name, conditions in conditional.items():
-                if isinstance(conditions, dict):
-                    path_count += len(conditions)
-                else:
-                    path_count += 1
-
-        # Count choices
-        path_count += len(chapter_data.get("choices", []))
-
-        # Count dialogue choices
-        for dialogue in chapter_data.get("dialogues", []):
-            path_count += len(dialogue.get("choices", []))
-
-        # Count additional dialogue choices
-        for dialogue_id, dialogues in chapter_data.get("additional_dialogues", {}).items():
-            for dialogue in dialogues:
-                path_count += len(dialogue.get("choices", []))
-
-        return path_count
-
     def generate_coverage_report(self) -> Dict[str, Any]:
         """
         Generate a report on narrative path coverage.
@@ -349,73 +335,56 @@ class NarrativePathValidator:
             "undefined_variables": [var for var in self.variable_usages if var not in self.variable_definitions]
         }
 
+        if self.analysis:
+            analysis = self.analysis
+            busiest = sorted(analysis.paths_through.items(), key=lambda item: item[1], reverse=True)[:10]
+            report.update({
+                "start_chapters": analysis.starts,
+                "story_paths": analysis.total_paths,
+                "unbounded_paths": analysis.unbounded,
+                "unreachable_chapters": analysis.unreachable_chapters,
+                "unlinked_chapters": analysis.unlinked_chapters,
+                "endings": analysis.endings,
+                "dead_ends": analysis.dead_ends,
+                "cycles": analysis.cycles,
+                "busiest_nodes": busiest
+            })
+
         return report
 
-    def simulate_path_coverage(self) -> None:
+    def simulate_path_coverage(self, starts: Optional[List[str]] = None) -> None:
         """
-        Simulate path traversal to estimate path coverage.
-        This is a simplified simulation and doesn't account for all possible combinations.
-        """
-        visited = set()
-        queue = deque(["1_1"])  # Start with the first chapter
-
-        while queue:
-            chapter_id = queue.popleft()
-
-            if chapter_id in visited or chapter_id not in self.chapters_data:
-                continue
-
-            visited.add(chapter_id)
-            chapter_data = self.chapters_data[chapter_id]
-
-            # Mark this chapter's paths as covered
-            if chapter_id in self.path_coverage:
-                self.path_coverage[chapter_id]["covered_paths"] = self.path_coverage[chapter_id]["total_paths"]
+        Mark the paths of every chapter reachable from the start chapters as covered.
 
-            # Add next chapters to the queue
-            if "next_chapter" in chapter_data:
-                queue.append(chapter_data["next_chapter"])
-
-            # Add conditional next chapters
-            if "conditional_next_chapter" in chapter_data:
-                conditional = chapter_data["conditional_next_chapter"]
-                for var_name, conditions in conditional.items():
-                    if isinstance(conditions, dict):
-                        for value, next_chapter in conditions.items():
-                            if next_chapter:
-                                queue.append(next_chapter)
-                    elif isinstance(conditions, str):
-                        queue.append(conditions)
-
-            # Add choices next chapters
-            for choice in chapter_data.get("choices", []):
-                if "next_chapter" in choice:
-                    queue.append(choice["next_chapter"])
-
-            # Add dialogue choices next chapters
-            for dialogue in chapter_data.get("dialogues", []):
-                for choice in dialogue.get("choices", []):
-                    if "next_chapter" in choice:
-                        queue.append(choice["next_chapter"])
-
-            # Add additional dialogue choices next chapters
-            for dialogue_id, dialogues in chapter_data.get("additional_dialogues", {}).items():
-                for dialogue in dialogues:
-                    for choice in dialogue.get("choices", []):
-                        if "next_chapter" in choice:
-                            queue.append(choice["next_chapter"])
+        Args:
+            starts: Chapters where the story begins (default: DEFAULT_START_CHAPTERS)
+        """
+        if self.graph is None:
+            self.graph = NarrativeGraph.from_chapters(self.chapters_data)
+        starts = DEFAULT_START_CHAPTERS if starts is None else starts
+        missing = [chapter_id for chapter_id in starts if chapter_id not in self.defined_chapters]
+        if missing:
+            logger.warning(f"Start chapters not found: {', '.join(missing)}")
+        self.analysis = self.graph.analyze(starts)
+
+        for chapter_id, coverage in self.path_coverage.items():
+            if chapter_id in self.analysis.reachable:
+                coverage["covered_paths"] = coverage["total_paths"]
 
 def validate_narrative_paths_cli():
     """
     Command-line interface for validating narrative paths.
     """
-    import sys
+    import argparse
 
-    if len(sys.argv) < 2:
-        print("Usage: python -m story_mode.narrative_validator <chapters_dir>")
-        return False
+    parser = argparse.ArgumentParser(prog="python -m story_mode.narrative_validator",
+                                     description="Validate narrative paths and report path coverage")
+    parser.add_argument("chapters_dir", help="Directory containing chapter JSON files")
+    parser.add_argument("--start", action="append", dest="starts", metavar="CHAPTER_ID",
+                        help=f"Chapter where the story begins (repeatable, default: {', '.join(DEFAULT_START_CHAPTERS)})")
+    args = parser.parse_args()
 
-    chapters_dir = sys.argv[1]
+    chapters_dir = args.chapters_dir
     validator = NarrativePathValidator(chapters_dir)
 
     print(f"Loading chapters from {chapters_dir}...")
@@ -429,7 +398,7 @@ def validate_narrative_paths_cli():
     valid = validator.validate_narrative_paths()
 
     print("Simulating path coverage...")
-    validator.simulate_path_coverage()
+    validator.simulate_path_coverage(args.starts)
 
     report = validator.generate_coverage_report()
 
@@ -438,6 +407,21 @@ def validate_narrative_paths_cli():
     print(f"Total Paths: {report['total_paths']}")
     print(f"Covered Paths: {report['covered_paths']}")
     print(f"Coverage Percentage: {report['coverage_percentage']:.2f}%")
+    print(f"Story Paths: {report['story_paths']}{' (unbounded, loops counted once)' if report['unbounded_paths'] else ''}")
+    print(f"Start Chapters: {', '.join(report['start_chapters'])}")
+
+    for key, title in (("unreachable_chapters", "Unreachable Chapters"),
+                       ("unlinked_chapters", "Unlinked Chapters (nothing leads to them)"),
+                       ("dead_ends", "Dead Ends")):
+        if report[key]:
+            print(f"\n{title} ({len(report[key])}):")
+            for name in report[key]:
+                print(f"  - {name}")
+
+    if report['cycles']:
+        print(f"\nCycles ({len(report['cycles'])}):")
+        for cycle in report['cycles']:
+            print(f"  - {' -> '.join(cycle)}")
 
     if report['broken_references']:
         print(f"\nBroken References ({len(report['broken_references'])}):")
@@ -1,7 +1,7 @@
 from typing import Dict, List, Any, Optional, Union
-import json
 import logging
 from .interfaces import NPC
+from utils.content_bundle import load_json
 
 logger = logging.getLogger('tokugawa_bot')
 
@@ -228,8 +228,7 @@ class NPCManager:
         Loads NPCs from a JSON file.
         """
         try:
-            with open(file_path, 'r') as f:
-                npcs_data = json.load(f)
+            npcs_data = load_json(file_path)
             
             for npc_id, npc_data in npcs_data.items():
                 self.register_npc_from_data(npc_id, npc_data)
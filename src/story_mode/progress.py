@@ -2,7 +2,15 @@ from typing import Dict, List, Any, Optional, Union, TypedDict, Callable
 import json
 import logging
 from .interfaces import StoryProgressManager
-from utils.persistence.dynamodb_story import get_story_progress, update_story_progress
+from utils.persistence.dynamodb_story import (
+    get_story_progress,
+    get_story_position,
+    update_story_progress,
+    set_story_position,
+    complete_story_chapter,
+    record_story_choice,
+    add_story_counter
+)
 
 logger = logging.getLogger('tokugawa_bot')
 
@@ -59,41 +67,32 @@ class DefaultStoryProgressManager(StoryProgressManager):
         """
         Returns the ID of the player's current chapter.
         """
-        progress = await get_story_progress(player_data["user_id"])
+        progress = await get_story_position(player_data["user_id"])
         return progress.get("current_chapter")
     
     async def set_current_chapter(self, player_data: Dict[str, Any], chapter_id: str) -> Dict[str, Any]:
         """
         Sets the player's current chapter and returns updated player data.
         """
-        progress = await get_story_progress(player_data["user_id"])
-        progress["current_chapter"] = chapter_id
-        await update_story_progress(player_data["user_id"], progress)
+        await set_story_position(player_data["user_id"], current_chapter=chapter_id)
         return player_data
     
     async def complete_chapter(self, player_data: Dict[str, Any], chapter_id: str) -> Dict[str, Any]:
         """
         Marks a chapter as completed and returns updated player data.
         """
-        progress = await get_story_progress(player_data["user_id"])
-        completed_chapters = progress.get("completed_chapters", [])
-        if chapter_id not in completed_chapters:
-            completed_chapters.append(chapter_id)
-            progress["completed_chapters"] = completed_chapters
-            await update_story_progress(player_data["user_id"], progress)
+        await complete_story_chapter(player_data["user_id"], chapter_id)
         return player_data
     
     async def record_choice(self, player_data: Dict[str, Any], chapter_id: str, choice_key: str, choice_value: Any) -> Dict[str, Any]:
         """
         Records a player's choice and returns updated player data.
         """
-        progress = await get_story_progress(player_data["user_id"])
-        choices = progress.get("choices", {})
-        chapter_choices = choices.get(chapter_id, {})
-        chapter_choices[choice_key] = choice_value
-        choices[chapter_id] = chapter_choices
-        progress["choices"] = choices
-        await update_story_progress(player_data["user_id"], progress)
+        await record_story_choice(player_data["user_id"], chapter_id, {
+            "attribute": "choices",
+            "key": choice_key,
+            "value": choice_value
+        })
         return player_data
     
     async def get_completed_chapters(self, player_data: Dict[str, Any]) -> List[str]:
@@ -179,20 +178,19 @@ class DefaultStoryProgressManager(StoryProgressManager):
         """
         Updates the player's hierarchy tier and returns updated player data.
         """
-        progress = await get_story_progress(player_data["user_id"])
-        progress["hierarchy_tier"] = new_tier
-        await update_story_progress(player_data["user_id"], progress)
+        await update_story_progress(player_data["user_id"], {"hierarchy_tier": new_tier})
         return player_data
     
     async def add_hierarchy_points(self, player_data: Dict[str, Any], points: int) -> Dict[str, Any]:
         """
         Adds hierarchy points to the player and updates tier if necessary.
         """
+        new_points = await add_story_counter(player_data["user_id"], "hierarchy_points", points)
+        if new_points is None:
+            return player_data
+        
         progress = await get_story_progress(player_data["user_id"])
-        current_points = progress.get("hierarchy_points", 0)
         current_tier = progress.get("hierarchy_tier", 1)
-        
-        new_points = current_points + points
         new_tier = current_tier
         
         # Update tier based on points
@@ -203,17 +201,13 @@ class DefaultStoryProgressManager(StoryProgressManager):
         elif new_points >= 100:
             new_tier = 2
         
-        progress["hierarchy_points"] = new_points
         if new_tier != current_tier:
-            progress["hierarchy_tier"] = new_tier
-        
-        await update_story_progress(player_data["user_id"], progress)
+            await update_story_progress(player_data["user_id"], {"hierarchy_tier": new_tier})
         return player_data
     
     async def save_progress(self, player_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Saves player progress to persistent storage.
+        Progress is written incrementally as it changes, so there is nothing left to flush.
         """
-        progress = await get_story_progress(player_data["user_id"])
-        await update_story_progress(player_data["user_id"], progress)
         return player_data
@@ -0,0 +1,186 @@
+"""
+Precomputed chapter requirements for availability queries.
+
+Listing the chapters open to a player used to evaluate every chapter's
+requirements. RequirementIndex splits each chapter's requirements once into
+prerequisite chapters, numeric thresholds (level, attributes, ...), exact
+matches (element) and the new-player flag, and indexes them:
+
+- chapters without prerequisites are always candidates; the others are found
+  by walking from the player's completed chapters to the chapters that depend
+  on them, counting how many of each chapter's prerequisites are done;
+- each threshold metric keeps its chapters sorted by threshold, so the
+  chapters a player value fails are one bisect away.
+
+A query therefore touches the player's completed chapters, their dependents
+and the chapters failing a threshold, not every chapter.
+"""
+
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Tuple
+
+
+class ChapterRequirements(NamedTuple):
+    """Normalized requirements of one chapter."""
+
+    prerequisites: frozenset = frozenset()
+    thresholds: Mapping[str, Any] = {}
+    equals: Mapping[str, Any] = {}
+    new_player_only: bool = False
+
+
+class RequirementIndexStats:
+    """Thread-safe availability query counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.builds = 0
+            self.queries = 0
+            self.chapters_examined = 0
+            self.chapters_indexed = 0
+
+    def record_build(self, chapters: int):
+        with self._lock:
+            self.builds += 1
+            self.chapters_indexed = chapters
+
+    def record_query(self, examined: int):
+        with self._lock:
+            self.queries += 1
+            self.chapters_examined += examined
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the current counters."""
+        with self._lock:
+            return {
+                'builds': self.builds,
+                'queries': self.queries,
+                'chapters_examined': self.chapters_examined,
+                'chapters_indexed': self.chapters_indexed
+            }
+
+
+requirement_index_stats = RequirementIndexStats()
+
+
+class RequirementIndex:
+    """Answers "which chapters can this player open" without re-checking every chapter."""
+
+    def __init__(self, requirements: Mapping[str, ChapterRequirements]):
+        self._order = {chapter_id: position for position, chapter_id in enumerate(requirements)}
+        self._requirements = dict(requirements)
+        self._roots: List[str] = []
+        self._dependents: Dict[str, List[str]] = defaultdict(list)
+        self._thresholds: Dict[str, Tuple[List[Any], List[str]]] = {}
+        self._equals = [chapter_id for chapter_id, r in self._requirements.items() if r.equals]
+        self._new_player_only = [chapter_id for chapter_id, r in self._requirements.items() if r.new_player_only]
+
+        by_metric: Dict[str, List[Tuple[Any, int, str]]] = defaultdict(list)
+        for chapter_id, requirement in self._requirements.items():
+            if requirement.prerequisites:
+                for prerequisite in requirement.prerequisites:
+                    self._dependents[prerequisite].append(chapter_id)
+            else:
+                self._roots.append(chapter_id)
+            for metric, threshold in requirement.thresholds.items():
+                by_metric[metric].append((threshold, self._order[chapter_id], chapter_id))
+        for metric, entries in by_metric.items():
+            entries.sort()
+            self._thresholds[metric] = ([e[0] for e in entries], [e[2] for e in entries])
+        requirement_index_stats.record_build(len(self._requirements))
+
+    def __len__(self) -> int:
+        return len(self._requirements)
+
+    def __contains__(self, chapter_id: str) -> bool:
+        return chapter_id in self._requirements
+
+    def available(self, completed: Iterable[str], values: Mapping[str, Any],
+                  fields: Mapping[str, Any] = None, exclude_completed: bool = False) -> List[str]:
+        """
+        Chapters whose requirements a player meets, in index order.
+
+        Args:
+            completed: IDs of the chapters the player completed
+            values: Player value of each threshold metric (missing values count as 0)
+            fields: Player values compared to exact-match requirements (missing is None)
+            exclude_completed: Leave out chapters the player already completed
+
+        Returns:
+            List of chapter IDs
+        """
+        completed = set(completed)
+        fields = fields or {}
+
+        # Frontier: chapters with every prerequisite completed
+        candidates = set(self._roots)
+        done_counts: Dict[str, int] = defaultdict(int)
+        for chapter_id in completed:
+            for dependent in self._dependents.get(chapter_id, ()):
+                done_counts[dependent] += 1
+                if done_counts[dependent] == len(self._requirements[dependent].prerequisites):
+                    candidates.add(dependent)
+
+        # Thresholds: chapters sorted after the player's value are not met
+        for metric, (thresholds, chapter_ids) in self._thresholds.items():
+            candidates.difference_update(chapter_ids[bisect_right(thresholds, values.get(metric, 0)):])
+
+        for chapter_id in self._equals:
+            if chapter_id in candidates and any(fields.get(field) != expected for field, expected
+                                                in self._requirements[chapter_id].equals.items()):
+                candidates.discard(chapter_id)
+        if completed:
+            candidates.difference_update(self._new_player_only)
+        if exclude_completed:
+            candidates.difference_update(completed)
+
+        requirement_index_stats.record_query(len(candidates) + len(done_counts))
+        return sorted(candidates, key=self._order.__getitem__)
+
+
+class IndexedRequirements:
+    """
+    A RequirementIndex rebuilt whenever its source chapters change.
+
+    The source is a callable returning the chapters mapping; the index is
+    rebuilt when a different mapping object, or the same one with another
+    size, is returned. Requirements edited in place need invalidate().
+    """
+
+    def __init__(self, source: Callable[[], Mapping[str, Any]],
+                 normalize: Callable[[str, Any], ChapterRequirements]):
+        self._source = source
+        self._normalize = normalize
+        self._chapters = None
+        self._size = 0
+        self._index = None
+        self._lock = threading.Lock()
+
+    def get(self) -> RequirementIndex:
+        chapters = self._source()
+        index = self._index
+        if index is None or chapters is not self._chapters or len(chapters) != self._size:
+            with self._lock:
+                if self._index is None or chapters is not self._chapters or len(chapters) != self._size:
+                    self._index = RequirementIndex({chapter_id: self._normalize(chapter_id, chapter)
+                                                    for chapter_id, chapter in chapters.items()})
+                    self._chapters, self._size = chapters, len(chapters)
+                index = self._index
+        return index
+
+    def invalidate(self):
+        """Force a rebuild on the next query (after chapters change in place)."""
+        with self._lock:
+            self._index = None
+
+
+def get_requirement_index_stats() -> Dict[str, Any]:
+    """Get chapter availability query metrics."""
+    return requirement_index_stats.snapshot()
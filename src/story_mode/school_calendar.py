@@ -1,9 +1,9 @@
 from typing import Dict, List, Any, Optional, Union
-import json
 import logging
 import os
 from datetime import datetime, timedelta
 from .interfaces import Event
+from utils.content_bundle import load_json
 
 logger = logging.getLogger('tokugawa_bot')
 
@@ -76,8 +76,7 @@ class SchoolCalendar:
         # Load class schedule from JSON file
         try:
             schedule_path = "data/story_mode/class_schedule.json"
-            with open(schedule_path, 'r') as f:
-                self.class_schedule = json.load(f)
+            self.class_schedule = load_json(schedule_path)
             logger.info("Loaded class schedule from JSON file")
         except Exception as e:
             logger.error(f"Error loading class schedule from JSON file: {e}")
@@ -105,8 +104,7 @@ class SchoolCalendar:
         # Load holidays from JSON file
         try:
             holidays_path = "data/story_mode/holidays.json"
-            with open(holidays_path, 'r') as f:
-                holidays_data = json.load(f)
+            holidays_data = load_json(holidays_path)
 
             # Convert dates to datetime objects and update the year
             self.holidays = []
@@ -330,8 +328,7 @@ class SchoolCalendar:
         # Load class attribute bonuses from JSON file
         try:
             bonuses_path = "data/story_mode/class_attribute_bonuses.json"
-            with open(bonuses_path, 'r') as f:
-                class_bonuses = json.load(f)
+            class_bonuses = load_json(bonuses_path, shared=True)
             logger.debug(f"Loaded class attribute bonuses from JSON file")
         except Exception as e:
             logger.error(f"Error loading class attribute bonuses from JSON file: {e}")
@@ -354,7 +351,7 @@ class SchoolCalendar:
             }
             logger.warning("Using default class attribute bonuses")
 
-        return class_bonuses.get(class_name, {})
+        return dict(class_bonuses.get(class_name, {}))
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -5,6 +5,7 @@ from pathlib import Path
 from datetime import datetime, timedelta
 
 from .reputation_manager import ReputationManager
+from utils.content_bundle import list_json, load_json
 
 logger = logging.getLogger('tokugawa_bot')
 
@@ -43,12 +44,10 @@ class ShopManager:
         
         # Load items from category-based structure
         items_dir = Path("data/economy/items")
-        if items_dir.exists():
-            for item_file in items_dir.glob("*.json"):
-                with open(item_file, 'r') as f:
-                    items = json.load(f)
-                    for item in items:
-                        shop_data["items"][str(item["id"])] = item
+        for item_file in list_json(items_dir):
+            items = load_json(item_file)
+            for item in items:
+                shop_data["items"][str(item["id"])] = item
         
         # Load shops
         shops_file = self.shop_dir / "shops.json"
@@ -21,24 +21,44 @@ from .club_content import ClubContentManager
 from .player_manager import PlayerManager
 from .choice_processor import ChoiceProcessor
 from .image_manager import ImageManager
+from .chapter_cache import chapter_cache
+from .requirement_index import ChapterRequirements, IndexedRequirements
 import discord
+from utils.content_bundle import load_json
 
 logger = logging.getLogger('tokugawa_bot')
 
+
+def _chapter_requirements(chapter_id: str, chapter_info: Any) -> ChapterRequirements:
+    """Normalize a chapter's requirements (see StoryMode.check_chapter_requirements)."""
+    requirements = (chapter_info or {}).get("requirements", {})
+    if not requirements:
+        return ChapterRequirements()
+    return ChapterRequirements(
+        prerequisites=frozenset(requirements.get("completed_chapters", [])),
+        thresholds={"level": requirements["level"]} if "level" in requirements else {},
+        equals={"element": requirements["element"]} if "element" in requirements else {}
+    )
+
 class StoryMode:
     """
     Main class for managing the story mode.
     """
 
-    def __init__(self, data_dir: str):
+    def __init__(self, data_dir: str, image_manager: Optional[ImageManager] = None):
         """
         Initialize the story mode.
+
+        Args:
+            data_dir: Story mode data directory
+            image_manager: Shared image manager; a new one is created if omitted
         """
         self.data_dir = data_dir
         self.progress_manager = DefaultStoryProgressManager()
         self.validator = StoryValidator(data_dir, self.progress_manager)
         self.story_data = self._load_story_data()
-        self.image_manager = ImageManager()
+        self._requirements = IndexedRequirements(self._story_chapters, _chapter_requirements)
+        self.image_manager = image_manager or ImageManager()
         logger.info("StoryMode initialized")
 
     def _load_story_data(self) -> Dict[str, Any]:
@@ -54,10 +74,7 @@ class StoryMode:
                 logger.error(f"Story file not found: {story_file}")
                 return {}
 
-            with open(story_file, "r") as f:
-                story_data = json.load(f)
-
-            return story_data
+            return load_json(story_file)
         except Exception as e:
             logger.error(f"Error loading story data: {str(e)}")
             return {}
@@ -188,10 +205,8 @@ class StoryMode:
                 logger.error(f"Chapter file not found: {chapter_file}")
                 return None
 
-            with open(chapter_file, "r") as f:
-                chapter_data = json.load(f)
-
-            return chapter_data
+            # Parsed once and kept in memory; edits to the file are picked up
+            return chapter_cache.get(chapter_file)
         except Exception as e:
             logger.error(f"Error loading chapter: {str(e)}")
             return None
@@ -383,12 +398,16 @@ class StoryMode:
         Returns:
             List[str]: The list of available chapter IDs.
         """
-        available_chapters = []
-        for chapter_id in self.story_data.get("chapters", {}):
-            if self.check_chapter_requirements(player_data, chapter_id):
-                available_chapters.append(chapter_id)
+        # Same rules as check_chapter_requirements, answered from the requirement index
+        return self._requirements.get().available(
+            player_data.get("story_progress", {}).get("completed_chapters", []),
+            {"level": player_data.get("level", 0)},
+            {"element": player_data.get("element")}
+        )
 
-        return available_chapters
+    def _story_chapters(self) -> Dict[str, Any]:
+        chapters = self.story_data.get("chapters", {})
+        return chapters if isinstance(chapters, dict) else {}
 
     def get_chapter_progress(self, player_data: Dict, chapter_id: str) -> Dict:
         """
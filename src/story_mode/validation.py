@@ -635,18 +635,19 @@ def validate_story_data(story_data: Dict) -> List[str]:
 
     return errors
 
-def validate_chapters(chapters: Dict) -> List[str]:
+def validate_chapters(chapters: Dict, image_manager: Optional[ImageManager] = None) -> List[str]:
     """
     Validate the chapters.
 
     Args:
         chapters (Dict): The chapters to validate.
+        image_manager (Optional[ImageManager]): Image manager to reuse, created if omitted.
 
     Returns:
         List[str]: List of validation errors.
     """
     errors = []
-    image_manager = ImageManager()
+    image_manager = image_manager or ImageManager()
 
     for chapter_id, chapter_data in chapters.items():
         # Check if the chapter has the required fields
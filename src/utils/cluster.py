@@ -0,0 +1,340 @@
+"""
+Shard cluster mode.
+
+A single process and event loop is the ceiling for one bot. In cluster mode a
+supervisor (src/cluster.py) starts CLUSTER_WORKERS processes running
+src/bot.py, each an AutoShardedBot owning a contiguous range of shards. Several
+ECS tasks can each run a supervisor; CLUSTER_TASK_INDEX/CLUSTER_TASK_COUNT
+split the shards between them.
+
+Work that must happen once for the whole bot (event scheduling, cleanup
+loops) runs only in the worker holding the 'scheduler' lease, a conditional
+item in SystemFlags renewed every LEASE_TTL / 3 seconds. If that worker dies
+another one takes the lease over after LEASE_TTL. Cooldowns, leaderboards and
+player state already live in DynamoDB, so every worker reads the same data.
+
+Without the cluster variables the bot runs as one process owning every shard,
+and the lease still keeps a replacement ECS task from running the scheduler
+twice during a rolling deploy.
+"""
+
+import os
+import sys
+import signal
+import socket
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils.logging_config import get_logger
+
+logger = get_logger('tokugawa_bot.cluster')
+
+# Seconds a lease stays valid without renewal
+LEASE_TTL = int(os.environ.get('CLUSTER_LEASE_TTL', '60'))
+
+# Maximum delay between restarts of a crashing worker
+MAX_RESTART_BACKOFF = 60.0
+
+# Time workers get to shut down before they are killed
+SHUTDOWN_TIMEOUT = 30.0
+
+SCHEDULER_LEASE = 'scheduler'
+
+
+def shard_ranges(shard_count: int, workers: int) -> List[List[int]]:
+    """Split shard IDs into contiguous, nearly equal ranges."""
+    workers = max(1, min(workers, shard_count))
+    base, extra = divmod(shard_count, workers)
+    ranges, start = [], 0
+    for index in range(workers):
+        size = base + (1 if index < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+class ClusterConfig:
+    """Shard assignment of the current worker process."""
+
+    def __init__(self, cluster_id: Optional[int] = None, shard_ids: Optional[List[int]] = None,
+                 shard_count: Optional[int] = None):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+
+    @classmethod
+    def from_env(cls) -> 'ClusterConfig':
+        """Read the assignment the supervisor passes to each worker."""
+        shard_ids = os.environ.get('CLUSTER_SHARD_IDS')
+        shard_count = os.environ.get('CLUSTER_SHARD_COUNT')
+        cluster_id = os.environ.get('CLUSTER_ID')
+        return cls(
+            cluster_id=int(cluster_id) if cluster_id else None,
+            shard_ids=[int(s) for s in shard_ids.split(',') if s] if shard_ids else None,
+            shard_count=int(shard_count) if shard_count else None
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.shard_ids is not None and self.shard_count is not None
+
+    @property
+    def is_primary(self) -> bool:
+        """Whether this worker does once-per-deploy work such as command sync."""
+        return not self.enabled or 0 in self.shard_ids
+
+    @property
+    def name(self) -> str:
+        if not self.enabled:
+            return 'standalone'
+        return f'cluster-{self.cluster_id}[{self.shard_ids[0]}-{self.shard_ids[-1]}]'
+
+    def bot_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for AutoShardedBot."""
+        if not self.enabled:
+            return {}
+        return {'shard_ids': self.shard_ids, 'shard_count': self.shard_count}
+
+    def metrics_port(self, base_port: int) -> int:
+        """Workers of one supervisor share a host, so each gets its own port."""
+        local_id = int(os.environ.get('CLUSTER_LOCAL_ID', '0'))
+        return base_port + local_id if self.enabled else base_port
+
+
+class ClusterLease:
+    """Time-limited, renewable ownership of a cluster-wide role, stored in SystemFlags."""
+
+    def __init__(self, name: str, ttl: int = LEASE_TTL, holder: Optional[str] = None, table=None):
+        self.name = name
+        self.ttl = ttl
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}"
+        self._table = table
+        self._expires_at: Optional[datetime] = None
+
+    @property
+    def table(self):
+        if self._table is None:
+            from utils.persistence.db_provider import db_provider
+            self._table = db_provider.SYSTEM_FLAGS_TABLE
+        return self._table
+
+    @property
+    def held(self) -> bool:
+        return self._expires_at is not None and datetime.now() < self._expires_at
+
+    def _put(self) -> bool:
+        now = datetime.now()
+        expires_at = now + timedelta(seconds=self.ttl)
+        try:
+            self.table.put_item(
+                Item={
+                    'PK': f'LEASE#{self.name}',
+                    'SK': 'HOLDER',
+                    'holder': self.holder,
+                    'expires_at': expires_at.isoformat(),
+                    'type': 'cluster_lease'
+                },
+                # Take the lease if it is free, expired, or already ours (renewal)
+                ConditionExpression='attribute_not_exists(PK) OR expires_at < :now OR holder = :holder',
+                ExpressionAttributeValues={':now': now.isoformat(), ':holder': self.holder}
+            )
+            self._expires_at = expires_at
+            return True
+        except Exception as e:
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                logger.error(f"Error acquiring lease {self.name}: {e}")
+            self._expires_at = None
+            return False
+
+    async def acquire(self) -> bool:
+        """Acquire or renew the lease."""
+        return await asyncio.to_thread(self._put)
+
+    async def release(self):
+        """Give the lease up so another worker can take over immediately."""
+        if not self.held:
+            return
+        self._expires_at = None
+        try:
+            await asyncio.to_thread(
+                self.table.delete_item,
+                Key={'PK': f'LEASE#{self.name}', 'SK': 'HOLDER'},
+                ConditionExpression='holder = :holder',
+                ExpressionAttributeValues={':holder': self.holder}
+            )
+        except Exception as e:
+            logger.warning(f"Error releasing lease {self.name}: {e}")
+
+
+class ClusterCoordinator:
+    """
+    Runs cluster-wide singletons only in the worker holding the scheduler lease.
+
+    Services register start/stop callbacks; they are started when this worker
+    gains the lease and stopped when it loses it or shuts down.
+    """
+
+    def __init__(self, lease: Optional[ClusterLease] = None):
+        self.lease = lease or ClusterLease(SCHEDULER_LEASE)
+        self._services: Dict[str, tuple] = {}
+        self._running = False
+        self._leader = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader and self.lease.held
+
+    def register(self, name: str, start: Callable[[], Awaitable[Any]], stop: Callable[[], Awaitable[Any]]):
+        """Register a service that must run exactly once across the cluster."""
+        self._services[name] = (start, stop)
+
+    async def _set_leader(self, leader: bool):
+        if leader == self._leader:
+            return
+        self._leader = leader
+        logger.info(f"{'Acquired' if leader else 'Lost'} the {self.lease.name} lease ({self.lease.holder})")
+        for name, (start, stop) in self._services.items():
+            try:
+                await (start() if leader else stop())
+            except Exception as e:
+                logger.error(f"Error {'starting' if leader else 'stopping'} cluster service {name}: {e}")
+
+    async def tick(self):
+        """Acquire or renew the lease and start/stop services accordingly."""
+        await self._set_leader(await self.lease.acquire())
+
+    async def _run(self):
+        while self._running:
+            await self.tick()
+            await asyncio.sleep(self.lease.ttl / 3)
+
+    async def start(self):
+        """Start competing for the lease."""
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop services and release the lease."""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self._set_leader(False)
+        await self.lease.release()
+
+
+def is_cluster_leader(bot) -> bool:
+    """Whether cluster-wide work should run in this process."""
+    coordinator = getattr(bot, 'coordinator', None)
+    if not isinstance(coordinator, ClusterCoordinator):
+        return True
+    return coordinator.is_leader
+
+
+async def resolve_shard_count(token: str) -> int:
+    """Ask Discord for the recommended shard count."""
+    import aiohttp
+    async with aiohttp.ClientSession() as session:
+        async with session.get('https://discord.com/api/v10/gateway/bot',
+                               headers={'Authorization': f'Bot {token}'}) as response:
+            response.raise_for_status()
+            return int((await response.json())['shards'])
+
+
+class Supervisor:
+    """Starts one bot process per shard range and restarts workers that crash."""
+
+    def __init__(self, shard_count: int, workers: int, task_index: int = 0, task_count: int = 1,
+                 command: Optional[List[str]] = None):
+        self.shard_count = shard_count
+        self.workers = workers
+        self.task_index = task_index
+        self.task_count = task_count
+        self.command = command or [sys.executable, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'bot.py')]
+        self._processes: Dict[int, asyncio.subprocess.Process] = {}
+        self._stopping = asyncio.Event()
+
+    def assignments(self) -> Dict[int, List[int]]:
+        """Shard ranges of this task's workers, keyed by global cluster ID."""
+        ranges = shard_ranges(self.shard_count, self.workers * self.task_count)
+        first = self.task_index * self.workers
+        return {cluster_id: ranges[cluster_id] for cluster_id in range(first, min(first + self.workers, len(ranges)))}
+
+    def worker_env(self, cluster_id: int, shard_ids: List[int]) -> Dict[str, str]:
+        env = dict(os.environ)
+        env.update({
+            'CLUSTER_ID': str(cluster_id),
+            'CLUSTER_LOCAL_ID': str(cluster_id - self.task_index * self.workers),
+            'CLUSTER_SHARD_IDS': ','.join(map(str, shard_ids)),
+            'CLUSTER_SHARD_COUNT': str(self.shard_count)
+        })
+        return env
+
+    async def _supervise(self, cluster_id: int, shard_ids: List[int]):
+        backoff = 1.0
+        while not self._stopping.is_set():
+            process = await asyncio.create_subprocess_exec(*self.command, env=self.worker_env(cluster_id, shard_ids))
+            self._processes[cluster_id] = process
+            logger.info(f"Started cluster {cluster_id} (pid {process.pid}) with shards {shard_ids}")
+            started = asyncio.get_running_loop().time()
+            code = await process.wait()
+            if self._stopping.is_set():
+                return
+            # A worker that ran for a while gets a fresh backoff
+            if asyncio.get_running_loop().time() - started > MAX_RESTART_BACKOFF:
+                backoff = 1.0
+            logger.error(f"Cluster {cluster_id} exited with code {code}; restarting in {backoff:.0f}s")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, MAX_RESTART_BACKOFF)
+
+    async def shutdown(self):
+        """Ask all workers to stop, killing those that do not exit in time."""
+        self._stopping.set()
+        processes = [p for p in self._processes.values() if p.returncode is None]
+        for process in processes:
+            process.terminate()
+        try:
+            await asyncio.wait_for(asyncio.gather(*(p.wait() for p in processes)), timeout=SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            for process in processes:
+                if process.returncode is None:
+                    process.kill()
+
+    async def run(self):
+        """Run the workers until SIGTERM/SIGINT."""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, lambda: asyncio.ensure_future(self.shutdown()))
+            except NotImplementedError:
+                pass
+        assignments = self.assignments()
+        logger.info(f"Supervising {len(assignments)} workers for {self.shard_count} shards "
+                    f"(task {self.task_index + 1}/{self.task_count})")
+        await asyncio.gather(*(self._supervise(cluster_id, shards) for cluster_id, shards in assignments.items()))
+
+
+async def run_supervisor():
+    """Entry point of the cluster supervisor, configured from the environment."""
+    shard_count = os.environ.get('CLUSTER_TOTAL_SHARDS')
+    if shard_count:
+        shard_count = int(shard_count)
+    else:
+        shard_count = await resolve_shard_count(os.environ['DISCORD_TOKEN'])
+    supervisor = Supervisor(
+        shard_count=shard_count,
+        workers=int(os.environ.get('CLUSTER_WORKERS', os.cpu_count() or 1)),
+        task_index=int(os.environ.get('CLUSTER_TASK_INDEX', '0')),
+        task_count=int(os.environ.get('CLUSTER_TASK_COUNT', '1'))
+    )
+    await supervisor.run()
@@ -0,0 +1,136 @@
+"""
+Hash-based application command sync.
+
+Syncing the command tree with Discord takes seconds and is rate limited, yet
+the tree only changes when a deploy adds or edits commands. The tree payload
+for each scope (global or one guild) is serialized and hashed; the hash of the
+last successful sync is stored in SystemFlags and the sync is skipped when the
+hash is unchanged. COMMAND_SYNC_FORCE=true or the admin !sincronizar command
+forces a sync.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
+
+from utils.logging_config import get_logger
+
+logger = get_logger('tokugawa_bot.command_sync')
+
+# Force a sync on every start (deploy override)
+FORCE_SYNC = os.environ.get('COMMAND_SYNC_FORCE', 'false').lower() == 'true'
+
+# SystemFlags name prefix for the synced hash of each scope
+FLAG_PREFIX = 'command_tree_hash'
+FLAG_TYPE = 'command_sync'
+
+
+class CommandSyncStats:
+    """Thread-safe per-scope sync counters and durations."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.by_scope: Dict[str, Dict[str, Any]] = {}
+
+    def _scope(self, scope: str) -> Dict[str, Any]:
+        return self.by_scope.setdefault(scope, {
+            'synced': 0,
+            'skipped': 0,
+            'failed': 0,
+            'duration_seconds': 0.0,
+            'last_duration_seconds': 0.0,
+            'last_hash': None
+        })
+
+    def record(self, scope: str, result: str, duration: float = 0.0, tree_hash: Optional[str] = None):
+        with self._lock:
+            stats = self._scope(scope)
+            stats[result] += 1
+            if result != 'skipped':
+                stats['duration_seconds'] += duration
+                stats['last_duration_seconds'] = duration
+            if tree_hash is not None:
+                stats['last_hash'] = tree_hash
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return a copy of the current counters."""
+        with self._lock:
+            return {scope: dict(stats) for scope, stats in self.by_scope.items()}
+
+
+sync_stats = CommandSyncStats()
+
+
+def sync_scope(guild=None) -> str:
+    """Name of the sync scope for a guild (or the global scope)."""
+    return 'global' if guild is None else f'guild:{guild.id}'
+
+
+def tree_payload(tree, guild=None) -> List[Dict[str, Any]]:
+    """Serialize the commands of a scope the way CommandTree.sync sends them."""
+    payload = [command.to_dict() for command in tree.get_commands(guild=guild)]
+    return sorted(payload, key=lambda command: (command.get('type', 1), command.get('name', '')))
+
+
+def tree_hash(payload: List[Dict[str, Any]]) -> str:
+    """Stable hash of a command tree payload."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+async def sync_command_tree(bot, guild=None, force: bool = False, db=None) -> Optional[list]:
+    """
+    Sync one scope of the command tree if it changed since the last sync.
+
+    Args:
+        bot: The bot whose tree is synced
+        guild: Guild to sync, or None for the global commands
+        force: Sync even if the stored hash matches
+        db: Provider with get/set_system_flag (defaults to db_provider)
+
+    Returns:
+        The synced commands, or None if the sync was skipped
+
+    Raises:
+        Whatever CommandTree.sync raises; the stored hash is left untouched
+    """
+    if db is None:
+        from utils.persistence.db_provider import db_provider as db
+
+    scope = sync_scope(guild)
+    flag_name = f'{FLAG_PREFIX}:{scope}'
+    current = tree_hash(tree_payload(bot.tree, guild))
+
+    if not (force or FORCE_SYNC):
+        stored = await db.get_system_flag(flag_name)
+        if stored == current:
+            sync_stats.record(scope, 'skipped', tree_hash=current)
+            logger.info(f"Command tree unchanged for {scope} ({current[:12]}), skipping sync")
+            return None
+
+    started = time.perf_counter()
+    try:
+        synced = await bot.tree.sync(guild=guild)
+    except Exception:
+        sync_stats.record(scope, 'failed', time.perf_counter() - started)
+        raise
+    duration = time.perf_counter() - started
+    sync_stats.record(scope, 'synced', duration, current)
+
+    if not await db.set_system_flag(flag_name, current, FLAG_TYPE):
+        logger.warning(f"Could not store command tree hash for {scope}; next start will sync again")
+    logger.info(f"Synced {len(synced)} commands for {scope} in {duration:.2f}s ({current[:12]})")
+    return synced
+
+
+def get_command_sync_stats() -> Dict[str, Dict[str, Any]]:
+    """Get per-scope command sync metrics."""
+    return sync_stats.snapshot()
@@ -18,26 +18,36 @@ class ContentAnalyzer:
     """
     A utility class for analyzing narrative content and player choices.
     """
-    def __init__(self, data_dir: str = "data/story_mode"):
+    def __init__(self, data_dir: str = "data/story_mode", snapshot_dir: Optional[str] = None):
         """
         Initialize the content analyzer.
 
         Args:
             data_dir: Directory containing story mode data
+            snapshot_dir: Directory of table snapshots (see utils.persistence.table_export)
         """
         self.data_dir = data_dir
+        self.snapshot_dir = snapshot_dir or os.getenv('EXPORT_DIR', 'exports')
         self.player_data = self._load_player_data()
         self.content_data = self._load_content_data()
 
     def _load_player_data(self) -> Dict[str, Any]:
         """
-        Load player data from the database.
-        This is a placeholder - in a real implementation, this would load from the actual database.
+        Load player data from the latest players table snapshot.
+        Falls back to a local player_data.json file when no snapshot exists.
 
         Returns:
             Dictionary mapping player IDs to player data
         """
-        # Placeholder - in a real implementation, this would load from the database
+        from utils.persistence.table_export import load_snapshot
+        snapshot = load_snapshot("players", self.snapshot_dir)
+        if snapshot:
+            return {
+                item["PK"].split("#", 1)[1]: item
+                for item in snapshot.values()
+                if item.get("SK") == "PROFILE" and "#" in item.get("PK", "")
+            }
+
         player_data_file = os.path.join(self.data_dir, "player_data.json")
         if os.path.exists(player_data_file):
             with open(player_data_file, 'r', encoding='utf-8') as f:
@@ -277,10 +287,11 @@ def main():
     parser.add_argument("--heatmap", type=str, help="Generate a choice heatmap and save to the specified file")
     parser.add_argument("--progression", type=str, help="Generate a progression chart and save to the specified file")
     parser.add_argument("--bottlenecks", action="store_true", help="Identify narrative bottlenecks")
+    parser.add_argument("--snapshot-dir", type=str, help="Directory of the table snapshots to analyze")
 
     args = parser.parse_args()
 
-    analyzer = ContentAnalyzer()
+    analyzer = ContentAnalyzer(snapshot_dir=args.snapshot_dir)
 
     if args.export:
         analyzer.export_analytics(args.export)
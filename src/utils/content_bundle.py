@@ -0,0 +1,380 @@
+"""
+Compiled content bundle.
+
+Game content lives in about 80 JSON files under data/ that several loaders
+(chapters, story data, shop items, NPCs, calendar) used to open and parse one
+by one, some more than once per process. The content compiler validates every
+file and writes them into a single versioned bundle:
+
+    header   magic "TKBNDL", format version, index offset and length
+    blobs    compact UTF-8 JSON of each document; identical documents are
+             stored once
+    index    JSON: content version, and for every path relative to the data
+             directory (sorted, so directories are ranges) its blob offset
+             and length and the source file's size and mtime
+
+At runtime the bundle is memory-mapped read-only, so every shard process on a
+host shares the same page cache pages, and only the index is parsed when it is
+opened. A document is decoded from its blob the first time it is read.
+
+Files changed on disk after the bundle was compiled are detected when the
+bundle is opened (size or mtime differ) and read from disk instead; callers
+that stat the file themselves (the chapter cache) also see later edits. If the
+bundle is missing or unreadable everything is read from disk. Directories the
+game writes to at runtime (logs, analytics, shops, reputation) are not bundled.
+
+Build it with:
+
+    python src/utils/content_bundle.py [data_dir] [output]
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import hashlib
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+if __name__ == '__main__':
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.logging_config import get_logger
+
+logger = get_logger('tokugawa_bot.content_bundle')
+
+MAGIC = b'TKBNDL\x00\x00'
+FORMAT_VERSION = 1
+
+# magic, format version, flags, index offset, index length
+HEADER = struct.Struct('<8sIIQQ')
+
+CONTENT_DATA_DIR = os.environ.get('CONTENT_DATA_DIR', 'data')
+CONTENT_BUNDLE_PATH = os.environ.get('CONTENT_BUNDLE_PATH', os.path.join(CONTENT_DATA_DIR, 'content.bundle'))
+
+# Directories holding state the game writes at runtime
+RUNTIME_DIRS = frozenset({'logs', 'narrative_logs', 'analytics', 'shops', 'reputation', 'community'})
+
+PathLike = Union[str, Path]
+
+
+class ContentBundleError(Exception):
+    """Raised when content cannot be compiled or a bundle cannot be read."""
+
+
+class ContentBundleStats:
+    """Thread-safe counters of documents served from the bundle and from disk."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.reads = {'bundle': 0, 'file': 0}
+            self.decodes = 0
+            self.open_seconds = 0.0
+
+    def record_read(self, source: str):
+        with self._lock:
+            self.reads[source] += 1
+
+    def record_decode(self):
+        with self._lock:
+            self.decodes += 1
+
+    def record_open(self, seconds: float):
+        with self._lock:
+            self.open_seconds = seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the current counters."""
+        with self._lock:
+            return {'reads': dict(self.reads), 'decodes': self.decodes, 'open_seconds': self.open_seconds}
+
+
+content_bundle_stats = ContentBundleStats()
+
+
+def _source_files(data_dir: Path) -> List[Tuple[str, Path]]:
+    """Bundled JSON files of a data directory as (key, path), sorted by key."""
+    files = []
+    for root, dirs, names in os.walk(data_dir):
+        dirs[:] = sorted(d for d in dirs if d not in RUNTIME_DIRS)
+        for name in names:
+            if name.endswith('.json'):
+                path = Path(root) / name
+                files.append((path.relative_to(data_dir).as_posix(), path))
+    return sorted(files)
+
+
+def compile_bundle(data_dir: PathLike = CONTENT_DATA_DIR, output: Optional[PathLike] = None) -> Dict[str, Any]:
+    """
+    Validate the content of a data directory and write it as a bundle.
+
+    Args:
+        data_dir: Directory with the JSON content
+        output: Bundle path (default: content.bundle in data_dir)
+
+    Returns:
+        Summary with the content version, entry count and sizes
+
+    Raises:
+        ContentBundleError: If any file is not valid UTF-8 JSON (nothing is written)
+    """
+    data_dir = Path(data_dir)
+    output = Path(output) if output else data_dir / 'content.bundle'
+
+    documents, errors = [], []
+    for key, path in _source_files(data_dir):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+        except (UnicodeDecodeError, ValueError) as e:
+            errors.append(f"{key}: {e}")
+            continue
+        if not isinstance(document, (dict, list)):
+            errors.append(f"{key}: top level must be an object or a list")
+            continue
+        stat = path.stat()
+        blob = json.dumps(document, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        documents.append((key, blob, stat.st_size, stat.st_mtime_ns))
+    if errors:
+        raise ContentBundleError("Invalid content:\n" + "\n".join(errors))
+
+    version = hashlib.sha256()
+    blobs, offsets, entries = [], {}, {}
+    position = HEADER.size
+    source_bytes = 0
+    for key, blob, size, mtime_ns in documents:
+        digest = hashlib.sha256(blob).digest()
+        version.update(key.encode('utf-8') + b'\0' + digest)
+        source_bytes += size
+        if digest not in offsets:
+            offsets[digest] = position
+            blobs.append(blob)
+            position += len(blob)
+        entries[key] = [offsets[digest], len(blob), size, mtime_ns]
+
+    index = json.dumps({
+        'format': FORMAT_VERSION,
+        'content_version': version.hexdigest()[:16],
+        'built_at': datetime.now().isoformat(),
+        'entries': entries
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    # Written next to the target and renamed, so running processes keep their mapping
+    temporary = output.with_name(output.name + '.tmp')
+    with open(temporary, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, position, len(index)))
+        for blob in blobs:
+            f.write(blob)
+        f.write(index)
+    os.replace(temporary, output)
+
+    summary = {
+        'content_version': version.hexdigest()[:16],
+        'entries': len(entries),
+        'blobs': len(blobs),
+        'source_bytes': source_bytes,
+        'bundle_bytes': position + len(index)
+    }
+    logger.info(f"Compiled content bundle {output}: {summary}")
+    return summary
+
+
+class ContentBundle:
+    """Read-only, memory-mapped view of a compiled content bundle."""
+
+    def __init__(self, path: PathLike, data_dir: PathLike = CONTENT_DATA_DIR):
+        """
+        Open a bundle.
+
+        Raises:
+            ContentBundleError: If the file is not a bundle of a supported format
+        """
+        self.path = Path(path)
+        self.data_dir = Path(data_dir).resolve()
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, format_version, _, index_offset, index_length = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or format_version != FORMAT_VERSION:
+                raise ValueError(f"not a content bundle of format {FORMAT_VERSION}")
+            index = json.loads(self._map[index_offset:index_offset + index_length])
+        except (struct.error, ValueError) as e:
+            self._map.close()
+            raise ContentBundleError(f"Cannot read content bundle {self.path}: {e}")
+
+        self.content_version: str = index['content_version']
+        self.built_at: str = index['built_at']
+        self._entries: Dict[str, List[int]] = index['entries']
+        self._keys = sorted(self._entries)
+        self._decoded: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.stale = self._find_stale()
+
+    def _find_stale(self) -> frozenset:
+        """Keys whose source changed or appeared since the bundle was compiled."""
+        stale = set()
+        current = dict(_source_files(self.data_dir))
+        for key, path in current.items():
+            entry = self._entries.get(key)
+            if entry is None:
+                stale.add(key)
+                continue
+            stat = path.stat()
+            if stat.st_size != entry[2] or stat.st_mtime_ns != entry[3]:
+                stale.add(key)
+        stale.update(key for key in self._entries if key not in current)
+        if stale:
+            logger.warning(f"Content bundle {self.path} is out of date for {len(stale)} files; "
+                           f"reading them from disk")
+        return frozenset(stale)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries and key not in self.stale
+
+    def is_current(self, key: str, stat: os.stat_result) -> bool:
+        """Whether the bundled copy of an entry matches the file's current stat."""
+        entry = self._entries.get(key)
+        return entry is not None and entry[2] == stat.st_size and entry[3] == stat.st_mtime_ns
+
+    def key_for(self, path: PathLike) -> Optional[str]:
+        """Bundle key of a file path; None if the path is outside the data directory."""
+        try:
+            return Path(os.path.abspath(path)).relative_to(self.data_dir).as_posix()
+        except ValueError:
+            return None
+
+    def raw(self, key: str) -> bytes:
+        """Encoded JSON of an entry."""
+        offset, length = self._entries[key][:2]
+        return self._map[offset:offset + length]
+
+    def decode(self, key: str) -> Any:
+        """Decode an entry into a new object."""
+        content_bundle_stats.record_decode()
+        return json.loads(self.raw(key))
+
+    def get(self, key: str) -> Any:
+        """Decoded entry shared by all callers (do not modify it)."""
+        document = self._decoded.get(key)
+        if document is None:
+            with self._lock:
+                document = self._decoded.get(key)
+                if document is None:
+                    document = self._decoded[key] = self.decode(key)
+        return document
+
+    def listdir(self, directory: str) -> List[str]:
+        """Keys of the JSON files directly inside a directory key."""
+        prefix = directory.rstrip('/') + '/' if directory not in ('', '.') else ''
+        keys = []
+        for key in self._keys[bisect_left(self._keys, prefix):]:
+            if not key.startswith(prefix):
+                break
+            if '/' not in key[len(prefix):]:
+                keys.append(key)
+        return keys
+
+    def close(self):
+        self._map.close()
+
+
+_bundle: Optional[ContentBundle] = None
+_bundle_loaded = False
+_bundle_lock = threading.Lock()
+
+
+def get_content_bundle() -> Optional[ContentBundle]:
+    """Get the process-wide bundle, opening it on first use; None if there is none."""
+    global _bundle, _bundle_loaded
+    if not _bundle_loaded:
+        with _bundle_lock:
+            if not _bundle_loaded:
+                started = datetime.now()
+                try:
+                    if os.path.exists(CONTENT_BUNDLE_PATH):
+                        _bundle = ContentBundle(CONTENT_BUNDLE_PATH, CONTENT_DATA_DIR)
+                        logger.info(f"Opened content bundle {_bundle.content_version} "
+                                    f"({len(_bundle)} entries)")
+                    else:
+                        logger.info(f"No content bundle at {CONTENT_BUNDLE_PATH}; reading content files")
+                except (OSError, ContentBundleError) as e:
+                    logger.error(f"Error opening content bundle: {e}")
+                    _bundle = None
+                content_bundle_stats.record_open((datetime.now() - started).total_seconds())
+                _bundle_loaded = True
+    return _bundle
+
+
+def set_content_bundle(bundle: Optional[ContentBundle]):
+    """Replace the process-wide bundle (None: read every file from disk)."""
+    global _bundle, _bundle_loaded
+    with _bundle_lock:
+        _bundle, _bundle_loaded = bundle, True
+
+
+def load_json(path: PathLike, shared: bool = False, stat: Optional[os.stat_result] = None) -> Any:
+    """
+    Load a JSON content file, from the bundle when it holds an up-to-date copy.
+
+    Args:
+        path: Path of the file
+        shared: Return the bundle's shared decoded document instead of a new
+            object (callers must not modify it)
+        stat: Current stat of the file; when given, the bundled copy is only
+            used if it matches (instead of the check made when it was opened)
+
+    Raises:
+        OSError, ValueError: As reading and parsing the file would
+    """
+    bundle = get_content_bundle()
+    if bundle is not None:
+        key = bundle.key_for(path)
+        if key is not None and (key in bundle if stat is None else bundle.is_current(key, stat)):
+            content_bundle_stats.record_read('bundle')
+            return bundle.get(key) if shared else bundle.decode(key)
+    content_bundle_stats.record_read('file')
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def list_json(directory: PathLike) -> List[Path]:
+    """Sorted paths of the JSON files directly inside a directory."""
+    directory = Path(directory)
+    bundle = get_content_bundle()
+    if bundle is not None and not bundle.stale:
+        key = bundle.key_for(directory)
+        if key is not None and not RUNTIME_DIRS.intersection(key.split('/')):
+            return [directory / k.rsplit('/', 1)[-1] for k in bundle.listdir(key)]
+    if not directory.is_dir():
+        return []
+    return sorted(directory.glob('*.json'))
+
+
+def get_content_bundle_stats() -> Dict[str, Any]:
+    """Get content bundle metrics."""
+    snapshot = content_bundle_stats.snapshot()
+    bundle = _bundle
+    snapshot['entries'] = len(bundle) if bundle is not None else 0
+    snapshot['stale'] = len(bundle.stale) if bundle is not None else 0
+    snapshot['decoded'] = len(bundle._decoded) if bundle is not None else 0
+    return snapshot
+
+
+if __name__ == '__main__':
+    try:
+        print(compile_bundle(*sys.argv[1:3]))
+    except ContentBundleError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
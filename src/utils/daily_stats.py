@@ -0,0 +1,427 @@
+"""
+Daily player stats snapshots for the daily digest.
+
+At day rollover the scheduler worker scans the players table once and stores
+one compact metrics vector per player (exp, level, TUSD, reputation), labelled
+with the day that just ended. Snapshots are columnar: IDs, names and clubs as
+JSON, the metrics as one int64 matrix, both zlib-compressed and split into
+items of SNAPSHOT_PART_SIZE players so they fit DynamoDB's item size limit:
+
+    PK = DAILY_STATS    SK = 2026-10-17#000, 2026-10-17#001, ...
+
+Day-over-day gains come from diffing two snapshots as matrices: the previous
+snapshot is aligned to the current player order and subtracted, and the
+rankings ("biggest gainers", "most active", club movement) are argsorts and
+grouped sums over the difference. The digest therefore reads two stored
+snapshots instead of scanning the players table. Without the previous day's
+snapshot there is no baseline, so the digest has no day-over-day rankings.
+
+numpy is imported on first use: this module is loaded at startup through the
+events manager, long before the first capture or digest.
+"""
+
+import json
+import zlib
+import asyncio
+import functools
+import importlib
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from utils.logging_config import get_logger
+from utils.ttl_cache import TTLCache
+
+logger = get_logger('tokugawa_bot.daily_stats')
+
+# Columns of the metrics matrix
+METRICS = ('exp', 'level', 'tusd', 'reputation')
+
+# Values of a player that did not exist in the previous snapshot
+STARTING_VALUES = {'exp': 0, 'level': 1, 'tusd': 0, 'reputation': 0}
+
+# Players per stored item (keeps compressed parts far below 400 KB)
+SNAPSHOT_PART_SIZE = 5000
+
+SNAPSHOT_PK = 'DAILY_STATS'
+
+# Rows in each digest ranking
+DIGEST_SIZE = 5
+
+
+def _number(value) -> int:
+    if isinstance(value, Decimal):
+        return int(value)
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    """Import numpy on first use."""
+    import numpy as np
+    return np
+
+
+def _binary(value) -> bytes:
+    # boto3 returns Binary attributes wrapped in boto3.dynamodb.types.Binary
+    return bytes(getattr(value, 'value', value))
+
+
+class DailyStatsSnapshot:
+    """Metrics of every player at the end of one day."""
+
+    def __init__(self, day: str, ids: List[str], names: List[str], clubs: List[Optional[str]],
+                 values: 'np.ndarray'):
+        np = _numpy()
+        self.day = day
+        self.ids = ids
+        self.names = names
+        self.clubs = clubs
+        self.values = values.reshape(len(ids), len(METRICS)).astype(np.int64, copy=False)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_players(cls, day: str, players: List[Dict[str, Any]]) -> 'DailyStatsSnapshot':
+        """Build a snapshot from player items (PK=PLAYER#<id>)."""
+        np = _numpy()
+        players = [p for p in players if str(p.get('PK', '')).startswith('PLAYER#')]
+        return cls(
+            day,
+            [p['PK'].split('#', 1)[1] for p in players],
+            [p.get('name') or 'Desconhecido' for p in players],
+            [str(p['club_id']) if p.get('club_id') else None for p in players],
+            np.array([[_number(p.get(metric, STARTING_VALUES[metric])) for metric in METRICS]
+                      for p in players], dtype=np.int64)
+        )
+
+    def to_items(self, part_size: int = SNAPSHOT_PART_SIZE) -> List[Dict[str, Any]]:
+        """Encode the snapshot as SystemFlags items."""
+        np = _numpy()
+        items = []
+        for part, start in enumerate(range(0, max(len(self), 1), part_size)):
+            end = start + part_size
+            columns = {'ids': self.ids[start:end], 'names': self.names[start:end],
+                       'clubs': self.clubs[start:end], 'metrics': list(METRICS)}
+            items.append({
+                'PK': SNAPSHOT_PK,
+                'SK': f'{self.day}#{part:03d}',
+                'type': 'daily_stats',
+                'columns': zlib.compress(json.dumps(columns, separators=(',', ':'),
+                                                    ensure_ascii=False).encode('utf-8')),
+                'values': zlib.compress(np.ascontiguousarray(self.values[start:end], dtype='<i8').tobytes()),
+                'captured_at': datetime.now().isoformat()
+            })
+        return items
+
+    @classmethod
+    def from_items(cls, day: str, items: List[Dict[str, Any]]) -> 'DailyStatsSnapshot':
+        """Decode a snapshot from its stored items."""
+        np = _numpy()
+        ids, names, clubs, blocks = [], [], [], []
+        for item in sorted(items, key=lambda item: item['SK']):
+            columns = json.loads(zlib.decompress(_binary(item['columns'])))
+            block = np.frombuffer(zlib.decompress(_binary(item['values'])), dtype='<i8')
+            block = block.reshape(len(columns['ids']), len(columns['metrics']))
+            # Snapshots written with other metrics are mapped onto the current columns
+            if columns['metrics'] != list(METRICS):
+                stored = {metric: index for index, metric in enumerate(columns['metrics'])}
+                block = np.stack([block[:, stored[metric]] if metric in stored
+                                  else np.full(len(block), STARTING_VALUES[metric])
+                                  for metric in METRICS], axis=1)
+            ids += columns['ids']
+            names += columns['names']
+            clubs += columns['clubs']
+            blocks.append(block)
+        values = np.concatenate(blocks) if blocks else np.zeros((0, len(METRICS)), dtype=np.int64)
+        return cls(day, ids, names, clubs, values)
+
+    def column(self, metric: str) -> 'np.ndarray':
+        return self.values[:, METRICS.index(metric)]
+
+    def top(self, metric: str = 'level', limit: int = DIGEST_SIZE) -> List[Dict[str, Any]]:
+        """Players with the highest value of a metric (ties broken by exp)."""
+        np = _numpy()
+        order = np.lexsort((-self.column('exp'), -self.column(metric)))[:limit]
+        return [self.row(int(i)) for i in order]
+
+    def row(self, index: int) -> Dict[str, Any]:
+        row = {'user_id': self.ids[index], 'name': self.names[index], 'club_id': self.clubs[index]}
+        row.update(zip(METRICS, (int(v) for v in self.values[index])))
+        return row
+
+
+def diff_snapshots(current: DailyStatsSnapshot, previous: Optional[DailyStatsSnapshot],
+                   limit: int = DIGEST_SIZE) -> Dict[str, Any]:
+    """
+    Compute the day's digest from two consecutive snapshots.
+
+    Args:
+        current: Snapshot at the end of the day
+        previous: Snapshot at the end of the day before (None if it was not captured)
+        limit: Rows per ranking
+
+    Returns:
+        Dictionary with 'gainers' (most exp gained), 'most_active' (most metrics
+        changed, then exp gained) and 'clubs' (reputation and exp gained per club,
+        with the change of the club's rank by total reputation). Without a
+        previous snapshot 'baseline' is False and the rankings are empty, since
+        every value would count as gained that day.
+    """
+    if previous is None or not len(previous):
+        return {
+            'day': current.day,
+            'baseline': False,
+            'players': len(current),
+            'new_players': None,
+            'gainers': [],
+            'most_active': [],
+            'clubs': []
+        }
+
+    np = _numpy()
+    baseline = np.array([STARTING_VALUES[metric] for metric in METRICS], dtype=np.int64)
+    aligned = np.tile(baseline, (len(current), 1))
+    previous_index = {user_id: i for i, user_id in enumerate(previous.ids)}
+    rows = np.fromiter((previous_index.get(user_id, -1) for user_id in current.ids),
+                       dtype=np.int64, count=len(current))
+    known = rows >= 0
+    aligned[known] = previous.values[rows[known]]
+    deltas = current.values - aligned
+
+    exp_gained = deltas[:, METRICS.index('exp')]
+    changed = np.count_nonzero(deltas, axis=1)
+
+    def rows_of(order, mask):
+        result = []
+        for i in order[mask[order]][:limit]:
+            row = current.row(int(i))
+            row['exp_gained'] = int(exp_gained[i])
+            row.update({f'{metric}_gained': int(deltas[i, m]) for m, metric in enumerate(METRICS) if metric != 'exp'})
+            row['metrics_changed'] = int(changed[i])
+            result.append(row)
+        return result
+
+    gainers = rows_of(np.argsort(-exp_gained, kind='stable'), exp_gained > 0)
+    most_active = rows_of(np.lexsort((-exp_gained, -changed)), changed > 0)
+
+    return {
+        'day': current.day,
+        'baseline': True,
+        'players': len(current),
+        'new_players': len(current) - int(known.sum()),
+        'gainers': gainers,
+        'most_active': most_active,
+        'clubs': club_movement(current, previous, deltas)[:limit]
+    }
+
+
+def _club_totals(snapshot: DailyStatsSnapshot, values: 'np.ndarray'):
+    """Per-club sums of a matrix whose rows follow the snapshot's players."""
+    np = _numpy()
+    in_club = np.array([club is not None for club in snapshot.clubs], dtype=bool)
+    clubs, groups = np.unique(np.array([c for c in snapshot.clubs if c is not None], dtype=object),
+                              return_inverse=True)
+    totals = np.zeros((len(clubs), values.shape[1]), dtype=np.int64)
+    np.add.at(totals, groups, values[in_club])
+    return [str(club) for club in clubs], totals, np.bincount(groups, minlength=len(clubs))
+
+
+def club_movement(current: DailyStatsSnapshot, previous: Optional[DailyStatsSnapshot],
+                  deltas: 'np.ndarray') -> List[Dict[str, Any]]:
+    """Clubs ordered by reputation gained, with their rank change by total reputation."""
+    if not any(current.clubs):
+        return []
+    np = _numpy()
+    reputation = METRICS.index('reputation')
+    clubs, gained, members = _club_totals(current, deltas)
+    _, totals, _ = _club_totals(current, current.values)
+
+    previous_rank = {}
+    if previous is not None and any(previous.clubs):
+        previous_clubs, previous_totals, _ = _club_totals(previous, previous.values)
+        for rank, i in enumerate(np.argsort(-previous_totals[:, reputation], kind='stable'), 1):
+            previous_rank[previous_clubs[i]] = rank
+    rank_of = {clubs[i]: rank for rank, i in enumerate(np.argsort(-totals[:, reputation], kind='stable'), 1)}
+
+    order = np.lexsort((-gained[:, METRICS.index('exp')], -gained[:, reputation]))
+    return [{
+        'club_id': clubs[i],
+        'members': int(members[i]),
+        'reputation_gained': int(gained[i, reputation]),
+        'exp_gained': int(gained[i, METRICS.index('exp')]),
+        'rank': rank_of[clubs[i]],
+        'rank_change': previous_rank[clubs[i]] - rank_of[clubs[i]] if clubs[i] in previous_rank else None
+    } for i in order]
+
+
+class DailyStatsStats:
+    """Thread-safe snapshot capture and digest counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.captures = 0
+            self.captured_players = 0
+            self.stored_bytes = 0
+            self.digests = 0
+            self.loads = {'cache': 0, 'dynamodb': 0, 'missing': 0}
+
+    def record_capture(self, players: int, stored_bytes: int):
+        with self._lock:
+            self.captures += 1
+            self.captured_players = players
+            self.stored_bytes += stored_bytes
+
+    def record_digest(self):
+        with self._lock:
+            self.digests += 1
+
+    def record_load(self, source: str):
+        with self._lock:
+            self.loads[source] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the current counters."""
+        with self._lock:
+            return {
+                'captures': self.captures,
+                'captured_players': self.captured_players,
+                'stored_bytes': self.stored_bytes,
+                'digests': self.digests,
+                'loads': dict(self.loads)
+            }
+
+
+class DailyStats:
+    """Captures daily stats snapshots and builds the daily digest from them."""
+
+    def __init__(self, table=None, players_table=None):
+        self.table = table
+        self.players_table = players_table
+        self.stats = DailyStatsStats()
+        self._cache = TTLCache(2 * 24 * 3600, 4)
+
+    def _resolve_tables(self):
+        if self.table is None or self.players_table is None:
+            db_provider = importlib.import_module('utils.persistence.db_provider').db_provider
+            self.table = self.table or db_provider.SYSTEM_FLAGS_TABLE
+            self.players_table = self.players_table or db_provider.PLAYERS_TABLE
+
+    def _scan_players(self) -> List[Dict[str, Any]]:
+        self._resolve_tables()
+        kwargs = {
+            'ProjectionExpression': 'PK, #name, club_id, exp, #level, tusd, reputation',
+            'ExpressionAttributeNames': {'#name': 'name', '#level': 'level'}
+        }
+        players = []
+        while True:
+            response = self.players_table.scan(**kwargs)
+            players.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return players
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def _store(self, snapshot: DailyStatsSnapshot) -> int:
+        """Write the snapshot items (runs in a thread); returns the bytes stored."""
+        stored = 0
+        for item in snapshot.to_items():
+            try:
+                self.table.put_item(Item=item, ConditionExpression='attribute_not_exists(PK)')
+            except Exception as e:
+                if getattr(e, 'response', {}).get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                    continue
+                raise
+            stored += len(item['columns']) + len(item['values'])
+        return stored
+
+    def _query(self, day: str) -> List[Dict[str, Any]]:
+        from boto3.dynamodb.conditions import Key
+
+        self._resolve_tables()
+        kwargs = {'KeyConditionExpression': Key('PK').eq(SNAPSHOT_PK) & Key('SK').begins_with(f'{day}#')}
+        items = []
+        while True:
+            response = self.table.query(**kwargs)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return items
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    async def capture(self, now: Optional[datetime] = None) -> Optional[DailyStatsSnapshot]:
+        """
+        Snapshot every player's metrics as the end of the day that just ended.
+
+        Returns:
+            The snapshot, or None on error
+        """
+        now = now or datetime.now()
+        day = (now - timedelta(minutes=1)).date().isoformat()
+        try:
+            players = await asyncio.to_thread(self._scan_players)
+            snapshot = DailyStatsSnapshot.from_players(day, players)
+            stored = await asyncio.to_thread(self._store, snapshot)
+            self._cache.set(day, snapshot)
+            self.stats.record_capture(len(snapshot), stored)
+            logger.info(f"Captured daily stats of {len(snapshot)} players for {day} ({stored} bytes)")
+            return snapshot
+        except Exception as e:
+            logger.error(f"Error capturing daily stats snapshot: {e}")
+            return None
+
+    async def load(self, day: str) -> Optional[DailyStatsSnapshot]:
+        """Get the snapshot of a day; None if it was not captured."""
+        snapshot = self._cache.get(day)
+        if snapshot is not None:
+            self.stats.record_load('cache')
+            return snapshot
+        try:
+            items = await asyncio.to_thread(self._query, day)
+        except Exception as e:
+            logger.error(f"Error loading daily stats snapshot {day}: {e}")
+            return None
+        if not items:
+            self.stats.record_load('missing')
+            return None
+        self.stats.record_load('dynamodb')
+        snapshot = DailyStatsSnapshot.from_items(day, items)
+        self._cache.set(day, snapshot)
+        return snapshot
+
+    async def digest(self, day: Optional[str] = None, limit: int = DIGEST_SIZE) -> Optional[Dict[str, Any]]:
+        """
+        Digest of a day (default: yesterday) from its snapshot and the one before.
+
+        Returns:
+            The digest (see diff_snapshots) plus 'top' (highest levels), or None
+            if the day has no snapshot
+        """
+        day = day or (date.today() - timedelta(days=1)).isoformat()
+        current = await self.load(day)
+        if current is None:
+            return None
+        previous = await self.load((date.fromisoformat(day) - timedelta(days=1)).isoformat())
+        digest = diff_snapshots(current, previous, limit)
+        digest['top'] = current.top('level', limit)
+        self.stats.record_digest()
+        return digest
+
+
+daily_stats = DailyStats()
+
+
+def get_daily_stats_stats() -> Dict[str, Any]:
+    """Get daily stats snapshot metrics."""
+    return daily_stats.stats.snapshot()
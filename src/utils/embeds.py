@@ -493,8 +493,16 @@ def create_progress_bar(percentage, length=10):
     bar = "█" * filled + "░" * (length - filled)
     return bar
 
-async def create_leaderboard_embed(players, title="Ranking da Academia Tokugawa"):
-    """Create an embed displaying a leaderboard of players."""
+async def create_leaderboard_embed(players, title="Ranking da Academia Tokugawa", club_names=None, start_rank=1):
+    """
+    Create an embed displaying a leaderboard of players.
+
+    Args:
+        players: Players in ranking order
+        title: Embed title
+        club_names: str(club_id) -> name; resolved in one batch when not given
+        start_rank: Rank of the first player (for later pages)
+    """
     embed = discord.Embed(
         title=title,
         color=0xFFD700,  # Gold
@@ -505,26 +513,21 @@ async def create_leaderboard_embed(players, title="Ranking da Academia Tokugawa"
         embed.description = "Nenhum jogador encontrado."
         return embed
 
-    # Import here to avoid circular imports
-    from utils.persistence.db_provider import db_provider
+    if club_names is None:
+        # Import here to avoid circular imports
+        from utils.leaderboard import club_directory
+        club_names = await club_directory.names(
+            player.get('club_id') for player in players if not player.get('club_name'))
 
     # Create leaderboard text
     leaderboard_text = ""
-    for i, player in enumerate(players, 1):
+    for i, player in enumerate(players, start_rank):
         medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
 
-        # Get club name based on club_id
+        # Get club name based on club_id, preferring the name stored with the player
         club_name = 'Sem clube'
         if player.get('club_id'):
-            # Try to get club name from player data first
-            if player.get('club_name'):
-                club_name = player.get('club_name')
-            # Otherwise fetch it from the database
-            else:
-                # Use the async method directly from db_provider
-                club = await db_provider.get_club(str(player.get('club_id')))
-                if club and club.get('name'):
-                    club_name = club.get('name')
+            club_name = player.get('club_name') or club_names.get(str(player.get('club_id')), club_name)
 
         leaderboard_text += f"{medal} **{player.get('name', 'Desconhecido')}** | {club_name} | Nível: {player.get('level', 1)}\n"
 
@@ -0,0 +1,314 @@
+"""
+Deadline guard for application command interactions.
+
+Discord only accepts the initial response to an interaction within 3 seconds
+of its creation. The guard attaches to every slash command before it runs,
+tracks the interaction's age and defers it automatically when the command is
+projected to miss the budget (from its recent durations) or when the budget is
+about to run out. Responses sent after an automatic deferral are routed through
+the interaction followup, so cogs can keep calling
+``interaction.response.send_message``.
+
+Per-command counters of deferrals and expired interactions are available with
+get_interaction_deadline_stats().
+
+The automatic defer is ephemeral, so replies meant for the user alone stay
+private; commands whose replies are public opt out with ``defer_ephemeral``.
+Commands that call ``interaction.response.defer()`` themselves opt out of the
+guard with ``auto_defer``, so their own defer keeps its visibility.
+
+Commands can tune the guard through their ``extras``:
+
+    @app_commands.command(name="...", extras={"auto_defer": False})   # commands that defer or send modals
+    @app_commands.command(name="...", extras={"defer_ephemeral": False})   # public replies
+"""
+
+import os
+import time
+import asyncio
+import threading
+from typing import Any, Dict, Optional
+
+import discord
+from discord import app_commands
+
+from utils.logging_config import get_logger
+from utils.metrics import start_interaction_trace
+
+logger = get_logger('tokugawa_bot.interaction_guard')
+
+# Discord acknowledgement deadline for interactions (seconds)
+DISCORD_ACK_DEADLINE = 3.0
+
+# Time after the interaction's creation at which the guard defers (leaves room for the HTTP call)
+DEFER_BUDGET = float(os.environ.get('INTERACTION_DEFER_BUDGET', '2.0'))
+
+# Smoothing factor of the per-command duration estimate
+DURATION_EWMA_ALPHA = 0.2
+
+# Discord error code for unknown (expired) interactions
+UNKNOWN_INTERACTION = 10062
+
+# Command extras understood by the guard
+EXTRA_AUTO_DEFER = 'auto_defer'
+EXTRA_DEFER_EPHEMERAL = 'defer_ephemeral'
+
+# Key of the guard in Interaction.extras
+GUARD_KEY = 'deadline_guard'
+
+# Keyword arguments of InteractionResponse.send_message not accepted by followup.send
+FOLLOWUP_UNSUPPORTED = ('delete_after',)
+
+
+def is_unknown_interaction(error: BaseException) -> bool:
+    """Check if an error is Discord's 10062 "Unknown interaction"."""
+    return isinstance(error, discord.NotFound) and getattr(error, 'code', None) == UNKNOWN_INTERACTION
+
+
+class InteractionDeadlineStats:
+    """Thread-safe per-command counters of deferred and expired interactions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.by_command: Dict[str, Dict[str, Any]] = {}
+
+    def _command(self, command: str) -> Dict[str, Any]:
+        return self.by_command.setdefault(command, {
+            'invocations': 0,
+            'completed': 0,
+            'failed': 0,
+            'deferred_projected': 0,
+            'deferred_deadline': 0,
+            'expired': 0,
+            'max_dispatch_age': 0.0,
+            'avg_duration': None
+        })
+
+    def record_start(self, command: str, dispatch_age: float):
+        """Record a new invocation and how old the interaction was when it reached the bot."""
+        with self._lock:
+            stats = self._command(command)
+            stats['invocations'] += 1
+            stats['max_dispatch_age'] = max(stats['max_dispatch_age'], round(dispatch_age, 3))
+
+    def record_deferral(self, command: str, reason: str):
+        """Record an automatic deferral ('projected' or 'deadline')."""
+        with self._lock:
+            self._command(command)[f'deferred_{reason}'] += 1
+
+    def record_expired(self, command: str):
+        """Record an interaction that expired before it was acknowledged."""
+        with self._lock:
+            self._command(command)['expired'] += 1
+
+    def record_finish(self, command: str, duration: float, failed: bool = False):
+        """Record the end of an invocation and update the duration estimate."""
+        with self._lock:
+            stats = self._command(command)
+            stats['failed' if failed else 'completed'] += 1
+            previous = stats['avg_duration']
+            stats['avg_duration'] = duration if previous is None else (
+                DURATION_EWMA_ALPHA * duration + (1 - DURATION_EWMA_ALPHA) * previous
+            )
+
+    def projected_duration(self, command: str) -> float:
+        """Expected duration of a command, or 0 if it has never run."""
+        with self._lock:
+            stats = self.by_command.get(command)
+            return (stats or {}).get('avg_duration') or 0.0
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return a copy of the current counters with deferral and expiry rates."""
+        with self._lock:
+            result = {}
+            for command, stats in self.by_command.items():
+                invocations = stats['invocations'] or 1
+                deferred = stats['deferred_projected'] + stats['deferred_deadline']
+                result[command] = dict(
+                    stats,
+                    avg_duration=round(stats['avg_duration'] or 0.0, 3),
+                    deferral_rate=round(deferred / invocations, 4),
+                    expiry_rate=round(stats['expired'] / invocations, 4)
+                )
+            return result
+
+
+deadline_stats = InteractionDeadlineStats()
+
+
+class GuardedInteractionResponse(discord.InteractionResponse):
+    """InteractionResponse that routes responses through the followup once the guard deferred."""
+
+    __slots__ = ('_guard',)
+
+    def __init__(self, parent: discord.Interaction, guard: 'InteractionDeadline'):
+        super().__init__(parent)
+        self._guard = guard
+
+    async def defer(self, **kwargs) -> None:
+        async with self._guard.lock:
+            # The guard already acknowledged the interaction on the command's behalf
+            if self._guard.auto_deferred:
+                return
+            try:
+                await super().defer(**kwargs)
+            except discord.NotFound as e:
+                if is_unknown_interaction(e):
+                    self._guard.mark_expired()
+                raise
+
+    async def send_message(self, content: Optional[Any] = None, **kwargs) -> None:
+        async with self._guard.lock:
+            if self._guard.auto_deferred:
+                for name in FOLLOWUP_UNSUPPORTED:
+                    kwargs.pop(name, None)
+                await self._parent.followup.send(content, **kwargs)
+                return
+            try:
+                await super().send_message(content, **kwargs)
+            except discord.NotFound as e:
+                if is_unknown_interaction(e):
+                    self._guard.mark_expired()
+                raise
+
+
+class InteractionDeadline:
+    """Deadline tracking for a single interaction."""
+
+    def __init__(self, interaction: discord.Interaction, command: str, budget: float = DEFER_BUDGET,
+                 stats: InteractionDeadlineStats = deadline_stats):
+        self.interaction = interaction
+        self.command = command
+        self.budget = budget
+        self.stats = stats
+        self.lock = asyncio.Lock()
+        self.auto_deferred = False
+        self.expired = False
+        self.finished = False
+        self.started = time.monotonic()
+        self.dispatch_age = max(0.0, (discord.utils.utcnow() - interaction.created_at).total_seconds())
+        self.ephemeral = bool(self._extra(EXTRA_DEFER_EPHEMERAL, True))
+
+        existing = getattr(interaction, '_cs_response', None)
+        self.response = GuardedInteractionResponse(interaction, self)
+        if isinstance(existing, discord.InteractionResponse):
+            self.response._response_type = existing._response_type
+        interaction._cs_response = self.response
+        self._watchdog: Optional[asyncio.Task] = None
+
+    def _extra(self, name: str, default: Any) -> Any:
+        command = self.interaction.command
+        extras = getattr(command, 'extras', None) or {}
+        return extras.get(name, default)
+
+    @property
+    def age(self) -> float:
+        """Seconds since Discord created the interaction."""
+        return self.dispatch_age + (time.monotonic() - self.started)
+
+    @property
+    def remaining(self) -> float:
+        """Seconds left before the guard must defer."""
+        return self.budget - self.age
+
+    async def start(self):
+        """Defer right away if the command is projected to miss the budget, otherwise arm the watchdog."""
+        self.stats.record_start(self.command, self.dispatch_age)
+        if not self._extra(EXTRA_AUTO_DEFER, True):
+            return
+        if self.age + self.stats.projected_duration(self.command) > self.budget:
+            await self.defer('projected')
+        else:
+            self._watchdog = asyncio.create_task(self._watch())
+
+    async def _watch(self):
+        await asyncio.sleep(max(0.0, self.remaining))
+        await self.defer('deadline')
+
+    async def defer(self, reason: str):
+        """Acknowledge the interaction unless the command already responded."""
+        async with self.lock:
+            if self.response.is_done() or self.expired:
+                return
+            try:
+                await discord.InteractionResponse.defer(self.response, thinking=True, ephemeral=self.ephemeral)
+            except discord.NotFound as e:
+                if is_unknown_interaction(e):
+                    self.mark_expired()
+                return
+            except discord.HTTPException as e:
+                logger.warning(f"Could not defer /{self.command}: {e}")
+                return
+            self.auto_deferred = True
+            self.stats.record_deferral(self.command, reason)
+            logger.debug(f"Deferred /{self.command} ({reason}) at {self.age:.2f}s")
+
+    def mark_expired(self):
+        """Record that the interaction expired (counted once per interaction)."""
+        if not self.expired:
+            self.expired = True
+            self.stats.record_expired(self.command)
+            logger.warning(f"Interaction for /{self.command} expired after {self.age:.2f}s")
+
+    def finish(self, failed: bool = False):
+        """Stop the watchdog and record the command's duration."""
+        if self.finished:
+            return
+        self.finished = True
+        if self._watchdog and not self._watchdog.done():
+            self._watchdog.cancel()
+        self.stats.record_finish(self.command, time.monotonic() - self.started, failed=failed)
+
+
+def _command_name(interaction: discord.Interaction) -> str:
+    command = interaction.command
+    return getattr(command, 'qualified_name', None) or getattr(command, 'name', None) or 'unknown'
+
+
+async def attach_deadline_guard(interaction: discord.Interaction,
+                                budget: float = DEFER_BUDGET) -> InteractionDeadline:
+    """Attach a deadline guard to an interaction and start tracking it."""
+    guard = InteractionDeadline(interaction, _command_name(interaction), budget=budget)
+    interaction.extras[GUARD_KEY] = guard
+    await guard.start()
+    return guard
+
+
+def get_deadline_guard(interaction: discord.Interaction) -> Optional[InteractionDeadline]:
+    """Get the guard attached to an interaction, if any."""
+    extras = getattr(interaction, 'extras', None) or {}
+    return extras.get(GUARD_KEY)
+
+
+def finish_deadline_guard(interaction: discord.Interaction, error: Optional[BaseException] = None):
+    """Finish the guard of an interaction, recording expiry if the error was a 10062."""
+    guard = get_deadline_guard(interaction)
+    if guard is None:
+        return
+    original = getattr(error, 'original', error)
+    if original is not None and is_unknown_interaction(original):
+        guard.mark_expired()
+    guard.finish(failed=error is not None)
+
+
+def get_interaction_deadline_stats() -> Dict[str, Dict[str, Any]]:
+    """Get per-command deferral and expiry counters."""
+    return deadline_stats.snapshot()
+
+
+class GuardedCommandTree(app_commands.CommandTree):
+    """Command tree that traces and attaches a deadline guard to every application command."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        try:
+            start_interaction_trace(interaction)
+            await attach_deadline_guard(interaction)
+        except Exception as e:
+            # The guard must never block a command
+            logger.error(f"Error attaching deadline guard: {e}")
+        return True
@@ -0,0 +1,252 @@
+"""
+Central router for component and modal interactions.
+
+Buttons carry everything their handler needs in a stateless custom_id of the
+form ``<namespace>:<action>:<arg>...`` (for example
+``story:choice:<user_id>:<chapter_id>:<index>``). A single listener decodes the
+custom_id and dispatches on ``<namespace>:<action>`` through a dict, so no
+View objects or closures have to stay in memory while a choice is pending, and
+buttons keep working after a restart.
+
+    class StoryModeCog(commands.Cog):
+        def cog_load(self):
+            interaction_router.add_cog(self)
+
+        @route('story', 'choice')
+        async def on_story_choice(self, interaction, user_id, chapter_id, index): ...
+
+    view = component_view(discord.ui.Button(
+        label="Opção 1", custom_id=encode_custom_id('story', 'choice', user_id, chapter_id, 0)))
+
+Custom IDs posted before the router existed can be kept working with
+legacy_route(prefix), whose handler receives the rest of the custom_id.
+"""
+
+import time
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import discord
+
+from utils.logging_config import get_logger
+
+logger = get_logger('tokugawa_bot.interaction_router')
+
+SEPARATOR = ':'
+
+# Discord rejects component custom_ids longer than this
+MAX_CUSTOM_ID_LENGTH = 100
+
+# Attribute set by route/legacy_route on the handlers of a cog
+ROUTES_ATTR = '__interaction_routes__'
+
+ROUTED_TYPES = (discord.InteractionType.component, discord.InteractionType.modal_submit)
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+class RouterStats:
+    """Thread-safe per-route dispatch counters and handler durations."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.by_route: Dict[str, Dict[str, Any]] = {}
+            self.unrouted = 0
+
+    def _route(self, name: str) -> Dict[str, Any]:
+        return self.by_route.setdefault(name, {
+            'dispatched': 0,
+            'errors': 0,
+            'duration_seconds': 0.0
+        })
+
+    def record(self, name: str, duration: float, error: bool = False):
+        with self._lock:
+            stats = self._route(name)
+            stats['dispatched'] += 1
+            stats['duration_seconds'] += duration
+            if error:
+                stats['errors'] += 1
+
+    def record_unrouted(self):
+        with self._lock:
+            self.unrouted += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the current counters."""
+        with self._lock:
+            return {
+                'routes': {name: dict(stats) for name, stats in self.by_route.items()},
+                'unrouted': self.unrouted
+            }
+
+
+def encode_custom_id(namespace: str, action: str, *args: Any) -> str:
+    """
+    Build a routed custom_id.
+
+    Raises:
+        ValueError: If a part contains the separator or the result is too long
+    """
+    parts = [namespace, action] + ['' if arg is None else str(arg) for arg in args]
+    if any(SEPARATOR in part for part in parts):
+        raise ValueError(f"custom_id parts cannot contain '{SEPARATOR}': {parts}")
+    custom_id = SEPARATOR.join(parts)
+    if len(custom_id) > MAX_CUSTOM_ID_LENGTH:
+        raise ValueError(f"custom_id longer than {MAX_CUSTOM_ID_LENGTH} characters: {custom_id}")
+    return custom_id
+
+
+def decode_custom_id(custom_id: str) -> Optional[Tuple[str, List[str]]]:
+    """Split a routed custom_id into ('namespace:action', args); None if it is not routed."""
+    parts = custom_id.split(SEPARATOR)
+    if len(parts) < 2:
+        return None
+    return f'{parts[0]}{SEPARATOR}{parts[1]}', parts[2:]
+
+
+def _mark(func, entry: Tuple[str, str]):
+    routes = getattr(func, ROUTES_ATTR, None)
+    if routes is None:
+        routes = []
+        setattr(func, ROUTES_ATTR, routes)
+    routes.append(entry)
+    return func
+
+
+def route(namespace: str, action: str):
+    """Mark a cog method as the handler of custom_ids '<namespace>:<action>:...'."""
+    def decorator(func):
+        return _mark(func, ('route', f'{namespace}{SEPARATOR}{action}'))
+    return decorator
+
+
+def legacy_route(prefix: str):
+    """Mark a cog method as the handler of old custom_ids starting with prefix."""
+    def decorator(func):
+        return _mark(func, ('prefix', prefix))
+    return decorator
+
+
+def component_view(*items: discord.ui.Item) -> discord.ui.View:
+    """
+    Build a View that only renders routed components.
+
+    The view is stopped before it is sent, so discord.py does not keep it in
+    its view store; clicks reach their handler through the router.
+    """
+    view = discord.ui.View(timeout=None)
+    for item in items:
+        view.add_item(item)
+    view.stop()
+    return view
+
+
+class InteractionRouter:
+    """Dispatch table from custom_id routes to handlers."""
+
+    def __init__(self):
+        self.stats = RouterStats()
+        self._routes: Dict[str, Handler] = {}
+        self._prefixes: List[Tuple[str, Handler]] = []
+
+    @property
+    def routes(self) -> List[str]:
+        return sorted(self._routes) + [prefix for prefix, _ in self._prefixes]
+
+    def add(self, name: str, handler: Handler):
+        """Register the handler of a 'namespace:action' route."""
+        if name in self._routes:
+            logger.warning(f"Replacing handler of interaction route {name}")
+        self._routes[name] = handler
+
+    def add_prefix(self, prefix: str, handler: Handler):
+        """Register the handler of unrouted custom_ids starting with prefix."""
+        self._prefixes = [(p, h) for p, h in self._prefixes if p != prefix] + [(prefix, handler)]
+
+    def remove(self, name: str):
+        """Remove a route or legacy prefix."""
+        self._routes.pop(name, None)
+        self._prefixes = [(p, h) for p, h in self._prefixes if p != name]
+
+    def _cog_routes(self, cog):
+        for attr in dir(type(cog)):
+            entries = getattr(getattr(type(cog), attr, None), ROUTES_ATTR, None)
+            if entries:
+                yield attr, entries
+
+    def add_cog(self, cog):
+        """Register every route and legacy_route method of a cog."""
+        for attr, entries in self._cog_routes(cog):
+            handler = getattr(cog, attr)
+            for kind, name in entries:
+                if kind == 'route':
+                    self.add(name, handler)
+                else:
+                    self.add_prefix(name, handler)
+
+    def remove_cog(self, cog):
+        """Remove the routes registered by add_cog."""
+        for _, entries in self._cog_routes(cog):
+            for _, name in entries:
+                self.remove(name)
+
+    def resolve(self, custom_id: str) -> Optional[Tuple[str, Handler, List[str]]]:
+        """Find the handler of a custom_id; returns (route, handler, args) or None."""
+        decoded = decode_custom_id(custom_id)
+        if decoded is not None:
+            handler = self._routes.get(decoded[0])
+            if handler is not None:
+                return decoded[0], handler, decoded[1]
+        for prefix, handler in self._prefixes:
+            if custom_id.startswith(prefix):
+                return prefix, handler, [custom_id[len(prefix):]]
+        return None
+
+    async def dispatch(self, interaction: discord.Interaction) -> bool:
+        """
+        Run the handler of a component or modal interaction.
+
+        Returns:
+            True if a handler was found for the custom_id
+        """
+        if interaction.type not in ROUTED_TYPES:
+            return False
+        custom_id = (interaction.data or {}).get('custom_id')
+        resolved = self.resolve(custom_id) if custom_id else None
+        if resolved is None:
+            # Components of live Views are handled by discord.py itself
+            self.stats.record_unrouted()
+            return False
+
+        name, handler, args = resolved
+        started = time.perf_counter()
+        try:
+            await handler(interaction, *args)
+        except Exception as e:
+            self.stats.record(name, time.perf_counter() - started, error=True)
+            logger.error(f"Error handling interaction {custom_id}: {e}")
+            try:
+                if not interaction.response.is_done():
+                    await interaction.response.send_message(
+                        "Ocorreu um erro ao processar sua interação. Por favor, tente novamente.",
+                        ephemeral=True
+                    )
+            except discord.HTTPException:
+                pass
+        else:
+            self.stats.record(name, time.perf_counter() - started)
+        return True
+
+
+interaction_router = InteractionRouter()
+
+
+def get_router_stats() -> Dict[str, Any]:
+    """Get per-route interaction dispatch metrics."""
+    return interaction_router.stats.snapshot()
@@ -0,0 +1,222 @@
+"""
+Leaderboard presentation without per-row lookups.
+
+Club names of a leaderboard come from a ClubDirectory: a TTL cache of club
+names backed by one BatchGetItem for every club not cached yet, instead of a
+get_club call per listed player.
+
+The rendered embed is memoized per (leaderboard type, page, page size, title)
+and tagged with the leaderboard data version. Writes that change a ranked
+field (level, exp, name, club or reputation) bump the version; repeated
+/ranking calls between such writes are served from memory without scanning
+the players table. Writes made by other cluster workers are not seen by the local
+version, so a memoized embed is also dropped after LEADERBOARD_MAX_AGE seconds.
+"""
+
+import os
+import time
+import asyncio
+import importlib
+import threading
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Tuple
+
+from utils.logging_config import get_logger
+from utils.ttl_cache import TTLCache
+
+logger = get_logger('tokugawa_bot.leaderboard')
+
+# Seconds a memoized leaderboard may be served (bounds staleness across workers)
+LEADERBOARD_MAX_AGE = float(os.environ.get('LEADERBOARD_MAX_AGE', '60'))
+
+# Seconds a club name is cached
+CLUB_DIRECTORY_TTL = float(os.environ.get('CLUB_DIRECTORY_TTL', '600'))
+
+# Player fields shown or ranked by a leaderboard
+RANKED_FIELDS = frozenset({'level', 'exp', 'name', 'club_id', 'reputation'})
+
+# DynamoDB limit of keys in a BatchGetItem request
+BATCH_GET_SIZE = 100
+
+NO_CLUB = 'Sem clube'
+
+
+class LeaderboardStats:
+    """Thread-safe leaderboard render, memo and club lookup counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.by_kind: Dict[str, Dict[str, int]] = {}
+            self.club_cache_hits = 0
+            self.club_reads = 0
+            self.club_batches = 0
+
+    def record(self, kind: str, memo_hit: bool):
+        with self._lock:
+            stats = self.by_kind.setdefault(kind, {'renders': 0, 'memo_hits': 0})
+            stats['memo_hits' if memo_hit else 'renders'] += 1
+
+    def record_clubs(self, hits: int, reads: int, batches: int):
+        with self._lock:
+            self.club_cache_hits += hits
+            self.club_reads += reads
+            self.club_batches += batches
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the current counters."""
+        with self._lock:
+            return {
+                'kinds': {kind: dict(stats) for kind, stats in self.by_kind.items()},
+                'club_cache_hits': self.club_cache_hits,
+                'club_reads': self.club_reads,
+                'club_batches': self.club_batches
+            }
+
+
+leaderboard_stats = LeaderboardStats()
+
+
+def _club_key(club_id) -> str:
+    return str(club_id)
+
+
+class ClubDirectory:
+    """Club ID -> name lookups with a TTL cache and batched reads."""
+
+    def __init__(self, ttl: float = CLUB_DIRECTORY_TTL, clubs_table=None, dynamodb=None):
+        self.cache = TTLCache(ttl)
+        self.clubs_table = clubs_table
+        self.dynamodb = dynamodb
+
+    def invalidate(self, club_id):
+        """Forget a club's name (after a rename)."""
+        self.cache.invalidate(_club_key(club_id))
+
+    def _batch_get(self, club_ids: List[str]) -> Tuple[Dict[str, str], int]:
+        """Read the names of several clubs (runs in a thread); returns (names, requests)."""
+        if self.clubs_table is None or self.dynamodb is None:
+            db_provider = importlib.import_module('utils.persistence.db_provider').db_provider
+            self.clubs_table = self.clubs_table or db_provider.CLUBS_TABLE
+            self.dynamodb = self.dynamodb or db_provider.dynamodb
+        table_name = self.clubs_table.name
+
+        names, requests = {}, 0
+        for start in range(0, len(club_ids), BATCH_GET_SIZE):
+            request = {table_name: {
+                'Keys': [{'PK': f'CLUB#{club_id}', 'SK': 'INFO'}
+                         for club_id in club_ids[start:start + BATCH_GET_SIZE]],
+                'ProjectionExpression': 'PK, #name',
+                'ExpressionAttributeNames': {'#name': 'name'}
+            }}
+            while request:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                requests += 1
+                for item in response.get('Responses', {}).get(table_name, []):
+                    names[item['PK'].split('#', 1)[1]] = item.get('name') or NO_CLUB
+                request = response.get('UnprocessedKeys') or None
+        return names, requests
+
+    async def names(self, club_ids: Iterable) -> Dict[str, str]:
+        """
+        Resolve club names, reading every uncached club in one batch.
+
+        Returns:
+            Dictionary of str(club_id) -> name; unknown clubs map to "Sem clube"
+        """
+        names, missing = {}, []
+        for club_id in dict.fromkeys(_club_key(c) for c in club_ids if c):
+            name = self.cache.get(club_id)
+            if name is None:
+                missing.append(club_id)
+            else:
+                names[club_id] = name
+
+        requests = 0
+        if missing:
+            try:
+                found, requests = await asyncio.to_thread(self._batch_get, missing)
+            except Exception as e:
+                logger.error(f"Error reading club names: {e}")
+                found = {}
+            for club_id in missing:
+                name = found.get(club_id, NO_CLUB)
+                # Failed reads are not cached so the next render retries
+                if club_id in found:
+                    self.cache.set(club_id, name)
+                names[club_id] = name
+        leaderboard_stats.record_clubs(len(names) - len(missing), len(missing), requests)
+        return names
+
+
+club_directory = ClubDirectory()
+
+
+class LeaderboardPresenter:
+    """Memoizes rendered leaderboard embeds per type, page, title and data version."""
+
+    def __init__(self, max_age: float = LEADERBOARD_MAX_AGE):
+        self.max_age = max_age
+        self.version = 0
+        self._memo: Dict[Tuple[str, int, int, str], Tuple[int, float, Any]] = {}
+
+    def invalidate(self):
+        """Mark every memoized leaderboard as outdated."""
+        self.version += 1
+
+    async def render(self, kind: str, load_players: Callable[[int], Awaitable[List[Dict[str, Any]]]],
+                     limit: int = 10, page: int = 1, title: str = "Ranking da Academia Tokugawa"):
+        """
+        Get the embed of a leaderboard page.
+
+        Args:
+            kind: Leaderboard type (part of the memo key)
+            load_players: Coroutine function returning the top players for a limit
+            limit: Rows per page
+            page: 1-based page number
+            title: Embed title (part of the memo key)
+
+        Returns:
+            A discord.Embed (a copy; callers may change it)
+        """
+        key = (kind, page, limit, title)
+        memo = self._memo.get(key)
+        now = time.monotonic()
+        if memo is not None and memo[0] == self.version and now - memo[1] < self.max_age:
+            leaderboard_stats.record(kind, memo_hit=True)
+            return memo[2].copy()
+
+        from utils.embeds import create_leaderboard_embed
+
+        version = self.version
+        players = (await load_players(limit * page))[limit * (page - 1):]
+        club_names = await club_directory.names(player.get('club_id') for player in players)
+        embed = await create_leaderboard_embed(players, title=title, club_names=club_names,
+                                               start_rank=limit * (page - 1) + 1)
+        self._memo[key] = (version, now, embed)
+        leaderboard_stats.record(kind, memo_hit=False)
+        return embed.copy()
+
+
+leaderboard_presenter = LeaderboardPresenter()
+
+
+def note_player_write(fields: Iterable[str]):
+    """Bump the leaderboard version if a write touched a ranked field."""
+    if RANKED_FIELDS.intersection(fields):
+        leaderboard_presenter.invalidate()
+
+
+async def render_leaderboard(kind: str, load_players, limit: int = 10, page: int = 1, **kwargs):
+    """Render a leaderboard page (see LeaderboardPresenter.render)."""
+    return await leaderboard_presenter.render(kind, load_players, limit, page, **kwargs)
+
+
+def get_leaderboard_stats() -> Dict[str, Any]:
+    """Get leaderboard memo and club lookup metrics."""
+    snapshot = leaderboard_stats.snapshot()
+    snapshot['version'] = leaderboard_presenter.version
+    return snapshot
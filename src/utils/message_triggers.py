@@ -0,0 +1,154 @@
+"""
+Precompiled message triggers.
+
+Listeners such as Junie's see every message in every guild, and almost none of
+them are addressed to the bot. Instead of lowercasing each message and testing
+phrases one by one, a TriggerMatcher compiles the keywords of all its triggers
+into a single case-insensitive pattern that rejects unrelated messages in one
+scan; only messages containing a keyword are checked against the phrase
+pattern of the matching trigger.
+
+    matcher = TriggerMatcher({'junie': (['junie'], ['o que devo', 'me ajuda'])})
+    matcher.match("Junie, me ajuda?")  # -> 'junie'
+
+Replies are kept per user in a TTLCache and ChannelRateLimiter caps
+how often a channel gets an automatic reply, so a burst of mentions costs
+neither DynamoDB reads nor Discord rate limit.
+"""
+
+import os
+import re
+import time
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Hashable, Iterable, Optional, Sequence, Tuple
+
+from utils.logging_config import get_logger
+
+logger = get_logger('tokugawa_bot.message_triggers')
+
+# Seconds a suggestion is reused for the same user
+SUGGESTION_TTL = float(os.environ.get('TRIGGER_SUGGESTION_TTL', '300'))
+
+# Automatic replies allowed per channel within CHANNEL_RATE_PERIOD seconds
+CHANNEL_RATE_LIMIT = int(os.environ.get('TRIGGER_CHANNEL_RATE_LIMIT', '3'))
+CHANNEL_RATE_PERIOD = float(os.environ.get('TRIGGER_CHANNEL_RATE_PERIOD', '30'))
+
+# Upper bound of channels tracked by a rate limiter
+MAX_ENTRIES = 10000
+
+
+def _alternation(words: Iterable[str]) -> str:
+    # Longest first so a phrase is never shadowed by one of its prefixes
+    unique = sorted(set(words), key=lambda word: (-len(word), word))
+    return '|'.join(re.escape(word) for word in unique)
+
+
+class TriggerStats:
+    """Thread-safe per-trigger match, cache and rate limit counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.scanned = 0
+            self.by_trigger: Dict[str, Dict[str, int]] = {}
+
+    def _trigger(self, name: str) -> Dict[str, int]:
+        return self.by_trigger.setdefault(name, {
+            'matched': 0,
+            'replied': 0,
+            'rate_limited': 0,
+            'cache_hits': 0,
+            'cache_misses': 0
+        })
+
+    def record_scan(self, matched: Optional[str]):
+        with self._lock:
+            self.scanned += 1
+            if matched is not None:
+                self._trigger(matched)['matched'] += 1
+
+    def record(self, trigger: str, event: str):
+        with self._lock:
+            self._trigger(trigger)[event] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the current counters."""
+        with self._lock:
+            return {
+                'scanned': self.scanned,
+                'triggers': {name: dict(stats) for name, stats in self.by_trigger.items()}
+            }
+
+
+trigger_stats = TriggerStats()
+
+
+class TriggerMatcher:
+    """Matches messages against a fixed set of keyword + phrase triggers."""
+
+    def __init__(self, triggers: Dict[str, Tuple[Sequence[str], Sequence[str]]]):
+        """
+        Compile the triggers.
+
+        Args:
+            triggers: Trigger name -> (keywords, phrases). A message matches a
+                trigger when it contains any of its keywords and any of its
+                phrases (case-insensitive, anywhere in the text); triggers
+                are tried in the given order
+        """
+        all_keywords = [keyword for keywords, _ in triggers.values() for keyword in keywords]
+        self._prefilter = re.compile(_alternation(all_keywords), re.IGNORECASE)
+        self._triggers = [
+            (name,
+             re.compile(_alternation(keywords), re.IGNORECASE),
+             re.compile(_alternation(phrases), re.IGNORECASE))
+            for name, (keywords, phrases) in triggers.items()
+        ]
+
+    def match(self, content: str) -> Optional[str]:
+        """Return the name of the first trigger the message matches, or None."""
+        matched = None
+        if content and self._prefilter.search(content):
+            for name, keywords, phrases in self._triggers:
+                if keywords.search(content) and phrases.search(content):
+                    matched = name
+                    break
+        trigger_stats.record_scan(matched)
+        return matched
+
+
+class ChannelRateLimiter:
+    """Sliding-window limit of automatic replies per channel."""
+
+    def __init__(self, limit: int = CHANNEL_RATE_LIMIT, period: float = CHANNEL_RATE_PERIOD,
+                 max_entries: int = MAX_ENTRIES):
+        self.limit = limit
+        self.period = period
+        self.max_entries = max_entries
+        self._windows: 'OrderedDict[Hashable, Deque[float]]' = OrderedDict()
+
+    def allow(self, channel_id: Hashable) -> bool:
+        """Consume one reply for the channel; False if its window is full."""
+        now = time.monotonic()
+        window = self._windows.get(channel_id)
+        if window is None:
+            window = self._windows[channel_id] = deque()
+        while window and window[0] <= now - self.period:
+            window.popleft()
+        self._windows.move_to_end(channel_id)
+        if len(window) >= self.limit:
+            return False
+        window.append(now)
+        while len(self._windows) > self.max_entries:
+            self._windows.popitem(last=False)
+        return True
+
+
+def get_trigger_stats() -> Dict[str, Any]:
+    """Get message trigger metrics."""
+    return trigger_stats.snapshot()
@@ -0,0 +1,516 @@
+"""
+Command latency and throughput metrics.
+
+Every slash and prefix command is traced from invocation to completion. While
+a command runs, time spent in DynamoDB (DBProvider calls and player sessions)
+and in the Discord API (REST and interaction webhooks) is attributed to the
+command's trace; the rest of the wall time is counted as compute time.
+
+The collected data is served in the Prometheus text format by MetricsServer
+on ``/metrics``, together with a ``/health`` readiness check for the ECS task.
+"""
+
+import os
+import time
+import functools
+import inspect
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web
+
+from utils.logging_config import get_logger
+
+logger = get_logger('tokugawa_bot.metrics')
+
+METRICS_HOST = os.environ.get('METRICS_HOST', '0.0.0.0')
+METRICS_PORT = int(os.environ.get('METRICS_PORT', '8080'))
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() != 'false'
+
+# Number of recent samples per command and phase used for the quantiles
+SAMPLE_WINDOW = int(os.environ.get('METRICS_SAMPLE_WINDOW', '1024'))
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Key of the trace in Interaction.extras
+TRACE_KEY = 'command_trace'
+
+
+class CommandTrace:
+    """Timing of a single command invocation, split by phase."""
+
+    def __init__(self, command: str, kind: str):
+        self.command = command
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.phases = {'db': 0.0, 'discord': 0.0}
+        self._depth = {'db': 0, 'discord': 0}
+        self._entered = {'db': 0.0, 'discord': 0.0}
+        self._lock = threading.Lock()
+        self.finished = False
+
+    def enter(self, phase: str):
+        with self._lock:
+            if self._depth[phase] == 0:
+                self._entered[phase] = time.perf_counter()
+            self._depth[phase] += 1
+
+    def exit(self, phase: str):
+        with self._lock:
+            self._depth[phase] -= 1
+            # Overlapping calls (e.g. gathered requests) count their union once
+            if self._depth[phase] == 0:
+                self.phases[phase] += time.perf_counter() - self._entered[phase]
+
+    def durations(self) -> Dict[str, float]:
+        total = time.perf_counter() - self.started
+        db, discord_time = self.phases['db'], self.phases['discord']
+        return {
+            'total': total,
+            'db': db,
+            'discord': discord_time,
+            'compute': max(0.0, total - db - discord_time)
+        }
+
+
+_current_trace: ContextVar[Optional[CommandTrace]] = ContextVar('command_trace', default=None)
+
+
+@contextmanager
+def phase_timer(phase: str):
+    """Attribute the time spent in the block to a phase of the current command."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    trace.enter(phase)
+    try:
+        yield
+    finally:
+        trace.exit(phase)
+
+
+def timed(phase: str):
+    """Decorator attributing the time of a coroutine function to a phase of the current command."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with phase_timer(phase):
+                return await func(*args, **kwargs)
+        wrapper.__metrics_phase__ = phase
+        return wrapper
+    return decorator
+
+
+def instrument_methods(cls, phase: str, exclude: Iterable[str] = ()):
+    """Wrap every public coroutine method of a class with ``timed(phase)``."""
+    exclude = set(exclude)
+    for name, member in list(vars(cls).items()):
+        if name.startswith('_') or name in exclude:
+            continue
+        if inspect.iscoroutinefunction(member) and not hasattr(member, '__metrics_phase__'):
+            setattr(cls, name, timed(phase)(member))
+    return cls
+
+
+class _Series:
+    """Cumulative count/sum and a window of recent samples."""
+
+    __slots__ = ('count', 'total', 'samples')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def quantiles(self) -> List[Tuple[float, float]]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return [(q, 0.0) for q in QUANTILES]
+        last = len(ordered) - 1
+        return [(q, ordered[min(last, int(round(q * last)))]) for q in QUANTILES]
+
+
+class CommandMetrics:
+    """Thread-safe per-command latency, concurrency and error metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.reset()
+
+    def reset(self):
+        """Reset all metrics."""
+        with self._lock:
+            self.latency: Dict[Tuple[str, str, str], _Series] = {}
+            self.invocations: Dict[Tuple[str, str], int] = {}
+            self.errors: Dict[Tuple[str, str], int] = {}
+            self.in_flight: Dict[Tuple[str, str], int] = {}
+            self.max_in_flight = 0
+
+    def start(self, command: str, kind: str) -> CommandTrace:
+        """Start tracing a command in the current task."""
+        trace = CommandTrace(command, kind)
+        _current_trace.set(trace)
+        key = (command, kind)
+        with self._lock:
+            self.invocations[key] = self.invocations.get(key, 0) + 1
+            self.in_flight[key] = self.in_flight.get(key, 0) + 1
+            self.max_in_flight = max(self.max_in_flight, sum(self.in_flight.values()))
+        return trace
+
+    def finish(self, trace: Optional[CommandTrace], failed: bool = False):
+        """Record a finished command (only once per trace)."""
+        if trace is None or trace.finished:
+            return
+        trace.finished = True
+        durations = trace.durations()
+        key = (trace.command, trace.kind)
+        with self._lock:
+            self.in_flight[key] = max(0, self.in_flight.get(key, 0) - 1)
+            if failed:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            for phase, value in durations.items():
+                self.latency.setdefault((trace.command, trace.kind, phase), _Series()).add(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the current metrics."""
+        with self._lock:
+            return {
+                'invocations': dict(self.invocations),
+                'errors': dict(self.errors),
+                'in_flight': dict(self.in_flight),
+                'max_in_flight': self.max_in_flight,
+                'latency': {
+                    key: {'count': series.count, 'sum': series.total, 'quantiles': series.quantiles()}
+                    for key, series in self.latency.items()
+                }
+            }
+
+
+command_metrics = CommandMetrics()
+
+
+# --- Command hooks ---
+def _interaction_command_name(interaction) -> str:
+    command = getattr(interaction, 'command', None)
+    return getattr(command, 'qualified_name', None) or getattr(command, 'name', None) or 'unknown'
+
+
+def start_interaction_trace(interaction) -> CommandTrace:
+    """Start tracing an application command; must run in the command's task."""
+    trace = command_metrics.start(_interaction_command_name(interaction), 'slash')
+    interaction.extras[TRACE_KEY] = trace
+    return trace
+
+
+def finish_interaction_trace(interaction, error: Optional[BaseException] = None):
+    """Finish the trace of an application command."""
+    extras = getattr(interaction, 'extras', None) or {}
+    command_metrics.finish(extras.get(TRACE_KEY), failed=error is not None)
+
+
+async def before_prefix_command(ctx):
+    """Bot-wide before_invoke hook for prefix commands."""
+    ctx.command_trace = command_metrics.start(ctx.command.qualified_name, 'prefix')
+
+
+async def after_prefix_command(ctx):
+    """Bot-wide after_invoke hook for prefix commands."""
+    command_metrics.finish(getattr(ctx, 'command_trace', None), failed=ctx.command_failed)
+
+
+_http_instrumented = False
+
+
+def instrument_discord_http(http_client):
+    """Attribute Discord REST and interaction webhook calls to the 'discord' phase."""
+    global _http_instrumented
+    original = http_client.request
+
+    async def request(*args, **kwargs):
+        with phase_timer('discord'):
+            return await original(*args, **kwargs)
+
+    http_client.request = request
+
+    # Interaction responses and followups go through the webhook adapter, not the HTTP client
+    if not _http_instrumented:
+        from discord.webhook.async_ import AsyncWebhookAdapter
+        AsyncWebhookAdapter.request = timed('discord')(AsyncWebhookAdapter.request)
+        _http_instrumented = True
+
+
+# --- Prometheus exposition ---
+def _labels(**labels) -> str:
+    parts = []
+    for name, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(bot=None) -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    snapshot = command_metrics.snapshot()
+    lines: List[str] = []
+
+    def metric(name: str, kind: str, help_text: str, samples: Iterable[Tuple[str, Any]]):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for sample in samples:
+            # Samples are (labels, value) or (suffix, labels, value) for summary _sum/_count
+            suffix, labels, value = sample if len(sample) == 3 else ('', *sample)
+            lines.append(f'{name}{suffix}{labels} {_format_value(value)}')
+
+    latency_samples = []
+    for (command, kind, phase), series in sorted(snapshot['latency'].items()):
+        for quantile, value in series['quantiles']:
+            latency_samples.append((_labels(command=command, kind=kind, phase=phase, quantile=quantile), value))
+        latency_samples.append(('_sum', _labels(command=command, kind=kind, phase=phase), series['sum']))
+        latency_samples.append(('_count', _labels(command=command, kind=kind, phase=phase), series['count']))
+    metric('tokugawa_command_latency_seconds', 'summary',
+           'Command latency by phase (total, db, discord, compute).', latency_samples)
+
+    metric('tokugawa_command_invocations_total', 'counter', 'Command invocations.',
+           [(_labels(command=c, kind=k), v) for (c, k), v in sorted(snapshot['invocations'].items())])
+    metric('tokugawa_command_errors_total', 'counter', 'Commands that finished with an error.',
+           [(_labels(command=c, kind=k), v) for (c, k), v in sorted(snapshot['errors'].items())])
+    metric('tokugawa_command_in_flight', 'gauge', 'Commands currently running.',
+           [(_labels(command=c, kind=k), v) for (c, k), v in sorted(snapshot['in_flight'].items())])
+    metric('tokugawa_command_max_in_flight', 'gauge', 'Highest number of concurrent commands observed.',
+           [('', snapshot['max_in_flight'])])
+
+    from utils.interaction_guard import get_interaction_deadline_stats
+    deadline = get_interaction_deadline_stats()
+    metric('tokugawa_interaction_deferrals_total', 'counter', 'Automatic interaction deferrals.',
+           [(_labels(command=c, reason=reason), stats[f'deferred_{reason}'])
+            for c, stats in sorted(deadline.items()) for reason in ('projected', 'deadline')])
+    metric('tokugawa_interaction_expired_total', 'counter', 'Interactions that expired before acknowledgement.',
+           [(_labels(command=c), stats['expired']) for c, stats in sorted(deadline.items())])
+
+    from utils.persistence.player_session import get_round_trip_stats
+    round_trips = get_round_trip_stats()
+    metric('tokugawa_dynamodb_requests_total', 'counter', 'DynamoDB requests issued by player sessions.',
+           [(_labels(command=c), stats['requests']) for c, stats in sorted(round_trips.items())])
+    metric('tokugawa_dynamodb_round_trips_total', 'counter', 'Sequential DynamoDB round-trips of player sessions.',
+           [(_labels(command=c), stats['stages']) for c, stats in sorted(round_trips.items())])
+
+    from utils.user_lanes import get_lane_stats
+    lanes = get_lane_stats()
+    handlers = sorted(lanes['handlers'].items())
+    metric('tokugawa_lane_acquisitions_total', 'counter', 'Per-user lane acquisitions.',
+           [(_labels(handler=h), stats['acquisitions']) for h, stats in handlers])
+    metric('tokugawa_lane_contended_total', 'counter', 'Lane acquisitions that had to wait for another handler.',
+           [(_labels(handler=h), stats['contended']) for h, stats in handlers])
+    metric('tokugawa_lane_timeouts_total', 'counter', 'Handlers that gave up waiting for their lane.',
+           [(_labels(handler=h), stats['timeouts']) for h, stats in handlers])
+    metric('tokugawa_lane_wait_seconds_sum', 'counter', 'Total time spent waiting for lanes.',
+           [(_labels(handler=h), round(stats['wait_seconds'], 6)) for h, stats in handlers])
+    metric('tokugawa_lane_wait_seconds_max', 'gauge', 'Longest wait for a lane.',
+           [(_labels(handler=h), round(stats['max_wait_seconds'], 6)) for h, stats in handlers])
+    metric('tokugawa_lanes_active', 'gauge', 'Per-user lanes currently allocated.',
+           [('', lanes['active_lanes'])])
+    metric('tokugawa_lanes_peak', 'gauge', 'Highest number of lanes allocated at once.',
+           [('', lanes['peak_lanes'])])
+
+    from utils.interaction_router import get_router_stats
+    router = get_router_stats()
+    routes = sorted(router['routes'].items())
+    metric('tokugawa_interaction_routes_total', 'counter', 'Component and modal interactions dispatched by route.',
+           [(_labels(route=name), stats['dispatched']) for name, stats in routes])
+    metric('tokugawa_interaction_route_errors_total', 'counter', 'Routed interaction handlers that raised.',
+           [(_labels(route=name), stats['errors']) for name, stats in routes])
+    metric('tokugawa_interaction_route_seconds_sum', 'counter', 'Total time spent in routed interaction handlers.',
+           [(_labels(route=name), round(stats['duration_seconds'], 6)) for name, stats in routes])
+    metric('tokugawa_interaction_unrouted_total', 'counter', 'Component interactions without a route.',
+           [('', router['unrouted'])])
+
+    from utils.message_triggers import get_trigger_stats
+    triggers = get_trigger_stats()
+    metric('tokugawa_trigger_messages_scanned_total', 'counter', 'Messages scanned by the trigger matchers.',
+           [('', triggers['scanned'])])
+    metric('tokugawa_trigger_events_total', 'counter', 'Message trigger matches, replies, cache and rate limit events.',
+           [(_labels(trigger=name, event=event), value)
+            for name, stats in sorted(triggers['triggers'].items()) for event, value in stats.items()])
+
+    from utils.name_resolver import get_name_resolver_stats
+    names = get_name_resolver_stats()
+    metric('tokugawa_name_resolutions_total', 'counter', 'Display names resolved by source.',
+           [(_labels(source=source), value) for source, value in names['sources'].items()])
+    metric('tokugawa_name_rest_failures_total', 'counter', 'REST user lookups that failed.',
+           [('', names['rest_failures'])])
+    metric('tokugawa_name_cache_entries', 'gauge', 'Display names currently cached.',
+           [('', names['cached'])])
+
+    from utils.leaderboard import get_leaderboard_stats
+    boards = get_leaderboard_stats()
+    metric('tokugawa_leaderboard_requests_total', 'counter', 'Leaderboard requests by type and memo result.',
+           [(_labels(kind=kind, result=result), stats[key])
+            for kind, stats in sorted(boards['kinds'].items())
+            for result, key in (('rendered', 'renders'), ('memoized', 'memo_hits'))])
+    metric('tokugawa_club_directory_lookups_total', 'counter', 'Club name lookups by source.',
+           [(_labels(source='cache'), boards['club_cache_hits']), (_labels(source='dynamodb'), boards['club_reads'])])
+    metric('tokugawa_club_directory_batches_total', 'counter', 'BatchGetItem requests for club names.',
+           [('', boards['club_batches'])])
+
+    from utils.ranking_history import get_ranking_history_stats
+    history = get_ranking_history_stats()
+    metric('tokugawa_ranking_snapshots_total', 'counter', 'Ranking snapshots stored by encoding.',
+           [(_labels(encoding=encoding), count) for encoding, count in history['captured'].items()])
+    metric('tokugawa_ranking_snapshot_bytes_total', 'counter', 'Stored snapshot size, encoded and as full copies.',
+           [(_labels(form='encoded'), history['encoded_bytes']), (_labels(form='full'), history['full_bytes'])])
+    metric('tokugawa_ranking_snapshot_loads_total', 'counter', 'Ranking snapshot reads by source.',
+           [(_labels(source=source), count) for source, count in history['loads'].items()])
+
+    from utils.daily_stats import get_daily_stats_stats
+    daily = get_daily_stats_stats()
+    metric('tokugawa_daily_stats_captures_total', 'counter', 'Daily stats snapshots captured.',
+           [('', daily['captures'])])
+    metric('tokugawa_daily_stats_players', 'gauge', 'Players in the last daily stats snapshot.',
+           [('', daily['captured_players'])])
+    metric('tokugawa_daily_stats_stored_bytes_total', 'counter', 'Compressed bytes of stored daily stats snapshots.',
+           [('', daily['stored_bytes'])])
+    metric('tokugawa_daily_stats_loads_total', 'counter', 'Daily stats snapshot reads by source.',
+           [(_labels(source=source), count) for source, count in daily['loads'].items()])
+    metric('tokugawa_daily_digests_total', 'counter', 'Daily digests computed from snapshots.',
+           [('', daily['digests'])])
+
+    from utils.content_bundle import get_content_bundle_stats
+    bundle = get_content_bundle_stats()
+    metric('tokugawa_content_reads_total', 'counter', 'Content documents read by source.',
+           [(_labels(source=source), count) for source, count in bundle['reads'].items()])
+    metric('tokugawa_content_bundle_decodes_total', 'counter', 'Content bundle entries decoded.',
+           [('', bundle['decodes'])])
+    metric('tokugawa_content_bundle_entries', 'gauge', 'Content bundle entries by state.',
+           [(_labels(state='total'), bundle['entries']), (_labels(state='stale'), bundle['stale']),
+            (_labels(state='decoded'), bundle['decoded'])])
+    metric('tokugawa_content_bundle_open_seconds', 'gauge', 'Time spent opening the content bundle.',
+           [('', round(bundle['open_seconds'], 6))])
+
+    from story_mode.chapter_cache import get_chapter_cache_stats
+    chapters = get_chapter_cache_stats()
+    metric('tokugawa_chapter_cache_requests_total', 'counter', 'Chapter loads by cache result.',
+           [(_labels(result=result), chapters[result]) for result in ('hits', 'misses')])
+    metric('tokugawa_chapter_cache_reloads_total', 'counter', 'Edited chapters by reload outcome.',
+           [(_labels(outcome='swapped'), chapters['reloads']), (_labels(outcome='rejected'), chapters['rejected'])])
+    metric('tokugawa_chapter_cache_evictions_total', 'counter', 'Chapters evicted from the cache.',
+           [('', chapters['evictions'])])
+    metric('tokugawa_chapter_cache_entries', 'gauge', 'Chapters currently cached.',
+           [('', chapters['cached'])])
+
+    from story_mode.requirement_index import get_requirement_index_stats
+    availability = get_requirement_index_stats()
+    metric('tokugawa_chapter_availability_queries_total', 'counter', 'Chapter availability queries.',
+           [('', availability['queries'])])
+    metric('tokugawa_chapter_availability_examined_total', 'counter',
+           'Chapters examined by availability queries (frontier and candidates).',
+           [('', availability['chapters_examined'])])
+    metric('tokugawa_chapter_requirement_index_builds_total', 'counter', 'Requirement index builds.',
+           [('', availability['builds'])])
+    metric('tokugawa_chapter_requirement_index_chapters', 'gauge', 'Chapters in the last built requirement index.',
+           [('', availability['chapters_indexed'])])
+
+    from story_mode.conditions import get_condition_stats
+    conditions = get_condition_stats()
+    metric('tokugawa_story_conditions_compiled_total', 'counter', 'Story conditions compiled.',
+           [('', conditions['compiled'])])
+    metric('tokugawa_story_conditions_folded_total', 'counter', 'Story conditions folded to a constant.',
+           [('', conditions['folded'])])
+    metric('tokugawa_story_conditions_rejected_total', 'counter', 'Malformed story conditions rejected.',
+           [('', conditions['rejected'])])
+
+    from utils.command_sync import get_command_sync_stats
+    syncs = sorted(get_command_sync_stats().items())
+    metric('tokugawa_command_sync_total', 'counter', 'Command tree sync attempts by result.',
+           [(_labels(scope=scope, result=result), stats[result])
+            for scope, stats in syncs for result in ('synced', 'skipped', 'failed')])
+    metric('tokugawa_command_sync_duration_seconds_sum', 'counter', 'Total time spent syncing the command tree.',
+           [(_labels(scope=scope), round(stats['duration_seconds'], 6)) for scope, stats in syncs])
+    metric('tokugawa_command_sync_last_duration_seconds', 'gauge', 'Duration of the last command tree sync.',
+           [(_labels(scope=scope), round(stats['last_duration_seconds'], 6)) for scope, stats in syncs])
+
+    from utils.startup import get_startup_profile
+    startup = get_startup_profile()
+    metric('tokugawa_startup_phase_seconds', 'gauge', 'Duration of each startup phase.',
+           [(_labels(phase=name), seconds) for name, seconds in startup['phases'].items()])
+    metric('tokugawa_startup_extension_seconds', 'gauge', 'Load time of each extension.',
+           [(_labels(extension=name), seconds) for name, seconds in sorted(startup['extensions'].items())])
+    if startup['total'] is not None:
+        metric('tokugawa_startup_seconds', 'gauge', 'Time from process import to the end of setup.',
+               [('', startup['total'])])
+
+    metric('tokugawa_uptime_seconds', 'gauge', 'Seconds since the metrics subsystem started.',
+           [('', round(time.time() - command_metrics.started_at, 3))])
+    if bot is not None:
+        metric('tokugawa_ready', 'gauge', 'Whether the bot is connected and ready.',
+               [('', int(bot.is_ready() and not bot.is_closed()))])
+        latency = bot.latency
+        if latency == latency and latency != float('inf'):
+            metric('tokugawa_gateway_latency_seconds', 'gauge', 'Discord gateway heartbeat latency.',
+                   [('', latency)])
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """aiohttp server exposing /metrics and /health."""
+
+    def __init__(self, bot, host: str = METRICS_HOST, port: int = METRICS_PORT):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/metrics', self.handle_metrics)
+        app.router.add_get('/health', self.handle_health)
+        return app
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        body = render_prometheus(self.bot)
+        return web.Response(text=body, content_type='text/plain', charset='utf-8',
+                            headers={'X-Content-Type-Options': 'nosniff'})
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        ready = self.bot.is_ready() and not self.bot.is_closed()
+        start_time = getattr(self.bot, 'start_time', None)
+        body = {
+            'status': 'ok' if ready else 'starting',
+            'ready': ready,
+            'guilds': len(self.bot.guilds) if ready else 0,
+            'uptime_seconds': round((datetime.now() - start_time).total_seconds()) if start_time else 0
+        }
+        return web.json_response(body, status=200 if ready else 503)
+
+    async def start(self) -> bool:
+        """Start listening; returns False if the server could not be started."""
+        try:
+            self._runner = web.AppRunner(self.make_app(), access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, self.host, self.port).start()
+            logger.info(f"Metrics server listening on {self.host}:{self.port}")
+            return True
+        except Exception as e:
+            logger.error(f"Error starting metrics server: {e}")
+            self._runner = None
+            return False
+
+    async def stop(self):
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
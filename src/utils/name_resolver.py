@@ -0,0 +1,222 @@
+"""
+Display name resolution for rankings and notifications.
+
+Rendering a ranking used to call ``bot.fetch_user`` once per row, one REST
+request each. NameResolver looks names up in order of cost:
+
+1. the gateway cache (guild members, then cached users),
+2. a TTL cache of names resolved before,
+3. the player's stored name, fetched for all missing users with BatchGetItem,
+4. ``fetch_user`` for whatever is left, with bounded concurrency and a cap
+   on the REST lookups of a single call.
+
+Users that cannot be resolved get a placeholder, so a ranking always renders.
+"""
+
+import os
+import asyncio
+import importlib
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import discord
+
+from utils.logging_config import get_logger
+from utils.ttl_cache import TTLCache
+
+logger = get_logger('tokugawa_bot.name_resolver')
+
+# Seconds a resolved name is reused
+NAME_CACHE_TTL = float(os.environ.get('NAME_CACHE_TTL', '3600'))
+
+# Seconds a failed lookup is remembered before REST is tried again
+NEGATIVE_CACHE_TTL = 300
+
+NAME_CACHE_SIZE = int(os.environ.get('NAME_CACHE_SIZE', '20000'))
+
+# REST lookups allowed per resolve call and running at once
+REST_LOOKUP_LIMIT = int(os.environ.get('NAME_REST_LOOKUP_LIMIT', '10'))
+REST_CONCURRENCY = 3
+
+# DynamoDB limit of keys in a BatchGetItem request
+BATCH_GET_SIZE = 100
+
+SOURCES = ('member', 'cache', 'stored', 'rest', 'placeholder')
+
+
+def placeholder_name(user_id) -> str:
+    """Name shown for users that could not be resolved."""
+    return f"Usuário {user_id}"
+
+
+class NameResolverStats:
+    """Thread-safe counters of names resolved per source."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.by_source: Dict[str, int] = {source: 0 for source in SOURCES}
+            self.rest_failures = 0
+
+    def record(self, source: str, count: int = 1):
+        if count:
+            with self._lock:
+                self.by_source[source] += count
+
+    def record_rest_failure(self):
+        with self._lock:
+            self.rest_failures += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the current counters."""
+        with self._lock:
+            return {'sources': dict(self.by_source), 'rest_failures': self.rest_failures}
+
+
+def _user_name(user) -> str:
+    return getattr(user, 'display_name', None) or user.name
+
+
+class NameResolver:
+    """Resolves user IDs to display names with layered caches."""
+
+    def __init__(self, ttl: float = NAME_CACHE_TTL, max_entries: int = NAME_CACHE_SIZE,
+                 rest_limit: int = REST_LOOKUP_LIMIT, players_table=None, dynamodb=None):
+        self.cache = TTLCache(ttl, max_entries)
+        self.rest_limit = rest_limit
+        self.stats = NameResolverStats()
+        self.players_table = players_table
+        self.dynamodb = dynamodb
+        self._rest_slots = asyncio.Semaphore(REST_CONCURRENCY)
+
+    def invalidate(self, user_id):
+        """Forget a user's name (after a rename)."""
+        self.cache.invalidate(str(user_id))
+
+    def _from_gateway(self, bot, user_id: str, guild=None) -> Optional[str]:
+        if guild is not None:
+            member = guild.get_member(int(user_id))
+            if member is not None:
+                return member.display_name
+        user = bot.get_user(int(user_id))
+        return _user_name(user) if user is not None else None
+
+    def _batch_get_names(self, user_ids: List[str]) -> Dict[str, str]:
+        """Read the stored player names of several users (runs in a thread)."""
+        if self.players_table is None or self.dynamodb is None:
+            db_provider = importlib.import_module('utils.persistence.db_provider').db_provider
+            self.players_table = self.players_table or db_provider.PLAYERS_TABLE
+            self.dynamodb = self.dynamodb or db_provider.dynamodb
+        table_name = self.players_table.name
+
+        names = {}
+        for start in range(0, len(user_ids), BATCH_GET_SIZE):
+            request = {table_name: {
+                'Keys': [{'PK': f'PLAYER#{user_id}', 'SK': 'PROFILE'}
+                         for user_id in user_ids[start:start + BATCH_GET_SIZE]],
+                'ProjectionExpression': 'PK, #name',
+                'ExpressionAttributeNames': {'#name': 'name'}
+            }}
+            while request:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                for item in response.get('Responses', {}).get(table_name, []):
+                    if item.get('name'):
+                        names[item['PK'].split('#', 1)[1]] = item['name']
+                request = response.get('UnprocessedKeys') or None
+        return names
+
+    async def _fetch(self, bot, user_id: str) -> Optional[str]:
+        async with self._rest_slots:
+            try:
+                return _user_name(await bot.fetch_user(int(user_id)))
+            except discord.HTTPException as e:
+                self.stats.record_rest_failure()
+                logger.warning(f"Could not fetch user {user_id}: {e}")
+                return None
+
+    async def resolve_many(self, bot, user_ids: Iterable, guild=None) -> Dict[str, str]:
+        """
+        Resolve the display names of several users.
+
+        Args:
+            bot: Bot whose gateway cache and HTTP client are used
+            user_ids: User IDs (int or str)
+            guild: Guild whose member nicknames take precedence
+
+        Returns:
+            Dictionary of str(user_id) -> name for every requested user
+        """
+        names: Dict[str, str] = {}
+        missing = []
+        for user_id in dict.fromkeys(str(user_id) for user_id in user_ids):
+            name = self._from_gateway(bot, user_id, guild)
+            if name is not None:
+                self.stats.record('member')
+                self.cache.set(user_id, name)
+            else:
+                name = self.cache.get(user_id)
+                if name is not None:
+                    self.stats.record('cache')
+            if name is not None:
+                names[user_id] = name
+            else:
+                missing.append(user_id)
+
+        if missing:
+            try:
+                stored = await asyncio.to_thread(self._batch_get_names, missing)
+            except Exception as e:
+                logger.error(f"Error reading stored player names: {e}")
+                stored = {}
+            self.stats.record('stored', len(stored))
+            for user_id, name in stored.items():
+                self.cache.set(user_id, name)
+            names.update(stored)
+            missing = [user_id for user_id in missing if user_id not in stored]
+
+        if missing:
+            lookups = missing[:self.rest_limit]
+            fetched = await asyncio.gather(*(self._fetch(bot, user_id) for user_id in lookups))
+            for user_id, name in zip(lookups, fetched):
+                if name is not None:
+                    self.stats.record('rest')
+                    self.cache.set(user_id, name)
+                    names[user_id] = name
+                else:
+                    # Remember the failure so the next render does not retry at once
+                    self.cache.set(user_id, placeholder_name(user_id), ttl=NEGATIVE_CACHE_TTL)
+            unresolved = [user_id for user_id in missing if user_id not in names]
+            self.stats.record('placeholder', len(unresolved))
+            for user_id in unresolved:
+                names[user_id] = placeholder_name(user_id)
+
+        return names
+
+
+name_resolver = NameResolver()
+
+
+async def resolve_names(bot, user_ids: Iterable, guild=None) -> Dict[str, str]:
+    """Resolve the display names of several users (see NameResolver.resolve_many)."""
+    return await name_resolver.resolve_many(bot, user_ids, guild)
+
+
+async def resolve_name(bot, user_id, guild=None) -> str:
+    """Resolve the display name of one user."""
+    return (await name_resolver.resolve_many(bot, [user_id], guild))[str(user_id)]
+
+
+async def resolve_user(bot, user_id):
+    """Get a User for DMs from the gateway cache, fetching it only if needed."""
+    return bot.get_user(int(user_id)) or await bot.fetch_user(int(user_id))
+
+
+def get_name_resolver_stats() -> Dict[str, Any]:
+    """Get name resolution metrics."""
+    snapshot = name_resolver.stats.snapshot()
+    snapshot['cached'] = len(name_resolver.cache)
+    return snapshot
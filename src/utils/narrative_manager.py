@@ -4,9 +4,9 @@ from typing import Dict, List, Optional
 from .image_manager import ImageManager
 
 class NarrativeManager:
-    def __init__(self, narrative_path: str = "data/story_mode/narrative"):
+    def __init__(self, narrative_path: str = "data/story_mode/narrative", image_manager: Optional[ImageManager] = None):
         self.narrative_path = narrative_path
-        self.image_manager = ImageManager()
+        self.image_manager = image_manager or ImageManager()
         self.chapters = self._load_chapters()
         
     def _load_chapters(self) -> Dict:
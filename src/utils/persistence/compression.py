@@ -0,0 +1,250 @@
+"""
+Compressed storage for large player sub-documents.
+
+Story progress, choice history, faction data and companion state grow without
+bound inside the player item. This module stores them as versioned, compressed
+binary attributes and decodes them transparently when the player is read.
+"""
+
+import os
+import json
+import zlib
+import decimal
+import threading
+from typing import Any, Dict, Optional
+
+from boto3.dynamodb.types import Binary
+
+from utils.logging_config import get_logger
+from utils.persistence.dynamodb import DecimalEncoder
+
+# zstd is optional; zlib is always available and is the default codec
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+logger = get_logger('tokugawa_bot.compression')
+
+# Player attributes stored as compressed binary documents
+COMPRESSED_ATTRIBUTES = ('story_progress', 'choice_history', 'factions', 'companions')
+
+# Binary layout: MAGIC (2 bytes) + format version (1 byte) + codec (1 byte) + payload
+MAGIC = b'TK'
+FORMAT_VERSION = 1
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+HEADER_SIZE = 4
+
+CODEC_NAMES = {
+    'zlib': CODEC_ZLIB,
+    'zstd': CODEC_ZSTD
+}
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Warn when a single compressed document gets close to the 400 KB item limit
+SIZE_WARNING_BYTES = 100 * 1024
+
+
+class CompressionError(Exception):
+    """Exception raised when a compressed document cannot be encoded or decoded."""
+    pass
+
+
+class CompressionStats:
+    """Thread-safe size metrics for compressed player documents."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.encoded = 0
+            self.decoded = 0
+            self.legacy_reads = 0
+            self.failed = 0
+            self.raw_bytes = 0
+            self.compressed_bytes = 0
+            self.largest_compressed = 0
+            self.by_attribute: Dict[str, Dict[str, int]] = {}
+
+    def record_encode(self, attribute: Optional[str], raw_size: int, compressed_size: int):
+        """Record the sizes of an encoded document."""
+        with self._lock:
+            self.encoded += 1
+            self.raw_bytes += raw_size
+            self.compressed_bytes += compressed_size
+            self.largest_compressed = max(self.largest_compressed, compressed_size)
+            if attribute:
+                stats = self.by_attribute.setdefault(attribute, {'count': 0, 'raw_bytes': 0, 'compressed_bytes': 0})
+                stats['count'] += 1
+                stats['raw_bytes'] += raw_size
+                stats['compressed_bytes'] += compressed_size
+
+    def record_decode(self, legacy: bool = False):
+        """Record a decoded document."""
+        with self._lock:
+            if legacy:
+                self.legacy_reads += 1
+            else:
+                self.decoded += 1
+
+    def record_failure(self):
+        """Record a document that could not be decoded."""
+        with self._lock:
+            self.failed += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the current metrics."""
+        with self._lock:
+            ratio = (self.compressed_bytes / self.raw_bytes) if self.raw_bytes else 0.0
+            return {
+                'encoded': self.encoded,
+                'decoded': self.decoded,
+                'legacy_reads': self.legacy_reads,
+                'failed': self.failed,
+                'raw_bytes': self.raw_bytes,
+                'compressed_bytes': self.compressed_bytes,
+                'compression_ratio': round(ratio, 4),
+                'largest_compressed': self.largest_compressed,
+                'by_attribute': {k: dict(v) for k, v in self.by_attribute.items()}
+            }
+
+
+compression_stats = CompressionStats()
+
+
+def _default_codec() -> int:
+    """Resolve the codec used for new writes from PLAYER_DOC_CODEC."""
+    codec = CODEC_NAMES.get(os.getenv('PLAYER_DOC_CODEC', 'zlib').lower(), CODEC_ZLIB)
+    if codec == CODEC_ZSTD and not HAS_ZSTD:
+        logger.warning("PLAYER_DOC_CODEC=zstd but zstandard is not installed, falling back to zlib")
+        return CODEC_ZLIB
+    return codec
+
+
+def _raw_bytes(value: Any) -> Optional[bytes]:
+    """Return the raw bytes of a binary attribute value, or None for non-binary values."""
+    if isinstance(value, Binary):
+        return value.value
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return None
+
+
+def is_compressed(value: Any) -> bool:
+    """Check whether a value is a compressed document produced by this module."""
+    data = _raw_bytes(value)
+    return data is not None and len(data) >= HEADER_SIZE and data[:2] == MAGIC
+
+
+def encode_document(value: Any, attribute: Optional[str] = None, codec: Optional[int] = None) -> Binary:
+    """
+    Encode a sub-document as a versioned, compressed binary attribute.
+
+    Args:
+        value: The JSON-serializable document (dicts, lists, strings, Decimals)
+        attribute: Name of the player attribute, used for size metrics
+        codec: Codec to use (defaults to PLAYER_DOC_CODEC)
+
+    Returns:
+        A boto3 Binary value ready to be written to DynamoDB
+    """
+    codec = codec or _default_codec()
+    raw = json.dumps(value, cls=DecimalEncoder, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    if codec == CODEC_ZSTD:
+        if not HAS_ZSTD:
+            raise CompressionError("zstd codec requested but zstandard is not installed")
+        payload = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    elif codec == CODEC_ZLIB:
+        payload = zlib.compress(raw, ZLIB_LEVEL)
+    else:
+        raise CompressionError(f"Unknown codec: {codec}")
+
+    data = MAGIC + bytes([FORMAT_VERSION, codec]) + payload
+    compression_stats.record_encode(attribute, len(raw), len(data))
+
+    if len(data) > SIZE_WARNING_BYTES:
+        logger.warning(f"Compressed document {attribute or ''} is {len(data)} bytes ({len(raw)} bytes raw)")
+
+    return Binary(data)
+
+
+def decode_document(value: Any) -> Any:
+    """
+    Decode a compressed sub-document.
+
+    Values that were not produced by encode_document (legacy maps or JSON
+    strings) are returned unchanged so old items keep working.
+
+    Args:
+        value: The attribute value read from DynamoDB
+
+    Returns:
+        The decoded document, with numbers as Decimal like native DynamoDB reads
+    """
+    if not is_compressed(value):
+        compression_stats.record_decode(legacy=True)
+        return value
+
+    data = _raw_bytes(value)
+    version, codec = data[2], data[3]
+    if version != FORMAT_VERSION:
+        raise CompressionError(f"Unsupported document format version: {version}")
+
+    payload = data[HEADER_SIZE:]
+    try:
+        if codec == CODEC_ZLIB:
+            raw = zlib.decompress(payload)
+        elif codec == CODEC_ZSTD:
+            if not HAS_ZSTD:
+                raise CompressionError("Document is zstd-compressed but zstandard is not installed")
+            raw = zstandard.ZstdDecompressor().decompress(payload)
+        else:
+            raise CompressionError(f"Unknown codec: {codec}")
+    except (zlib.error, ValueError) as e:
+        raise CompressionError(f"Failed to decompress document: {e}") from e
+
+    compression_stats.record_decode()
+    return json.loads(raw.decode('utf-8'), parse_float=decimal.Decimal, parse_int=decimal.Decimal)
+
+
+def compress_player_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of a player item with its large sub-documents encoded."""
+    encoded = dict(item)
+    for attribute in COMPRESSED_ATTRIBUTES:
+        value = encoded.get(attribute)
+        if value is None or is_compressed(value):
+            continue
+        encoded[attribute] = encode_document(value, attribute)
+    return encoded
+
+
+def decompress_player_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Decode the large sub-documents of a player item in place and return it.
+
+    An attribute that cannot be decoded keeps its raw blob: compress_player_item
+    passes compressed values through, so a later full put writes the blob back
+    unchanged instead of replacing the document with an empty one.
+    """
+    for attribute in COMPRESSED_ATTRIBUTES:
+        if attribute in item:
+            try:
+                item[attribute] = decode_document(item[attribute])
+            except CompressionError as e:
+                compression_stats.record_failure()
+                logger.error(f"Could not decode {attribute} for {item.get('PK', 'unknown')}, "
+                             f"keeping the stored blob: {e}")
+    return item
+
+
+def get_compression_stats() -> Dict[str, Any]:
+    """Get size metrics for compressed player documents."""
+    return compression_stats.snapshot()
@@ -7,11 +7,20 @@ Each migration is handled by a specific class to maintain Single Responsibility.
 
 import os
 import json
+import asyncio
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from abc import ABC, abstractmethod
 from utils.logging_config import get_logger
-from utils.persistence.dynamodb import get_table
+from utils.persistence.dynamodb import get_table, EQUIPPED_ITEMS_INDEX
+from utils.persistence.compression import (
+    COMPRESSED_ATTRIBUTES,
+    encode_document,
+    is_compressed,
+    get_compression_stats
+)
+from utils.persistence.dynamodb_inventory import DynamoDBInventory
+from utils.persistence.migration_engine import BulkMigrationEngine, DeleteItem, UpdateItem
 from decimal import Decimal
 
 logger = get_logger('tokugawa_bot.migration')
@@ -19,8 +28,29 @@ logger = get_logger('tokugawa_bot.migration')
 class MigrationStrategy(ABC):
     """Abstract base class for migration strategies."""
     
-    def __init__(self, db_provider):
+    def __init__(self, db_provider, dry_run: bool = False, **engine_options):
         self.db_provider = db_provider
+        self.dry_run = dry_run
+        self.engine_options = engine_options
+        self.reports: List[Dict[str, Any]] = []
+
+    def _engine(self, name: str, source_table, transforms, **kwargs) -> BulkMigrationEngine:
+        """Create a bulk migration engine checkpointing into SystemFlags."""
+        options = {**self.engine_options, **kwargs}
+        return BulkMigrationEngine(
+            name,
+            source_table,
+            transforms,
+            dry_run=self.dry_run,
+            checkpoint_table=self.db_provider.SYSTEM_FLAGS_TABLE,
+            **options
+        )
+
+    async def _run_engine(self, engine: BulkMigrationEngine) -> bool:
+        """Run an engine, keep its report and fail if any write was dropped."""
+        report = await engine.run()
+        self.reports.append(report)
+        return report['failed'] == 0
     
     @abstractmethod
     async def migrate(self) -> bool:
@@ -95,7 +125,8 @@ class ItemsMigration(MigrationStrategy):
                             logger.info(f"Inserting item: {item}")
                             
                             # Use put_item with the item dictionary
-                            items_table.put_item(Item=item)
+                            if not self.dry_run:
+                                items_table.put_item(Item=item)
                             migrated_items += 1
                             
                         except Exception as e:
@@ -152,14 +183,324 @@ class ItemsMigration(MigrationStrategy):
             return False
 
 
+class PlayerDocumentCompressionMigration(MigrationStrategy):
+    """Rewrites large player sub-documents as compressed binary attributes."""
+
+    def _scan_players(self, projection_attributes: List[str]):
+        """Yield every player profile, following scan pagination."""
+        players_table = self.db_provider.PLAYERS_TABLE
+        names = {f'#a{i}': attr for i, attr in enumerate(projection_attributes)}
+        scan_kwargs = {
+            'FilterExpression': 'begins_with(PK, :pk) AND SK = :sk',
+            'ExpressionAttributeValues': {':pk': 'PLAYER#', ':sk': 'PROFILE'},
+            'ProjectionExpression': ', '.join(['PK', 'SK'] + list(names.keys())),
+            'ExpressionAttributeNames': names
+        }
+        while True:
+            response = players_table.scan(**scan_kwargs)
+            for item in response.get('Items', []):
+                yield item
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                break
+            scan_kwargs['ExclusiveStartKey'] = last_key
+
+    @staticmethod
+    def _compress(item: Dict[str, Any]) -> Optional[UpdateItem]:
+        """Build a targeted update for the attributes that are still uncompressed."""
+        pending = {
+            attr: item[attr] for attr in COMPRESSED_ATTRIBUTES
+            if item.get(attr) is not None and not is_compressed(item[attr])
+        }
+        if not pending:
+            return None
+
+        # Only the compressed attributes are rewritten, never the whole item
+        names = {f'#a{i}': attr for i, attr in enumerate(pending)}
+        values = {f':v{i}': encode_document(value, attr) for i, (attr, value) in enumerate(pending.items())}
+        return UpdateItem(
+            {'PK': item['PK'], 'SK': item['SK']},
+            UpdateExpression='SET ' + ', '.join(f'#a{i} = :v{i}' for i in range(len(pending))),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+
+    async def migrate(self) -> bool:
+        try:
+            names = {f'#a{i}': attr for i, attr in enumerate(COMPRESSED_ATTRIBUTES)}
+            engine = self._engine(
+                'player_documents',
+                self.db_provider.PLAYERS_TABLE,
+                [self._compress],
+                scan_kwargs={
+                    'FilterExpression': 'begins_with(PK, :pk) AND SK = :sk',
+                    'ExpressionAttributeValues': {':pk': 'PLAYER#', ':sk': 'PROFILE'},
+                    'ProjectionExpression': ', '.join(['PK', 'SK'] + list(names.keys())),
+                    'ExpressionAttributeNames': names
+                }
+            )
+            success = await self._run_engine(engine)
+
+            stats = get_compression_stats()
+            logger.info(
+                f"Compressed documents for {engine.stats.updates} players "
+                f"({stats['raw_bytes']} bytes raw -> {stats['compressed_bytes']} bytes, "
+                f"ratio {stats['compression_ratio']})"
+            )
+            return success
+
+        except Exception as e:
+            logger.error(f"Error migrating player documents: {e}")
+            return False
+
+    async def validate(self) -> bool:
+        try:
+            for item in self._scan_players(list(COMPRESSED_ATTRIBUTES)):
+                for attr in COMPRESSED_ATTRIBUTES:
+                    if item.get(attr) is not None and not is_compressed(item[attr]):
+                        logger.warning(f"Uncompressed {attr} found in {item['PK']}")
+                        return False
+
+            logger.info("Player document compression validation successful")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error validating player document compression: {e}")
+            return False
+
+
+class EquippedItemsIndexMigration(MigrationStrategy):
+    """Adds the sparse EquippedItemsIndex to inventory tables created before it existed."""
+
+    # Seconds between checks of the index backfill
+    POLL_INTERVAL = 15
+
+    def _describe(self) -> Dict[str, Any]:
+        table = self.db_provider.INVENTORY_TABLE
+        return table.meta.client.describe_table(TableName=table.name)['Table']
+
+    def _index_status(self) -> Optional[str]:
+        """Status of the index on the inventory table, or None if it does not exist."""
+        for index in self._describe().get('GlobalSecondaryIndexes', []):
+            if index['IndexName'] == EQUIPPED_ITEMS_INDEX['IndexName']:
+                return index['IndexStatus']
+        return None
+
+    def _create_index(self):
+        table = self.db_provider.INVENTORY_TABLE
+        table.meta.client.update_table(
+            TableName=table.name,
+            AttributeDefinitions=[
+                {'AttributeName': 'equipped_by', 'AttributeType': 'S'},
+                {'AttributeName': 'SK', 'AttributeType': 'S'}
+            ],
+            GlobalSecondaryIndexUpdates=[{'Create': EQUIPPED_ITEMS_INDEX}]
+        )
+
+    async def migrate(self) -> bool:
+        try:
+            loop = asyncio.get_event_loop()
+            status = await loop.run_in_executor(None, self._index_status)
+            if status is None:
+                if self.dry_run:
+                    logger.info(f"Dry run: would create {EQUIPPED_ITEMS_INDEX['IndexName']} on the inventory table")
+                    return True
+                await loop.run_in_executor(None, self._create_index)
+                logger.info(f"Creating {EQUIPPED_ITEMS_INDEX['IndexName']} on the inventory table")
+
+            # The index can only be queried once DynamoDB finished backfilling it
+            while not self.dry_run and status != 'ACTIVE':
+                await asyncio.sleep(self.POLL_INTERVAL)
+                status = await loop.run_in_executor(None, self._index_status)
+                logger.info(f"{EQUIPPED_ITEMS_INDEX['IndexName']} status: {status}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error creating the equipped items index: {e}")
+            return False
+
+    async def validate(self) -> bool:
+        try:
+            if self._index_status() != 'ACTIVE':
+                logger.warning(f"{EQUIPPED_ITEMS_INDEX['IndexName']} is not active")
+                return False
+
+            logger.info("Equipped items index validation successful")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error validating the equipped items index: {e}")
+            return False
+
+
+class InventoryRowsMigration(MigrationStrategy):
+    """Moves legacy inventories to one Inventario row per (player, item).
+
+    Legacy inventories live either as a JSON string in the player item or as
+    an ``items`` map inside a single ``SK=INVENTORY`` row in Inventario.
+    Rows are written like add_item_to_inventory (ADD quantity, metadata only
+    if missing), so grants made by the running bot are never overwritten and
+    an item held in both legacy layouts ends up with the summed quantity.
+    """
+
+    _convert_to_decimal = ItemsMigration._convert_to_decimal
+
+    def _scan(self, table, **scan_kwargs):
+        """Yield every item of a scan, following pagination."""
+        while True:
+            response = table.scan(**scan_kwargs)
+            for item in response.get('Items', []):
+                yield item
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                break
+            scan_kwargs['ExclusiveStartKey'] = last_key
+
+    @staticmethod
+    def _parse_inventory(value) -> Dict[str, Any]:
+        """Normalize a legacy inventory value into {item_id: item_data}."""
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except Exception:
+                return {}
+        if not isinstance(value, dict):
+            return {}
+        inventory = {}
+        for item_id, item_data in value.items():
+            if isinstance(item_data, str):
+                try:
+                    item_data = json.loads(item_data)
+                except Exception:
+                    item_data = {}
+            if not isinstance(item_data, dict):
+                item_data = {}
+            inventory[str(item_id)] = item_data
+        return inventory
+
+    def _grant(self, user_id: str, item_id: str, item_data: Dict[str, Any]) -> UpdateItem:
+        """Build the update merging a legacy item into its canonical row."""
+        now = datetime.now().isoformat()
+        metadata = {k: v for k, v in item_data.items() if k not in ('id', 'quantity', 'equipped')}
+        update_expression = (
+            'ADD quantity :q '
+            'SET item_id = :id, item_data = if_not_exists(item_data, :data), '
+            'acquired_at = if_not_exists(acquired_at, :acquired), last_updated = :now'
+        )
+        values = {
+            ':q': int(item_data.get('quantity', 1)),
+            ':id': item_id,
+            ':data': self._convert_to_decimal(metadata),
+            ':acquired': item_data.get('acquired_at', now),
+            ':now': now
+        }
+        if item_data.get('equipped'):
+            update_expression += ', equipped_by = :owner'
+            values[':owner'] = f'PLAYER#{user_id}'
+        return UpdateItem(
+            DynamoDBInventory._key(user_id, item_id),
+            UpdateExpression=update_expression,
+            ExpressionAttributeValues=values
+        )
+
+    def _grants(self, user_id: str, value) -> List[UpdateItem]:
+        """Expand a legacy inventory value into row updates."""
+        return [self._grant(user_id, item_id, item_data)
+                for item_id, item_data in self._parse_inventory(value).items()]
+
+    async def migrate(self) -> bool:
+        try:
+            players_table = self.db_provider.PLAYERS_TABLE
+            inventory_table = self.db_provider.INVENTORY_TABLE
+            player_scan = {
+                'FilterExpression': 'begins_with(PK, :pk) AND attribute_exists(inventory)',
+                'ExpressionAttributeValues': {':pk': 'PLAYER#'},
+                'ProjectionExpression': 'PK, SK, inventory'
+            }
+
+            def from_player(player):
+                user_id = player['PK'].split('#', 1)[1]
+                return self._grants(user_id, player.get('inventory'))
+
+            def from_inventory_row(row):
+                user_id = row['PK'].split('#', 1)[1]
+                return self._grants(user_id, row.get('items', {}))
+
+            def drop_legacy_row(row):
+                return DeleteItem({'PK': row['PK'], 'SK': row['SK']})
+
+            def drop_legacy_copy(player):
+                return UpdateItem(
+                    {'PK': player['PK'], 'SK': player['SK']},
+                    UpdateExpression='REMOVE #inv',
+                    ConditionExpression='attribute_exists(PK)',
+                    ExpressionAttributeNames={'#inv': 'inventory'}
+                )
+
+            # The legacy copies are only dropped once every item has been merged,
+            # so a failed merge can be resumed from the untouched sources
+            legacy_scan = {
+                'FilterExpression': 'SK = :sk',
+                'ExpressionAttributeValues': {':sk': 'INVENTORY'}
+            }
+            engines = [
+                self._engine('inventory_rows_players', players_table, [from_player],
+                             target_table=inventory_table, scan_kwargs=player_scan),
+                self._engine('inventory_rows_legacy', inventory_table, [from_inventory_row],
+                             scan_kwargs=legacy_scan),
+                self._engine('inventory_rows_cleanup', players_table, [drop_legacy_copy],
+                             scan_kwargs=player_scan),
+                self._engine('inventory_rows_legacy_cleanup', inventory_table, [drop_legacy_row],
+                             scan_kwargs=legacy_scan)
+            ]
+            for engine in engines:
+                if not await self._run_engine(engine):
+                    return False
+
+            migrated_items = engines[0].stats.updates + engines[1].stats.updates
+            logger.info(
+                f"Migrated {migrated_items} inventory items, cleaned {engines[2].stats.updates} player items "
+                f"and {engines[3].stats.deletes} legacy inventory rows"
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Error migrating inventories: {e}")
+            return False
+
+    async def validate(self) -> bool:
+        try:
+            for _ in self._scan(self.db_provider.INVENTORY_TABLE,
+                                FilterExpression='SK = :sk',
+                                ExpressionAttributeValues={':sk': 'INVENTORY'}):
+                logger.warning("Legacy SK=INVENTORY rows remain after migration")
+                return False
+
+            logger.info("Inventory migration validation successful")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error validating inventory migration: {e}")
+            return False
+
+
 class DataMigration:
     """Main class for handling data migrations."""
     
-    def __init__(self, db_provider):
+    def __init__(self, db_provider, dry_run: bool = False, **engine_options):
+        """
+        Args:
+            db_provider: Provider exposing the DynamoDB tables
+            dry_run: Collect diff statistics without writing anything
+            engine_options: Bulk engine settings (segments, max_writes_per_second, ...)
+        """
         self.db_provider = db_provider
+        self.dry_run = dry_run
         self.migrations = {
-            'items': ItemsMigration(db_provider)
-
+            'items': ItemsMigration(db_provider, dry_run, **engine_options),
+            'player_documents': PlayerDocumentCompressionMigration(db_provider, dry_run, **engine_options),
+            'equipped_index': EquippedItemsIndexMigration(db_provider, dry_run, **engine_options),
+            'inventory_rows': InventoryRowsMigration(db_provider, dry_run, **engine_options)
         }
     
     async def migrate_data(self) -> bool:
@@ -167,7 +508,10 @@ class DataMigration:
         try:
             # Run migrations in order
             migrations = [
-                'items'
+                'items',
+                'player_documents',
+                'equipped_index',
+                'inventory_rows'
             ]
             
             for migration_name in migrations:
@@ -196,6 +540,12 @@ class DataMigration:
         if not success:
             logger.error(f"Migration {migration_name} failed")
             return False
+
+        # A dry run writes nothing, so there is nothing to validate
+        if self.dry_run:
+            for report in migration.reports:
+                logger.info(f"Dry run report for {report['name']}: {report}")
+            return True
             
         # Validate migration
         valid = await migration.validate()
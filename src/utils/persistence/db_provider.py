@@ -37,13 +37,25 @@ from utils.persistence.dynamodb_cooldowns import (
 )
 from utils.persistence.dynamodb_inventory import (
     get_player_inventory as _get_player_inventory,
+    list_inventory_items as _list_inventory_items,
     add_item_to_inventory as _add_item_to_inventory,
-    remove_item_from_inventory as _remove_item_from_inventory
+    consume_item as _consume_item,
+    remove_item_from_inventory as _remove_item_from_inventory,
+    get_equipped_items as _get_equipped_items
 )
 from utils.persistence.dynamodb_market import (
     get_market_items as _get_market_items,
     add_market_item as _add_market_item
 )
+from utils.persistence.dynamodb_story import (
+    get_story_progress as _get_story_progress,
+    update_story_progress as _update_story_progress,
+    save_story_progress_delta as _save_story_progress_delta
+)
+from utils.persistence.compression import decompress_player_item
+from utils.persistence.player_session import PlayerSession
+from utils.leaderboard import RANKED_FIELDS, note_player_write
+from utils.metrics import instrument_methods
 
 logger = logging.getLogger('tokugawa_bot')
 
@@ -70,32 +82,55 @@ class DBProvider:
         self.SYSTEM_FLAGS_TABLE = self.dynamodb.Table(os.getenv('DYNAMODB_SYSTEM_FLAGS_TABLE', 'SystemFlags'))
         self.VOTES_TABLE = self.dynamodb.Table(os.getenv('DYNAMODB_VOTES_TABLE', 'Votos'))
         self.MAIN_TABLE = self.dynamodb.Table(os.getenv('DYNAMODB_TABLE', 'AcademiaTokugawa'))
-        
-        self.initialize_tables()
+
+        # Table checks are network calls; they run in init_db, not at import
+        self._initialized = False
+
+    def _all_tables(self) -> List[Any]:
+        """Return every table the bot uses."""
+        return [
+            self.PLAYERS_TABLE,
+            self.INVENTORY_TABLE,
+            self.CLUBS_TABLE,
+            self.EVENTS_TABLE,
+            self.COOLDOWNS_TABLE,
+            self.GRADES_TABLE,
+            self.MARKET_TABLE,
+            self.ITEMS_TABLE,
+            self.CLUB_ACTIVITIES_TABLE,
+            self.QUIZ_QUESTIONS_TABLE,
+            self.QUIZ_ANSWERS_TABLE,
+            self.SYSTEM_FLAGS_TABLE,
+            self.VOTES_TABLE,
+            self.MAIN_TABLE
+        ]
+
+    def _check_tables(self) -> Dict[str, Optional[Exception]]:
+        """
+        Describe all tables concurrently.
+
+        Returns:
+            Dict mapping each table name to None if it is available, or the error otherwise
+        """
+        def check(table) -> Optional[Exception]:
+            try:
+                table.table_status
+                return None
+            except Exception as e:
+                return e
+
+        tables = self._all_tables()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(tables)) as executor:
+            results = list(executor.map(check, tables))
+        return {table.name: error for table, error in zip(tables, results)}
 
     def initialize_tables(self):
         """Initialize DynamoDB tables."""
         try:
             # Check if all tables exist and are accessible
-            tables = [
-                self.PLAYERS_TABLE,
-                self.INVENTORY_TABLE,
-                self.CLUBS_TABLE,
-                self.EVENTS_TABLE,
-                self.COOLDOWNS_TABLE,
-                self.GRADES_TABLE,
-                self.MARKET_TABLE,
-                self.ITEMS_TABLE,
-                self.CLUB_ACTIVITIES_TABLE,
-                self.QUIZ_QUESTIONS_TABLE,
-                self.QUIZ_ANSWERS_TABLE,
-                self.SYSTEM_FLAGS_TABLE,
-                self.VOTES_TABLE,
-                self.MAIN_TABLE
-            ]
-            
-            for table in tables:
-                table.table_status
+            for name, error in self._check_tables().items():
+                if error is not None:
+                    raise error
                 
             logger.info("All DynamoDB tables initialized successfully")
         except Exception as e:
@@ -105,36 +140,18 @@ class DBProvider:
     def ensure_dynamo_available(self) -> bool:
         """Check if DynamoDB is available and all required tables exist."""
         try:
-            # List of required tables
-            required_tables = [
-                self.PLAYERS_TABLE,
-                self.INVENTORY_TABLE,
-                self.CLUBS_TABLE,
-                self.EVENTS_TABLE,
-                self.COOLDOWNS_TABLE,
-                self.GRADES_TABLE,
-                self.MARKET_TABLE,
-                self.ITEMS_TABLE,
-                self.CLUB_ACTIVITIES_TABLE,
-                self.QUIZ_QUESTIONS_TABLE,
-                self.QUIZ_ANSWERS_TABLE,
-                self.SYSTEM_FLAGS_TABLE,
-                self.VOTES_TABLE,
-                self.MAIN_TABLE
-            ]
+            # Describe every table at once instead of one round-trip after the other
+            available = True
+            for name, error in self._check_tables().items():
+                if error is None:
+                    logger.info(f"Table {name} is available")
+                else:
+                    logger.error(f"Table {name} is not available: {error}")
+                    available = False
             
-            # Check each table
-            for table in required_tables:
-                try:
-                    # Try to describe the table
-                    table.table_status
-                    logger.info(f"Table {table.name} is available")
-                except Exception as e:
-                    logger.error(f"Table {table.name} is not available: {e}")
-                    return False
-            
-            logger.info("All required DynamoDB tables are available")
-            return True
+            if available:
+                logger.info("All required DynamoDB tables are available")
+            return available
         except Exception as e:
             logger.error(f"Error checking DynamoDB availability: {e}")
             return False
@@ -175,7 +192,7 @@ class DBProvider:
                 logger.info(f"No player found for user_id: {user_id}")
                 return None
             
-            return response['Item']
+            return decompress_player_item(response['Item'])
             
         except Exception as e:
             logger.error(f"Error getting player data: {e}")
@@ -183,11 +200,17 @@ class DBProvider:
 
     async def create_player(self, user_id: str, name: str, **kwargs) -> bool:
         """Create a new player in database."""
-        return await _create_player(user_id, name, **kwargs)
+        created = await _create_player(user_id, name, **kwargs)
+        if created:
+            note_player_write(RANKED_FIELDS)
+        return created
 
     async def update_player(self, user_id: str, **kwargs) -> bool:
         """Update player data in database."""
-        return await _update_player(user_id, **kwargs)
+        updated = await _update_player(user_id, **kwargs)
+        if updated:
+            note_player_write(kwargs)
+        return updated
 
     async def get_all_players(self) -> List[Dict[str, Any]]:
         """Get all players from database."""
@@ -260,6 +283,18 @@ class DBProvider:
         """Clear expired cooldowns."""
         return await _clear_expired_cooldowns(user_id)
 
+    # --- Player sessions ---
+    def player_session(self, user_id: str, command: str, load_equipped: bool = False) -> PlayerSession:
+        """Open a request-scoped unit of work over a player's profile, cooldowns and inventory."""
+        return PlayerSession(
+            user_id,
+            command,
+            players_table=self.PLAYERS_TABLE,
+            cooldowns_table=self.COOLDOWNS_TABLE,
+            inventory_table=self.INVENTORY_TABLE,
+            load_equipped=load_equipped
+        )
+
     # --- Inventory operations ---
     async def get_player_inventory(self, user_id: str) -> Dict[str, Any]:
         """Get player inventory from database."""
@@ -273,6 +308,19 @@ class DBProvider:
         """Remove an item from player inventory."""
         return await _remove_item_from_inventory(user_id, item_id)
 
+    async def list_inventory_items(self, user_id: str, limit: int = 25,
+                                   start_token: Optional[str] = None) -> tuple:
+        """List one page of a player's inventory and the token of the next page."""
+        return await _list_inventory_items(user_id, limit, start_token)
+
+    async def consume_item(self, user_id: str, item_id: str, quantity: int = 1) -> bool:
+        """Atomically decrement an item's quantity."""
+        return await _consume_item(user_id, item_id, quantity)
+
+    async def get_equipped_items(self, user_id: str) -> Dict[str, Any]:
+        """Get a player's equipped items."""
+        return await _get_equipped_items(user_id)
+
     # --- Market operations ---
     async def get_market_items(self) -> List[Dict[str, Any]]:
         """Get all items in the market."""
@@ -543,32 +591,16 @@ class DBProvider:
     # --- Story operations ---
     async def get_story_progress(self, user_id: str) -> Dict[str, Any]:
         """Get a player's story progress."""
-        try:
-            response = self.MAIN_TABLE.get_item(
-                Key={
-                    'PK': f'STORY#{user_id}',
-                    'SK': 'PROGRESS'
-                }
-            )
-            return response.get('Item', {})
-        except Exception as e:
-            logger.error(f"Error getting story progress: {e}")
-            return {}
+        return await _get_story_progress(str(user_id))
 
     async def update_story_progress(self, user_id: str, progress_data: Dict[str, Any]) -> bool:
-        """Update a player's story progress."""
-        try:
-            self.MAIN_TABLE.put_item(
-                Item={
-                    'PK': f'STORY#{user_id}',
-                    'SK': 'PROGRESS',
-                    **progress_data
-                }
-            )
-            return True
-        except Exception as e:
-            logger.error(f"Error updating story progress: {e}")
-            return False
+        """Update fields of a player's story progress with targeted writes."""
+        return await _update_story_progress(str(user_id), progress_data)
+
+    async def save_story_progress_delta(self, user_id: str, before: Optional[Dict[str, Any]],
+                                        after: Dict[str, Any]) -> bool:
+        """Persist only what changed in a player's story progress."""
+        return await _save_story_progress_delta(str(user_id), before, after)
 
     # --- System operations ---
     async def get_system_flag(self, flag_name: str) -> Optional[str]:
@@ -620,7 +652,11 @@ class DBProvider:
     async def init_db(self) -> bool:
         """Initialize database with required tables and data."""
         try:
-            if not self.ensure_dynamo_available():
+            # setup_hook and on_ready both call this; the checks only need to run once
+            if self._initialized:
+                return True
+
+            if not await asyncio.to_thread(self.ensure_dynamo_available):
                 logger.error("DynamoDB is not available")
                 return False
 
@@ -628,6 +664,7 @@ class DBProvider:
                 logger.error("Failed to sync data to DynamoDB")
                 return False
 
+            self._initialized = True
             logger.info("Database initialized successfully")
             return True
         except Exception as e:
@@ -644,6 +681,9 @@ class DBProvider:
             logger.error(f"Error closing database connections: {e}")
             raise
 
+# Attribute the time of every database call to the 'db' phase of the running command
+instrument_methods(DBProvider, 'db')
+
 # Create a singleton instance of DBProvider
 db_provider = DBProvider()
 
@@ -658,7 +698,8 @@ async def get_player_async(user_id: str) -> Optional[Dict[str, Any]]:
                 'SK': 'PROFILE'
             }
         )
-        return response.get('Item')
+        item = response.get('Item')
+        return decompress_player_item(item) if item else None
     except Exception as e:
         logger.error(f"Error getting player data: {e}")
         return None
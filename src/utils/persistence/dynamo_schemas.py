@@ -52,7 +52,12 @@ PLAYERS_SCHEMA = {
 INVENTORY_SCHEMA = {
     'PK': 'S',  # Partition key (PLAYER#<user_id>)
     'SK': 'S',  # Sort key (ITEM#<item_id>)
-    'item_data': 'M'  # Map containing item details
+    'item_id': 'S',
+    'quantity': 'N',  # Updated atomically with ADD
+    'item_data': 'M',  # Map containing item details
+    'equipped_by': 'S',  # Sparse: PLAYER#<user_id>, only present when equipped (EquippedItemsIndex)
+    'acquired_at': 'S',
+    'last_updated': 'S'
 }
 
 EVENTS_SCHEMA = {
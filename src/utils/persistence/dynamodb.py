@@ -53,6 +53,18 @@ TABLES = {
     'system_flags': os.environ.get('DYNAMODB_SYSTEM_FLAGS_TABLE', 'SystemFlags')
 }
 
+# Sparse index of the inventory table: only equipped items carry equipped_by
+EQUIPPED_ITEMS_INDEX = {
+    'IndexName': 'EquippedItemsIndex',
+    'KeySchema': [
+        {'AttributeName': 'equipped_by', 'KeyType': 'HASH'},
+        {'AttributeName': 'SK', 'KeyType': 'RANGE'}
+    ],
+    'Projection': {
+        'ProjectionType': 'ALL'
+    }
+}
+
 # AWS region
 AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
 
@@ -313,8 +325,10 @@ def create_table(dynamodb, table_name):
                 ],
                 AttributeDefinitions=[
                     {'AttributeName': 'PK', 'AttributeType': 'S'},
-                    {'AttributeName': 'SK', 'AttributeType': 'S'}
+                    {'AttributeName': 'SK', 'AttributeType': 'S'},
+                    {'AttributeName': 'equipped_by', 'AttributeType': 'S'}
                 ],
+                GlobalSecondaryIndexes=[EQUIPPED_ITEMS_INDEX],
                 BillingMode='PAY_PER_REQUEST'
             )
         elif table_name == TABLES['market']:
@@ -489,92 +503,25 @@ async def store_event(event_id, name, description, event_type, channel_id, messa
         logger.error(f"Error storing event {event_id}: {e}")
         raise DynamoDBOperationError(f"Failed to store event: {e}")
 
+# Inventory operations live in dynamodb_inventory (one row per item under the
+# player partition). These wrappers keep the historical import path working.
 @handle_dynamo_error
 async def get_player_inventory(user_id):
     """Get player's inventory from DynamoDB."""
-    try:
-        table = get_table(TABLES['inventory'])
-        response = await table.query(
-            KeyConditionExpression='PK = :pk',
-            ExpressionAttributeValues={
-                ':pk': f'PLAYER#{user_id}'
-            }
-        )
-
-        # Convert items to inventory format
-        inventory = {}
-        for item in response.get('Items', []):
-            item_id = item['SK'].replace('ITEM#', '')
-            inventory[item_id] = item['item_data']
-
-        return inventory
-    except Exception as e:
-        logger.error(f"Error getting inventory for player {user_id}: {e}")
-        raise DynamoDBOperationError(f"Failed to get inventory: {e}")
+    from utils.persistence.dynamodb_inventory import dynamodb_inventory
+    return await dynamodb_inventory.get_player_inventory(user_id)
 
 @handle_dynamo_error
 async def add_item_to_inventory(user_id, item_id, item_data):
     """Add item to player's inventory."""
-    try:
-        # Ensure item_data has all required fields
-        item_data_with_id = {
-            'id': item_id,
-            'name': item_data.get('name', ''),
-            'description': item_data.get('description', ''),
-            'type': item_data.get('type', ''),
-            'rarity': item_data.get('rarity', 'common'),
-            'effects': item_data.get('effects', {}),
-            'quantity': item_data.get('quantity', 1),
-            'equipped': item_data.get('equipped', False),
-            'attributes': item_data.get('attributes', {}),
-            'acquired_at': datetime.now().isoformat(),
-            'last_used': None
-        }
-
-        # Convert numeric values to Decimal
-        def convert_floats_to_decimal(obj):
-            if isinstance(obj, float):
-                return decimal.Decimal(str(obj))
-            elif isinstance(obj, dict):
-                return {k: convert_floats_to_decimal(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_floats_to_decimal(v) for v in obj]
-            return obj
-
-        item_data_with_id = convert_floats_to_decimal(item_data_with_id)
-
-        table = get_table(TABLES['inventory'])
-        await table.put_item(
-            Item={
-                'PK': f'PLAYER#{user_id}',
-                'SK': f'ITEM#{item_id}',
-                'JogadorID': f'PLAYER#{user_id}',
-                'ItemID': item_id,
-                'item_data': item_data_with_id,
-                'created_at': datetime.now().isoformat(),
-                'last_updated': datetime.now().isoformat()
-            }
-        )
-        return True
-    except Exception as e:
-        logger.error(f"Error adding item to inventory for player {user_id}: {e}")
-        raise DynamoDBOperationError(f"Failed to add item to inventory: {e}")
+    from utils.persistence.dynamodb_inventory import dynamodb_inventory
+    return await dynamodb_inventory.add_item_to_inventory(user_id, item_id, item_data)
 
 @handle_dynamo_error
 async def remove_item_from_inventory(user_id, item_id):
     """Remove item from player's inventory."""
-    try:
-        table = get_table(TABLES['inventory'])
-        await table.delete_item(
-            Key={
-                'PK': f'PLAYER#{user_id}',
-                'SK': f'ITEM#{item_id}'
-            }
-        )
-        return True
-    except Exception as e:
-        logger.error(f"Error removing item from inventory for player {user_id}: {e}")
-        raise DynamoDBOperationError(f"Failed to remove item from inventory: {e}")
+    from utils.persistence.dynamodb_inventory import dynamodb_inventory
+    return await dynamodb_inventory.remove_item_from_inventory(user_id, item_id)
 
 @handle_dynamo_error
 async def get_market_listing(item_id, seller_id):
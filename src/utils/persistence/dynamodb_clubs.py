@@ -10,6 +10,7 @@ from typing import Dict, Any, List, Optional
 from decimal import Decimal
 from utils.logging_config import get_logger
 from utils.persistence.dynamodb import handle_dynamo_error, get_table
+from utils.leaderboard import club_directory
 
 logger = logging.getLogger('tokugawa_bot.clubs')
 
@@ -145,6 +146,8 @@ async def update_club(club_id: str, **kwargs) -> bool:
             **kwargs,
             'last_updated': datetime.now().isoformat()
         })
+        if 'name' in kwargs:
+            club_directory.invalidate(club_id)
         return True
     except Exception as e:
         logger.error(f"Error updating club {club_id}: {str(e)}")
@@ -1,15 +1,26 @@
 """
 Inventory operations for DynamoDB.
+
+Each inventory entry is stored as its own row under the player partition:
+
+    PK = PLAYER#<user_id>, SK = ITEM#<item_id>
+
+Quantities are changed with atomic ADD updates, listings are paginated
+queries over the partition and equipped items are tracked through the
+sparse EquippedItemsIndex (only equipped rows carry ``equipped_by``).
 """
 
 import os
 import logging
 import boto3
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from decimal import Decimal
+from botocore.exceptions import ClientError
 from utils.logging_config import get_logger
-from utils.persistence.dynamodb import handle_dynamo_error, get_table, TABLES
+from utils.persistence.dynamodb import (
+    handle_dynamo_error, AsyncDynamoDBTable, TABLES, EQUIPPED_ITEMS_INDEX, DynamoDBOperationError
+)
 from utils.item_effects import ItemEffectHandler
 
 logger = logging.getLogger('tokugawa_bot.inventory')
@@ -18,194 +29,288 @@ logger = logging.getLogger('tokugawa_bot.inventory')
 AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
 dynamodb = boto3.resource('dynamodb', region_name=AWS_REGION)
 
+# Sparse GSI containing only equipped items (HASH equipped_by, RANGE SK)
+EQUIPPED_INDEX = EQUIPPED_ITEMS_INDEX['IndexName']
+
+# Default page size for inventory listings
+DEFAULT_PAGE_SIZE = 25
+
+ITEM_PREFIX = 'ITEM#'
+
+
 def get_table(table_name: str):
     """Get DynamoDB table."""
     return dynamodb.Table(table_name)
 
+
+def _to_decimal(obj):
+    """Convert floats to Decimal for DynamoDB compatibility."""
+    if isinstance(obj, float):
+        return Decimal(str(obj))
+    elif isinstance(obj, dict):
+        return {k: _to_decimal(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [_to_decimal(v) for v in obj]
+    return obj
+
+
 class DynamoDBInventory:
     """Class for handling inventory data in DynamoDB."""
-    
+
     def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb')
-        self.table = self.dynamodb.Table('Inventario')
-    
+        self.table = AsyncDynamoDBTable(get_table(TABLES['inventory']))
+
+    @staticmethod
+    def _key(user_id: str, item_id: str) -> Dict[str, str]:
+        """Build the primary key of an inventory row."""
+        return {'PK': f'PLAYER#{user_id}', 'SK': f'{ITEM_PREFIX}{item_id}'}
+
+    @staticmethod
+    def _row_to_item(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert an inventory row into the item dict used by the cogs."""
+        item_id = row.get('item_id') or row['SK'][len(ITEM_PREFIX):]
+        item = dict(row.get('item_data', {}))
+        item['id'] = item_id
+        item['quantity'] = int(row.get('quantity', 0))
+        item['equipped'] = 'equipped_by' in row
+        return item
+
+    async def list_items(self, user_id: str, limit: int = DEFAULT_PAGE_SIZE,
+                         start_token: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        List one page of a player's inventory.
+
+        Args:
+            user_id: The player's user ID
+            limit: Maximum number of items in the page
+            start_token: Token returned by the previous page
+
+        Returns:
+            A tuple with the items of the page and the token of the next page (or None)
+        """
+        user_id = str(user_id)
+        query_kwargs = {
+            'KeyConditionExpression': 'PK = :pk AND begins_with(SK, :sk)',
+            'ExpressionAttributeValues': {
+                ':pk': f'PLAYER#{user_id}',
+                ':sk': ITEM_PREFIX
+            },
+            'Limit': limit
+        }
+        if start_token:
+            query_kwargs['ExclusiveStartKey'] = self._key(user_id, start_token)
+
+        response = await self.table.query(**query_kwargs)
+        items = [self._row_to_item(row) for row in response.get('Items', [])]
+
+        last_key = response.get('LastEvaluatedKey')
+        next_token = last_key['SK'][len(ITEM_PREFIX):] if last_key else None
+        return items, next_token
+
     async def get_player_inventory(self, user_id: str) -> Dict[str, Any]:
-        """Get player inventory from DynamoDB."""
+        """Get the full player inventory as a dict keyed by item ID."""
         try:
             if not user_id:
                 logger.warning("Empty user_id provided to get_player_inventory")
                 return {}
-            
-            # Ensure user_id is a string
-            user_id = str(user_id)
-            
-            # Get inventory data
-            response = self.table.get_item(
-                Key={
-                    'PK': f'PLAYER#{user_id}',
-                    'SK': 'INVENTORY'
-                }
-            )
-            
-            if 'Item' not in response:
-                logger.info(f"No inventory found for player {user_id}, creating empty inventory")
-                # Create empty inventory
-                empty_inventory = {
-                    'PK': f'PLAYER#{user_id}',
-                    'SK': 'INVENTORY',
-                    'items': {},
-                    'created_at': datetime.now().isoformat(),
-                    'last_updated': datetime.now().isoformat()
-                }
-                await self.table.put_item(Item=empty_inventory)
-                return empty_inventory
-            
-            return response['Item']
-            
+
+            inventory = {}
+            token = None
+            while True:
+                items, token = await self.list_items(user_id, limit=100, start_token=token)
+                for item in items:
+                    inventory[item['id']] = item
+                if not token:
+                    break
+            return inventory
         except Exception as e:
             logger.error(f"Error getting inventory for player {user_id}: {e}")
             return {}
-    
+
+    async def get_inventory_item(self, user_id: str, item_id: str) -> Optional[Dict[str, Any]]:
+        """Get a single inventory entry."""
+        try:
+            response = await self.table.get_item(Key=self._key(str(user_id), str(item_id)))
+            row = response.get('Item')
+            return self._row_to_item(row) if row else None
+        except Exception as e:
+            logger.error(f"Error getting item {item_id} for player {user_id}: {e}")
+            return None
+
     async def add_item_to_inventory(self, user_id: str, item_id: str, item_data: Dict[str, Any]) -> bool:
-        """Add item to player inventory."""
+        """
+        Add an item to the player inventory with a single atomic update.
+
+        The quantity is incremented with ADD; item metadata is only written
+        the first time the item is granted.
+        """
         try:
-            # Get current inventory
-            inventory = await self.get_player_inventory(user_id)
-            
-            # Update items
-            items = inventory.get('items', {})
-            if item_id in items:
-                # Update quantity if item exists
-                current_quantity = items[item_id].get('quantity', 0)
-                items[item_id]['quantity'] = current_quantity + item_data.get('quantity', 1)
-            else:
-                # Add new item
-                items[item_id] = {
-                    'id': item_id,
-                    'quantity': item_data.get('quantity', 1),
-                    'added_at': datetime.now().isoformat(),
-                    **item_data
+            user_id, item_id = str(user_id), str(item_id)
+            now = datetime.now().isoformat()
+            quantity = int(item_data.get('quantity', 1))
+            metadata = _to_decimal({k: v for k, v in item_data.items()
+                                    if k not in ('id', 'quantity', 'equipped')})
+
+            await self.table.update_item(
+                Key=self._key(user_id, item_id),
+                UpdateExpression=(
+                    'ADD quantity :q '
+                    'SET item_id = :id, item_data = if_not_exists(item_data, :data), '
+                    'acquired_at = if_not_exists(acquired_at, :now), last_updated = :now'
+                ),
+                ExpressionAttributeValues={
+                    ':q': quantity,
+                    ':id': item_id,
+                    ':data': metadata,
+                    ':now': now
                 }
-            
-            # Update inventory
-            inventory['items'] = items
-            inventory['last_updated'] = datetime.now().isoformat()
-            
-            await self.table.put_item(Item=inventory)
+            )
             return True
         except Exception as e:
             logger.error(f"Error adding item to inventory for player {user_id}: {e}")
             return False
-    
+
+    async def consume_item(self, user_id: str, item_id: str, quantity: int = 1) -> bool:
+        """
+        Atomically decrement an item's quantity, deleting the row when it reaches zero.
+
+        Returns:
+            False if the player does not hold enough of the item
+        """
+        user_id, item_id = str(user_id), str(item_id)
+        key = self._key(user_id, item_id)
+        try:
+            response = await self.table.update_item(
+                Key=key,
+                UpdateExpression='ADD quantity :neg SET last_updated = :now',
+                ConditionExpression='quantity >= :q',
+                ExpressionAttributeValues={
+                    ':neg': -quantity,
+                    ':q': quantity,
+                    ':now': datetime.now().isoformat()
+                },
+                ReturnValues='UPDATED_NEW'
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                logger.info(f"Player {user_id} does not have {quantity}x {item_id}")
+                return False
+            logger.error(f"Error consuming item {item_id} for player {user_id}: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Error consuming item {item_id} for player {user_id}: {e}")
+            return False
+
+        remaining = response.get('Attributes', {}).get('quantity', 1)
+        if remaining <= 0:
+            try:
+                # Conditional so a concurrent grant between the two writes is never lost
+                await self.table.delete_item(
+                    Key=key,
+                    ConditionExpression='quantity <= :zero',
+                    ExpressionAttributeValues={':zero': 0}
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    logger.error(f"Error cleaning up item {item_id} for player {user_id}: {e}")
+        return True
+
     async def remove_item_from_inventory(self, user_id: str, item_id: str) -> bool:
-        """Remove item from player inventory."""
+        """Remove an item from the player inventory regardless of its quantity."""
         try:
-            # Get current inventory
-            inventory = await self.get_player_inventory(user_id)
-            
-            # Update items
-            items = inventory.get('items', {})
-            if item_id in items:
-                del items[item_id]
-                inventory['items'] = items
-                inventory['last_updated'] = datetime.now().isoformat()
-                
-                await self.table.put_item(Item=inventory)
-                return True
+            await self.table.delete_item(
+                Key=self._key(str(user_id), str(item_id)),
+                ConditionExpression='attribute_exists(PK)'
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            logger.error(f"Error removing item from inventory for player {user_id}: {e}")
             return False
         except Exception as e:
             logger.error(f"Error removing item from inventory for player {user_id}: {e}")
             return False
 
+    async def get_equipped_items(self, user_id: str) -> Dict[str, Any]:
+        """
+        Get the player's equipped items through the sparse index.
+
+        Raises:
+            DynamoDBOperationError: If the table has no EquippedItemsIndex
+                (run the equipped_index migration)
+        """
+        try:
+            response = await self.table.query(
+                IndexName=EQUIPPED_INDEX,
+                KeyConditionExpression='equipped_by = :owner',
+                ExpressionAttributeValues={':owner': f'PLAYER#{user_id}'}
+            )
+            return {item['id']: item for item in map(self._row_to_item, response.get('Items', []))}
+        except ClientError as e:
+            # Without the index there is no way to tell "nothing equipped" from "not provisioned"
+            if e.response['Error']['Code'] == 'ValidationException':
+                raise DynamoDBOperationError(f"{EQUIPPED_INDEX} is missing on the inventory table: {e}") from e
+            logger.error(f"Error getting equipped items for player {user_id}: {e}")
+            return {}
+        except Exception as e:
+            logger.error(f"Error getting equipped items for player {user_id}: {e}")
+            return {}
+
+
 # Create singleton instance
 dynamodb_inventory = DynamoDBInventory()
 
 # Export functions
 get_player_inventory = dynamodb_inventory.get_player_inventory
+get_inventory_item = dynamodb_inventory.get_inventory_item
+list_inventory_items = dynamodb_inventory.list_items
 add_item_to_inventory = dynamodb_inventory.add_item_to_inventory
+consume_item = dynamodb_inventory.consume_item
 remove_item_from_inventory = dynamodb_inventory.remove_item_from_inventory
+get_equipped_items = dynamodb_inventory.get_equipped_items
+
 
 @handle_dynamo_error
 async def use_item(user_id: str, item_id: str) -> bool:
     """
     Use an item from inventory.
-    
+
     Args:
         user_id: The player's user ID
         item_id: The ID of the item to use
-        
+
     Returns:
         True if successful, False otherwise
     """
     try:
-        table = get_table(TABLES['inventory'])
-        
-        # Get current inventory
-        response = await table.get_item(
-            Key={
-                'PK': f'USER#{user_id}',
-                'SK': 'INVENTORY'
-            }
-        )
-        
-        if 'Item' not in response:
+        item = await get_inventory_item(user_id, item_id)
+        if not item or item['quantity'] <= 0:
             logger.warning(f"Item {item_id} not found in player {user_id}'s inventory")
             return False
-            
-        current_items = response['Item'].get('items', {})
-        
-        # Find item
-        if item_id in current_items:
-            # Apply item effects
-            effect_handler = ItemEffectHandler()
-            success = await effect_handler.apply_effects(user_id, current_items[item_id])
-            
-            if not success:
-                return False
-                
-            # Remove item after use
-            del current_items[item_id]
-            
-            # Update inventory
-            await table.put_item(
-                Item={
-                    'PK': f'USER#{user_id}',
-                    'SK': 'INVENTORY',
-                    'items': current_items
-                }
-            )
-            
-            return True
-            
-        logger.warning(f"Item {item_id} not found in player {user_id}'s inventory")
-        return False
+
+        # Apply item effects
+        effect_handler = ItemEffectHandler()
+        success = await effect_handler.apply_effects(user_id, item)
+
+        if not success:
+            return False
+
+        # Consume one unit after use
+        return await consume_item(user_id, item_id)
     except Exception as e:
         logger.error(f"Error using item {item_id} for player {user_id}: {str(e)}")
         return False
 
+
 async def get_inventory(user_id: int) -> Dict[str, Any]:
     """
     Get a player's inventory from DynamoDB.
-    
+
     Args:
         user_id: The player's user ID
-        
+
     Returns:
         The player's inventory data
     """
-    try:
-        # Get the table
-        table = await get_table(TABLES['inventory'])
-        
-        # Get the inventory
-        response = await table.get_item(
-            Key={
-                'user_id': user_id
-            }
-        )
-        
-        # Return the inventory data
-        return response.get('Item', {})
-    except Exception as e:
-        logger.error(f"Error getting inventory for player {user_id}: {e}")
-        return {} 
\ No newline at end of file
+    return await get_player_inventory(str(user_id))
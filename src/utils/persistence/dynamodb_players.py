@@ -3,6 +3,7 @@ DynamoDB implementation for player data persistence.
 """
 
 import boto3
+import decimal
 import logging
 from typing import Optional, Dict, Any, List
 from datetime import datetime
@@ -20,6 +21,7 @@ from utils.persistence.dynamodb import (
     handle_dynamo_error,
     DynamoDBOperationError
 )
+from utils.persistence.compression import compress_player_item, decompress_player_item
 from botocore.exceptions import ClientError
 
 logger = get_logger('tokugawa_bot.players')
@@ -63,35 +65,10 @@ class DynamoDBPlayers:
                 logger.info(f"No player found for user_id: {user_id}")
                 return None
             
-            item = response['Item']
+            item = decompress_player_item(response['Item'])
             
-            # Handle inventory serialization
-            if isinstance(item.get('inventory'), str):
-                try:
-                    item['inventory'] = json.loads(item['inventory'])
-                except Exception as e:
-                    logger.warning(f"Could not decode inventory for player {user_id}: {e}")
-                    item['inventory'] = {}
-            
-            # Ensure inventory is a dictionary
-            if not isinstance(item.get('inventory'), dict):
-                item['inventory'] = {}
-            
-            # Normalize inventory items
-            for item_id, item_data in item['inventory'].items():
-                if isinstance(item_data, str):
-                    try:
-                        item['inventory'][item_id] = json.loads(item_data)
-                    except:
-                        item['inventory'][item_id] = {
-                            'id': item_id,
-                            'quantity': 1
-                        }
-                elif not isinstance(item_data, dict):
-                    item['inventory'][item_id] = {
-                        'id': item_id,
-                        'quantity': 1
-                    }
+            # Inventory lives in the Inventario table (one row per item) and is
+            # no longer decoded here; see dynamodb_inventory
             
             # Check for missing attributes
             missing_attrs = []
@@ -104,19 +81,17 @@ class DynamoDBPlayers:
             # If any attributes were missing, update the player record
             if missing_attrs:
                 logger.info(f"Updating player {user_id} with missing attributes: {missing_attrs}")
-                update_item = {
+                profile_item = {
                     'PK': f"PLAYER#{user_id}",
                     'SK': 'PROFILE',
                     **item
                 }
                 # Convert numeric values to Decimal for DynamoDB
-                for k, v in update_item.items():
+                for k, v in profile_item.items():
                     if isinstance(v, (int, float)):
-                        update_item[k] = decimal.Decimal(str(v))
-                    elif k == 'inventory' and isinstance(v, dict):
-                        update_item[k] = json.dumps(v)
+                        profile_item[k] = decimal.Decimal(str(v))
                 try:
-                    await self.table.put_item(Item=update_item)
+                    await self.table.put_item(Item=compress_player_item(profile_item))
                     logger.info(f"Successfully updated player {user_id} with missing attributes")
                 except Exception as e:
                     logger.error(f"Failed to update player {user_id} with missing attributes: {e}")
@@ -160,7 +135,7 @@ class DynamoDBPlayers:
                 **kwargs
             }
             
-            await self.table.put_item(Item=item)
+            await self.table.put_item(Item=compress_player_item(item))
             return True
         except Exception as e:
             logger.error(f"Error creating player: {e}")
@@ -190,7 +165,7 @@ class DynamoDBPlayers:
             current_data['updated_at'] = datetime.now().isoformat()
             
             # Update in DynamoDB
-            await self.table.put_item(Item=current_data)
+            await self.table.put_item(Item=compress_player_item(current_data))
             return True
         except Exception as e:
             logger.error(f"Error updating player: {e}")
@@ -208,7 +183,7 @@ class DynamoDBPlayers:
                     ':pk': 'PLAYER#'
                 }
             )
-            return response.get('Items', [])
+            return [decompress_player_item(item) for item in response.get('Items', [])]
         except Exception as e:
             logger.error(f"Error getting all players: {e}")
             return []
@@ -228,7 +203,7 @@ class DynamoDBPlayers:
             
             players = response.get('Items', [])
             players.sort(key=lambda x: (x.get('level', 0), x.get('exp', 0)), reverse=True)
-            return players[:limit]
+            return [decompress_player_item(item) for item in players[:limit]]
         except Exception as e:
             logger.error(f"Error getting top players: {e}")
             return []
@@ -270,7 +245,7 @@ async def get_club_members(club_id: str) -> List[Dict[str, Any]]:
                 ':club_id': club_id
             }
         )
-        return response.get('Items', [])
+        return [decompress_player_item(item) for item in response.get('Items', [])]
     except Exception as e:
         logger.error(f"Error getting club members: {e}")
         return []
@@ -290,9 +265,13 @@ async def update_player_stats(user_id: str, stats: Dict[str, int]) -> bool:
 
 @handle_dynamo_error
 async def update_player_inventory(user_id: str, inventory: Dict[str, Any]) -> bool:
-    """Update a player's inventory."""
+    """Add the given items to a player's inventory rows."""
     try:
-        return await update_player(user_id, inventory=json.dumps(inventory))
+        from utils.persistence.dynamodb_inventory import add_item_to_inventory
+        for item_id, item_data in inventory.items():
+            if not await add_item_to_inventory(user_id, item_id, item_data):
+                return False
+        return True
     except Exception as e:
         logger.error(f"Error updating player inventory: {e}")
         return False
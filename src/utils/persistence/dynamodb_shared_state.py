@@ -0,0 +1,104 @@
+"""
+Shared state documents for cluster-wide services.
+
+Small JSON documents stored in SystemFlags (PK=STATE#<name>, SK=CURRENT) so
+every worker of a shard cluster sees the same state. Each document carries a
+version number; writes are conditional on it, so two workers changing the
+same document cannot overwrite each other.
+"""
+
+import json
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from utils.logging_config import get_logger
+
+logger = get_logger('tokugawa_bot.shared_state')
+
+# Attempts of update_shared_state before giving up on a contended document
+MAX_UPDATE_ATTEMPTS = 5
+
+
+class SharedStateConflict(Exception):
+    """Raised when a shared state document kept changing under an update."""
+    pass
+
+
+def _table():
+    from utils.persistence.db_provider import db_provider
+    return db_provider.SYSTEM_FLAGS_TABLE
+
+
+def _key(name: str) -> Dict[str, str]:
+    return {'PK': f'STATE#{name}', 'SK': 'CURRENT'}
+
+
+def _is_conditional_failure(error: Exception) -> bool:
+    return getattr(error, 'response', {}).get('Error', {}).get('Code') == 'ConditionalCheckFailedException'
+
+
+async def load_shared_state(name: str) -> Tuple[Optional[Dict[str, Any]], int]:
+    """
+    Load a shared state document.
+
+    Returns:
+        Tuple of (document or None if it does not exist, version)
+    """
+    response = await asyncio.to_thread(_table().get_item, Key=_key(name), ConsistentRead=True)
+    item = response.get('Item')
+    if not item:
+        return None, 0
+    return json.loads(item['value']), int(item.get('version', 0))
+
+
+async def save_shared_state(name: str, data: Dict[str, Any], expected_version: int) -> bool:
+    """
+    Write a shared state document if nobody changed it since expected_version.
+
+    Returns:
+        True if written, False if another writer got there first
+    """
+    item = dict(_key(name))
+    item.update({
+        'value': json.dumps(data, default=str, ensure_ascii=False),
+        'version': expected_version + 1,
+        'type': 'shared_state',
+        'last_updated': datetime.now().isoformat()
+    })
+    if expected_version:
+        condition = {'ConditionExpression': 'version = :version',
+                     'ExpressionAttributeValues': {':version': expected_version}}
+    else:
+        condition = {'ConditionExpression': 'attribute_not_exists(PK)'}
+    try:
+        await asyncio.to_thread(_table().put_item, Item=item, **condition)
+        return True
+    except Exception as e:
+        if _is_conditional_failure(e):
+            return False
+        raise
+
+
+async def update_shared_state(name: str, apply: Callable[[Optional[Dict[str, Any]]], Tuple[Dict[str, Any], Any]]) -> Any:
+    """
+    Read-modify-write a shared state document with optimistic concurrency.
+
+    Args:
+        name: Document name
+        apply: Receives the current document (None if missing) and returns
+            (new document, result); it is re-run on the fresh document after a conflict
+
+    Returns:
+        The result returned by apply
+
+    Raises:
+        SharedStateConflict: If the document changed under every attempt
+    """
+    for attempt in range(MAX_UPDATE_ATTEMPTS):
+        current, version = await load_shared_state(name)
+        data, result = apply(current)
+        if await save_shared_state(name, data, version):
+            return result
+        logger.info(f"Shared state {name} changed during update, retrying ({attempt + 1})")
+    raise SharedStateConflict(f"Shared state {name} kept changing during update")
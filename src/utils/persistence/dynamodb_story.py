@@ -1,62 +1,436 @@
 """
 Story operations for DynamoDB.
+
+Story progress is stored as its own item in the main table
+(PK = PLAYER#<user_id>, SK = STORY_PROGRESS) and is written incrementally:
+
+- position fields (current chapter, dialogue index) are changed with targeted SETs;
+- chapter/scene lists that only grow are String Sets updated with ADD;
+- choices are appended to ``choice_log`` with list_append.
+
+Reads fold the item back into the compact progress dict used by the story
+engine, so a story click writes a few bytes instead of the whole history.
 """
 
+import json
 import logging
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterable
 from decimal import Decimal
+from botocore.exceptions import ClientError
 from utils.logging_config import get_logger
-from utils.persistence.dynamodb import handle_dynamo_error, get_table
+from utils.persistence.dynamodb import handle_dynamo_error, get_table, TABLES
 
 logger = get_logger('tokugawa_bot.story')
 
+STORY_SK = 'STORY_PROGRESS'
+
+# Fields changed with targeted SETs on every story click
+POSITION_ATTRIBUTES = ('current_chapter', 'current_dialogue_index', 'full_chapter_id', 'current_challenge_chapter')
+
+# Append-only lists stored as String Sets
+SET_ATTRIBUTES = (
+    'completed_chapters',
+    'completed_challenge_chapters',
+    'failed_challenge_chapters',
+    'blocked_chapter_arcs',
+    'villain_defeats',
+    'minion_defeats',
+    'discovered_secrets',
+    'completed_events',
+    'visited_scenes'
+)
+
+# {chapter: {key: value}} maps rebuilt from the choice log
+CHOICE_ATTRIBUTES = ('story_choices', 'choices')
+
+CHOICE_LOG = 'choice_log'
+
+_story_table = None
+
+
+def _table():
+    """Get the main table, resolving it once."""
+    global _story_table
+    if _story_table is None:
+        _story_table = get_table(TABLES['main'])
+    return _story_table
+
+
+def _key(user_id: str) -> Dict[str, str]:
+    return {'PK': f'PLAYER#{user_id}', 'SK': STORY_SK}
+
+
+def _to_decimal(obj):
+    """Convert floats to Decimal for DynamoDB compatibility."""
+    if isinstance(obj, float):
+        return Decimal(str(obj))
+    elif isinstance(obj, dict):
+        return {k: _to_decimal(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [_to_decimal(v) for v in obj]
+    return obj
+
+
+class _UpdateBuilder:
+    """Accumulates SET/ADD/REMOVE clauses for a single UpdateItem."""
+
+    def __init__(self):
+        self.set_clauses: List[str] = []
+        self.add_clauses: List[str] = []
+        self.remove_clauses: List[str] = []
+        self.names: Dict[str, str] = {}
+        self.values: Dict[str, Any] = {}
+
+    def _name(self, attribute: str) -> str:
+        placeholder = f'#a{len(self.names)}'
+        self.names[placeholder] = attribute
+        return placeholder
+
+    def _value(self, value: Any) -> str:
+        placeholder = f':v{len(self.values)}'
+        self.values[placeholder] = _to_decimal(value)
+        return placeholder
+
+    def set(self, attribute: str, value: Any):
+        if isinstance(value, (set, frozenset, list, tuple)) and attribute in SET_ATTRIBUTES:
+            value = {str(v) for v in value}
+            if not value:
+                # DynamoDB does not store empty sets
+                self.remove(attribute)
+                return
+        self.set_clauses.append(f'{self._name(attribute)} = {self._value(value)}')
+
+    def add(self, attribute: str, value: Any):
+        self.add_clauses.append(f'{self._name(attribute)} {self._value(value)}')
+
+    def append(self, attribute: str, entries: List[Any]):
+        name = self._name(attribute)
+        self.set_clauses.append(
+            f'{name} = list_append(if_not_exists({name}, {self._value([])}), {self._value(entries)})'
+        )
+
+    def remove(self, attribute: str):
+        self.remove_clauses.append(self._name(attribute))
+
+    def __bool__(self):
+        return bool(self.set_clauses or self.add_clauses or self.remove_clauses)
+
+    def build(self) -> Dict[str, Any]:
+        self.set_clauses.append(f"{self._name('last_updated')} = {self._value(datetime.now().isoformat())}")
+        parts = ['SET ' + ', '.join(self.set_clauses)]
+        if self.add_clauses:
+            parts.append('ADD ' + ', '.join(self.add_clauses))
+        if self.remove_clauses:
+            parts.append('REMOVE ' + ', '.join(self.remove_clauses))
+        return {
+            'UpdateExpression': ' '.join(parts),
+            'ExpressionAttributeNames': self.names,
+            'ExpressionAttributeValues': self.values
+        }
+
+
+def _choice_entries(attribute: str, before: Dict[str, Any], after: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Log entries for the choices that are new or changed in ``after``."""
+    now = datetime.now().isoformat()
+    entries = []
+    for chapter_id, chapter_choices in (after or {}).items():
+        if not isinstance(chapter_choices, dict):
+            continue
+        previous = (before or {}).get(chapter_id) or {}
+        for choice_key, choice_value in chapter_choices.items():
+            if choice_key not in previous or previous[choice_key] != choice_value:
+                entries.append({
+                    'attribute': attribute,
+                    'chapter': str(chapter_id),
+                    'key': str(choice_key),
+                    'value': choice_value,
+                    'timestamp': now
+                })
+    return entries
+
+
+def _to_read_model(item: Dict[str, Any], include_log: bool = False) -> Dict[str, Any]:
+    """Fold a stored progress item into the compact progress dict."""
+    progress = {k: v for k, v in item.items() if k not in ('PK', 'SK', CHOICE_LOG)}
+
+    for attribute in SET_ATTRIBUTES:
+        if isinstance(progress.get(attribute), (set, frozenset)):
+            progress[attribute] = sorted(progress[attribute])
+
+    if 'current_dialogue_index' in progress:
+        progress['current_dialogue_index'] = int(progress['current_dialogue_index'])
+
+    # Replay the choice log over any legacy choice maps; later entries win
+    for entry in item.get(CHOICE_LOG, []):
+        attribute = entry.get('attribute', 'story_choices')
+        choices = progress.setdefault(attribute, {})
+        choices.setdefault(entry['chapter'], {})[entry['key']] = entry.get('value')
+
+    if include_log:
+        progress[CHOICE_LOG] = list(item.get(CHOICE_LOG, []))
+    return progress
+
+
+def merge_story_progress(legacy: Optional[Dict[str, Any]], stored: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Overlay the stored progress on the legacy copy kept in the player item.
+
+    Keys present in the store win; set attributes are merged.
+    """
+    if isinstance(legacy, str):
+        # Older code stored the progress as a JSON string
+        try:
+            legacy = json.loads(legacy)
+        except ValueError:
+            legacy = {}
+    if not isinstance(legacy, dict):
+        legacy = {}
+    merged = {**legacy, **stored}
+    for attribute in SET_ATTRIBUTES:
+        if attribute in legacy and attribute in stored:
+            merged[attribute] = sorted(set(map(str, legacy[attribute] or [])) | set(stored[attribute]))
+    for attribute in CHOICE_ATTRIBUTES:
+        if isinstance(legacy.get(attribute), dict) and attribute in stored:
+            combined = {chapter: dict(choices) for chapter, choices in legacy[attribute].items()
+                        if isinstance(choices, dict)}
+            for chapter, choices in stored[attribute].items():
+                combined.setdefault(chapter, {}).update(choices)
+            merged[attribute] = combined
+    return merged
+
+
+async def _apply_update(user_id: str, builder: _UpdateBuilder, return_values: Optional[str] = None):
+    """Run an update built by _UpdateBuilder."""
+    kwargs = {'Key': _key(user_id), **builder.build()}
+    if return_values:
+        kwargs['ReturnValues'] = return_values
+    return await _table().update_item(**kwargs)
+
+
 @handle_dynamo_error
-async def get_story_progress(user_id: str) -> Dict[str, Any]:
-    """Get a player's story progress."""
+async def get_story_progress(user_id: str, include_log: bool = False) -> Dict[str, Any]:
+    """Get a player's story progress as a compact read model."""
     try:
-        table = get_table('AcademiaTokugawa')
-        response = await table.get_item(Key={'PK': f'PLAYER#{user_id}', 'SK': 'STORY_PROGRESS'})
-        return response.get('Item', {})
+        response = await _table().get_item(Key=_key(user_id))
+        item = response.get('Item')
+        return _to_read_model(item, include_log) if item else {}
     except Exception as e:
         logger.error(f"Error getting story progress for player {user_id}: {str(e)}")
         return {}
 
+
+@handle_dynamo_error
+async def get_story_position(user_id: str) -> Dict[str, Any]:
+    """Get only the position fields of a player's story progress."""
+    try:
+        names = {f'#p{i}': attr for i, attr in enumerate(POSITION_ATTRIBUTES)}
+        response = await _table().get_item(
+            Key=_key(user_id),
+            ProjectionExpression=', '.join(names),
+            ExpressionAttributeNames=names
+        )
+        return _to_read_model(response.get('Item', {}))
+    except Exception as e:
+        logger.error(f"Error getting story position for player {user_id}: {str(e)}")
+        return {}
+
+
+async def load_story_progress(user_id: str, legacy: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Get the story progress overlaid on the legacy copy from the player item."""
+    return merge_story_progress(legacy, await get_story_progress(user_id))
+
+
+async def with_story_progress(player_data: Optional[Dict[str, Any]],
+                              user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Attach the current story progress to player data read from the players table."""
+    if not player_data:
+        return player_data
+    user_id = user_id or player_data.get('user_id') or player_data.get('PK', '').split('#', 1)[-1]
+    if not user_id:
+        return player_data
+    player_data['story_progress'] = await load_story_progress(str(user_id), player_data.get('story_progress'))
+    return player_data
+
+
 @handle_dynamo_error
 async def update_story_progress(user_id: str, progress_data: Dict[str, Any]) -> bool:
-    """Update a player's story progress."""
+    """
+    Update fields of a player's story progress without rewriting the item.
+
+    Each given field is written with a targeted SET; set attributes are
+    replaced as String Sets. Choice maps are appended to the choice log.
+    """
     try:
-        table = get_table('AcademiaTokugawa')
-        
-        # Get current progress
-        current_data = await get_story_progress(user_id)
-        
-        # Update progress
-        updated_data = {
-            'PK': f'PLAYER#{user_id}',
-            'SK': 'STORY_PROGRESS',
-            **current_data,
-            **progress_data,
-            'last_updated': datetime.now().isoformat()
-        }
-        
-        # Store updated progress
-        await table.put_item(Item=updated_data)
+        builder = _UpdateBuilder()
+        entries = []
+        for attribute, value in progress_data.items():
+            if attribute in ('PK', 'SK', 'last_updated', CHOICE_LOG):
+                continue
+            if attribute in CHOICE_ATTRIBUTES and isinstance(value, dict):
+                entries.extend(_choice_entries(attribute, {}, value))
+            elif value is None:
+                builder.remove(attribute)
+            else:
+                builder.set(attribute, value)
+        if entries:
+            builder.append(CHOICE_LOG, entries)
+
+        await _apply_update(user_id, builder)
         return True
     except Exception as e:
         logger.error(f"Error updating story progress for player {user_id}: {str(e)}")
         return False
 
+
+@handle_dynamo_error
+async def set_story_position(user_id: str, current_chapter: Optional[str] = None,
+                             dialogue_index: Optional[int] = None,
+                             full_chapter_id: Optional[str] = None) -> bool:
+    """Move the player's story cursor with a single targeted SET."""
+    try:
+        builder = _UpdateBuilder()
+        if current_chapter is not None:
+            builder.set('current_chapter', current_chapter)
+        if dialogue_index is not None:
+            builder.set('current_dialogue_index', int(dialogue_index))
+        if full_chapter_id is not None:
+            builder.set('full_chapter_id', full_chapter_id)
+        await _apply_update(user_id, builder)
+        return True
+    except Exception as e:
+        logger.error(f"Error updating story position for player {user_id}: {str(e)}")
+        return False
+
+
+@handle_dynamo_error
+async def add_story_set_members(user_id: str, attribute: str, members: Iterable[str]) -> bool:
+    """Add members to an append-only story set (completed chapters, visited scenes...)."""
+    members = {str(m) for m in members}
+    if not members:
+        return True
+    try:
+        builder = _UpdateBuilder()
+        builder.add(attribute, members)
+        await _apply_update(user_id, builder)
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ValidationException':
+            logger.error(f"Error adding to {attribute} for player {user_id}: {str(e)}")
+            return False
+        # Legacy items keep these attributes as lists; convert them once
+        current = await get_story_progress(user_id)
+        return await update_story_progress(user_id, {attribute: set(current.get(attribute, [])) | members})
+    except Exception as e:
+        logger.error(f"Error adding to {attribute} for player {user_id}: {str(e)}")
+        return False
+
+
+async def complete_story_chapter(user_id: str, chapter_id: str) -> bool:
+    """Mark a chapter as completed."""
+    return await add_story_set_members(user_id, 'completed_chapters', [chapter_id])
+
+
+async def record_scene_visit(user_id: str, scene_id: str) -> bool:
+    """Record that the player has seen a scene."""
+    return await add_story_set_members(user_id, 'visited_scenes', [scene_id])
+
+
+@handle_dynamo_error
+async def add_story_counter(user_id: str, attribute: str, amount: int) -> Optional[int]:
+    """Atomically add to a numeric story attribute and return its new value."""
+    try:
+        builder = _UpdateBuilder()
+        builder.add(attribute, amount)
+        response = await _apply_update(user_id, builder, return_values='UPDATED_NEW')
+        return int(response.get('Attributes', {}).get(attribute, 0))
+    except Exception as e:
+        logger.error(f"Error adding to {attribute} for player {user_id}: {str(e)}")
+        return None
+
+
+def _delta_update(before: Dict[str, Any], after: Dict[str, Any], full_sets: bool = False) -> _UpdateBuilder:
+    """Build the update for what changed between two versions of the progress."""
+    builder = _UpdateBuilder()
+    entries = []
+
+    for attribute, value in after.items():
+        if attribute in ('PK', 'SK', 'last_updated', CHOICE_LOG):
+            continue
+        previous = before.get(attribute)
+        if value == previous:
+            continue
+
+        if attribute in CHOICE_ATTRIBUTES and isinstance(value, dict):
+            entries.extend(_choice_entries(attribute, previous, value))
+        elif attribute in SET_ATTRIBUTES and isinstance(value, (list, set, tuple)):
+            old_members, new_members = set(map(str, previous or [])), set(map(str, value))
+            if full_sets or old_members - new_members:
+                builder.set(attribute, new_members)
+            elif new_members - old_members:
+                builder.add(attribute, new_members - old_members)
+        elif value is None:
+            builder.remove(attribute)
+        else:
+            builder.set(attribute, value)
+
+    if entries:
+        builder.append(CHOICE_LOG, entries)
+    return builder
+
+
+@handle_dynamo_error
+async def save_story_progress_delta(user_id: str, before: Optional[Dict[str, Any]],
+                                    after: Dict[str, Any]) -> bool:
+    """
+    Persist only what changed between two versions of the story progress.
+
+    Args:
+        user_id: The player's user ID
+        before: Progress as it was loaded
+        after: Progress after the story engine processed the interaction
+
+    Returns:
+        True if successful (or nothing changed), False otherwise
+    """
+    before = before or {}
+    builder = _delta_update(before, after)
+    if not builder:
+        return True
+
+    try:
+        await _apply_update(user_id, builder)
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ValidationException':
+            logger.error(f"Error saving story progress for player {user_id}: {str(e)}")
+            return False
+        # Legacy items keep set attributes as lists, which ADD rejects; write them as full sets once
+        try:
+            await _apply_update(user_id, _delta_update(before, after, full_sets=True))
+            return True
+        except Exception as retry_error:
+            logger.error(f"Error saving story progress for player {user_id}: {str(retry_error)}")
+            return False
+    except Exception as e:
+        logger.error(f"Error saving story progress for player {user_id}: {str(e)}")
+        return False
+
+
 @handle_dynamo_error
 async def get_chapter_progress(user_id: str, chapter: str) -> Dict[str, Any]:
     """Get a player's progress for a specific chapter."""
     try:
-        data = await get_story_progress(user_id)
-        return data.get('chapters', {}).get(chapter, {})
+        data = await get_story_progress(user_id, include_log=True)
+        return {
+            'completed': chapter in data.get('completed_chapters', []),
+            'choices': [entry for entry in data.get(CHOICE_LOG, []) if entry.get('chapter') == chapter]
+        }
     except Exception as e:
         logger.error(f"Error getting chapter progress for player {user_id}: {str(e)}")
         return {}
 
+
 @handle_dynamo_error
 async def get_story_choices(user_id: str, chapter: str) -> List[Dict[str, Any]]:
     """Get a player's choices for a specific chapter."""
@@ -67,59 +441,97 @@ async def get_story_choices(user_id: str, chapter: str) -> List[Dict[str, Any]]:
         logger.error(f"Error getting story choices for player {user_id}: {str(e)}")
         return []
 
+
 @handle_dynamo_error
 async def record_story_choice(user_id: str, chapter: str, choice: Dict[str, Any]) -> bool:
-    """Record a player's choice in a chapter."""
+    """Append a player's choice in a chapter to the choice log."""
     try:
-        current_choices = await get_story_choices(user_id, chapter)
-        current_choices.append({
-            **choice,
+        entry = {
+            'attribute': choice.get('attribute', 'story_choices'),
+            'chapter': str(chapter),
+            'key': str(choice.get('key', choice.get('choice_key', ''))),
+            'value': choice.get('value', choice.get('choice_value')),
+            **{k: v for k, v in choice.items() if k not in ('attribute', 'key', 'value', 'choice_key', 'choice_value')},
             'timestamp': datetime.now().isoformat()
-        })
-        
-        return await update_story_progress(user_id, {'choices': current_choices})
+        }
+        builder = _UpdateBuilder()
+        builder.append(CHOICE_LOG, [entry])
+        await _apply_update(user_id, builder)
+        return True
     except Exception as e:
         logger.error(f"Error recording story choice for player {user_id}: {str(e)}")
         return False
 
+
+def story_progress_by_player(items: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Fold the STORY_PROGRESS items of a scan or snapshot into progress dicts keyed by user id."""
+    return {
+        item['PK'].split('#', 1)[-1]: _to_read_model(item)
+        for item in items
+        if item.get('SK') == STORY_SK and item.get('PK')
+    }
+
+
+@handle_dynamo_error
+async def get_all_story_progress() -> Dict[str, Dict[str, Any]]:
+    """Get the story progress of every player, keyed by user id."""
+    try:
+        table = _table()
+        scan_kwargs = {
+            'FilterExpression': 'SK = :sk',
+            'ExpressionAttributeValues': {':sk': STORY_SK}
+        }
+        items = []
+        while True:
+            response = await table.scan(**scan_kwargs)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        return story_progress_by_player(items)
+    except Exception as e:
+        logger.error(f"Error getting story progress of all players: {str(e)}")
+        return {}
+
+
 @handle_dynamo_error
 async def get_story_stats() -> Dict[str, Any]:
     """Get overall story statistics."""
     try:
-        table = get_table('AcademiaTokugawa')
-        response = await table.scan(
-            FilterExpression='SK = :sk',
-            ExpressionAttributeValues={
-                ':sk': 'STORY_PROGRESS'
-            }
-        )
-        
-        players = response.get('Items', [])
+        table = _table()
+        scan_kwargs = {
+            'FilterExpression': 'SK = :sk',
+            'ExpressionAttributeValues': {':sk': STORY_SK}
+        }
+        players = []
+        while True:
+            response = await table.scan(**scan_kwargs)
+            players.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
         if not players:
             return {}
-            
+
         stats = {
             'total_players': len(players),
             'chapters': {},
             'choices': {}
         }
-        
-        for player in players:
-            chapters = player.get('completed_chapters', [])
-            for chapter in chapters:
-                if chapter not in stats['chapters']:
-                    stats['chapters'][chapter] = 0
-                stats['chapters'][chapter] += 1
-                
-            choices = player.get('story_choices', {})
+
+        for item in players:
+            progress = _to_read_model(item)
+            for chapter in progress.get('completed_chapters', []):
+                stats['chapters'][chapter] = stats['chapters'].get(chapter, 0) + 1
+
+            choices = progress.get('story_choices', {})
             for chapter_id, chapter_choices in choices.items():
-                for choice_key, choice_value in chapter_choices.items():
+                for choice_key in chapter_choices:
                     choice_id = f"{chapter_id}:{choice_key}"
-                    if choice_id not in stats['choices']:
-                        stats['choices'][choice_id] = 0
-                    stats['choices'][choice_id] += 1
-        
+                    stats['choices'][choice_id] = stats['choices'].get(choice_id, 0) + 1
+
         return stats
     except Exception as e:
         logger.error(f"Error getting story stats: {str(e)}")
-        return {} 
\ No newline at end of file
+        return {}
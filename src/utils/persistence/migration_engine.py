@@ -0,0 +1,423 @@
+"""
+Bulk migration engine for Academia Tokugawa.
+
+Runs a data migration as a pipeline:
+
+    parallel scan segments -> transform pipeline -> batched writes
+
+Writes go through BatchWriteItem (with unprocessed-item retry) or targeted
+UpdateItem calls, are throttled by a token bucket so the live bot is not
+starved, and progress is checkpointed per segment in SystemFlags so an
+interrupted migration resumes where it stopped. A segment stops at the first
+page with failed writes without advancing its checkpoint, so a resumed run
+retries that page; the checkpoint is deleted once every segment completes.
+In dry-run mode nothing is written and diff statistics describe what the
+migration would change.
+"""
+
+import json
+import time
+import random
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from boto3.dynamodb.types import TypeSerializer
+
+from utils.logging_config import get_logger
+
+logger = get_logger('tokugawa_bot.migration_engine')
+
+# DynamoDB limit for a single BatchWriteItem request
+MAX_BATCH_SIZE = 25
+
+
+class DeleteItem:
+    """Transform output requesting the deletion of an item."""
+
+    __slots__ = ('key',)
+
+    def __init__(self, key: Dict[str, Any]):
+        self.key = key
+
+
+class UpdateItem:
+    """Transform output requesting a targeted UpdateItem instead of a full put."""
+
+    __slots__ = ('key', 'params')
+
+    def __init__(self, key: Dict[str, Any], **params):
+        self.key = key
+        self.params = params
+
+
+MigrationOutput = Union[Dict[str, Any], DeleteItem, UpdateItem]
+Transform = Callable[[Dict[str, Any]], Union[None, MigrationOutput, Iterable[MigrationOutput]]]
+
+
+class RateLimiter:
+    """Token bucket limiting the number of write units per second."""
+
+    def __init__(self, rate: Optional[float], burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = max(rate or 0, burst or MAX_BATCH_SIZE)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: int = 1):
+        """Wait until ``amount`` tokens are available."""
+        if not self.rate:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+class MigrationCheckpoint:
+    """Per-segment progress of a migration, persisted as a SystemFlags entry."""
+
+    def __init__(self, name: str, table=None):
+        self.name = name
+        self.table = table
+        self.segments: Dict[str, Dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def key(self) -> Dict[str, str]:
+        return {'PK': 'SYSTEM', 'SK': f'FLAG#migration_checkpoint_{self.name}'}
+
+    async def load(self):
+        """Load the stored checkpoint, if any."""
+        if self.table is None:
+            return
+        loop = asyncio.get_event_loop()
+        response = await loop.run_in_executor(None, lambda: self.table.get_item(Key=self.key))
+        value = response.get('Item', {}).get('value')
+        self.segments = json.loads(value) if value else {}
+
+    async def save(self, segment: int, last_key: Optional[Dict[str, Any]], done: bool, scanned: int):
+        """Store the progress of one segment."""
+        async with self._lock:
+            self.segments[str(segment)] = {'last_key': last_key, 'done': done, 'scanned': scanned}
+            if self.table is None:
+                return
+            item = {
+                **self.key,
+                'value': json.dumps(self.segments, default=str),
+                'flag_type': 'migration',
+                'updated_at': datetime.now().isoformat()
+            }
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, lambda: self.table.put_item(Item=item))
+
+    async def clear(self):
+        """Forget all stored progress."""
+        self.segments = {}
+        if self.table is None:
+            return
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, lambda: self.table.delete_item(Key=self.key))
+
+    def segment(self, segment: int) -> Dict[str, Any]:
+        return self.segments.get(str(segment), {})
+
+
+class MigrationStats:
+    """Counters and diff statistics collected while a migration runs."""
+
+    def __init__(self):
+        self.scanned = 0
+        self.puts = 0
+        self.updates = 0
+        self.deletes = 0
+        self.created = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.dropped = 0
+        self.written = 0
+        self.retries = 0
+        self.failed = 0
+        self.attributes: Dict[str, Dict[str, int]] = {}
+
+    def record_attribute(self, name: str, change: str):
+        counters = self.attributes.setdefault(name, {'added': 0, 'removed': 0, 'changed': 0})
+        counters[change] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'scanned': self.scanned,
+            'puts': self.puts,
+            'updates': self.updates,
+            'deletes': self.deletes,
+            'created': self.created,
+            'changed': self.changed,
+            'unchanged': self.unchanged,
+            'dropped': self.dropped,
+            'written': self.written,
+            'retries': self.retries,
+            'failed': self.failed,
+            'attributes': {k: dict(v) for k, v in self.attributes.items()}
+        }
+
+
+class BulkMigrationEngine:
+    """Parallel, throttled and resumable table migration."""
+
+    def __init__(self, name: str, source_table, transforms: Sequence[Transform],
+                 target_table=None, segments: int = 4, page_size: int = 100,
+                 max_writes_per_second: Optional[float] = None,
+                 batch_size: int = MAX_BATCH_SIZE, max_retries: int = 8,
+                 dry_run: bool = False, checkpoint_table=None,
+                 scan_kwargs: Optional[Dict[str, Any]] = None,
+                 key_attributes: Sequence[str] = ('PK', 'SK')):
+        """
+        Initialize the engine.
+
+        Args:
+            name: Unique migration name, used for the checkpoint flag
+            source_table: boto3 Table scanned as input
+            transforms: Pipeline stages; each receives an item and returns None
+                (drop), an item to put, a DeleteItem/UpdateItem, or an iterable of those
+            target_table: boto3 Table receiving the writes (defaults to source_table)
+            segments: Number of parallel scan segments
+            page_size: Items per scan page (checkpoint granularity)
+            max_writes_per_second: Write throttle, None for unlimited
+            batch_size: Requests per BatchWriteItem call (at most 25)
+            max_retries: Attempts for unprocessed items before failing them
+            dry_run: Collect diff statistics without writing anything
+            checkpoint_table: SystemFlags table for checkpoints, None to disable resume
+            scan_kwargs: Extra scan parameters (filters, projections)
+            key_attributes: Primary key attribute names of the target table
+        """
+        self.name = name
+        self.source_table = source_table
+        self.target_table = target_table or source_table
+        self.transforms = list(transforms)
+        self.segments = segments
+        self.page_size = page_size
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.max_retries = max_retries
+        self.dry_run = dry_run
+        self.scan_kwargs = scan_kwargs or {}
+        self.key_attributes = tuple(key_attributes)
+        self.limiter = RateLimiter(max_writes_per_second)
+        self.checkpoint = MigrationCheckpoint(name, None if dry_run else checkpoint_table)
+        self.stats = MigrationStats()
+        self._serializer = TypeSerializer()
+        self._same_table = self.target_table is self.source_table
+
+    # --- Transform pipeline ---
+    def _apply_transforms(self, item: Dict[str, Any]) -> List[MigrationOutput]:
+        """Run an item through every pipeline stage."""
+        outputs: List[MigrationOutput] = [item]
+        for transform in self.transforms:
+            next_outputs: List[MigrationOutput] = []
+            for output in outputs:
+                # Only items flow into the next stage; write requests pass through
+                if not isinstance(output, dict):
+                    next_outputs.append(output)
+                    continue
+                result = transform(output)
+                if result is None:
+                    continue
+                if isinstance(result, (dict, DeleteItem, UpdateItem)):
+                    next_outputs.append(result)
+                else:
+                    next_outputs.extend(result)
+            outputs = next_outputs
+        return outputs
+
+    def _key_of(self, item: Dict[str, Any]) -> tuple:
+        return tuple(item.get(attr) for attr in self.key_attributes)
+
+    def _diff(self, source: Dict[str, Any], output: MigrationOutput) -> bool:
+        """Record diff statistics for one output; returns False if no write is needed."""
+        if isinstance(output, DeleteItem):
+            self.stats.deletes += 1
+            return True
+        if isinstance(output, UpdateItem):
+            self.stats.updates += 1
+            self.stats.changed += 1
+            for name in output.params.get('ExpressionAttributeNames', {}).values():
+                self.stats.record_attribute(name, 'changed')
+            return True
+
+        self.stats.puts += 1
+        if not self._same_table or self._key_of(source) != self._key_of(output):
+            self.stats.created += 1
+            return True
+        if output == source:
+            self.stats.unchanged += 1
+            return False
+
+        self.stats.changed += 1
+        for name in set(source) | set(output):
+            if name not in source:
+                self.stats.record_attribute(name, 'added')
+            elif name not in output:
+                self.stats.record_attribute(name, 'removed')
+            elif source[name] != output[name]:
+                self.stats.record_attribute(name, 'changed')
+        return True
+
+    # --- Writers ---
+    def _write_request(self, output: Union[Dict[str, Any], DeleteItem]) -> Dict[str, Any]:
+        serialize = self._serializer.serialize
+        if isinstance(output, DeleteItem):
+            return {'DeleteRequest': {'Key': {k: serialize(v) for k, v in output.key.items()}}}
+        return {'PutRequest': {'Item': {k: serialize(v) for k, v in output.items()}}}
+
+    async def _batch_write(self, outputs: List[Union[Dict[str, Any], DeleteItem]]) -> int:
+        """Write one batch, retrying unprocessed items with exponential backoff; returns the failed count."""
+        client = self.target_table.meta.client
+        table_name = self.target_table.name
+        requests = [self._write_request(output) for output in outputs]
+        loop = asyncio.get_event_loop()
+
+        for attempt in range(self.max_retries):
+            response = await loop.run_in_executor(
+                None, lambda: client.batch_write_item(RequestItems={table_name: requests})
+            )
+            unprocessed = response.get('UnprocessedItems', {}).get(table_name, [])
+            self.stats.written += len(requests) - len(unprocessed)
+            if not unprocessed:
+                return 0
+            self.stats.retries += len(unprocessed)
+            requests = unprocessed
+            await asyncio.sleep(min(20.0, 0.05 * (2 ** attempt)) * random.uniform(0.5, 1.5))
+
+        self.stats.failed += len(requests)
+        logger.error(f"Migration {self.name}: {len(requests)} items still unprocessed after {self.max_retries} attempts")
+        return len(requests)
+
+    async def _update(self, output: UpdateItem) -> bool:
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(
+                None, lambda: self.target_table.update_item(Key=output.key, **output.params)
+            )
+            self.stats.written += 1
+            return True
+        except Exception as e:
+            self.stats.failed += 1
+            logger.error(f"Migration {self.name}: update of {output.key} failed: {e}")
+            return False
+
+    async def _flush(self, outputs: List[MigrationOutput]) -> int:
+        """Throttle and write the outputs of one scan page; returns the number of failed writes."""
+        batchable: Dict[tuple, Union[Dict[str, Any], DeleteItem]] = {}
+        updates: List[UpdateItem] = []
+        for output in outputs:
+            if isinstance(output, UpdateItem):
+                updates.append(output)
+            else:
+                # A batch may not contain the same key twice; the last output wins
+                key = output.key if isinstance(output, DeleteItem) else output
+                batchable[self._key_of(key)] = output
+
+        failed = 0
+        pending = list(batchable.values())
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            await self.limiter.acquire(len(chunk))
+            failed += await self._batch_write(chunk)
+
+        for output in updates:
+            await self.limiter.acquire(1)
+            if not await self._update(output):
+                failed += 1
+        return failed
+
+    # --- Scan segments ---
+    async def _run_segment(self, segment: int) -> bool:
+        """Migrate one scan segment; returns False if it stopped on failed writes."""
+        state = self.checkpoint.segment(segment)
+        if state.get('done'):
+            logger.info(f"Migration {self.name}: segment {segment} already completed, skipping")
+            return True
+
+        scan_kwargs = {
+            **self.scan_kwargs,
+            'Segment': segment,
+            'TotalSegments': self.segments,
+            'Limit': self.page_size
+        }
+        if state.get('last_key'):
+            scan_kwargs['ExclusiveStartKey'] = state['last_key']
+        scanned = state.get('scanned', 0)
+        loop = asyncio.get_event_loop()
+
+        while True:
+            kwargs = dict(scan_kwargs)
+            response = await loop.run_in_executor(None, lambda: self.source_table.scan(**kwargs))
+
+            outputs: List[MigrationOutput] = []
+            for item in response.get('Items', []):
+                scanned += 1
+                self.stats.scanned += 1
+                item_outputs = self._apply_transforms(item)
+                if not item_outputs:
+                    self.stats.dropped += 1
+                for output in item_outputs:
+                    if self._diff(item, output):
+                        outputs.append(output)
+
+            if outputs and not self.dry_run and await self._flush(outputs):
+                # Keep the checkpoint before this page so a resumed run writes it again
+                logger.error(f"Migration {self.name}: segment {segment} stopped on failed writes")
+                return False
+
+            # Checkpoint only after the page is written, so resuming is at-least-once
+            last_key = response.get('LastEvaluatedKey')
+            await self.checkpoint.save(segment, last_key, last_key is None, scanned)
+            if not last_key:
+                return True
+            scan_kwargs['ExclusiveStartKey'] = last_key
+
+    async def run(self, reset: bool = False) -> Dict[str, Any]:
+        """
+        Run (or resume) the migration.
+
+        Args:
+            reset: Discard any stored checkpoint and start from scratch
+
+        Returns:
+            A report with the migration statistics
+        """
+        started = time.monotonic()
+        if reset:
+            await self.checkpoint.clear()
+        else:
+            await self.checkpoint.load()
+            if self.checkpoint.segments:
+                logger.info(f"Migration {self.name}: resuming from checkpoint")
+
+        completed = await asyncio.gather(*(self._run_segment(segment) for segment in range(self.segments)))
+        if all(completed):
+            # Nothing left to resume; a later run with the same name starts from scratch
+            await self.checkpoint.clear()
+
+        elapsed = time.monotonic() - started
+        report = {
+            'name': self.name,
+            'dry_run': self.dry_run,
+            'segments': self.segments,
+            'completed': all(completed),
+            'elapsed_seconds': round(elapsed, 3),
+            'items_per_second': round(self.stats.scanned / elapsed, 2) if elapsed else 0.0,
+            **self.stats.as_dict()
+        }
+        logger.info(
+            f"Migration {self.name}{' (dry run)' if self.dry_run else ''}: scanned {report['scanned']}, "
+            f"changed {report['changed']}, created {report['created']}, deleted {report['deletes']}, "
+            f"unchanged {report['unchanged']}, written {report['written']}, failed {report['failed']} "
+            f"in {report['elapsed_seconds']}s"
+        )
+        return report
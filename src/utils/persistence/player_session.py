@@ -0,0 +1,470 @@
+"""
+Request-scoped player sessions (unit of work) for cogs.
+
+A session loads everything a command needs about one player in a single
+parallel round (profile, cooldowns and optionally equipped items), hands the
+command a mutable view of the profile and commits every change - stats,
+cooldowns and inventory grants - in one TransactWriteItems call:
+
+    async with db_provider.player_session(user_id, "treinar") as session:
+        if not session.exists:
+            ...
+        session.player["exp"] += 10
+        session.set_cooldown("treinar", 3600)
+        await session.commit()
+
+Every DynamoDB request issued by a session is counted per command so the
+number of round-trips of each command can be inspected with
+get_round_trip_stats().
+"""
+
+import asyncio
+import decimal
+import threading
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from boto3.dynamodb.types import TypeSerializer
+from botocore.exceptions import ClientError
+
+from utils.logging_config import get_logger
+from utils.leaderboard import note_player_write
+from utils.metrics import phase_timer
+from utils.persistence.compression import COMPRESSED_ATTRIBUTES, decompress_player_item, encode_document, is_compressed
+
+logger = get_logger('tokugawa_bot.player_session')
+
+# DynamoDB limit of operations in a single transaction
+MAX_TRANSACTION_ITEMS = 100
+
+COOLDOWN_PREFIX = 'COMMAND#'
+ITEM_PREFIX = 'ITEM#'
+
+# Key attributes of the profile that a session must never rewrite
+PROFILE_KEY_ATTRIBUTES = ('PK', 'SK')
+
+
+def _to_decimal(obj):
+    """Convert floats to Decimal for DynamoDB compatibility."""
+    if isinstance(obj, float):
+        return decimal.Decimal(str(obj))
+    elif isinstance(obj, dict):
+        return {k: _to_decimal(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [_to_decimal(v) for v in obj]
+    return obj
+
+
+class RoundTripStats:
+    """Thread-safe per-command counters of DynamoDB round-trips."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.by_command: Dict[str, Dict[str, int]] = {}
+
+    def record(self, command: str, requests: int, stages: int):
+        """Record the requests and sequential stages of one command invocation."""
+        with self._lock:
+            stats = self.by_command.setdefault(command, {
+                'invocations': 0, 'requests': 0, 'stages': 0, 'max_requests': 0, 'last_requests': 0
+            })
+            stats['invocations'] += 1
+            stats['requests'] += requests
+            stats['stages'] += stages
+            stats['max_requests'] = max(stats['max_requests'], requests)
+            stats['last_requests'] = requests
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return a copy of the current counters with per-invocation averages."""
+        with self._lock:
+            result = {}
+            for command, stats in self.by_command.items():
+                invocations = stats['invocations'] or 1
+                result[command] = dict(stats,
+                                       avg_requests=round(stats['requests'] / invocations, 2),
+                                       avg_stages=round(stats['stages'] / invocations, 2))
+            return result
+
+
+round_trip_stats = RoundTripStats()
+
+
+class RoundTripTrace:
+    """Round-trips issued while handling one command invocation."""
+
+    def __init__(self, command: str):
+        self.command = command
+        self.requests = 0
+        self.stages = 0
+
+    def stage(self, requests: int = 1):
+        """Record a sequential wait on the database covering ``requests`` parallel requests."""
+        self.requests += requests
+        self.stages += 1
+
+
+_current_trace: ContextVar[Optional[RoundTripTrace]] = ContextVar('player_session_trace', default=None)
+
+
+@asynccontextmanager
+async def track_round_trips(command: str):
+    """
+    Count the round-trips of every session opened inside the block under ``command``.
+
+    Nested calls reuse the outer trace, so a command that opens several
+    sessions (e.g. a duel) is recorded as a single invocation.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        yield trace
+        return
+
+    trace = RoundTripTrace(command)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        round_trip_stats.record(command, trace.requests, trace.stages)
+        logger.debug(f"Command {command}: {trace.requests} DynamoDB requests in {trace.stages} round-trips")
+
+
+def get_round_trip_stats() -> Dict[str, Dict[str, Any]]:
+    """Get the per-command round-trip counters."""
+    return round_trip_stats.snapshot()
+
+
+class PlayerView(dict):
+    """Mutable view of a player profile that remembers which fields were changed."""
+
+    def __init__(self, data: Dict[str, Any]):
+        super().__init__(data)
+        self.dirty = set()
+        self.increments: Dict[str, Any] = {}
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.dirty.add(key)
+        self.increments.pop(key, None)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def increment(self, key: str, delta) -> Any:
+        """
+        Add ``delta`` to a numeric field.
+
+        Unless the field is also assigned directly, the change is committed with
+        an atomic ADD so concurrent increments are not lost.
+        """
+        value = self.get(key, 0) + delta
+        super().__setitem__(key, value)
+        if key not in self.dirty:
+            self.increments[key] = self.increments.get(key, 0) + delta
+        return value
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.dirty or self.increments)
+
+
+class PlayerSession:
+    """Unit of work over one player's profile, cooldowns and inventory."""
+
+    def __init__(self, user_id, command: str, players_table=None, cooldowns_table=None,
+                 inventory_table=None, load_equipped: bool = False):
+        """
+        Args:
+            user_id: The player's user ID
+            command: Command name used for the round-trip counters
+            players_table: Players table (defaults to db_provider.PLAYERS_TABLE)
+            cooldowns_table: Cooldowns table (defaults to db_provider.COOLDOWNS_TABLE)
+            inventory_table: Inventory table (defaults to db_provider.INVENTORY_TABLE)
+            load_equipped: Also load the player's equipped items in the same round
+        """
+        self.user_id = str(user_id)
+        self.command = command
+        self.load_equipped = load_equipped
+        self.players_table = players_table
+        self.cooldowns_table = cooldowns_table
+        self.inventory_table = inventory_table
+
+        self.player: Optional[PlayerView] = None
+        self.cooldowns: Dict[str, datetime] = {}
+        self.equipped_items: Dict[str, Any] = {}
+        self.committed = False
+
+        self._new_cooldowns: Dict[str, datetime] = {}
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._trace_context = None
+
+    # --- Context management ---
+    async def __aenter__(self) -> 'PlayerSession':
+        self._trace_context = track_round_trips(self.command)
+        await self._trace_context.__aenter__()
+        await self.load()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self.changed and not self.committed:
+            logger.debug(f"Discarding uncommitted changes of player {self.user_id} ({self.command})")
+        await self._trace_context.__aexit__(exc_type, exc, tb)
+        return False
+
+    def _resolve_tables(self):
+        if self.players_table is None or self.cooldowns_table is None or self.inventory_table is None:
+            from utils.persistence.db_provider import db_provider
+            self.players_table = self.players_table or db_provider.PLAYERS_TABLE
+            self.cooldowns_table = self.cooldowns_table or db_provider.COOLDOWNS_TABLE
+            self.inventory_table = self.inventory_table or db_provider.INVENTORY_TABLE
+
+    @property
+    def _pk(self) -> str:
+        return f'PLAYER#{self.user_id}'
+
+    # --- Loading ---
+    def _read_profile(self) -> Optional[Dict[str, Any]]:
+        response = self.players_table.get_item(Key={'PK': self._pk, 'SK': 'PROFILE'})
+        item = response.get('Item')
+        return decompress_player_item(item) if item else None
+
+    def _read_cooldowns(self) -> Dict[str, datetime]:
+        cooldowns = {}
+        kwargs = {
+            'KeyConditionExpression': 'PK = :pk AND begins_with(SK, :sk)',
+            'ExpressionAttributeValues': {':pk': self._pk, ':sk': COOLDOWN_PREFIX}
+        }
+        while True:
+            response = self.cooldowns_table.query(**kwargs)
+            for item in response.get('Items', []):
+                command = item['SK'][len(COOLDOWN_PREFIX):]
+                cooldowns[command] = datetime.fromisoformat(item['expiry_time'])
+            if 'LastEvaluatedKey' not in response:
+                return cooldowns
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    async def load(self, record_stage: bool = True) -> 'PlayerSession':
+        """Load the profile, cooldowns and (optionally) equipped items concurrently."""
+        self._resolve_tables()
+        loop = asyncio.get_event_loop()
+        reads = [
+            loop.run_in_executor(None, self._read_profile),
+            loop.run_in_executor(None, self._read_cooldowns)
+        ]
+        if self.load_equipped:
+            from utils.persistence.dynamodb_inventory import get_equipped_items
+            reads.append(get_equipped_items(self.user_id))
+
+        trace = _current_trace.get()
+        if trace is not None:
+            if record_stage:
+                trace.stage(len(reads))
+            else:
+                trace.requests += len(reads)
+
+        with phase_timer('db'):
+            results = await asyncio.gather(*reads, return_exceptions=True)
+        profile, cooldowns = results[0], results[1]
+        if isinstance(profile, Exception):
+            logger.error(f"Error loading player {self.user_id}: {profile}")
+            profile = None
+        if isinstance(cooldowns, Exception):
+            logger.error(f"Error loading cooldowns for player {self.user_id}: {cooldowns}")
+            cooldowns = {}
+
+        self.player = PlayerView(profile) if profile else None
+        self.cooldowns = cooldowns
+        if self.load_equipped:
+            equipped = results[2]
+            if isinstance(equipped, Exception):
+                # A missing index must not look like a player with nothing equipped
+                logger.error(f"Error loading equipped items for player {self.user_id}: {equipped}")
+                raise equipped
+            self.equipped_items = equipped
+        return self
+
+    @property
+    def exists(self) -> bool:
+        return self.player is not None
+
+    # --- Cooldowns ---
+    def cooldown_remaining(self, command: str) -> Optional[timedelta]:
+        """Time left on a command's cooldown, or None if it is not active."""
+        expiry = self._new_cooldowns.get(command) or self.cooldowns.get(command)
+        if expiry and datetime.now() < expiry:
+            return expiry - datetime.now()
+        return None
+
+    def set_cooldown(self, command: str, seconds: int):
+        """Start a cooldown, written on commit."""
+        self._new_cooldowns[command] = datetime.now() + timedelta(seconds=seconds)
+
+    # --- Inventory ---
+    def add_item(self, item_id: str, item_data: Dict[str, Any]):
+        """Grant an item, written on commit as an atomic quantity increment."""
+        item_id = str(item_id)
+        if item_id in self._items:
+            self._items[item_id]['quantity'] = (
+                int(self._items[item_id].get('quantity', 1)) + int(item_data.get('quantity', 1))
+            )
+        else:
+            self._items[item_id] = dict(item_data)
+
+    @property
+    def changed(self) -> bool:
+        return bool((self.player is not None and self.player.changed) or self._new_cooldowns or self._items)
+
+    # --- Commit ---
+    def _profile_operation(self, serialize, now: str) -> Optional[Dict[str, Any]]:
+        player = self.player
+        if player is None or not player.changed:
+            return None
+
+        names, values, set_parts, add_parts = {}, {}, [], []
+        for index, field in enumerate(sorted(player.dirty)):
+            if field in PROFILE_KEY_ATTRIBUTES:
+                continue
+            value = player[field]
+            if field in COMPRESSED_ATTRIBUTES and value is not None and not is_compressed(value):
+                value = encode_document(value, attribute=field)
+            names[f'#s{index}'] = field
+            values[f':s{index}'] = serialize(_to_decimal(value))
+            set_parts.append(f'#s{index} = :s{index}')
+        for index, (field, delta) in enumerate(sorted(player.increments.items())):
+            names[f'#a{index}'] = field
+            values[f':a{index}'] = serialize(_to_decimal(delta))
+            add_parts.append(f'#a{index} :a{index}')
+
+        names['#updated'] = 'updated_at'
+        values[':updated'] = serialize(now)
+        set_parts.append('#updated = :updated')
+
+        expression = 'SET ' + ', '.join(set_parts)
+        if add_parts:
+            expression += ' ADD ' + ', '.join(add_parts)
+        return {'Update': {
+            'TableName': self.players_table.name,
+            'Key': {'PK': serialize(self._pk), 'SK': serialize('PROFILE')},
+            'UpdateExpression': expression,
+            'ConditionExpression': 'attribute_exists(PK)',
+            'ExpressionAttributeNames': names,
+            'ExpressionAttributeValues': values
+        }}
+
+    def _cooldown_operations(self, serialize, now: str) -> List[Dict[str, Any]]:
+        return [{'Put': {
+            'TableName': self.cooldowns_table.name,
+            'Item': {
+                'PK': serialize(self._pk),
+                'SK': serialize(f'{COOLDOWN_PREFIX}{command}'),
+                'expiry_time': serialize(expiry.isoformat()),
+                'command': serialize(command),
+                'created_at': serialize(now)
+            }
+        }} for command, expiry in self._new_cooldowns.items()]
+
+    def _item_operations(self, serialize, now: str) -> List[Dict[str, Any]]:
+        operations = []
+        for item_id, item_data in self._items.items():
+            metadata = _to_decimal({k: v for k, v in item_data.items() if k not in ('id', 'quantity', 'equipped')})
+            operations.append({'Update': {
+                'TableName': self.inventory_table.name,
+                'Key': {'PK': serialize(self._pk), 'SK': serialize(f'{ITEM_PREFIX}{item_id}')},
+                'UpdateExpression': (
+                    'ADD quantity :q '
+                    'SET item_id = :id, item_data = if_not_exists(item_data, :data), '
+                    'acquired_at = if_not_exists(acquired_at, :now), last_updated = :now'
+                ),
+                'ExpressionAttributeValues': {
+                    ':q': serialize(int(item_data.get('quantity', 1))),
+                    ':id': serialize(item_id),
+                    ':data': serialize(metadata),
+                    ':now': serialize(now)
+                }
+            }})
+        return operations
+
+    def operations(self) -> List[Dict[str, Any]]:
+        """Build the transaction operations for the pending changes."""
+        serialize = TypeSerializer().serialize
+        now = datetime.now().isoformat()
+        operations = []
+        profile = self._profile_operation(serialize, now)
+        if profile:
+            operations.append(profile)
+        operations.extend(self._cooldown_operations(serialize, now))
+        operations.extend(self._item_operations(serialize, now))
+        return operations
+
+    def _mark_committed(self):
+        self.committed = True
+        if self.player is not None:
+            self.player.dirty.clear()
+            self.player.increments.clear()
+        self.cooldowns.update(self._new_cooldowns)
+        self._new_cooldowns.clear()
+        self._items.clear()
+
+    async def commit(self) -> bool:
+        """Write all pending changes in a single transaction."""
+        return await commit_sessions(self)
+
+
+async def commit_sessions(*sessions: PlayerSession) -> bool:
+    """
+    Commit the pending changes of several sessions in one transaction.
+
+    Returns:
+        True if the transaction succeeded (or there was nothing to write), False otherwise
+    """
+    operations = []
+    for session in sessions:
+        operations.extend(session.operations())
+    if not operations:
+        for session in sessions:
+            session._mark_committed()
+        return True
+    if len(operations) > MAX_TRANSACTION_ITEMS:
+        logger.error(f"Transaction with {len(operations)} operations exceeds the DynamoDB limit")
+        return False
+
+    client = sessions[0].players_table.meta.client
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.stage()
+
+    loop = asyncio.get_event_loop()
+    try:
+        with phase_timer('db'):
+            await loop.run_in_executor(None, lambda: client.transact_write_items(TransactItems=operations))
+    except ClientError as e:
+        reasons = e.response.get('CancellationReasons')
+        logger.error(f"Error committing session for players {[s.user_id for s in sessions]}: {e} {reasons or ''}")
+        return False
+    except Exception as e:
+        logger.error(f"Error committing session for players {[s.user_id for s in sessions]}: {e}")
+        return False
+
+    for session in sessions:
+        if session.player is not None:
+            note_player_write(session.player.dirty | set(session.player.increments))
+        session._mark_committed()
+    return True
+
+
+async def load_sessions(user_ids: Iterable, command: str, **kwargs) -> List[PlayerSession]:
+    """Load sessions for several players concurrently (must run inside track_round_trips)."""
+    sessions = [PlayerSession(user_id, command, **kwargs) for user_id in user_ids]
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.stages += 1
+    await asyncio.gather(*(session.load(record_stage=False) for session in sessions))
+    return sessions
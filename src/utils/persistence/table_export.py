@@ -0,0 +1,406 @@
+"""
+Table export for Academia Tokugawa.
+
+Streams a DynamoDB table through a parallel scan into chunked, gzip-compressed
+JSONL snapshot files described by a manifest:
+
+    exports/<table>/<snapshot_id>/part-<segment>-<chunk>.jsonl.gz
+    exports/<table>/<snapshot_id>/manifest.json
+
+Incremental exports only contain items whose write timestamp is newer than
+the previous snapshot; readers merge them on top of their base snapshot.
+Writers stamp items differently (``updated_at`` on player updates,
+``created_at`` on new players, ``last_updated`` on clubs and story progress,
+``timestamp`` on votes), so each table lists the attributes its writers set,
+and an item is exported if any of them is newer. Tables whose writers set no
+timestamp can only be exported in full. Deleted items are not tracked by
+incremental exports, so a full export should be run periodically. Snapshots
+can optionally be uploaded to S3 so analytics can run offline instead of
+scanning production tables.
+"""
+
+import os
+import json
+import gzip
+import time
+import base64
+import asyncio
+import hashlib
+import argparse
+import decimal
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from boto3.dynamodb.types import Binary
+
+from utils.logging_config import get_logger
+
+logger = get_logger('tokugawa_bot.table_export')
+
+EXPORT_DIR = os.getenv('EXPORT_DIR', 'exports')
+DEFAULT_SEGMENTS = 4
+DEFAULT_CHUNK_SIZE = 5000
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Exportable tables: name -> DBProvider table attribute
+EXPORT_TABLES = {
+    'players': 'PLAYERS_TABLE',
+    'story': 'MAIN_TABLE',
+    'events': 'EVENTS_TABLE',
+    'votes': 'VOTES_TABLE',
+    'clubs': 'CLUBS_TABLE',
+    'inventory': 'INVENTORY_TABLE'
+}
+
+# Timestamp attributes set by each table's writers, for incremental exports.
+# Events are stored without a timestamp, so they are always exported in full.
+INCREMENTAL_ATTRIBUTES = {
+    'players': ('updated_at', 'created_at'),
+    'story': ('last_updated', 'updated_at', 'created_at', 'timestamp'),
+    'votes': ('timestamp',),
+    'clubs': ('last_updated', 'created_at'),
+    'inventory': ('last_updated',)
+}
+
+
+def _json_default(obj):
+    """Serialize DynamoDB-specific types for JSONL snapshots."""
+    if isinstance(obj, decimal.Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, Binary):
+        obj = obj.value
+    if isinstance(obj, (bytes, bytearray)):
+        return {'__binary__': base64.b64encode(bytes(obj)).decode('ascii')}
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=str)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _players_transform(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Decode compressed player sub-documents so snapshots stay readable."""
+    from utils.persistence.compression import decompress_player_item
+    return decompress_player_item(item)
+
+
+# Per-table item transforms applied before writing
+EXPORT_TRANSFORMS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    'players': _players_transform
+}
+
+
+class _ChunkWriter:
+    """Writes the items of one scan segment into rotating gzip JSONL files."""
+
+    def __init__(self, directory: str, segment: int, chunk_size: int):
+        self.directory = directory
+        self.segment = segment
+        self.chunk_size = chunk_size
+        self.files: List[Dict[str, Any]] = []
+        self._file = None
+        self._path = None
+        self._count = 0
+
+    def _open(self):
+        name = f'part-{self.segment:03d}-{len(self.files):05d}.jsonl.gz'
+        self._path = os.path.join(self.directory, name)
+        self._file = gzip.open(self._path, 'wt', encoding='utf-8')
+        self._count = 0
+
+    def write(self, item: Dict[str, Any]):
+        if self._file is None:
+            self._open()
+        self._file.write(json.dumps(item, default=_json_default, ensure_ascii=False, separators=(',', ':')))
+        self._file.write('\n')
+        self._count += 1
+        if self._count >= self.chunk_size:
+            self.close()
+
+    def close(self):
+        if self._file is None:
+            return
+        self._file.close()
+        with open(self._path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self.files.append({
+            'file': os.path.basename(self._path),
+            'segment': self.segment,
+            'items': self._count,
+            'bytes': os.path.getsize(self._path),
+            'sha256': digest
+        })
+        self._file = None
+
+
+class TableExporter:
+    """Exports one table to a gzip JSONL snapshot."""
+
+    def __init__(self, table_name: str, table, output_dir: str = EXPORT_DIR,
+                 segments: int = DEFAULT_SEGMENTS, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 updated_attributes: Optional[Sequence[str]] = None,
+                 transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+        """
+        Initialize the exporter.
+
+        Args:
+            table_name: Logical table name (directory of the snapshots)
+            table: boto3 Table to scan
+            output_dir: Root directory of the snapshots
+            segments: Number of parallel scan segments
+            chunk_size: Maximum items per snapshot file
+            updated_attributes: Timestamp attributes used by incremental exports
+                (default: INCREMENTAL_ATTRIBUTES of the table)
+            transform: Optional function applied to each item before writing
+        """
+        self.table_name = table_name
+        self.table = table
+        self.output_dir = output_dir
+        self.segments = segments
+        self.chunk_size = chunk_size
+        if updated_attributes is None:
+            updated_attributes = INCREMENTAL_ATTRIBUTES.get(table_name, ())
+        self.updated_attributes = tuple(updated_attributes)
+        self.transform = transform or EXPORT_TRANSFORMS.get(table_name)
+
+    def _export_segment(self, directory: str, segment: int, since: Optional[str]) -> List[Dict[str, Any]]:
+        """Scan one segment and write it to chunk files (runs in a worker thread)."""
+        scan_kwargs = {'Segment': segment, 'TotalSegments': self.segments}
+        if since:
+            names = {f'#updated{i}': name for i, name in enumerate(self.updated_attributes)}
+            scan_kwargs['FilterExpression'] = ' OR '.join(f'{name} > :since' for name in names)
+            scan_kwargs['ExpressionAttributeNames'] = names
+            scan_kwargs['ExpressionAttributeValues'] = {':since': since}
+
+        writer = _ChunkWriter(directory, segment, self.chunk_size)
+        try:
+            while True:
+                response = self.table.scan(**scan_kwargs)
+                for item in response.get('Items', []):
+                    if self.transform:
+                        item = self.transform(item)
+                    writer.write(item)
+                last_key = response.get('LastEvaluatedKey')
+                if not last_key:
+                    break
+                scan_kwargs['ExclusiveStartKey'] = last_key
+        finally:
+            writer.close()
+        return writer.files
+
+    async def export(self, incremental: bool = False, s3_client=None,
+                     s3_prefix: str = 'snapshots') -> Dict[str, Any]:
+        """
+        Export the table.
+
+        Args:
+            incremental: Only export items updated since the latest snapshot
+            s3_client: Optional utils.s3_storage.S3Client used to upload the snapshot
+            s3_prefix: Key prefix of the uploaded files
+
+        Returns:
+            The snapshot manifest
+
+        Raises:
+            ValueError: If incremental is requested for a table without timestamp attributes
+        """
+        if incremental and not self.updated_attributes:
+            raise ValueError(f"{self.table_name} has no timestamp attributes; only full exports are supported")
+        started_at = datetime.now().isoformat()
+        start = time.monotonic()
+
+        base = latest_manifest(self.table_name, self.output_dir) if incremental else None
+        since = base['started_at'] if base else None
+        if incremental and not base:
+            logger.info(f"No previous snapshot of {self.table_name}, running a full export")
+
+        snapshot_id = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        directory = os.path.join(self.output_dir, self.table_name, snapshot_id)
+        os.makedirs(directory, exist_ok=True)
+
+        loop = asyncio.get_event_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(None, self._export_segment, directory, segment, since)
+            for segment in range(self.segments)
+        ))
+        files = [entry for segment_files in results for entry in segment_files]
+
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'table': self.table_name,
+            'snapshot_id': snapshot_id,
+            'type': 'incremental' if since else 'full',
+            'base_snapshot': base['snapshot_id'] if base else None,
+            'since': since,
+            'updated_attributes': list(self.updated_attributes),
+            'started_at': started_at,
+            'finished_at': datetime.now().isoformat(),
+            'duration_seconds': round(time.monotonic() - start, 3),
+            'total_items': sum(entry['items'] for entry in files),
+            'total_bytes': sum(entry['bytes'] for entry in files),
+            'files': files,
+            'uploaded': False
+        }
+
+        if s3_client is not None:
+            manifest['uploaded'] = await loop.run_in_executor(
+                None, self._upload, s3_client, directory, manifest, s3_prefix
+            )
+
+        with open(os.path.join(directory, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        logger.info(
+            f"Exported {manifest['total_items']} items of {self.table_name} "
+            f"({manifest['type']}, {len(files)} files, {manifest['total_bytes']} bytes) "
+            f"in {manifest['duration_seconds']}s"
+        )
+        return manifest
+
+    def _upload(self, s3_client, directory: str, manifest: Dict[str, Any], s3_prefix: str) -> bool:
+        """Upload the snapshot files and manifest to S3."""
+        from utils.s3_storage import S3ClientError
+        key_prefix = f"{s3_prefix}/{self.table_name}/{manifest['snapshot_id']}"
+        try:
+            for entry in manifest['files']:
+                if not s3_client.upload_file(os.path.join(directory, entry['file']), f"{key_prefix}/{entry['file']}"):
+                    return False
+            # The uploaded manifest is the last file, so readers never see a partial snapshot
+            manifest_path = os.path.join(directory, MANIFEST_FILE)
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump({**manifest, 'uploaded': True}, f, indent=2)
+            return s3_client.upload_file(manifest_path, f"{key_prefix}/{MANIFEST_FILE}")
+        except S3ClientError as e:
+            logger.error(f"Error uploading snapshot {manifest['snapshot_id']} of {self.table_name}: {e}")
+            return False
+
+
+def list_manifests(table_name: str, output_dir: str = EXPORT_DIR) -> List[Dict[str, Any]]:
+    """List the manifests of a table's snapshots, oldest first."""
+    table_dir = os.path.join(output_dir, table_name)
+    if not os.path.isdir(table_dir):
+        return []
+
+    manifests = []
+    for snapshot_id in sorted(os.listdir(table_dir)):
+        path = os.path.join(table_dir, snapshot_id, MANIFEST_FILE)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                manifests.append(json.load(f))
+    return manifests
+
+
+def latest_manifest(table_name: str, output_dir: str = EXPORT_DIR) -> Optional[Dict[str, Any]]:
+    """Get the manifest of the most recent snapshot of a table."""
+    manifests = list_manifests(table_name, output_dir)
+    return manifests[-1] if manifests else None
+
+
+def iter_snapshot(manifest: Dict[str, Any], output_dir: str = EXPORT_DIR) -> Iterator[Dict[str, Any]]:
+    """Iterate over the items of a single snapshot."""
+    directory = os.path.join(output_dir, manifest['table'], manifest['snapshot_id'])
+    for entry in manifest['files']:
+        with gzip.open(os.path.join(directory, entry['file']), 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def load_snapshot(table_name: str, output_dir: str = EXPORT_DIR,
+                  key_attributes: tuple = ('PK', 'SK')) -> Dict[tuple, Dict[str, Any]]:
+    """
+    Load the latest state of a table from its snapshots.
+
+    Incremental snapshots are applied on top of their chain of base snapshots.
+
+    Returns:
+        Dictionary mapping primary key tuples to items (empty if there is no snapshot)
+    """
+    manifests = {m['snapshot_id']: m for m in list_manifests(table_name, output_dir)}
+    if not manifests:
+        return {}
+
+    # Walk back from the latest snapshot to the last full export
+    chain = []
+    current = manifests[max(manifests)]
+    while current is not None:
+        chain.append(current)
+        if current['type'] == 'full':
+            break
+        current = manifests.get(current.get('base_snapshot'))
+
+    items = {}
+    for manifest in reversed(chain):
+        for item in iter_snapshot(manifest, output_dir):
+            items[tuple(item.get(attr) for attr in key_attributes)] = item
+    return items
+
+
+def snapshot_age(table_name: str, output_dir: str = EXPORT_DIR) -> Optional[float]:
+    """Seconds since the latest snapshot of a table finished, or None if there is none."""
+    manifest = latest_manifest(table_name, output_dir)
+    if not manifest:
+        return None
+    return (datetime.now() - datetime.fromisoformat(manifest['finished_at'])).total_seconds()
+
+
+async def export_table(table_name: str, incremental: bool = False, upload: bool = False,
+                       output_dir: str = EXPORT_DIR, **exporter_options) -> Dict[str, Any]:
+    """
+    Export one of the EXPORT_TABLES using the shared DB provider.
+
+    Args:
+        table_name: Key of EXPORT_TABLES (players, story, events, votes, ...)
+        incremental: Only export items updated since the latest snapshot
+        upload: Upload the snapshot through utils.s3_storage
+        output_dir: Root directory of the snapshots
+
+    Returns:
+        The snapshot manifest
+    """
+    if table_name not in EXPORT_TABLES:
+        raise ValueError(f"Unknown export table: {table_name}")
+
+    from utils.persistence.db_provider import db_provider
+    table = getattr(db_provider, EXPORT_TABLES[table_name])
+    exporter = TableExporter(table_name, table, output_dir=output_dir, **exporter_options)
+
+    s3_client = None
+    if upload:
+        from utils.s3_storage import S3Client
+        s3_client = S3Client()
+
+    return await exporter.export(incremental=incremental, s3_client=s3_client)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export DynamoDB tables to gzip JSONL snapshots")
+    parser.add_argument("tables", nargs="+", choices=sorted(EXPORT_TABLES), help="Tables to export")
+    parser.add_argument("--incremental", action="store_true", help="Only export items updated since the last snapshot")
+    parser.add_argument("--upload", action="store_true", help="Upload the snapshots to S3")
+    parser.add_argument("--output-dir", default=EXPORT_DIR, help="Directory of the snapshots")
+    parser.add_argument("--segments", type=int, default=DEFAULT_SEGMENTS, help="Parallel scan segments")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Items per snapshot file")
+
+    args = parser.parse_args()
+    if args.incremental:
+        full_only = [name for name in args.tables if not INCREMENTAL_ATTRIBUTES.get(name)]
+        if full_only:
+            parser.error(f"--incremental is not supported for: {', '.join(full_only)} (no timestamp attribute)")
+
+    async def run():
+        for table_name in args.tables:
+            manifest = await export_table(
+                table_name,
+                incremental=args.incremental,
+                upload=args.upload,
+                output_dir=args.output_dir,
+                segments=args.segments,
+                chunk_size=args.chunk_size
+            )
+            print(f"{table_name}: {manifest['total_items']} items -> {manifest['snapshot_id']}")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
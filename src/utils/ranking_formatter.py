@@ -1,6 +1,8 @@
 import discord
+import logging
 from datetime import datetime
 import random
+from typing import Any, Dict
 from utils.persistence.db_provider import get_player, get_club, get_top_players, get_top_players_by_reputation, db_provider
 from utils.embeds import create_basic_embed
 
@@ -10,11 +12,25 @@ class RankingFormatter:
     """Class for formatting ranking and news messages for the Academia Tokugawa Discord bot."""
 
     @staticmethod
-    def format_diario(daily_players):
+    def rank_arrow(change):
+        """Arrow for a rank change: 🆕 (new), ▲n (up), ▼n (down) or ＝ (unchanged)."""
+        if change is None:
+            return "🆕"
+        if change > 0:
+            return f"▲{change}"
+        if change < 0:
+            return f"▼{-change}"
+        return "＝"
+
+    @staticmethod
+    def format_diario(daily_players, club_names=None, most_active=None, club_movement=None):
         """Format daily ranking embed with improved visuals.
         
         Args:
             daily_players (list): List of player dictionaries with daily progress
+            club_names (dict, optional): Club ID -> name, for rows that carry a club_id
+            most_active (list, optional): Most active players of the day (see daily_stats.diff_snapshots)
+            club_movement (list, optional): Club gains and rank changes (see daily_stats.diff_snapshots)
             
         Returns:
             discord.Embed: Formatted embed for daily ranking
@@ -35,7 +51,7 @@ class RankingFormatter:
         
         for i, player in enumerate(top_daily, 1):
             medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
-            club_name = player.get('club_name', 'Sem clube')
+            club_name = player.get('club_name') or (club_names or {}).get(player.get('club_id'), 'Sem clube')
             
             ranking_text += f"{medal} **{player.get('name', 'Unknown')}** | {club_name} | Total: {player.get('exp_gained', 0)} pts\n"
         
@@ -47,6 +63,22 @@ class RankingFormatter:
             description=ranking_text,
             color=0x00FF00  # Green
         )
+
+        if most_active:
+            embed.add_field(
+                name="🔥 Mais Ativos:",
+                value="\n".join(f"**{player['name']}** · {player['metrics_changed']} estatísticas alteradas"
+                                 for player in most_active[:5]),
+                inline=False
+            )
+
+        if club_movement:
+            movement_text = ""
+            for club in club_movement[:5]:
+                arrow = RankingFormatter.rank_arrow(club.get('rank_change'))
+                club_name = (club_names or {}).get(club['club_id'], 'Clube')
+                movement_text += f"{club['rank']}º **{club_name}** {arrow} · +{club['reputation_gained']} reputação\n"
+            embed.add_field(name="🏫 Movimento dos Clubes:", value=movement_text, inline=False)
         
         # Add reactions hint at the bottom
         embed.add_field(
@@ -142,6 +174,41 @@ class RankingFormatter:
         
         return embed
 
+    @staticmethod
+    def format_snapshot(title, entries, changes, footer=None):
+        """Format a stored ranking snapshot with position-change arrows.
+
+        Args:
+            title (str): Embed title (board and period)
+            entries (list): Snapshot rows as [id, name, score]
+            changes (list): Rank change of each row (see ranking_history.position_changes)
+            footer (str, optional): Footer text
+
+        Returns:
+            discord.Embed: Formatted embed for the snapshot
+        """
+        if not entries:
+            return create_basic_embed(
+                title=f"🎓 Conselho Estudantil da Tokugawa · 🗂️ {title}",
+                description="Nenhum ranking registrado neste período.",
+                color=0x808080  # Gray
+            )
+
+        ranking_text = ""
+        for i, ((_, name, score), change) in enumerate(zip(entries, changes), 1):
+            medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
+            ranking_text += f"{medal} **{name}**: {score} pts {RankingFormatter.rank_arrow(change)}\n"
+
+        embed = create_basic_embed(
+            title=f"🎓 Conselho Estudantil da Tokugawa · 🗂️ {title}",
+            description=ranking_text,
+            color=0x4169E1  # Royal Blue
+        )
+        if footer:
+            embed.set_footer(text=footer)
+
+        return embed
+
     @staticmethod
     def format_noticias(featured_club=None, buff_description=None, news_items=None):
         """Format news embed with improved visuals.
@@ -0,0 +1,411 @@
+"""
+Historical ranking snapshots.
+
+Once per day, week and month the scheduler worker captures compact top-N
+snapshots of every board (player reputation and TUSD, clubs and one board
+per subject). A snapshot is stored in SystemFlags under a key derived from
+its period, so "the previous ranking" is a single get_item:
+
+    PK = RANKING#<board>#<period>    SK = 2026-10-17 | 2026-W42 | 2026-10
+
+Entries are [user_or_club_id, name, score] rows. Consecutive snapshots of a
+board mostly repeat each other, so each snapshot is stored as a delta against
+the previous one; every KEYFRAME_INTERVAL snapshots a full copy bounds the
+chain read to rebuild one. Decoded snapshots are cached in memory, so paging
+back through history and computing position arrows cost no scans.
+
+Delta operations, one per row of the new snapshot:
+
+    3                  same row as rank 3 of the base snapshot
+    [3, 120]           rank 3 of the base with a new score
+    [3, 120, "Aiko"]   rank 3 of the base with a new score and name
+    ["42", "Ren", 90]  a row that is not in the base
+"""
+
+import os
+import json
+import asyncio
+import importlib
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.logging_config import get_logger
+from utils.ttl_cache import TTLCache
+
+logger = get_logger('tokugawa_bot.ranking_history')
+
+PERIODS = ('daily', 'weekly', 'monthly')
+
+# Rows kept per snapshot
+SNAPSHOT_SIZE = int(os.environ.get('RANKING_SNAPSHOT_SIZE', '25'))
+
+# A full snapshot is stored after this many deltas
+KEYFRAME_INTERVAL = 7
+
+# Decoded snapshots kept in memory (past snapshots never change)
+SNAPSHOT_CACHE_SIZE = 512
+SNAPSHOT_CACHE_TTL = 24 * 3600
+
+BOARD_TITLES = {
+    'reputation': 'Reputação',
+    'tusd': 'TUSD',
+    'clubs': 'Clubes'
+}
+
+PERIOD_TITLES = {
+    'daily': 'Diário',
+    'weekly': 'Semanal',
+    'monthly': 'Mensal'
+}
+
+Entry = List[Any]
+
+# Longest subject name accepted for a subject board; the board travels in the
+# "previous" button's custom_id, which Discord caps at 100 characters
+MAX_SUBJECT_LENGTH = 40
+
+
+# --- Period keys ---
+
+def period_key(period: str, when: date) -> str:
+    """Key of the period containing a date."""
+    if period == 'daily':
+        return when.strftime('%Y-%m-%d')
+    if period == 'weekly':
+        year, week, _ = when.isocalendar()
+        return f'{year}-W{week:02d}'
+    if period == 'monthly':
+        return when.strftime('%Y-%m')
+    raise ValueError(f"Unknown ranking period: {period}")
+
+
+def previous_period_key(period: str, key: str) -> str:
+    """Key of the period right before the given one."""
+    if period == 'daily':
+        return period_key(period, datetime.strptime(key, '%Y-%m-%d').date() - timedelta(days=1))
+    if period == 'weekly':
+        year, week = key.split('-W')
+        monday = date.fromisocalendar(int(year), int(week), 1)
+        return period_key(period, monday - timedelta(days=7))
+    if period == 'monthly':
+        first = datetime.strptime(key, '%Y-%m').date()
+        return period_key(period, first - timedelta(days=1))
+    raise ValueError(f"Unknown ranking period: {period}")
+
+
+def due_periods(now: datetime) -> List[str]:
+    """Periods whose snapshot is taken at this time (the first minute of the period)."""
+    if now.hour != 0 or now.minute != 0:
+        return []
+    periods = ['daily']
+    if now.weekday() == 0:
+        periods.append('weekly')
+    if now.day == 1:
+        periods.append('monthly')
+    return periods
+
+
+# --- Delta encoding ---
+
+def encode_delta(entries: List[Entry], base: List[Entry]) -> List[Any]:
+    """Encode a snapshot as operations against a base snapshot."""
+    base_rank = {entry[0]: index for index, entry in enumerate(base)}
+    operations = []
+    for entry_id, name, score in entries:
+        index = base_rank.get(entry_id)
+        if index is None:
+            operations.append([entry_id, name, score])
+            continue
+        _, base_name, base_score = base[index]
+        if name != base_name:
+            operations.append([index, score, name])
+        elif score != base_score:
+            operations.append([index, score])
+        else:
+            operations.append(index)
+    return operations
+
+
+def decode_delta(operations: List[Any], base: List[Entry]) -> List[Entry]:
+    """Rebuild a snapshot from delta operations and its base snapshot."""
+    entries = []
+    for operation in operations:
+        if isinstance(operation, int):
+            entries.append(list(base[operation]))
+        elif isinstance(operation[0], int):
+            entry_id, name, _ = base[operation[0]]
+            entries.append([entry_id, operation[2] if len(operation) > 2 else name, operation[1]])
+        else:
+            entries.append(list(operation))
+    return entries
+
+
+def position_changes(entries: List[Entry], previous: Optional[List[Entry]]) -> List[Optional[int]]:
+    """
+    Rank change of each row against the previous snapshot.
+
+    Returns:
+        One value per row: positive when the row climbed, 0 when it kept its
+        rank, None when it was not in the previous snapshot
+    """
+    if previous is None:
+        return [None] * len(entries)
+    previous_rank = {entry[0]: index for index, entry in enumerate(previous)}
+    return [previous_rank[entry[0]] - index if entry[0] in previous_rank else None
+            for index, entry in enumerate(entries)]
+
+
+def _score(value) -> Any:
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value or 0
+
+
+def top_entries(rows: List[Tuple[str, str, Any]], size: int = SNAPSHOT_SIZE) -> List[Entry]:
+    """Top rows by score as snapshot entries (ties keep a stable order by ID)."""
+    rows = sorted(((str(i), n, _score(s)) for i, n, s in rows), key=lambda row: (-row[2], row[0]))
+    return [list(row) for row in rows[:size]]
+
+
+class RankingHistoryStats:
+    """Thread-safe snapshot capture and retrieval counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.captured = {'full': 0, 'delta': 0}
+            self.loads = {'cache': 0, 'dynamodb': 0, 'missing': 0}
+            self.encoded_bytes = 0
+            self.full_bytes = 0
+
+    def record_capture(self, encoding: str, encoded: int, full: int):
+        with self._lock:
+            self.captured[encoding] += 1
+            self.encoded_bytes += encoded
+            self.full_bytes += full
+
+    def record_load(self, source: str):
+        with self._lock:
+            self.loads[source] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the current counters."""
+        with self._lock:
+            return {
+                'captured': dict(self.captured),
+                'loads': dict(self.loads),
+                'encoded_bytes': self.encoded_bytes,
+                'full_bytes': self.full_bytes
+            }
+
+
+class RankingHistory:
+    """Captures, stores and serves ranking snapshots."""
+
+    def __init__(self, table=None, players_table=None, clubs_table=None, grades_table=None,
+                 size: int = SNAPSHOT_SIZE):
+        self.table = table
+        self.players_table = players_table
+        self.clubs_table = clubs_table
+        self.grades_table = grades_table
+        self.size = size
+        self.stats = RankingHistoryStats()
+        self._cache = TTLCache(SNAPSHOT_CACHE_TTL, SNAPSHOT_CACHE_SIZE)
+
+    def _resolve_tables(self):
+        if None in (self.table, self.players_table, self.clubs_table, self.grades_table):
+            db_provider = importlib.import_module('utils.persistence.db_provider').db_provider
+            self.table = self.table or db_provider.SYSTEM_FLAGS_TABLE
+            self.players_table = self.players_table or db_provider.PLAYERS_TABLE
+            self.clubs_table = self.clubs_table or db_provider.CLUBS_TABLE
+            self.grades_table = self.grades_table or db_provider.GRADES_TABLE
+
+    @staticmethod
+    def _key(board: str, period: str, key: str) -> Dict[str, str]:
+        return {'PK': f'RANKING#{board}#{period}', 'SK': key}
+
+    # --- Collection ---
+    @staticmethod
+    def _scan(table, **kwargs) -> List[Dict[str, Any]]:
+        items = []
+        while True:
+            response = table.scan(**kwargs)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return items
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def collect_boards(self) -> Dict[str, List[Entry]]:
+        """Compute the current top rows of every board (runs in a thread)."""
+        self._resolve_tables()
+        players = self._scan(
+            self.players_table,
+            ProjectionExpression='PK, #name, reputation, tusd',
+            ExpressionAttributeNames={'#name': 'name'}
+        )
+        players = {p['PK'].split('#', 1)[1]: p for p in players if p.get('PK', '').startswith('PLAYER#')}
+        names = {uid: p.get('name', 'Desconhecido') for uid, p in players.items()}
+
+        boards = {
+            board: top_entries([(uid, names[uid], p.get(field, 0)) for uid, p in players.items()], self.size)
+            for board, field in (('reputation', 'reputation'), ('tusd', 'tusd'))
+        }
+
+        clubs = self._scan(
+            self.clubs_table,
+            ProjectionExpression='PK, SK, #name, reputacao',
+            ExpressionAttributeNames={'#name': 'name'}
+        )
+        boards['clubs'] = top_entries([(c['PK'].split('#', 1)[1], c.get('name', 'Clube'), c.get('reputacao', 0))
+                                       for c in clubs if c.get('SK') == 'INFO'], self.size)
+
+        by_subject: Dict[str, List[Tuple[str, str, Any]]] = {}
+        for grade in self._scan(self.grades_table):
+            user_id = grade.get('PK', '').split('#', 1)[-1]
+            subject = grade.get('SK', '').split('#', 1)[-1]
+            if user_id in names and subject:
+                by_subject.setdefault(subject, []).append((user_id, names[user_id], grade.get('grade', 0)))
+        for subject, rows in by_subject.items():
+            boards[f'subject.{subject}'] = top_entries(rows, self.size)
+        return boards
+
+    # --- Storage ---
+    def _get_item(self, board: str, period: str, key: str) -> Optional[Dict[str, Any]]:
+        self._resolve_tables()
+        return self.table.get_item(Key=self._key(board, period, key)).get('Item')
+
+    async def load(self, board: str, period: str, key: str) -> Optional[List[Entry]]:
+        """
+        Get a snapshot by key.
+
+        Returns:
+            The snapshot rows, or None if no snapshot was captured for that period
+        """
+        cache_key = (board, period, key)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self.stats.record_load('cache')
+            return cached
+
+        item = await asyncio.to_thread(self._get_item, board, period, key)
+        if item is None:
+            self.stats.record_load('missing')
+            return None
+        self.stats.record_load('dynamodb')
+
+        data = json.loads(item['entries'])
+        if item.get('encoding') == 'delta':
+            base = await self.load(board, period, item['base'])
+            if base is None:
+                logger.error(f"Base snapshot {item['base']} of {board}/{period} is missing")
+                return None
+            entries = decode_delta(data, base)
+        else:
+            entries = data
+        self._cache.set(cache_key, entries)
+        return entries
+
+    async def store(self, board: str, period: str, key: str, entries: List[Entry]) -> bool:
+        """
+        Store a snapshot, as a delta against the previous period when possible.
+
+        Returns:
+            True if stored, False if a snapshot for that period already exists
+        """
+        previous_key = previous_period_key(period, key)
+        previous = await asyncio.to_thread(self._get_item, board, period, previous_key)
+        full = json.dumps(entries, separators=(',', ':'), ensure_ascii=False)
+
+        item = dict(self._key(board, period, key), type='ranking_snapshot',
+                    captured_at=datetime.now().isoformat())
+        depth = int(previous.get('depth', 0)) + 1 if previous is not None else 0
+        if previous is not None and depth <= KEYFRAME_INTERVAL:
+            base = await self.load(board, period, previous_key)
+            encoded = json.dumps(encode_delta(entries, base or []), separators=(',', ':'), ensure_ascii=False)
+            if base is not None and len(encoded) < len(full):
+                item.update(encoding='delta', base=previous_key, depth=depth, entries=encoded)
+        if 'entries' not in item:
+            item.update(encoding='full', depth=0, entries=full)
+
+        try:
+            await asyncio.to_thread(self.table.put_item, Item=item,
+                                    ConditionExpression='attribute_not_exists(PK)')
+        except Exception as e:
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                return False
+            raise
+        self._cache.set((board, period, key), entries)
+        self.stats.record_capture(item['encoding'], len(item['entries']), len(full))
+        return True
+
+    # --- Job ---
+    async def capture(self, period: str, now: Optional[datetime] = None) -> int:
+        """
+        Capture the snapshots of every board for the period that just ended.
+
+        Returns:
+            Number of snapshots stored
+        """
+        now = now or datetime.now()
+        key = period_key(period, (now - timedelta(minutes=1)).date())
+        boards = await asyncio.to_thread(self.collect_boards)
+        stored = 0
+        for board, entries in boards.items():
+            try:
+                if await self.store(board, period, key, entries):
+                    stored += 1
+            except Exception as e:
+                logger.error(f"Error storing {period} ranking snapshot of {board}: {e}")
+        logger.info(f"Captured {stored} {period} ranking snapshots for {key}")
+        return stored
+
+    async def capture_due(self, now: datetime) -> int:
+        """Capture every period whose snapshot is due at this time."""
+        stored = 0
+        for period in due_periods(now):
+            try:
+                stored += await self.capture(period, now)
+            except Exception as e:
+                logger.error(f"Error capturing {period} ranking snapshots: {e}")
+        return stored
+
+
+ranking_history = RankingHistory()
+
+
+def latest_key(period: str, now: Optional[datetime] = None) -> str:
+    """Key of the most recent finished period (the newest snapshot)."""
+    now = now or datetime.now()
+    return previous_period_key(period, period_key(period, now.date()))
+
+
+def subject_board(subject: Optional[str]) -> Optional[str]:
+    """
+    Board of a subject typed by the user.
+
+    Returns:
+        'subject.<name>', or None if the name is empty, too long or contains ':'
+        (the custom_id separator)
+    """
+    subject = (subject or '').strip()
+    if not subject or ':' in subject or len(subject) > MAX_SUBJECT_LENGTH:
+        return None
+    return f'subject.{subject}'
+
+
+def board_title(board: str) -> str:
+    """Human readable title of a board."""
+    if board.startswith('subject.'):
+        return f"Matéria: {board.split('.', 1)[1]}"
+    return BOARD_TITLES.get(board, board)
+
+
+def get_ranking_history_stats() -> Dict[str, Any]:
+    """Get ranking snapshot metrics."""
+    return ranking_history.stats.snapshot()
@@ -0,0 +1,100 @@
+"""
+Startup phase timing.
+
+Records how long each startup phase takes (module imports, database checks,
+content loading, each extension) so cold starts and ECS task replacements can
+be tracked. The import phase is measured from the moment this module is
+imported, which bot.py does before anything else, and is checked against
+STARTUP_IMPORT_BUDGET.
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from utils.logging_config import get_logger
+
+logger = get_logger('tokugawa_bot.startup')
+
+# Seconds module imports may take before a warning is logged
+IMPORT_BUDGET = float(os.environ.get('STARTUP_IMPORT_BUDGET', '3.0'))
+
+
+class StartupProfile:
+    """Thread-safe per-phase startup durations."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all phases and restart the clock."""
+        with self._lock:
+            self.started = time.perf_counter()
+            self.phases: Dict[str, float] = {}
+            self.extensions: Dict[str, float] = {}
+            self.completed: Optional[float] = None
+
+    def record(self, name: str, seconds: float):
+        """Record the duration of a phase."""
+        with self._lock:
+            self.phases[name] = round(seconds, 6)
+
+    def record_extension(self, name: str, seconds: float):
+        """Record the load time of one extension."""
+        with self._lock:
+            self.extensions[name] = round(seconds, 6)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as a startup phase."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def mark_imports_done(self, budget: float = IMPORT_BUDGET) -> float:
+        """Record the import phase and warn if it exceeded its budget."""
+        elapsed = time.perf_counter() - self.started
+        self.record('imports', elapsed)
+        if elapsed > budget:
+            logger.warning(f"Module imports took {elapsed:.2f}s, over the {budget:.2f}s budget")
+        return elapsed
+
+    def complete(self) -> float:
+        """Mark startup as finished and log the breakdown."""
+        with self._lock:
+            self.completed = round(time.perf_counter() - self.started, 6)
+        self.log_report()
+        return self.completed
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the recorded timings."""
+        with self._lock:
+            return {
+                'phases': dict(self.phases),
+                'extensions': dict(self.extensions),
+                'total': self.completed
+            }
+
+    def log_report(self):
+        """Log the per-phase startup timing breakdown."""
+        snapshot = self.snapshot()
+        phases = ', '.join(f"{name}={seconds:.3f}s" for name, seconds in snapshot['phases'].items())
+        slowest = sorted(snapshot['extensions'].items(), key=lambda item: item[1], reverse=True)[:5]
+        extensions = ', '.join(f"{name}={seconds:.3f}s" for name, seconds in slowest)
+        total = snapshot['total']
+        logger.info(f"Startup finished in {total:.3f}s: {phases}" if total is not None else f"Startup phases: {phases}")
+        if extensions:
+            logger.info(f"Slowest extensions: {extensions}")
+
+
+startup_profile = StartupProfile()
+
+
+def get_startup_profile() -> Dict[str, Any]:
+    """Get the startup timing breakdown."""
+    return startup_profile.snapshot()
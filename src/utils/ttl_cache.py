@@ -0,0 +1,52 @@
+"""
+Bounded LRU cache with per-entry expiry.
+
+Used for short-lived per-user data (Junie suggestions, display names) where a
+stale value for a few minutes is acceptable and a miss only costs a lookup.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+# Default upper bound of entries kept by a cache
+MAX_ENTRIES = 10000
+
+
+class TTLCache:
+    """Small LRU cache whose entries expire after a number of seconds."""
+
+    def __init__(self, ttl: float, max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value for ttl seconds (defaults to the cache TTL)."""
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """Drop a cached value."""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every cached value."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,257 @@
+"""
+Per-user execution lanes.
+
+State-mutating handlers read a player, change it and write it back. When two
+handlers for the same player run at once (two buttons pressed quickly, a duel
+accept and a bet) the last write wins and the other update is lost. A lane is
+an asyncio lock keyed by user ID: handlers for the same user run one after
+the other, handlers for different users stay fully parallel.
+
+    @app_commands.command(name="treinar")
+    @serialized_per_user()
+    async def slash_train(self, interaction): ...
+
+    async with user_lanes.hold(challenger_id, opponent_id, name="duelar"):
+        ...
+
+Lanes are created on demand and dropped after LANE_IDLE_TTL seconds without
+use. Contention and wait time are recorded per handler.
+"""
+
+import os
+import time
+import asyncio
+import functools
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+import discord
+
+from utils.logging_config import get_logger
+
+logger = get_logger('tokugawa_bot.user_lanes')
+
+# Seconds an unused lane is kept before it is dropped
+LANE_IDLE_TTL = float(os.environ.get('USER_LANE_IDLE_TTL', '300'))
+
+# Maximum time a handler waits for its lane
+LANE_TIMEOUT = float(os.environ.get('USER_LANE_TIMEOUT', '30'))
+
+# Minimum interval between sweeps of idle lanes
+SWEEP_INTERVAL = 60.0
+
+class LaneTimeoutError(asyncio.TimeoutError):
+    """Raised when a handler could not enter a user's lane in time."""
+    pass
+
+
+class _Lane:
+    __slots__ = ('lock', 'owner', 'waiters', 'last_used')
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        # Task holding the lock; lets that task re-enter its own lane
+        self.owner: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def idle(self) -> bool:
+        return not self.lock.locked() and self.waiters == 0
+
+
+class LaneStats:
+    """Thread-safe per-handler lane contention and wait time metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.by_handler: Dict[str, Dict[str, Any]] = {}
+            self.peak_lanes = 0
+
+    def _handler(self, name: str) -> Dict[str, Any]:
+        return self.by_handler.setdefault(name, {
+            'acquisitions': 0,
+            'contended': 0,
+            'timeouts': 0,
+            'wait_seconds': 0.0,
+            'max_wait_seconds': 0.0
+        })
+
+    def record_acquire(self, name: str, wait: float, contended: bool):
+        with self._lock:
+            stats = self._handler(name)
+            stats['acquisitions'] += 1
+            stats['wait_seconds'] += wait
+            stats['max_wait_seconds'] = max(stats['max_wait_seconds'], wait)
+            if contended:
+                stats['contended'] += 1
+
+    def record_timeout(self, name: str):
+        with self._lock:
+            self._handler(name)['timeouts'] += 1
+
+    def record_lanes(self, count: int):
+        with self._lock:
+            self.peak_lanes = max(self.peak_lanes, count)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the current counters."""
+        with self._lock:
+            handlers = {}
+            for name, stats in self.by_handler.items():
+                acquisitions = stats['acquisitions'] or 1
+                handlers[name] = dict(
+                    stats,
+                    contention_rate=round(stats['contended'] / acquisitions, 4),
+                    avg_wait_seconds=round(stats['wait_seconds'] / acquisitions, 6)
+                )
+            return {'handlers': handlers, 'peak_lanes': self.peak_lanes}
+
+
+class UserLanes:
+    """Registry of per-user asyncio locks with bounded idle lifetime."""
+
+    def __init__(self, idle_ttl: float = LANE_IDLE_TTL, timeout: float = LANE_TIMEOUT):
+        self.idle_ttl = idle_ttl
+        self.timeout = timeout
+        self.stats = LaneStats()
+        self._lanes: Dict[str, _Lane] = {}
+        self._last_sweep = time.monotonic()
+
+    @property
+    def active_lanes(self) -> int:
+        return len(self._lanes)
+
+    def is_held(self, user_id) -> bool:
+        """Check if the current task holds a user's lane."""
+        lane = self._lanes.get(str(user_id))
+        return lane is not None and lane.owner is not None and lane.owner is asyncio.current_task()
+
+    async def _acquire(self, keys, name: str, timeout: Optional[float]):
+        acquired = []
+        deadline = None if timeout is None else time.monotonic() + timeout
+        started = time.perf_counter()
+        contended = False
+        try:
+            # Always lock in the same order so multi-user handlers cannot deadlock
+            for key in keys:
+                lane = self._lanes.get(key)
+                if lane is None:
+                    lane = self._lanes[key] = _Lane()
+                    self.stats.record_lanes(len(self._lanes))
+                if lane.lock.locked():
+                    contended = True
+                    lane.waiters += 1
+                    try:
+                        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                        await asyncio.wait_for(lane.lock.acquire(), timeout=remaining)
+                    finally:
+                        lane.waiters -= 1
+                else:
+                    # Free lane: take it without yielding to the event loop
+                    await lane.lock.acquire()
+                lane.owner = asyncio.current_task()
+                acquired.append(key)
+        except asyncio.TimeoutError:
+            self._release(acquired)
+            self.stats.record_timeout(name)
+            logger.warning(f"Timed out waiting for lane of users {list(keys)} in {name}")
+            raise LaneTimeoutError(f"Timed out waiting for user lane in {name}")
+        except BaseException:
+            self._release(acquired)
+            raise
+        self.stats.record_acquire(name, time.perf_counter() - started, contended)
+        return acquired
+
+    def _release(self, keys):
+        now = time.monotonic()
+        for key in keys:
+            lane = self._lanes.get(key)
+            if lane is not None:
+                lane.last_used = now
+                lane.owner = None
+                lane.lock.release()
+        self._sweep(now)
+
+    def _sweep(self, now: float):
+        """Drop lanes that have been idle for longer than idle_ttl."""
+        if now - self._last_sweep < min(SWEEP_INTERVAL, self.idle_ttl):
+            return
+        self._last_sweep = now
+        expired = [key for key, lane in self._lanes.items()
+                   if lane.idle and now - lane.last_used >= self.idle_ttl]
+        for key in expired:
+            del self._lanes[key]
+
+    @asynccontextmanager
+    async def hold(self, *user_ids, name: str = 'unknown', timeout: Optional[float] = None):
+        """
+        Run the block inside the lanes of one or more users.
+
+        Args:
+            user_ids: Users whose state the block mutates
+            name: Handler name used for the metrics
+            timeout: Maximum wait for the lanes (defaults to LANE_TIMEOUT)
+
+        Raises:
+            LaneTimeoutError: If the lanes could not be entered in time
+        """
+        keys = sorted({str(user_id) for user_id in user_ids
+                       if user_id is not None and not self.is_held(user_id)})
+        if not keys:
+            yield
+            return
+
+        acquired = await self._acquire(keys, name, self.timeout if timeout is None else timeout)
+        try:
+            yield
+        finally:
+            self._release(acquired)
+
+
+user_lanes = UserLanes()
+
+
+def _user_id_from(args, kwargs) -> Optional[int]:
+    """Find the acting user in a handler's arguments."""
+    for arg in list(args) + list(kwargs.values()):
+        if isinstance(arg, discord.Interaction):
+            return arg.user.id
+        # commands.Context, recognised by its message to avoid importing the commands extension
+        if isinstance(getattr(arg, 'message', None), discord.Message) and hasattr(arg, 'author'):
+            return arg.author.id
+    return None
+
+
+def serialized_per_user(name: Optional[str] = None):
+    """
+    Decorator running a handler inside the lane of the user who invoked it.
+
+    Works for slash commands, prefix commands and component callbacks; the
+    user is taken from the Interaction or Context argument.
+    """
+    def decorator(func):
+        lane_name = name or func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            user_id = _user_id_from(args, kwargs)
+            if user_id is None:
+                return await func(*args, **kwargs)
+            async with user_lanes.hold(user_id, name=lane_name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_lane_stats() -> Dict[str, Any]:
+    """Get lane contention and wait time metrics."""
+    snapshot = user_lanes.stats.snapshot()
+    snapshot['active_lanes'] = user_lanes.active_lanes
+    return snapshot
@@ -0,0 +1,83 @@
+"""
+Testes para o cache de capítulos com recarga por mtime.
+"""
+
+import json
+import os
+import pytest
+
+
+def _chapter(title, speaker="Sensei"):
+    return {
+        "chapter_id": "1_1_arrival", "type": "story", "title": title, "description": "Chegada",
+        "scenes": [{"scene_id": "s1", "title": "Portão", "description": "...",
+                    "dialogue": [{"speaker": speaker, "text": "Bem-vindo!"}]}]
+    }
+
+
+def _write(path, document, mtime_ns):
+    path.write_text(json.dumps(document, ensure_ascii=False), encoding='utf-8')
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def chapter_file(tmp_path):
+    path = tmp_path / "1_1_arrival.json"
+    _write(path, _chapter("Chegada"), 1_000_000_000)
+    return path
+
+
+def test_hits_within_interval_and_lru_eviction(tmp_path, chapter_file):
+    """Leituras seguidas vêm da memória; o capítulo menos usado sai quando o cache enche."""
+    from story_mode.chapter_cache import ChapterCache
+    cache = ChapterCache(max_entries=2, check_interval=60)
+
+    first = cache.get(chapter_file)
+    assert cache.get(chapter_file) is first and first["title"] == "Chegada"
+
+    others = []
+    for name in ("b", "c"):
+        path = tmp_path / f"{name}.json"
+        _write(path, _chapter(name), 1_000_000_000)
+        others.append(path)
+        cache.get(path)
+
+    assert len(cache) == 2 and cache.get(chapter_file) is not first
+    assert cache.stats.snapshot() == {'hits': 1, 'misses': 4, 'reloads': 0, 'rejected': 0, 'evictions': 2}
+
+
+def test_edited_chapter_is_swapped_in(chapter_file):
+    """Uma edição no arquivo troca o capítulo inteiro; quem tinha a versão antiga não é afetado."""
+    from story_mode.chapter_cache import ChapterCache
+    cache = ChapterCache(check_interval=0)
+
+    old = cache.get(chapter_file)
+    assert cache.get(chapter_file) is old
+
+    _write(chapter_file, _chapter("Chegada (revisada)"), 2_000_000_000)
+    new = cache.get(chapter_file)
+
+    assert new["title"] == "Chegada (revisada)" and old["title"] == "Chegada"
+    assert cache.get(chapter_file) is new
+    stats = cache.stats.snapshot()
+    assert stats['reloads'] == 1 and stats['hits'] == 2
+
+
+def test_broken_edits_keep_the_last_good_version(chapter_file):
+    """JSON inválido ou um capítulo que deixa de validar são rejeitados; arquivo removido sai do cache."""
+    from story_mode.chapter_cache import ChapterCache
+    cache = ChapterCache(check_interval=0)
+    good = cache.get(chapter_file)
+
+    chapter_file.write_text('{"title": "Chegada', encoding='utf-8')
+    os.utime(chapter_file, ns=(2_000_000_000, 2_000_000_000))
+    assert cache.get(chapter_file) is good
+
+    _write(chapter_file, _chapter("Sem falante", speaker=None) | {"scenes": [{"scene_id": "s1"}]}, 3_000_000_000)
+    assert cache.get(chapter_file) is good
+    # A versão rejeitada não é relida a cada consulta
+    assert cache.get(chapter_file) is good
+    assert cache.stats.snapshot()['rejected'] == 2
+
+    chapter_file.unlink()
+    assert cache.get(chapter_file) is None and len(cache) == 0
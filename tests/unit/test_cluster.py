@@ -0,0 +1,142 @@
+"""
+Testes para o modo cluster (shards, lease do agendador e estado compartilhado).
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+
+class _ConditionFailed(Exception):
+    response = {'Error': {'Code': 'ConditionalCheckFailedException'}}
+
+
+class _FakeFlagsTable:
+    """Tabela SystemFlags em memória com as condições usadas pelo cluster."""
+
+    def __init__(self):
+        self.items = {}
+
+    def get_item(self, Key, **kwargs):
+        item = self.items.get((Key['PK'], Key['SK']))
+        return {'Item': dict(item)} if item else {}
+
+    def put_item(self, Item, ConditionExpression=None, ExpressionAttributeValues=None):
+        key = (Item['PK'], Item['SK'])
+        current = self.items.get(key)
+        values = ExpressionAttributeValues or {}
+        if ConditionExpression == 'attribute_not_exists(PK)':
+            ok = current is None
+        elif ConditionExpression == 'version = :version':
+            ok = current is not None and current['version'] == values[':version']
+        elif ConditionExpression and ConditionExpression.startswith('attribute_not_exists(PK) OR expires_at'):
+            ok = (current is None or current['expires_at'] < values[':now']
+                  or current['holder'] == values[':holder'])
+        else:
+            ok = True
+        if not ok:
+            raise _ConditionFailed()
+        self.items[key] = dict(Item)
+
+    def delete_item(self, Key, ConditionExpression=None, ExpressionAttributeValues=None):
+        key = (Key['PK'], Key['SK'])
+        if self.items.get(key, {}).get('holder') == ExpressionAttributeValues[':holder']:
+            del self.items[key]
+
+
+def test_shard_ranges_split_across_tasks_and_workers():
+    """Os shards são divididos em faixas contíguas entre tasks e processos."""
+    from utils.cluster import Supervisor, shard_ranges
+
+    assert shard_ranges(10, 3) == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+    assert shard_ranges(2, 4) == [[0], [1]]
+
+    first = Supervisor(shard_count=8, workers=2, task_index=0, task_count=2).assignments()
+    second = Supervisor(shard_count=8, workers=2, task_index=1, task_count=2)
+    assert first == {0: [0, 1], 1: [2, 3]}
+    assert second.assignments() == {2: [4, 5], 3: [6, 7]}
+    env = second.worker_env(3, [6, 7])
+    assert env['CLUSTER_SHARD_IDS'] == '6,7' and env['CLUSTER_LOCAL_ID'] == '1'
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_in_exactly_one_worker():
+    """Só o dono do lease roda o agendador; outro worker assume quando ele sai."""
+    from utils.cluster import ClusterCoordinator, ClusterLease, is_cluster_leader
+    table = _FakeFlagsTable()
+    started = []
+
+    coordinators = []
+    for worker in ('a', 'b'):
+        coordinator = ClusterCoordinator(ClusterLease('scheduler', holder=worker, table=table))
+        coordinator.register('events', lambda w=worker: _record(started, ('start', w)),
+                             lambda w=worker: _record(started, ('stop', w)))
+        coordinators.append(coordinator)
+
+    for coordinator in coordinators:
+        await coordinator.tick()
+    a, b = coordinators
+    assert a.is_leader and not b.is_leader
+    assert started == [('start', 'a')]
+    assert is_cluster_leader(MagicMock(coordinator=b)) is False
+
+    # Renovar não reinicia o serviço; ao parar, o lease é liberado para o outro worker
+    await a.tick()
+    await a.stop()
+    await b.tick()
+    assert b.is_leader
+    assert started == [('start', 'a'), ('stop', 'a'), ('start', 'b')]
+
+
+async def _record(log, entry):
+    log.append(entry)
+
+
+@pytest.mark.asyncio
+async def test_event_participants_are_shared_between_workers(monkeypatch):
+    """Inscrições feitas em workers diferentes aparecem no estado compartilhado."""
+    from utils.persistence import dynamodb_shared_state
+    from events.weekly_events import WeeklyEvents
+    table = _FakeFlagsTable()
+    monkeypatch.setattr(dynamodb_shared_state, '_table', lambda: table)
+
+    scheduler, other = WeeklyEvents(MagicMock()), WeeklyEvents(MagicMock())
+    scheduler.send_announcement = AsyncMock()
+    await scheduler.start_weekly_tournament()
+
+    # O worker sem o agendador ainda não conhece o torneio em memória
+    assert await other.add_tournament_participant(1, "Aiko") is True
+    assert await scheduler.add_tournament_participant(2, "Kenji") is True
+    assert await other.add_tournament_participant(1, "Aiko") is False
+
+    await other.refresh_state()
+    assert [p['username'] for p in other.tournament_participants] == ["Aiko", "Kenji"]
+    assert other.tournament_end_time == scheduler.tournament_end_time
+
+
+
+@pytest.mark.asyncio
+async def test_tournament_prizes_wait_for_shared_reset(monkeypatch):
+    """Se o fim do torneio não for gravado no estado compartilhado, ninguém recebe prêmio e o torneio continua ativo."""
+    from utils.persistence import dynamodb_shared_state
+    from events import weekly_events
+    table = _FakeFlagsTable()
+    monkeypatch.setattr(dynamodb_shared_state, '_table', lambda: table)
+    add_points = AsyncMock()
+    monkeypatch.setattr(weekly_events.db_provider, 'add_points', add_points, raising=False)
+
+    events = weekly_events.WeeklyEvents(MagicMock())
+    events.send_announcement = AsyncMock()
+    await events.start_weekly_tournament()
+    await events.add_tournament_participant(1, "Aiko")
+
+    put_item = table.put_item
+    table.put_item = MagicMock(side_effect=RuntimeError("DynamoDB indisponível"))
+    await events.end_tournament()
+    assert events.current_tournament is not None
+    assert add_points.await_count == 0 and events.send_announcement.await_count == 1
+
+    # Com o armazenamento de volta, a próxima verificação encerra e paga uma única vez
+    table.put_item = put_item
+    await events.end_tournament()
+    await events.end_tournament()
+    assert events.current_tournament is None and add_points.await_count == 1
@@ -0,0 +1,88 @@
+"""
+Testes para a sincronização de comandos baseada em hash.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+
+def _command(name, description="desc"):
+    command = MagicMock()
+    command.to_dict.return_value = {"name": name, "description": description, "type": 1, "options": []}
+    return command
+
+
+class _FakeFlags:
+    def __init__(self):
+        self.flags = {}
+
+    async def get_system_flag(self, name):
+        return self.flags.get(name)
+
+    async def set_system_flag(self, name, value, flag_type='system'):
+        self.flags[name] = value
+        return True
+
+
+@pytest.fixture
+def command_sync():
+    from utils import command_sync
+    command_sync.sync_stats.reset()
+    yield command_sync
+    command_sync.sync_stats.reset()
+
+
+def _bot(*commands):
+    bot = MagicMock()
+    bot.tree.get_commands.return_value = list(commands)
+    bot.tree.sync = AsyncMock(side_effect=lambda guild=None: list(commands))
+    return bot
+
+
+@pytest.mark.asyncio
+async def test_unchanged_tree_is_not_synced_again(command_sync):
+    """A segunda inicialização com a mesma árvore não chama o Discord."""
+    flags = _FakeFlags()
+    bot = _bot(_command("treinar"), _command("explorar"))
+
+    assert len(await command_sync.sync_command_tree(bot, db=flags)) == 2
+    # Ordem diferente na árvore gera o mesmo hash
+    bot.tree.get_commands.return_value = [_command("explorar"), _command("treinar")]
+    assert await command_sync.sync_command_tree(bot, db=flags) is None
+
+    assert bot.tree.sync.await_count == 1
+    stats = command_sync.get_command_sync_stats()['global']
+    assert stats['synced'] == 1 and stats['skipped'] == 1
+    assert list(flags.flags) == ['command_tree_hash:global']
+
+
+@pytest.mark.asyncio
+async def test_changed_tree_or_force_syncs_per_scope(command_sync):
+    """Mudanças na árvore ou o override de admin sincronizam; cada guild tem seu hash."""
+    flags = _FakeFlags()
+    bot = _bot(_command("treinar"))
+    guild = MagicMock(id=123)
+
+    await command_sync.sync_command_tree(bot, db=flags)
+    await command_sync.sync_command_tree(bot, guild=guild, db=flags)
+    assert set(flags.flags) == {'command_tree_hash:global', 'command_tree_hash:guild:123'}
+
+    bot.tree.get_commands.return_value = [_command("treinar", "nova descrição")]
+    assert await command_sync.sync_command_tree(bot, db=flags) is not None
+    assert await command_sync.sync_command_tree(bot, db=flags, force=True) is not None
+    assert bot.tree.sync.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_failed_sync_keeps_previous_hash(command_sync):
+    """Se o Discord recusar a sincronização, o hash antigo é mantido para tentar de novo."""
+    flags = _FakeFlags()
+    flags.flags['command_tree_hash:global'] = 'antigo'
+    bot = _bot(_command("treinar"))
+    bot.tree.sync = AsyncMock(side_effect=RuntimeError("rate limited"))
+
+    with pytest.raises(RuntimeError):
+        await command_sync.sync_command_tree(bot, db=flags)
+
+    assert flags.flags['command_tree_hash:global'] == 'antigo'
+    assert command_sync.get_command_sync_stats()['global']['failed'] == 1
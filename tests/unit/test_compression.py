@@ -0,0 +1,73 @@
+"""
+Testes para a compressão de sub-documentos do jogador.
+"""
+
+import unittest
+from decimal import Decimal
+
+
+class TestPlayerDocumentCompression(unittest.TestCase):
+    def setUp(self):
+        from utils.persistence import compression
+        self.compression = compression
+        self.compression.compression_stats.reset()
+        self.story_progress = {
+            'current_chapter': '1_2',
+            'completed_chapters': ['1_1'],
+            'choices': [{'chapter': '1_1', 'choice': i} for i in range(200)],
+            'factions': {'Guardiões': 15}
+        }
+
+    def test_roundtrip_preserves_document(self):
+        """Codifica e decodifica sem perder dados."""
+        encoded = self.compression.encode_document(self.story_progress, 'story_progress')
+        self.assertTrue(self.compression.is_compressed(encoded))
+
+        decoded = self.compression.decode_document(encoded)
+        self.assertEqual(decoded['current_chapter'], '1_2')
+        self.assertEqual(decoded['factions']['Guardiões'], Decimal('15'))
+        self.assertEqual(len(decoded['choices']), 200)
+
+    def test_compressed_is_smaller(self):
+        """O documento comprimido deve ocupar menos bytes que o JSON bruto."""
+        self.compression.encode_document(self.story_progress, 'story_progress')
+        stats = self.compression.get_compression_stats()
+        self.assertEqual(stats['encoded'], 1)
+        self.assertLess(stats['compressed_bytes'], stats['raw_bytes'])
+        self.assertIn('story_progress', stats['by_attribute'])
+
+    def test_legacy_values_pass_through(self):
+        """Valores antigos (mapas e strings JSON) são retornados sem alteração."""
+        self.assertEqual(self.compression.decode_document({'a': 1}), {'a': 1})
+        self.assertEqual(self.compression.decode_document('{"a": 1}'), '{"a": 1}')
+        self.assertEqual(self.compression.get_compression_stats()['legacy_reads'], 2)
+
+    def test_player_item_helpers(self):
+        """Somente os atributos grandes são comprimidos no item do jogador."""
+        item = {'PK': 'PLAYER#1', 'SK': 'PROFILE', 'level': 3, 'story_progress': self.story_progress}
+        encoded = self.compression.compress_player_item(item)
+        self.assertEqual(encoded['level'], 3)
+        self.assertTrue(self.compression.is_compressed(encoded['story_progress']))
+        self.assertIsInstance(item['story_progress'], dict)
+
+        decoded = self.compression.decompress_player_item(encoded)
+        self.assertEqual(decoded['story_progress']['current_chapter'], '1_2')
+
+    def test_unknown_version_is_rejected(self):
+        """Versões de formato desconhecidas geram CompressionError."""
+        data = self.compression.MAGIC + bytes([99, self.compression.CODEC_ZLIB]) + b'x'
+        with self.assertRaises(self.compression.CompressionError):
+            self.compression.decode_document(data)
+
+    def test_undecodable_attribute_keeps_blob(self):
+        """Um documento que não decodifica mantém o blob e é regravado intacto, sem virar {}."""
+        data = self.compression.MAGIC + bytes([self.compression.FORMAT_VERSION, self.compression.CODEC_ZLIB]) + b'lixo'
+        item = self.compression.decompress_player_item({'PK': 'PLAYER#1', 'SK': 'PROFILE', 'factions': data})
+
+        self.assertEqual(item['factions'], data)
+        self.assertEqual(self.compression.get_compression_stats()['failed'], 1)
+        self.assertEqual(self.compression.compress_player_item(item)['factions'], data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Testes para o compilador de condições de escolhas e ramificações.
+"""
+
+import random
+
+
+def _interpret(condition, player_data):
+    """Avaliação de referência, como o capítulo fazia antes da compilação."""
+    if "all" in condition:
+        return all(_interpret(child, player_data) for child in condition["all"])
+    if "any" in condition:
+        return any(_interpret(child, player_data) for child in condition["any"])
+    if "not" in condition:
+        return not _interpret(condition["not"], player_data)
+    if "stat" not in condition:
+        return True
+    player_stat = player_data.get("attributes", {}).get(condition["stat"], 0)
+    return {
+        ">=": player_stat >= condition["value"], ">": player_stat > condition["value"],
+        "<=": player_stat <= condition["value"], "<": player_stat < condition["value"],
+        "==": player_stat == condition["value"], "!=": player_stat != condition["value"],
+    }.get(condition.get("operator", ">="), True)
+
+
+def _random_condition(rng, depth=0):
+    kind = rng.random()
+    if depth < 3 and kind < 0.3:
+        group = rng.choice(["all", "any"])
+        return {group: [_random_condition(rng, depth + 1) for _ in range(rng.randint(0, 4))]}
+    if depth < 3 and kind < 0.4:
+        return {"not": _random_condition(rng, depth + 1)}
+    if kind < 0.45:
+        return {}
+    return {"stat": rng.choice(["power", "knowledge", "charisma"]),
+            "operator": rng.choice([">=", ">", "<=", "<", "==", "!=", "~"]),
+            "value": rng.randint(-1, 10)}
+
+
+def test_compiled_conditions_match_interpreter():
+    """Condições aninhadas compiladas dão o mesmo resultado que a interpretação."""
+    from story_mode.conditions import compile_condition
+
+    rng = random.Random(11)
+    for _ in range(300):
+        condition = _random_condition(rng)
+        check = compile_condition(condition)
+        for _ in range(20):
+            player = {"attributes": {stat: rng.randint(0, 10) for stat in ("power", "charisma") if rng.random() < 0.8}}
+            assert check(player) == _interpret(condition, player), condition
+
+
+def test_constant_folding_and_ordering():
+    """Partes constantes são dobradas e a verificação mais seletiva roda primeiro."""
+    from story_mode.conditions import compile_condition, condition_stats
+
+    condition_stats.reset()
+    always = compile_condition({"any": [{"stat": "power", "operator": "~", "value": 3}, {"stat": "power", "value": 9}]})
+    never = compile_condition({"all": [{"stat": "power", "value": 1}, {"any": []}]})
+    assert always({}) is True and never({"attributes": {"power": 5}}) is False
+    assert condition_stats.snapshot() == {'compiled': 2, 'folded': 2, 'rejected': 0}
+
+    class Attributes(dict):
+        """Registra a ordem em que os atributos são lidos."""
+        reads = []
+
+        def get(self, key, default=None):
+            self.reads.append(key)
+            return super().get(key, default)
+
+    check = compile_condition({"all": [{"stat": "power", "operator": ">=", "value": 0},
+                                       {"stat": "clan", "operator": "==", "value": 2}]})
+    assert check({"attributes": Attributes(power=3, clan=1)}) is False
+    # A igualdade quase sempre falha, então é avaliada antes e encerra a conjunção
+    assert Attributes.reads == ["clan"]
+
+
+def test_branching_chapter_uses_compiled_checks():
+    """Escolhas, requisitos e ramificações do capítulo usam os predicados compilados."""
+    from story_mode.chapter import BranchingChapter
+    from story_mode.conditions import condition_stats
+
+    condition_stats.reset()
+    chapter = BranchingChapter("3_1_festival", {
+        "title": "Festival",
+        "choices": [
+            {"text": "Desafiar", "condition": {"stat": "power", "value": 5}},
+            {"text": "Conversar", "requirements": {"level": 3}},
+            {"text": "Quebrada", "condition": {"stat": "power"}},
+            {"text": "Sair"},
+        ],
+        "branches": {
+            "broken": {"conditions": {"choice_x": 1}, "next_chapter": "never"},
+            "kaito": {"conditions": {"choice_0": 1, "affinity": {"character": "Kaito", "threshold": 30}},
+                      "next_chapter": "3_2_kaito"},
+            "strong": {"conditions": {"attribute": {"name": "level", "threshold": 5}}, "next_chapter": "3_2_strong"},
+        },
+        "next_chapter": "3_2_default",
+    })
+    # Condições malformadas são rejeitadas no carregamento e nunca valem
+    assert condition_stats.snapshot()["rejected"] == 2
+
+    player = {"level": 2, "attributes": {"power": 6},
+              "story_progress": {"story_choices": {"3_1_festival": {"dialogue_0_choice": 1}},
+                                 "character_relationships": {"Kaito": 10}}}
+    assert [c["text"] for c in chapter.get_choices(player)] == ["Desafiar", "Conversar", "Sair"]
+    assert [c["text"] for c in chapter.get_available_choices(player)] == ["Desafiar", "Quebrada", "Sair"]
+    assert chapter.get_next_chapter(player) == "3_2_default"
+
+    player["story_progress"]["character_relationships"]["Kaito"] = 30
+    assert chapter.get_next_chapter(player) == "3_2_kaito"
+    player["story_progress"]["story_choices"] = {}
+    player["level"] = 5
+    assert chapter.get_next_chapter(player) == "3_2_strong"
@@ -0,0 +1,82 @@
+"""
+Testes para o pacote compilado de conteúdo.
+"""
+
+import json
+import os
+import pytest
+
+
+def _write(path, document):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, indent=2, ensure_ascii=False), encoding='utf-8')
+
+
+@pytest.fixture
+def content(tmp_path):
+    """Diretório de dados com capítulos, itens e um diretório de logs."""
+    data = tmp_path / 'data'
+    _write(data / 'story_mode/narrative/chapters/1_1_arrival.json', {'title': 'Chegada', 'scenes': []})
+    _write(data / 'story_mode/narrative/chapters/1_2_club.json', {'title': 'Clubes', 'scenes': []})
+    _write(data / 'story_mode/narrative/chapters/extra/skip.json', {'title': 'Subdiretório'})
+    _write(data / 'economy/items/weapons.json', [{'id': 1, 'name': 'Katana'}])
+    _write(data / 'economy/items/copy.json', [{'id': 1, 'name': 'Katana'}])
+    _write(data / 'story_mode/logs/player.json', {'runtime': True})
+    return data
+
+
+@pytest.fixture
+def bundle_module():
+    from utils import content_bundle
+    content_bundle.content_bundle_stats.reset()
+    yield content_bundle
+    content_bundle.set_content_bundle(None)
+    content_bundle._bundle_loaded = False
+
+
+def test_compile_and_read_back(content, bundle_module):
+    """O pacote guarda cada documento uma vez, indexado por caminho, sem os diretórios de runtime."""
+    summary = bundle_module.compile_bundle(content)
+    assert summary['entries'] == 5 and summary['blobs'] == 4
+
+    bundle = bundle_module.ContentBundle(content / 'content.bundle', content)
+    assert bundle.content_version == summary['content_version'] and not bundle.stale
+    assert 'story_mode/logs/player.json' not in bundle
+    assert bundle.listdir('story_mode/narrative/chapters') == [
+        'story_mode/narrative/chapters/1_1_arrival.json', 'story_mode/narrative/chapters/1_2_club.json']
+    assert bundle.decode('economy/items/copy.json') == [{'id': 1, 'name': 'Katana'}]
+
+    # Leituras compartilhadas são decodificadas uma vez; decode devolve um objeto novo
+    shared = bundle.get('economy/items/weapons.json')
+    assert bundle.get('economy/items/weapons.json') is shared
+    assert bundle.decode('economy/items/weapons.json') is not shared
+    bundle.close()
+
+
+def test_invalid_content_is_rejected(content, bundle_module):
+    """Um arquivo inválido aborta a compilação sem escrever o pacote."""
+    (content / 'economy/items/broken.json').write_text('{"id": 1,', encoding='utf-8')
+
+    with pytest.raises(bundle_module.ContentBundleError, match='broken.json'):
+        bundle_module.compile_bundle(content)
+    assert not (content / 'content.bundle').exists()
+
+
+def test_loaders_fall_back_to_changed_files(content, bundle_module):
+    """Arquivos alterados depois da compilação são lidos do disco; o resto vem do pacote."""
+    bundle_module.compile_bundle(content)
+    chapter = content / 'story_mode/narrative/chapters/1_2_club.json'
+    _write(chapter, {'title': 'Clubes (revisado)', 'scenes': []})
+    os.utime(chapter, ns=(1, 1))
+
+    bundle = bundle_module.ContentBundle(content / 'content.bundle', content)
+    bundle_module.set_content_bundle(bundle)
+    assert bundle.stale == {'story_mode/narrative/chapters/1_2_club.json'}
+
+    assert bundle_module.load_json(chapter)['title'] == 'Clubes (revisado)'
+    assert bundle_module.load_json(content / 'story_mode/narrative/chapters/1_1_arrival.json')['title'] == 'Chegada'
+    assert bundle_module.get_content_bundle_stats()['reads'] == {'bundle': 1, 'file': 1}
+
+    # Com arquivos desatualizados, a listagem de diretórios também vem do disco
+    assert [p.name for p in bundle_module.list_json(content / 'economy/items')] == ['copy.json', 'weapons.json']
+    bundle.close()
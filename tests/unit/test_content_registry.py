@@ -0,0 +1,73 @@
+"""
+Testes para o registro compartilhado de conteúdo.
+"""
+
+import json
+import pytest
+from unittest.mock import MagicMock
+
+
+@pytest.fixture
+def content_dirs(tmp_path):
+    data_dir = tmp_path / "story_mode"
+    data_dir.mkdir()
+    items_dir = tmp_path / "items"
+    items_dir.mkdir()
+    (items_dir / "energy_items.json").write_text(json.dumps([{"id": 7, "name": "Poção"}]))
+    (items_dir / "item_categories.json").write_text(json.dumps({"fixed": []}))
+    chapters_dir = tmp_path / "chapters"
+    chapters_dir.mkdir()
+    (chapters_dir / "1_1_arrival.json").write_text(json.dumps({"title": "Chegada"}))
+    return data_dir, items_dir, chapters_dir
+
+
+def test_registry_loads_content_once(content_dirs):
+    """Capítulos e itens são carregados e o ImageManager é compartilhado com o StoryMode."""
+    from story_mode.content_registry import build_content_registry
+    registry = build_content_registry(*content_dirs)
+
+    assert registry.get_chapter("1_1_arrival")["title"] == "Chegada"
+    assert registry.get_item(7)["name"] == "Poção"
+    assert list(registry.items) == ["7"]
+    assert registry.story_mode.image_manager is registry.image_manager
+    assert registry.companion_system.get_companion_by_name("Akira Tanaka") is not None
+
+
+def test_registry_reads_the_story_chapters():
+    """Por padrão os capítulos vêm de data/story_mode/narrative/chapters, o mesmo diretório do ChapterLoader."""
+    from story_mode.content_registry import CHAPTERS_DIR, build_content_registry
+
+    assert CHAPTERS_DIR.as_posix() == "data/story_mode/narrative/chapters"
+    registry = build_content_registry()
+    assert "1_1_arrival" in registry.chapters
+
+
+def test_registry_is_read_only(content_dirs):
+    """O registro e seus mapeamentos não podem ser alterados."""
+    from story_mode.content_registry import build_content_registry
+    registry = build_content_registry(*content_dirs)
+
+    with pytest.raises(AttributeError):
+        registry.chapters = {}
+    with pytest.raises(TypeError):
+        registry.chapters["novo"] = {}
+    with pytest.raises(TypeError):
+        registry.items["8"] = {}
+
+
+def test_cogs_share_injected_registry(content_dirs, monkeypatch):
+    """Bots sem registro injetado usam a instância única do processo."""
+    from story_mode import content_registry
+    registry = content_registry.build_content_registry(*content_dirs)
+
+    bot = MagicMock()
+    bot.content = registry
+    assert content_registry.content_for(bot) is registry
+
+    built = []
+    monkeypatch.setattr(content_registry, '_registry', None)
+    monkeypatch.setattr(content_registry, 'build_content_registry', lambda: built.append(1) or registry)
+    bot = MagicMock(spec=[])
+    assert content_registry.content_for(bot) is registry
+    assert content_registry.content_for(bot) is registry
+    assert built == [1]
@@ -0,0 +1,131 @@
+"""
+Testes para os snapshots diários de estatísticas e o resumo do dia.
+"""
+
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+
+def _player(user_id, exp, level=1, tusd=0, reputation=0, club_id=None):
+    return {'PK': f'PLAYER#{user_id}', 'name': f'Aluno {user_id}', 'exp': exp, 'level': level,
+            'tusd': tusd, 'reputation': reputation, 'club_id': club_id}
+
+
+class _FakeFlags:
+    """SystemFlags em memória com put_item condicional e query por prefixo de SK."""
+
+    def __init__(self):
+        self.items = {}
+        self.queries = 0
+
+    def put_item(self, Item, ConditionExpression=None):
+        key = (Item['PK'], Item['SK'])
+        if ConditionExpression and key in self.items:
+            error = Exception("exists")
+            error.response = {'Error': {'Code': 'ConditionalCheckFailedException'}}
+            raise error
+        self.items[key] = dict(Item)
+
+    def query(self, KeyConditionExpression):
+        self.queries += 1
+        prefix = KeyConditionExpression.get_expression()['values'][1].get_expression()['values'][1]
+        return {'Items': [item for (pk, sk), item in sorted(self.items.items()) if sk.startswith(prefix)]}
+
+
+def test_items_round_trip_across_parts():
+    """O snapshot é dividido em partes comprimidas e reconstruído igual."""
+    from utils.daily_stats import DailyStatsSnapshot
+
+    players = [_player(i, exp=i * 10, level=i % 7 + 1, club_id=str(i % 3) if i % 2 else None) for i in range(25)]
+    snapshot = DailyStatsSnapshot.from_players('2026-10-17', players + [{'PK': 'CLUB#1'}])
+    items = snapshot.to_items(part_size=10)
+
+    assert [item['SK'] for item in items] == ['2026-10-17#000', '2026-10-17#001', '2026-10-17#002']
+    restored = DailyStatsSnapshot.from_items('2026-10-17', list(reversed(items)))
+    assert restored.ids == snapshot.ids and restored.clubs == snapshot.clubs
+    assert (restored.values == snapshot.values).all()
+    assert restored.row(24) == {'user_id': '24', 'name': 'Aluno 24', 'club_id': None,
+                                'exp': 240, 'level': 4, 'tusd': 0, 'reputation': 0}
+
+
+def test_diff_ranks_gainers_activity_and_clubs():
+    """O diff vetorizado ordena maiores ganhos, mais ativos e o movimento dos clubes."""
+    from utils.daily_stats import DailyStatsSnapshot, diff_snapshots
+
+    before = DailyStatsSnapshot.from_players('2026-10-16', [
+        _player(1, exp=100, reputation=50, club_id='A'),
+        _player(2, exp=300, reputation=10, club_id='B'),
+        _player(3, exp=50, tusd=20, club_id='B'),
+    ])
+    after = DailyStatsSnapshot.from_players('2026-10-17', [
+        _player(2, exp=320, reputation=60, club_id='B'),
+        _player(3, exp=50, tusd=5, club_id='B'),
+        _player(1, exp=180, reputation=50, club_id='A'),
+        _player(4, exp=30, level=2, club_id='A'),
+    ])
+
+    digest = diff_snapshots(after, before)
+
+    assert digest['new_players'] == 1
+    assert [(p['user_id'], p['exp_gained']) for p in digest['gainers']] == [('1', 80), ('4', 30), ('2', 20)]
+    # Jogador 2 mudou EXP e reputação; o 4 é novo com EXP e nível; o 3 só gastou TUSD
+    assert [p['user_id'] for p in digest['most_active']] == ['4', '2', '1', '3']
+    assert digest['most_active'][-1]['tusd_gained'] == -15
+
+    clubs = {club['club_id']: club for club in digest['clubs']}
+    assert [club['club_id'] for club in digest['clubs']] == ['B', 'A']
+    assert clubs['B'] == {'club_id': 'B', 'members': 2, 'reputation_gained': 50, 'exp_gained': 20,
+                          'rank': 1, 'rank_change': 1}
+    assert clubs['A']['rank_change'] == -1 and clubs['A']['exp_gained'] == 110
+
+
+@pytest.mark.asyncio
+async def test_digest_reads_snapshots_without_scanning():
+    """O resumo do dia lê os dois snapshots guardados; só a captura varre a tabela de jogadores."""
+    from utils.daily_stats import DailyStats
+
+    flags = _FakeFlags()
+    players_table = MagicMock()
+    players_table.scan.side_effect = [
+        {'Items': [_player(1, exp=10), _player(2, exp=0)]},
+        {'Items': [_player(1, exp=15)], 'LastEvaluatedKey': {'PK': 'PLAYER#1'}},
+        {'Items': [_player(2, exp=40, level=2)]},
+    ]
+    stats = DailyStats(table=flags, players_table=players_table)
+    await stats.capture(datetime(2026, 10, 17, 0, 0))
+    await stats.capture(datetime(2026, 10, 18, 0, 0))
+    assert players_table.scan.call_count == 3
+
+    # Outra instância, sem cache, monta o resumo só com queries no SystemFlags
+    fresh = DailyStats(table=flags, players_table=players_table)
+    digest = await fresh.digest('2026-10-17')
+    assert players_table.scan.call_count == 3 and flags.queries == 2
+    assert [p['user_id'] for p in digest['gainers']] == ['2', '1']
+    assert digest['top'][0]['user_id'] == '2'
+    assert await fresh.digest('2026-10-10') is None
+
+
+def test_digest_without_baseline_has_no_rankings():
+    """Sem o snapshot do dia anterior não há base: nada de ganhos vitalícios como se fossem de ontem."""
+    from utils.daily_stats import DailyStatsSnapshot, diff_snapshots
+
+    snapshot = DailyStatsSnapshot.from_players('2026-10-17', [_player(1, exp=5000, reputation=90, club_id='A')])
+    digest = diff_snapshots(snapshot, None)
+
+    assert digest['baseline'] is False and digest['players'] == 1
+    assert digest['gainers'] == [] and digest['most_active'] == [] and digest['clubs'] == []
+    assert diff_snapshots(snapshot, snapshot)['baseline'] is True
+
+
+def test_numpy_is_imported_lazily():
+    """Importar o módulo (no startup, pelo gerenciador de eventos) não carrega o numpy."""
+    import os
+    import subprocess
+    import sys
+
+    src = os.path.join(os.path.dirname(__file__), '..', '..', 'src')
+    code = "import sys, utils.daily_stats; print('numpy loaded:', 'numpy' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=src, env={**os.environ, 'PYTHONPATH': '.'})
+    assert 'numpy loaded: False' in result.stdout, result.stderr
@@ -0,0 +1,43 @@
+"""
+Testes para a paginação de diálogos do modo história.
+"""
+
+
+def _lines(count, size=10):
+    return [{"npc": "Sensei", "text": "x" * size} for _ in range(count)]
+
+
+def test_lines_are_packed_into_pages():
+    """Linhas consecutivas são agrupadas em páginas com limite de linhas."""
+    from story_mode.dialogue_presenter import paginate, format_line
+
+    assert format_line({"npc": "Sensei", "text": "Olá"}) == "**Sensei:** Olá"
+    assert format_line({"text": "Narração"}) == "Narração"
+    assert paginate(_lines(20), lines_per_page=8) == [(0, 8), (8, 16), (16, 20)]
+    assert paginate(_lines(20), start=18, lines_per_page=8) == [(18, 20)]
+    assert paginate([]) == []
+
+
+def test_pages_respect_embed_size_limit():
+    """Nenhuma página ultrapassa o limite de caracteres, e linhas enormes são truncadas."""
+    from story_mode.dialogue_presenter import page_at, paginate
+
+    dialogues = _lines(5, size=40) + [{"text": "y" * 500}]
+    pages = paginate(dialogues, lines_per_page=10, char_limit=120)
+    assert pages[0] == (0, 2)
+    assert pages[-1] == (5, 6)
+    for start, _ in pages:
+        assert len(page_at(dialogues, start, lines_per_page=10, char_limit=120)["text"]) <= 120
+
+
+def test_page_numbers_follow_the_cursor():
+    """A página a partir do cursor informa o fim e a numeração dentro da cena."""
+    from story_mode.dialogue_presenter import page_at
+
+    dialogues = _lines(20)
+    page = page_at(dialogues, 8, lines_per_page=8)
+    assert (page["start"], page["end"], page["number"], page["total"]) == (8, 16, 2, 3)
+    assert page["text"].count("**Sensei:**") == 8
+
+    last = page_at(dialogues, 16, lines_per_page=8)
+    assert last["end"] == 20 and last["number"] == 3
@@ -0,0 +1,125 @@
+"""
+Testes para o guarda de prazo das interações.
+"""
+
+import asyncio
+import pytest
+import discord
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+def _interaction(command='atividade treinar', extras=None):
+    """Cria uma interação falsa recém-criada."""
+    interaction = MagicMock()
+    interaction.extras = {}
+    interaction.created_at = discord.utils.utcnow()
+    interaction.command.qualified_name = command
+    interaction.command.extras = extras or {}
+    interaction.followup.send = AsyncMock()
+    return interaction
+
+
+@pytest.fixture
+def guard_module():
+    from utils import interaction_guard
+    interaction_guard.deadline_stats.reset()
+    with patch.object(discord.InteractionResponse, 'defer', AsyncMock()) as defer, \
+         patch.object(discord.InteractionResponse, 'send_message', AsyncMock()) as send:
+        yield interaction_guard, defer, send
+
+
+@pytest.mark.asyncio
+async def test_slow_command_is_deferred_upfront_and_routed_to_followup(guard_module):
+    """Comandos lentos são adiados antes de executar e a resposta vai pelo followup."""
+    interaction_guard, defer, send = guard_module
+    interaction_guard.deadline_stats.record_finish('atividade treinar', 5.0)
+    interaction = _interaction()
+
+    guard = await interaction_guard.attach_deadline_guard(interaction)
+    await guard.response.send_message("ok", ephemeral=True, delete_after=5)
+
+    assert guard.auto_deferred
+    defer.assert_awaited_once()
+    send.assert_not_awaited()
+    interaction.followup.send.assert_awaited_once_with("ok", ephemeral=True)
+    assert interaction_guard.get_interaction_deadline_stats()['atividade treinar']['deferred_projected'] == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_command_responds_directly(guard_module):
+    """Comandos rápidos respondem normalmente e o vigia é cancelado."""
+    interaction_guard, defer, send = guard_module
+    interaction = _interaction()
+
+    guard = await interaction_guard.attach_deadline_guard(interaction)
+    await guard.response.send_message("ok")
+    interaction_guard.finish_deadline_guard(interaction)
+    await asyncio.sleep(0)
+
+    defer.assert_not_awaited()
+    send.assert_awaited_once()
+    assert guard._watchdog.cancelled()
+    stats = interaction_guard.get_interaction_deadline_stats()['atividade treinar']
+    assert stats['completed'] == 1 and stats['deferral_rate'] == 0
+
+
+@pytest.mark.asyncio
+async def test_watchdog_defers_at_deadline_and_counts_expiry(guard_module):
+    """O vigia adia quando o orçamento acaba; erros 10062 contam como expiração."""
+    interaction_guard, defer, send = guard_module
+    interaction = _interaction()
+
+    guard = await interaction_guard.attach_deadline_guard(interaction, budget=0.01)
+    await asyncio.sleep(0.05)
+    assert guard.auto_deferred
+
+    response = MagicMock(status=404)
+    error = discord.NotFound(response, {'code': 10062, 'message': 'Unknown interaction'})
+    interaction_guard.finish_deadline_guard(interaction, error)
+
+    stats = interaction_guard.get_interaction_deadline_stats()['atividade treinar']
+    assert stats['deferred_deadline'] == 1
+    assert stats['expired'] == 1 and stats['failed'] == 1
+
+
+@pytest.mark.asyncio
+async def test_auto_defer_is_ephemeral_and_skips_opted_out_commands(guard_module):
+    """O adiamento automático é efêmero; comandos com auto_defer desligado não são adiados pelo guarda."""
+    interaction_guard, defer, send = guard_module
+    interaction_guard.deadline_stats.record_finish('atividade treinar', 5.0)
+
+    await interaction_guard.attach_deadline_guard(_interaction())
+    assert defer.await_args.kwargs['ephemeral'] is True
+
+    defer.reset_mock()
+    interaction_guard.deadline_stats.record_finish('historia', 5.0)
+    interaction = _interaction('historia', extras={'auto_defer': False})
+    guard = await interaction_guard.attach_deadline_guard(interaction)
+    assert not guard.auto_deferred and guard._watchdog is None
+    defer.assert_not_awaited()
+
+    # Respostas públicas podem pedir um adiamento público
+    await interaction_guard.attach_deadline_guard(_interaction(extras={'defer_ephemeral': False}))
+    assert defer.await_args.kwargs['ephemeral'] is False
+
+
+@pytest.mark.asyncio
+async def test_followup_after_auto_defer_keeps_reply_visibility(guard_module):
+    """A resposta enviada pelo followup mantém a visibilidade pretendida pelo comando."""
+    interaction_guard, defer, send = guard_module
+    interaction_guard.deadline_stats.record_finish('atividade explorar', 5.0)
+    interaction_guard.deadline_stats.record_finish('atividade treinar', 5.0)
+
+    # Comando com resposta pública: o adiamento (que define a visibilidade do followup) é público
+    public = _interaction('atividade explorar', extras={'defer_ephemeral': False})
+    guard = await interaction_guard.attach_deadline_guard(public)
+    await guard.response.send_message(embed='evento')
+    assert defer.await_args.kwargs['ephemeral'] is False
+    public.followup.send.assert_awaited_once_with(None, embed='evento')
+
+    # Comando com resposta privada: continua efêmero
+    private = _interaction('atividade treinar')
+    guard = await interaction_guard.attach_deadline_guard(private)
+    await guard.response.send_message(embed='treino', ephemeral=True)
+    assert defer.await_args.kwargs['ephemeral'] is True
+    private.followup.send.assert_awaited_once_with(None, embed='treino', ephemeral=True)
@@ -0,0 +1,87 @@
+"""
+Testes para o roteador central de interações por custom_id.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+
+@pytest.fixture
+def router_module():
+    from utils import interaction_router
+    interaction_router.interaction_router.stats.reset()
+    yield interaction_router
+    interaction_router.interaction_router.stats.reset()
+
+
+def _interaction(custom_id, kind=None):
+    import discord
+    interaction = MagicMock()
+    interaction.type = kind or discord.InteractionType.component
+    interaction.data = {'custom_id': custom_id}
+    interaction.response.is_done.return_value = False
+    interaction.response.send_message = AsyncMock()
+    return interaction
+
+
+def test_custom_id_encoding_round_trip(router_module):
+    """O custom_id carrega rota e argumentos e respeita o limite do Discord."""
+    custom_id = router_module.encode_custom_id('story', 'choice', 42, '1_1_arrival', 2)
+    assert custom_id == 'story:choice:42:1_1_arrival:2'
+    assert router_module.decode_custom_id(custom_id) == ('story:choice', ['42', '1_1_arrival', '2'])
+    assert router_module.decode_custom_id('alterar_nome') is None
+
+    with pytest.raises(ValueError):
+        router_module.encode_custom_id('story', 'choice', 'a:b')
+    with pytest.raises(ValueError):
+        router_module.encode_custom_id('story', 'choice', 'x' * 100)
+
+
+@pytest.mark.asyncio
+async def test_cog_routes_are_dispatched_with_arguments(router_module):
+    """Métodos marcados com route e legacy_route recebem os argumentos do custom_id."""
+    calls = []
+
+    class _Cog:
+        @router_module.route('story', 'choice')
+        async def on_choice(self, interaction, user_id, chapter_id, index):
+            calls.append(('choice', user_id, chapter_id, index))
+
+        @router_module.route('event', 'join')
+        @router_module.legacy_route('join_event_')
+        async def on_join(self, interaction, event_id):
+            calls.append(('join', event_id))
+
+    router = router_module.InteractionRouter()
+    cog = _Cog()
+    router.add_cog(cog)
+
+    assert await router.dispatch(_interaction('story:choice:42:1_1_arrival:2')) is True
+    assert await router.dispatch(_interaction('event:join:EVENT#1')) is True
+    assert await router.dispatch(_interaction('join_event_EVENT#2')) is True
+    # Botões de Views ativas continuam com o discord.py
+    assert await router.dispatch(_interaction('dilema_choice_0')) is False
+    assert calls == [('choice', '42', '1_1_arrival', '2'), ('join', 'EVENT#1'), ('join', 'EVENT#2')]
+
+    router.remove_cog(cog)
+    assert router.routes == []
+    assert await router.dispatch(_interaction('story:choice:42:1_1_arrival:2')) is False
+
+
+@pytest.mark.asyncio
+async def test_handler_errors_are_reported_to_user(router_module):
+    """Uma falha no handler é contada e o usuário recebe uma mensagem de erro."""
+    import discord
+    router = router_module.InteractionRouter()
+    router.add('story:continue', AsyncMock(side_effect=RuntimeError("boom")))
+
+    interaction = _interaction('story:continue:42:1_1_arrival')
+    assert await router.dispatch(interaction) is True
+    interaction.response.send_message.assert_awaited_once()
+
+    # Comandos de barra não passam pelo roteador
+    assert await router.dispatch(_interaction('story:continue:42:x', discord.InteractionType.application_command)) is False
+
+    stats = router.stats.snapshot()
+    assert stats['routes']['story:continue']['errors'] == 1
+    assert stats['unrouted'] == 0
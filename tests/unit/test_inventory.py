@@ -0,0 +1,91 @@
+"""
+Testes para o inventário com uma linha por item.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from decimal import Decimal
+
+
+@pytest.fixture
+def inventory():
+    from utils.persistence.dynamodb_inventory import DynamoDBInventory
+    inv = DynamoDBInventory.__new__(DynamoDBInventory)
+    inv.table = MagicMock()
+    inv.table.update_item = AsyncMock(return_value={'Attributes': {'quantity': Decimal('2')}})
+    inv.table.delete_item = AsyncMock()
+    inv.table.query = AsyncMock()
+    return inv
+
+
+@pytest.mark.asyncio
+async def test_add_item_uses_atomic_add(inventory):
+    """Adicionar um item faz uma única escrita com ADD na quantidade."""
+    assert await inventory.add_item_to_inventory('1', 'potion', {'name': 'Poção', 'quantity': 2})
+
+    kwargs = inventory.table.update_item.call_args.kwargs
+    assert kwargs['Key'] == {'PK': 'PLAYER#1', 'SK': 'ITEM#potion'}
+    assert kwargs['UpdateExpression'].startswith('ADD quantity :q')
+    assert kwargs['ExpressionAttributeValues'][':q'] == 2
+    assert kwargs['ExpressionAttributeValues'][':data'] == {'name': 'Poção'}
+
+
+@pytest.mark.asyncio
+async def test_consume_item_keeps_row_when_quantity_remains(inventory):
+    """Consumir um item com quantidade restante não apaga a linha."""
+    assert await inventory.consume_item('1', 'potion')
+    inventory.table.delete_item.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_consume_last_unit_deletes_row(inventory):
+    """Consumir a última unidade remove a linha condicionalmente."""
+    inventory.table.update_item.return_value = {'Attributes': {'quantity': Decimal('0')}}
+    assert await inventory.consume_item('1', 'potion')
+    assert inventory.table.delete_item.call_args.kwargs['ConditionExpression'] == 'quantity <= :zero'
+
+
+@pytest.mark.asyncio
+async def test_list_items_returns_next_token(inventory):
+    """A listagem paginada devolve o token da próxima página."""
+    inventory.table.query.return_value = {
+        'Items': [{
+            'PK': 'PLAYER#1', 'SK': 'ITEM#sword', 'item_id': 'sword',
+            'quantity': Decimal('1'), 'item_data': {'name': 'Espada'}, 'equipped_by': 'PLAYER#1'
+        }],
+        'LastEvaluatedKey': {'PK': 'PLAYER#1', 'SK': 'ITEM#sword'}
+    }
+    items, token = await inventory.list_items('1', limit=1)
+
+    assert items == [{'name': 'Espada', 'id': 'sword', 'quantity': 1, 'equipped': True}]
+    assert token == 'sword'
+
+
+@pytest.mark.asyncio
+async def test_missing_equipped_index_raises(inventory):
+    """Sem o EquippedItemsIndex a consulta falha em vez de devolver um inventário vazio."""
+    from botocore.exceptions import ClientError
+    from utils.persistence.dynamodb import DynamoDBOperationError
+    inventory.table.query.side_effect = ClientError(
+        {'Error': {'Code': 'ValidationException', 'Message': 'The table does not have the specified index'}},
+        'Query'
+    )
+    with pytest.raises(DynamoDBOperationError):
+        await inventory.get_equipped_items('1')
+
+
+def test_inventory_migration_merges_with_add():
+    """A migração soma a quantidade com ADD e só grava os metadados se ainda não existirem."""
+    from utils.persistence.data_migration import InventoryRowsMigration
+    from utils.persistence.migration_engine import UpdateItem
+    migration = InventoryRowsMigration(MagicMock())
+
+    grants = migration._grants('1', '{"sword": {"name": "Espada", "quantity": 2, "equipped": true}}')
+
+    assert len(grants) == 1 and isinstance(grants[0], UpdateItem)
+    params = grants[0].params
+    assert grants[0].key == {'PK': 'PLAYER#1', 'SK': 'ITEM#sword'}
+    assert params['UpdateExpression'].startswith('ADD quantity :q')
+    assert 'item_data = if_not_exists(item_data, :data)' in params['UpdateExpression']
+    assert params['ExpressionAttributeValues'][':q'] == 2
+    assert params['ExpressionAttributeValues'][':owner'] == 'PLAYER#1'
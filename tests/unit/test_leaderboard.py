@@ -0,0 +1,102 @@
+"""
+Testes para o ranking sem consultas de clube por linha.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+
+class _FakeClubs:
+    """BatchGetItem em memória para a tabela de clubes."""
+
+    def __init__(self, names):
+        self.names = names
+        self.requests = []
+
+    def batch_get_item(self, RequestItems):
+        self.requests.append(RequestItems)
+        table, request = next(iter(RequestItems.items()))
+        items = [{'PK': key['PK'], 'name': self.names[key['PK']]}
+                 for key in request['Keys'] if key['PK'] in self.names]
+        return {'Responses': {table: items}}
+
+
+def _players(count, clubs=3):
+    return [{'name': f'Aluno {i}', 'level': 50 - i, 'club_id': str(i % clubs) if i % 4 else None}
+            for i in range(count)]
+
+
+@pytest.fixture
+def leaderboard():
+    from utils import leaderboard
+    leaderboard.leaderboard_stats.reset()
+    yield leaderboard
+    leaderboard.leaderboard_stats.reset()
+
+
+@pytest.mark.asyncio
+async def test_club_names_are_read_in_one_batch(leaderboard):
+    """Os clubes distintos do ranking são lidos numa única requisição e depois vêm do cache."""
+    from utils.embeds import create_leaderboard_embed
+    table = _FakeClubs({'CLUB#0': 'Ordem do Dragão', 'CLUB#1': 'Clube de Xadrez'})
+    directory = leaderboard.ClubDirectory(clubs_table=MagicMock(name='Clubes'), dynamodb=table)
+    players = _players(12)
+
+    names = await directory.names(p['club_id'] for p in players)
+    assert names == {'1': 'Clube de Xadrez', '2': leaderboard.NO_CLUB, '0': 'Ordem do Dragão'}
+    assert len(table.requests) == 1 and len(next(iter(table.requests[0].values()))['Keys']) == 3
+
+    await directory.names(['0', '1'])
+    assert len(table.requests) == 1
+
+    embed = await create_leaderboard_embed(players, club_names=names)
+    assert "**Aluno 1** | Clube de Xadrez | Nível: 49" in embed.description
+    assert "**Aluno 0** | Sem clube" in embed.description
+
+
+@pytest.mark.asyncio
+async def test_repeated_ranking_is_served_from_memory(leaderboard, monkeypatch):
+    """O embed é reaproveitado até uma escrita mudar um campo do ranking."""
+    monkeypatch.setattr(leaderboard, 'club_directory', MagicMock(names=AsyncMock(return_value={})))
+    presenter = leaderboard.LeaderboardPresenter(max_age=60)
+    monkeypatch.setattr(leaderboard, 'leaderboard_presenter', presenter)
+    load = AsyncMock(return_value=_players(10))
+
+    first = await leaderboard.render_leaderboard('level', load, 10)
+    second = await leaderboard.render_leaderboard('level', load, 10)
+    assert load.await_count == 1
+    assert first.description == second.description and first is not second
+
+    # Cooldowns e TUSD não mexem no ranking; nível sim
+    leaderboard.note_player_write({'tusd', 'last_daily'})
+    await leaderboard.render_leaderboard('level', load, 10)
+    assert load.await_count == 1
+    leaderboard.note_player_write({'exp'})
+    await leaderboard.render_leaderboard('level', load, 10)
+    assert load.await_count == 2
+
+    stats = leaderboard.get_leaderboard_stats()['kinds']['level']
+    assert stats == {'renders': 2, 'memo_hits': 2}
+
+
+@pytest.mark.asyncio
+async def test_pages_and_max_age_are_separate_memo_entries(leaderboard, monkeypatch):
+    """Cada página tem sua entrada, com ranks contínuos, e entradas antigas expiram."""
+    monkeypatch.setattr(leaderboard, 'club_directory', MagicMock(names=AsyncMock(return_value={})))
+    now = [1000.0]
+    monkeypatch.setattr(leaderboard.time, 'monotonic', lambda: now[0])
+    presenter = leaderboard.LeaderboardPresenter(max_age=60)
+    load = AsyncMock(side_effect=lambda limit: _players(limit))
+
+    page_two = await presenter.render('level', load, limit=5, page=2)
+    assert page_two.description.startswith("6. **Aluno 5**")
+    await presenter.render('level', load, limit=5, page=1)
+    assert load.await_count == 2
+
+    now[0] += 61
+    await presenter.render('level', load, limit=5, page=2)
+    assert load.await_count == 3
+
+    # Títulos diferentes não compartilham o embed memorizado
+    other = await presenter.render('level', load, limit=5, page=2, title="Histórico")
+    assert load.await_count == 4 and other.title == "Histórico"
@@ -0,0 +1,66 @@
+"""
+Testes para os gatilhos de mensagem pré-compilados.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def message_triggers():
+    from utils import message_triggers
+    message_triggers.trigger_stats.reset()
+    yield message_triggers
+    message_triggers.trigger_stats.reset()
+
+
+def test_matcher_requires_keyword_and_phrase(message_triggers):
+    """O gatilho exige a palavra-chave e uma frase, sem diferenciar maiúsculas."""
+    matcher = message_triggers.TriggerMatcher({
+        'junie': (['junie'], ['o que devo', 'me ajuda', 'sugestão'])
+    })
+
+    assert matcher.match("JUNIE, O QUE DEVO fazer hoje?") == 'junie'
+    assert matcher.match("junie alguma SUGESTÃO?") == 'junie'
+    assert matcher.match("Oi Junie!") is None
+    assert matcher.match("me ajuda com o dever") is None
+    assert matcher.match("") is None
+
+    stats = message_triggers.get_trigger_stats()
+    assert stats['scanned'] == 5
+    assert stats['triggers']['junie']['matched'] == 2
+
+
+def test_ttl_cache_and_channel_rate_limit(message_triggers, monkeypatch):
+    """Entradas expiram após o TTL e cada canal tem uma janela deslizante própria."""
+    now = [100.0]
+    monkeypatch.setattr(message_triggers.time, 'monotonic', lambda: now[0])
+
+    from utils.ttl_cache import TTLCache
+    cache = TTLCache(ttl=10, max_entries=2)
+    cache.set(1, "a")
+    cache.set(2, "b", ttl=1)
+    assert cache.get(1) == "a"
+    cache.set(3, "c")
+    assert cache.get(2) is None and len(cache) == 2
+    now[0] += 11
+    assert cache.get(1) is None
+
+    limiter = message_triggers.ChannelRateLimiter(limit=2, period=30)
+    assert limiter.allow(10) and limiter.allow(10)
+    assert limiter.allow(10) is False
+    assert limiter.allow(20) is True
+    now[0] += 31
+    assert limiter.allow(10) is True
+
+
+def test_matcher_picks_first_matching_trigger(message_triggers):
+    """Com vários gatilhos, o primeiro cuja palavra-chave e frase aparecem é escolhido."""
+    matcher = message_triggers.TriggerMatcher({
+        'junie': (['junie'], ['o que', 'help me']),
+        'sensei': (['sensei', 'professor'], ['o que', 'aula']),
+    })
+
+    assert matcher.match("Professor, o que cai na prova?") == 'sensei'
+    assert matcher.match("junie e sensei: o que fazer?") == 'junie'
+    assert matcher.match("sensei, help me") is None
+    assert matcher.match("junior, o que houve?") is None
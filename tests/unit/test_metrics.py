@@ -0,0 +1,85 @@
+"""
+Testes para as métricas de latência dos comandos.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+
+
+@pytest.fixture
+def metrics():
+    from utils import metrics
+    metrics.command_metrics.reset()
+    yield metrics
+    metrics.command_metrics.reset()
+
+
+@pytest.mark.asyncio
+async def test_trace_splits_db_discord_and_compute(metrics):
+    """O tempo do comando é dividido entre banco, Discord e processamento."""
+    @metrics.timed('db')
+    async def query():
+        await asyncio.sleep(0.02)
+
+    async def command():
+        trace = metrics.command_metrics.start('atividade treinar', 'slash')
+        # Consultas paralelas contam o intervalo sobreposto uma vez só
+        await asyncio.gather(query(), query())
+        with metrics.phase_timer('discord'):
+            await asyncio.sleep(0.01)
+        return trace
+
+    trace = await asyncio.create_task(command())
+    durations = trace.durations()
+    metrics.command_metrics.finish(trace)
+
+    assert 0.02 <= durations['db'] < 0.04
+    assert durations['discord'] >= 0.01
+    assert durations['compute'] >= 0
+    assert durations['total'] >= durations['db'] + durations['discord']
+    snapshot = metrics.command_metrics.snapshot()
+    assert snapshot['invocations'][('atividade treinar', 'slash')] == 1
+    assert snapshot['in_flight'][('atividade treinar', 'slash')] == 0
+
+
+@pytest.mark.asyncio
+async def test_prometheus_output_has_quantiles_and_errors(metrics):
+    """A saída Prometheus contém quantis por fase, contadores de erro e concorrência."""
+    async def command(failed):
+        trace = metrics.command_metrics.start('treinar', 'prefix')
+        metrics.command_metrics.finish(trace, failed=failed)
+
+    await asyncio.gather(asyncio.create_task(command(False)), asyncio.create_task(command(True)))
+    text = metrics.render_prometheus()
+
+    assert '# TYPE tokugawa_command_latency_seconds summary' in text
+    assert 'tokugawa_command_latency_seconds{command="treinar",kind="prefix",phase="db",quantile="0.99"}' in text
+    assert 'tokugawa_command_latency_seconds_count{command="treinar",kind="prefix",phase="total"} 2' in text
+    assert 'tokugawa_command_errors_total{command="treinar",kind="prefix"} 1' in text
+    assert 'tokugawa_command_max_in_flight' in text
+
+
+@pytest.mark.asyncio
+async def test_health_endpoint_reports_readiness(metrics):
+    """O /health responde 503 enquanto o bot inicia e 200 quando está pronto."""
+    from aiohttp.test_utils import TestClient, TestServer
+    bot = MagicMock()
+    bot.is_ready.return_value = False
+    bot.is_closed.return_value = False
+    bot.start_time = None
+    bot.latency = 0.05
+    server = metrics.MetricsServer(bot)
+
+    async with TestClient(TestServer(server.make_app())) as client:
+        response = await client.get('/health')
+        assert response.status == 503
+
+        bot.is_ready.return_value = True
+        bot.guilds = [MagicMock()]
+        response = await client.get('/health')
+        assert response.status == 200
+        assert (await response.json())['guilds'] == 1
+
+        response = await client.get('/metrics')
+        assert 'tokugawa_ready 1' in await response.text()
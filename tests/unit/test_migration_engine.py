@@ -0,0 +1,125 @@
+"""
+Testes para o motor de migração em massa.
+"""
+
+import json
+import pytest
+from unittest.mock import MagicMock
+
+
+def _table(pages_by_segment):
+    """Cria uma tabela falsa que devolve páginas por segmento do scan."""
+    table = MagicMock()
+    table.name = 'Teste'
+
+    def scan(**kwargs):
+        pages = pages_by_segment.get(kwargs['Segment'], [])
+        index = 0
+        if 'ExclusiveStartKey' in kwargs:
+            index = kwargs['ExclusiveStartKey']['page']
+        page = {'Items': pages[index]} if pages else {'Items': []}
+        if index + 1 < len(pages):
+            page['LastEvaluatedKey'] = {'page': index + 1}
+        return page
+
+    table.scan.side_effect = scan
+    table.meta.client.batch_write_item.return_value = {'UnprocessedItems': {}}
+    return table
+
+
+def _add_level(item):
+    return {**item, 'level': 1}
+
+
+@pytest.mark.asyncio
+async def test_dry_run_collects_diff_without_writing():
+    """Em modo dry-run nada é escrito e as estatísticas descrevem a mudança."""
+    from utils.persistence.migration_engine import BulkMigrationEngine
+    table = _table({
+        0: [[{'PK': 'PLAYER#1', 'SK': 'PROFILE'}]],
+        1: [[{'PK': 'PLAYER#2', 'SK': 'PROFILE', 'level': 1}]]
+    })
+    engine = BulkMigrationEngine('teste', table, [_add_level], segments=2, dry_run=True)
+
+    report = await engine.run()
+
+    assert report['scanned'] == 2
+    assert report['changed'] == 1
+    assert report['unchanged'] == 1
+    assert report['attributes'] == {'level': {'added': 1, 'removed': 0, 'changed': 0}}
+    table.meta.client.batch_write_item.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_unprocessed_items_are_retried(monkeypatch):
+    """Itens não processados pelo BatchWriteItem são reenviados."""
+    from utils.persistence import migration_engine
+    monkeypatch.setattr(migration_engine.asyncio, 'sleep', _no_sleep)
+    table = _table({0: [[{'PK': 'PLAYER#1', 'SK': 'PROFILE'}, {'PK': 'PLAYER#2', 'SK': 'PROFILE'}]]})
+    leftover = [{'PutRequest': {'Item': {'PK': {'S': 'PLAYER#2'}}}}]
+    table.meta.client.batch_write_item.side_effect = [
+        {'UnprocessedItems': {'Teste': leftover}},
+        {'UnprocessedItems': {}}
+    ]
+    engine = migration_engine.BulkMigrationEngine('teste', table, [_add_level], segments=1)
+
+    report = await engine.run()
+
+    assert report['written'] == 2
+    assert report['retries'] == 1
+    second_call = table.meta.client.batch_write_item.call_args_list[1].kwargs
+    assert second_call['RequestItems'] == {'Teste': leftover}
+
+
+@pytest.mark.asyncio
+async def test_resume_skips_checkpointed_pages():
+    """A migração retoma a partir do último checkpoint salvo."""
+    from utils.persistence.migration_engine import BulkMigrationEngine
+    table = _table({0: [
+        [{'PK': 'PLAYER#1', 'SK': 'PROFILE'}],
+        [{'PK': 'PLAYER#2', 'SK': 'PROFILE'}]
+    ]})
+    flags = MagicMock()
+    flags.get_item.return_value = {'Item': {'value': json.dumps(
+        {'0': {'last_key': {'page': 1}, 'done': False, 'scanned': 1}}
+    )}}
+    engine = BulkMigrationEngine('teste', table, [_add_level], segments=1, checkpoint_table=flags)
+
+    report = await engine.run()
+
+    assert report['scanned'] == 1
+    saved = json.loads(flags.put_item.call_args.kwargs['Item']['value'])
+    assert saved['0'] == {'last_key': None, 'done': True, 'scanned': 2}
+    # Concluída, a migração apaga o checkpoint
+    assert report['completed']
+    flags.delete_item.assert_called_once_with(Key={'PK': 'SYSTEM', 'SK': 'FLAG#migration_checkpoint_teste'})
+
+
+@pytest.mark.asyncio
+async def test_failed_writes_do_not_advance_checkpoint(monkeypatch):
+    """Uma página com escritas que falharam não avança o checkpoint, que é mantido para retomar."""
+    from utils.persistence import migration_engine
+    monkeypatch.setattr(migration_engine.asyncio, 'sleep', _no_sleep)
+    table = _table({0: [
+        [{'PK': 'PLAYER#1', 'SK': 'PROFILE'}],
+        [{'PK': 'PLAYER#2', 'SK': 'PROFILE'}],
+        [{'PK': 'PLAYER#3', 'SK': 'PROFILE'}]
+    ]})
+    leftover = [{'PutRequest': {'Item': {'PK': {'S': 'PLAYER#2'}}}}]
+    table.meta.client.batch_write_item.side_effect = [{'UnprocessedItems': {}}] + \
+        [{'UnprocessedItems': {'Teste': leftover}}] * 2
+    flags = MagicMock()
+    flags.get_item.return_value = {}
+    engine = migration_engine.BulkMigrationEngine('teste', table, [_add_level], segments=1,
+                                                  max_retries=2, checkpoint_table=flags)
+
+    report = await engine.run()
+
+    assert not report['completed'] and report['failed'] == 1 and report['scanned'] == 2
+    saved = json.loads(flags.put_item.call_args.kwargs['Item']['value'])
+    assert saved['0'] == {'last_key': {'page': 1}, 'done': False, 'scanned': 1}
+    flags.delete_item.assert_not_called()
+
+
+async def _no_sleep(_):
+    return None
@@ -0,0 +1,91 @@
+"""
+Testes para a resolução de nomes de exibição em camadas.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+
+class _FakeDynamo:
+    """BatchGetItem em memória que devolve parte das chaves como não processadas."""
+
+    def __init__(self, names, unprocessed_first=False):
+        self.names = names
+        self.unprocessed_first = unprocessed_first
+        self.requests = []
+
+    def batch_get_item(self, RequestItems):
+        self.requests.append(RequestItems)
+        table, request = next(iter(RequestItems.items()))
+        keys = request['Keys']
+        unprocessed = {}
+        if self.unprocessed_first and len(self.requests) == 1 and len(keys) > 1:
+            unprocessed = {table: dict(request, Keys=keys[1:])}
+            keys = keys[:1]
+        items = [{'PK': key['PK'], 'name': self.names[key['PK']]} for key in keys if key['PK'] in self.names]
+        return {'Responses': {table: items}, 'UnprocessedKeys': unprocessed}
+
+
+def _bot(cached_users=None):
+    bot = MagicMock()
+    cached_users = cached_users or {}
+    bot.get_user.side_effect = lambda user_id: cached_users.get(user_id)
+    bot.fetch_user = AsyncMock(side_effect=lambda user_id: MagicMock(display_name=f"rest-{user_id}"))
+    return bot
+
+
+def _resolver(dynamo, **kwargs):
+    from utils.name_resolver import NameResolver
+    return NameResolver(players_table=MagicMock(name='table'), dynamodb=dynamo, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_sources_are_tried_in_order():
+    """Membros do gateway, nomes armazenados e REST são usados nessa ordem."""
+    guild = MagicMock()
+    guild.get_member.side_effect = lambda user_id: MagicMock(display_name="Aiko") if user_id == 1 else None
+    bot = _bot({2: MagicMock(display_name="Kenji")})
+    dynamo = _FakeDynamo({'PLAYER#3': 'Hana', 'PLAYER#4': 'Ren'}, unprocessed_first=True)
+    resolver = _resolver(dynamo)
+
+    names = await resolver.resolve_many(bot, [1, 2, 3, 4, 5], guild)
+
+    assert names == {'1': 'Aiko', '2': 'Kenji', '3': 'Hana', '4': 'Ren', '5': 'rest-5'}
+    # As chaves não processadas são pedidas de novo
+    assert len(dynamo.requests) == 2
+    bot.fetch_user.assert_awaited_once_with(5)
+    sources = resolver.stats.snapshot()['sources']
+    assert sources['member'] == 2 and sources['stored'] == 2 and sources['rest'] == 1
+
+
+@pytest.mark.asyncio
+async def test_second_render_makes_no_calls():
+    """Uma segunda renderização do ranking sai inteira do cache."""
+    dynamo = _FakeDynamo({f'PLAYER#{i}': f'Aluno {i}' for i in range(30)})
+    resolver = _resolver(dynamo)
+    bot = _bot()
+
+    first = await resolver.resolve_many(bot, range(35))
+    second = await resolver.resolve_many(bot, range(35))
+
+    assert first == second and first['34'] == 'rest-34'
+    assert len(dynamo.requests) == 1
+    assert bot.fetch_user.await_count == 5
+    assert resolver.stats.snapshot()['sources']['cache'] == 35
+
+
+@pytest.mark.asyncio
+async def test_rest_lookups_are_capped_and_failures_get_placeholder():
+    """Lookups REST são limitados por chamada e falhas viram um nome provisório."""
+    import discord
+    from utils.name_resolver import placeholder_name
+    resolver = _resolver(_FakeDynamo({}), rest_limit=2)
+    bot = _bot()
+    bot.fetch_user = AsyncMock(side_effect=discord.HTTPException(MagicMock(status=404), "Unknown User"))
+
+    names = await resolver.resolve_many(bot, [7, 8, 9])
+
+    assert names == {str(i): placeholder_name(i) for i in (7, 8, 9)}
+    assert bot.fetch_user.await_count == 2
+    stats = resolver.stats.snapshot()
+    assert stats['rest_failures'] == 2 and stats['sources']['placeholder'] == 3
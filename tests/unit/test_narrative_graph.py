@@ -0,0 +1,95 @@
+"""
+Testes para o grafo narrativo (contagem exata de caminhos, ciclos e becos sem saída).
+"""
+
+import json
+
+
+def _diamond_chapters(count):
+    """Capítulos em cadeia: cada um tem duas escolhas que levam à mesma cena e uma que pula para o próximo."""
+    chapters = {}
+    for i in range(count):
+        following = f"c{i + 1}" if i + 1 < count else None
+        chapters[f"c{i}"] = {
+            "scenes": [
+                {"scene_id": "a", "choices": [{"next_scene": "b"}, {"next_scene": "b"}, {"next_chapter": following}]},
+                {"scene_id": "b", "choices": []},
+            ],
+            "next_chapter": following,
+        }
+    return chapters
+
+
+def test_exact_path_count_on_huge_content():
+    """Milhares de capítulos com 3^n caminhos são contados exatamente, sem enumerar caminhos."""
+    from story_mode.narrative_graph import NarrativeGraph
+
+    graph = NarrativeGraph.from_chapters(_diamond_chapters(2000))
+    analysis = graph.analyze(["c0"])
+
+    # No último capítulo a escolha sem destino também encerra o capítulo
+    assert analysis.starts == ["c0"] and analysis.total_paths == 3 ** 2000
+    assert analysis.endings == ["c1999:end"] and not analysis.dead_ends and not analysis.cycles
+    assert analysis.paths_through["c1000"] == 3 ** 2000
+    # Metade dos caminhos de cada capítulo passa pela cena b (2 de 3 escolhas)
+    assert analysis.paths_through["c0:b"] == 2 * 3 ** 1999
+    assert graph.chapter_paths("c0") == 3
+
+
+def test_cycles_dead_ends_and_reachability():
+    """Laços com saída tornam os caminhos ilimitados; laços sem saída e capítulos ausentes são becos sem saída."""
+    from story_mode.narrative_graph import NarrativeGraph
+
+    graph = NarrativeGraph.from_chapters({
+        "start": {"choices": [{"next_chapter": "loop"}, {"next_chapter": "trap"}, {"next_chapter": "ghost"}]},
+        "loop": {"conditional_next_chapter": {"club_id": {"1": "start", "default": "finale"}}},
+        "trap": {"next_chapter": "trap_b"},
+        "trap_b": {"next_chapter": "trap"},
+        "finale": {},
+        "orphan": {"next_chapter": "finale"},
+    })
+    analysis = graph.analyze(["start"])
+
+    assert analysis.total_paths == 1 and analysis.unbounded
+    assert analysis.endings == ["finale:end"]
+    assert set(analysis.dead_ends) == {"trap", "trap:end", "trap_b", "trap_b:end", "ghost"}
+    assert sorted(sorted(cycle) for cycle in analysis.cycles) == [
+        sorted(["start", "loop", "loop:end"]), sorted(["trap", "trap:end", "trap_b", "trap_b:end"])]
+    assert analysis.unreachable_chapters == ["orphan"] and analysis.unlinked_chapters == ["orphan"]
+    assert "finale" in graph.reachable(["orphan"]) and "start" not in graph.reachable(["orphan"])
+    assert set(graph.unlinked_chapters()) == {"start", "orphan"}
+
+
+def test_validator_reports_graph_analysis(tmp_path):
+    """O validador lê capítulos nos dois formatos e usa o grafo na cobertura."""
+    from story_mode.narrative_validator import NarrativePathValidator
+
+    (tmp_path / "1_1_arrival.json").write_text(json.dumps({
+        "chapter_id": "1_1_arrival", "type": "story", "title": "Chegada", "description": "...",
+        "scenes": [{"scene_id": "gate", "choices": [{"next_scene": "hall"}, {"next_scene": "hall"}]},
+                   {"scene_id": "hall", "choices": [{"text": "Seguir"}]}],
+        "next_chapter": "1_2_club"
+    }), encoding="utf-8")
+    (tmp_path / "legacy.json").write_text(json.dumps({
+        "1_2_club": {"choices": [{"next_chapter": "1_3_end"}, {"next_chapter": "1_9_missing"}]},
+        "1_3_end": {},
+        "unused": {"next_chapter": "1_3_end"},
+    }), encoding="utf-8")
+
+    validator = NarrativePathValidator(str(tmp_path))
+    assert validator.load_chapters()
+    assert validator.validate_narrative_paths() is False
+    validator.simulate_path_coverage(["1_1_arrival"])
+    report = validator.generate_coverage_report()
+
+    assert report["chapter_coverage"]["1_1_arrival"] == {"total_paths": 2, "covered_paths": 2}
+    assert report["chapter_coverage"]["unused"]["covered_paths"] == 0
+    assert report["story_paths"] == 2 and report["broken_references"] == ["1_9_missing"]
+    assert report["unreachable_chapters"] == ["unused"] and "1_9_missing" in report["dead_ends"]
+    assert report["unlinked_chapters"] == ["unused"]
+
+    # Por padrão a história começa no primeiro capítulo real, não em todo capítulo sem ligação
+    validator.simulate_path_coverage()
+    report = validator.generate_coverage_report()
+    assert report["start_chapters"] == ["1_1_arrival"] and report["unreachable_chapters"] == ["unused"]
+    assert report["coverage_percentage"] < 100
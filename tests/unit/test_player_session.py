@@ -0,0 +1,101 @@
+"""
+Testes para a sessão de jogador (unidade de trabalho por comando).
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+
+def _tables(profile=None, cooldowns=()):
+    """Cria tabelas falsas de jogadores, cooldowns e inventário."""
+    players = MagicMock()
+    players.name = 'Jogadores'
+    players.get_item.return_value = {'Item': profile} if profile else {}
+    players.meta.client.transact_write_items.return_value = {}
+    cooldown_table = MagicMock()
+    cooldown_table.name = 'Cooldowns'
+    cooldown_table.query.return_value = {'Items': list(cooldowns)}
+    inventory = MagicMock()
+    inventory.name = 'Inventario'
+    return players, cooldown_table, inventory
+
+
+def _session(tables, user_id='1', command='treinar'):
+    from utils.persistence.player_session import PlayerSession
+    players, cooldowns, inventory = tables
+    return PlayerSession(user_id, command, players_table=players,
+                         cooldowns_table=cooldowns, inventory_table=inventory)
+
+
+@pytest.mark.asyncio
+async def test_session_commits_everything_in_one_transaction():
+    """Estatísticas, cooldown e item são gravados em uma única transação."""
+    from utils.persistence.player_session import round_trip_stats
+    round_trip_stats.reset()
+    expiry = (datetime.now() + timedelta(minutes=5)).isoformat()
+    tables = _tables(
+        profile={'PK': 'PLAYER#1', 'SK': 'PROFILE', 'exp': Decimal('10'), 'tusd': Decimal('5')},
+        cooldowns=[{'PK': 'PLAYER#1', 'SK': 'COMMAND#duelar', 'expiry_time': expiry}]
+    )
+
+    async with _session(tables) as session:
+        assert session.exists
+        assert session.cooldown_remaining('duelar')
+        assert session.cooldown_remaining('treinar') is None
+        session.player['exp'] = 20
+        session.player.increment('tusd', 10)
+        session.set_cooldown('treinar', 3600)
+        session.add_item('pocao', {'name': 'Poção', 'quantity': 2})
+        assert await session.commit()
+
+    players = tables[0]
+    players.meta.client.transact_write_items.assert_called_once()
+    operations = players.meta.client.transact_write_items.call_args.kwargs['TransactItems']
+    assert [list(op)[0] for op in operations] == ['Update', 'Put', 'Update']
+
+    profile = operations[0]['Update']
+    assert profile['TableName'] == 'Jogadores'
+    assert 'ADD #a0 :a0' in profile['UpdateExpression']
+    assert set(profile['ExpressionAttributeNames'].values()) == {'exp', 'tusd', 'updated_at'}
+    assert operations[1]['Put']['Item']['SK'] == {'S': 'COMMAND#treinar'}
+    assert operations[2]['Update']['ExpressionAttributeValues'][':q'] == {'N': '2'}
+
+    stats = round_trip_stats.snapshot()['treinar']
+    assert stats == dict(stats, invocations=1, requests=3, stages=2)
+
+
+@pytest.mark.asyncio
+async def test_session_without_changes_does_not_write():
+    """Sem mudanças, o commit não faz nenhuma requisição."""
+    tables = _tables(profile={'PK': 'PLAYER#1', 'SK': 'PROFILE', 'exp': 1})
+
+    async with _session(tables) as session:
+        assert await session.commit()
+
+    tables[0].meta.client.transact_write_items.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_sessions_of_several_players_share_the_transaction():
+    """Vários jogadores (ex.: duelo) são carregados em paralelo e gravados juntos."""
+    from utils.persistence.player_session import (
+        commit_sessions, load_sessions, round_trip_stats, track_round_trips
+    )
+    round_trip_stats.reset()
+    players, cooldowns, inventory = _tables()
+    players.get_item.side_effect = lambda Key: {'Item': {'PK': Key['PK'], 'SK': 'PROFILE', 'exp': 0}}
+
+    async with track_round_trips('duelar'):
+        first, second = await load_sessions(('1', '2'), 'duelar', players_table=players,
+                                            cooldowns_table=cooldowns, inventory_table=inventory)
+        first.player['exp'] = 30
+        second.player['exp'] = 15
+        first.set_cooldown('duelar', 1800)
+        assert await commit_sessions(first, second)
+
+    operations = players.meta.client.transact_write_items.call_args.kwargs['TransactItems']
+    assert len(operations) == 3
+    stats = round_trip_stats.snapshot()['duelar']
+    assert stats['requests'] == 5 and stats['stages'] == 2
@@ -0,0 +1,116 @@
+"""
+Testes para os snapshots históricos de ranking.
+"""
+
+import pytest
+from datetime import date, datetime
+from unittest.mock import MagicMock
+
+
+class _FakeTable:
+    """Tabela SystemFlags em memória com put_item condicional."""
+
+    def __init__(self):
+        self.items = {}
+
+    def get_item(self, Key):
+        item = self.items.get((Key['PK'], Key['SK']))
+        return {'Item': dict(item)} if item else {}
+
+    def put_item(self, Item, ConditionExpression=None):
+        key = (Item['PK'], Item['SK'])
+        if ConditionExpression and key in self.items:
+            error = Exception("exists")
+            error.response = {'Error': {'Code': 'ConditionalCheckFailedException'}}
+            raise error
+        self.items[key] = dict(Item)
+
+
+def _scan_table(items):
+    table = MagicMock()
+    table.scan.return_value = {'Items': items}
+    return table
+
+
+def _history(table, players, clubs=(), grades=()):
+    from utils.ranking_history import RankingHistory
+    return RankingHistory(table=table, players_table=_scan_table(list(players)),
+                          clubs_table=_scan_table(list(clubs)), grades_table=_scan_table(list(grades)), size=5)
+
+
+def test_period_keys():
+    """Chaves de período e o período anterior cruzam virada de mês, ano e semana ISO."""
+    from utils.ranking_history import period_key, previous_period_key, due_periods
+
+    assert period_key('daily', date(2026, 3, 1)) == '2026-03-01'
+    assert previous_period_key('daily', '2026-03-01') == '2026-02-28'
+    assert period_key('weekly', date(2027, 1, 1)) == '2026-W53'
+    assert previous_period_key('weekly', '2027-W01') == '2026-W53'
+    assert previous_period_key('monthly', '2026-01') == '2025-12'
+
+    # Segunda-feira, 1º de junho de 2026: fecha o dia, a semana e o mês
+    assert due_periods(datetime(2026, 6, 1, 0, 0)) == ['daily', 'weekly', 'monthly']
+    assert due_periods(datetime(2026, 6, 2, 0, 0)) == ['daily']
+    assert due_periods(datetime(2026, 6, 2, 0, 1)) == []
+
+
+def test_delta_round_trip_and_arrows():
+    """Um delta reconstrói o snapshot e as setas comparam com o anterior."""
+    from utils.ranking_history import encode_delta, decode_delta, position_changes
+
+    base = [['1', 'Aiko', 300], ['2', 'Kenji', 200], ['3', 'Hana', 100]]
+    current = [['2', 'Kenji', 350], ['1', 'Aiko', 300], ['4', 'Ren', 150], ['3', 'Hana-chan', 120]]
+
+    operations = encode_delta(current, base)
+    assert operations == [[1, 350], 0, ['4', 'Ren', 150], [2, 120, 'Hana-chan']]
+    assert decode_delta(operations, base) == current
+    assert position_changes(current, base) == [1, -1, None, -1]
+    assert position_changes(current, None) == [None] * 4
+
+
+@pytest.mark.asyncio
+async def test_capture_stores_deltas_with_keyframes():
+    """Capturas diárias viram deltas, com um snapshot completo a cada KEYFRAME_INTERVAL."""
+    from utils import ranking_history as module
+
+    table = _FakeTable()
+    players = [{'PK': f'PLAYER#{i}', 'name': f'Aluno {i}', 'reputation': 100 - i, 'tusd': i} for i in range(8)]
+    grades = [{'PK': 'GRADE#1', 'SK': 'SUBJECT#Matemática', 'grade': 9}]
+    clubs = [{'PK': 'CLUB#1', 'SK': 'INFO', 'name': 'Clube de Xadrez', 'reputacao': 40}]
+    history = _history(table, players, clubs, grades)
+
+    days = module.KEYFRAME_INTERVAL + 2
+    for day in range(1, days + 1):
+        players[7]['reputation'] = 100 + day  # Aluno 7 assume a liderança e segue subindo
+        assert await history.capture('daily', datetime(2026, 5, day + 1, 0, 0)) == 4
+    # Capturar o mesmo período de novo não sobrescreve nada
+    assert await history.capture('daily', datetime(2026, 5, days + 1, 0, 0)) == 0
+
+    encodings = [table.items[('RANKING#reputation#daily', f'2026-05-{day:02d}')]['encoding']
+                 for day in range(1, days + 1)]
+    assert encodings == ['full'] + ['delta'] * module.KEYFRAME_INTERVAL + ['full']
+
+    # Uma instância nova, sem cache, reconstrói o snapshot pela cadeia de deltas
+    fresh = _history(table, [])
+    snapshot = await fresh.load('reputation', 'daily', f'2026-05-{days - 1:02d}')
+    assert snapshot[0] == ['7', 'Aluno 7', 100 + days - 1]
+    assert [row[0] for row in snapshot] == ['7', '0', '1', '2', '3']
+    assert await fresh.load('subject.Matemática', 'daily', '2026-05-01') == [['1', 'Aluno 1', 9]]
+    assert await fresh.load('clubs', 'daily', '2026-04-30') is None
+    assert fresh.stats.snapshot()['loads']['missing'] == 1
+
+
+def test_subject_board_fits_the_custom_id():
+    """Matérias digitadas pelo usuário são validadas antes de irem para o custom_id do botão."""
+    from utils.interaction_router import encode_custom_id
+    from utils.ranking_history import MAX_SUBJECT_LENGTH, subject_board
+
+    assert subject_board(" Matemática ") == "subject.Matemática"
+    assert subject_board("Física: avançada") is None
+    assert subject_board("x" * (MAX_SUBJECT_LENGTH + 1)) is None
+    assert subject_board("") is None and subject_board(None) is None
+
+    # O maior nome aceito ainda cabe no botão "Anterior" de qualquer período
+    board = subject_board("x" * MAX_SUBJECT_LENGTH)
+    for period, key in (('daily', '2026-10-17'), ('weekly', '2026-W42'), ('monthly', '2026-10')):
+        encode_custom_id('ranking', 'prev', board, period, key)
@@ -0,0 +1,101 @@
+"""
+Testes para o índice de requisitos de capítulos.
+"""
+
+import random
+from unittest.mock import MagicMock
+
+
+def _random_chapters(rng, count=60):
+    ids = [f"c{i}" for i in range(count)]
+    chapters = {}
+    for i, chapter_id in enumerate(ids):
+        requirements = {}
+        if rng.random() < 0.6 and i:
+            requirements["chapters"] = rng.sample(ids[:i], rng.randint(1, min(3, i)))
+        if rng.random() < 0.5:
+            requirements["stats"] = {stat: rng.randint(0, 10) for stat in rng.sample(["power", "knowledge", "charisma"], 2)}
+        if rng.random() < 0.1:
+            requirements["is_new_player"] = True
+        chapters[chapter_id] = requirements
+    return chapters
+
+
+def _random_player(rng, ids):
+    return {
+        "attributes": {stat: rng.randint(0, 10) for stat in ("power", "knowledge") if rng.random() < 0.8},
+        "story_progress": {"completed_chapters": rng.sample(ids, rng.randint(0, len(ids) // 2))}
+    }
+
+
+def test_loader_index_matches_full_evaluation(tmp_path):
+    """O índice responde igual à avaliação capítulo a capítulo do FileChapterLoader."""
+    from story_mode.chapter_loader import FileChapterLoader
+
+    rng = random.Random(7)
+    loader = FileChapterLoader(str(tmp_path))
+    for _ in range(5):
+        loader.chapters = {
+            chapter_id: MagicMock(get_id=MagicMock(return_value=chapter_id),
+                                  get_requirements=MagicMock(return_value=requirements))
+            for chapter_id, requirements in _random_chapters(rng).items()
+        }
+        for _ in range(40):
+            player = _random_player(rng, list(loader.chapters))
+            expected = [chapter_id for chapter_id, chapter in loader.chapters.items()
+                        if loader._is_chapter_available(chapter, player)]
+            assert loader.get_available_chapters(player) == expected
+
+
+def test_story_mode_index_matches_requirement_checks():
+    """Nível, elemento e capítulos concluídos seguem as regras de check_chapter_requirements."""
+    from story_mode.story_mode import StoryMode
+
+    story_mode = StoryMode("data/story_mode")
+    story_mode.story_data = {"chapters": {
+        "1_1": {},
+        "1_2": {"requirements": {"completed_chapters": ["1_1"]}},
+        "1_3": {"requirements": {"completed_chapters": ["1_1", "1_2"], "level": 5}},
+        "fire": {"requirements": {"element": "fogo", "level": 3}},
+        "water": {"requirements": {"element": "água"}},
+    }}
+    rng = random.Random(3)
+    for _ in range(200):
+        player = {
+            "level": rng.randint(0, 8),
+            "element": rng.choice(["fogo", "água", None]),
+            "story_progress": {"completed_chapters": rng.sample(["1_1", "1_2", "1_3"], rng.randint(0, 3))}
+        }
+        expected = [c for c in story_mode.story_data["chapters"] if story_mode.check_chapter_requirements(player, c)]
+        assert story_mode.get_available_chapters(player) == expected
+
+    assert story_mode.get_available_chapters({"level": 5, "element": "fogo",
+                                              "story_progress": {"completed_chapters": ["1_1", "1_2"]}}) == \
+        ["1_1", "1_2", "1_3", "fire"]
+
+
+def test_query_walks_only_the_frontier():
+    """Numa cadeia longa, a consulta examina só os capítulos ao redor do progresso do jogador."""
+    from story_mode.requirement_index import (
+        ChapterRequirements, IndexedRequirements, RequirementIndex, requirement_index_stats
+    )
+
+    chain = {"c0": ChapterRequirements()}
+    chain.update({f"c{i}": ChapterRequirements(prerequisites=frozenset({f"c{i - 1}"}), thresholds={"level": i // 100})
+                  for i in range(1, 2000)})
+    index = RequirementIndex(chain)
+    requirement_index_stats.reset()
+
+    assert index.available(["c0", "c1", "c2"], {"level": 0}) == ["c0", "c1", "c2", "c3"]
+    assert index.available(["c0", "c1", "c2"], {"level": 0}, exclude_completed=True) == ["c3"]
+    # Nível insuficiente corta o capítulo da fronteira pelo limiar
+    assert index.available(["c99"], {"level": 0}) == ["c0"]
+    assert requirement_index_stats.snapshot()['chapters_examined'] < 20
+
+    # O índice é reconstruído quando a fonte muda
+    source = {"a": {}}
+    indexed = IndexedRequirements(lambda: source, lambda chapter_id, chapter: ChapterRequirements())
+    first = indexed.get()
+    assert indexed.get() is first
+    source["b"] = {}
+    assert indexed.get() is not first and len(indexed.get()) == 2
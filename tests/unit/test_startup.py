@@ -0,0 +1,82 @@
+"""
+Testes para o pipeline de inicialização.
+"""
+
+import time
+import pytest
+from unittest.mock import MagicMock
+
+
+class _SlowTable:
+    def __init__(self, name, delay=0.05, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+
+    @property
+    def table_status(self):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return 'ACTIVE'
+
+
+def _provider(tables):
+    """Cria um DBProvider real sem conectar à AWS."""
+    import importlib
+    module = importlib.import_module('utils.persistence.db_provider')
+    provider = object.__new__(type(module.db_provider))
+    provider._initialized = False
+    provider._all_tables = lambda: tables
+    return provider
+
+
+def test_table_checks_run_concurrently():
+    """As 14 tabelas são verificadas em paralelo e falhas são reportadas por tabela."""
+    tables = [_SlowTable(f"T{i}") for i in range(13)] + [_SlowTable("Votos", error=RuntimeError("missing"))]
+    provider = _provider(tables)
+
+    started = time.perf_counter()
+    results = provider._check_tables()
+    elapsed = time.perf_counter() - started
+
+    # Em sequência seriam 14 * 0.05s = 0.7s
+    assert elapsed < 0.35
+    assert results["T0"] is None
+    assert isinstance(results["Votos"], RuntimeError)
+    assert provider.ensure_dynamo_available() is False
+
+
+@pytest.mark.asyncio
+async def test_init_db_checks_tables_once():
+    """setup_hook e on_ready chamam init_db, mas as tabelas são verificadas uma vez só."""
+    tables = [_SlowTable("Jogadores", delay=0)]
+    provider = _provider(tables)
+    provider.PLAYERS_TABLE = MagicMock()
+    provider.PLAYERS_TABLE.scan.return_value = {'Items': []}
+    provider.ensure_dynamo_available = MagicMock(return_value=True)
+
+    assert await provider.init_db() is True
+    assert await provider.init_db() is True
+    assert provider.ensure_dynamo_available.call_count == 1
+
+
+def test_startup_profile_records_phases_and_budget(monkeypatch):
+    """As fases são medidas e o orçamento de importação gera aviso quando excedido."""
+    from utils import startup
+    profile = startup.StartupProfile()
+    warnings = []
+    monkeypatch.setattr(startup.logger, 'warning', warnings.append)
+
+    profile.mark_imports_done(budget=0)
+    with profile.phase('database'):
+        time.sleep(0.01)
+    profile.record_extension('cogs.activities', 0.2)
+    total = profile.complete()
+
+    snapshot = profile.snapshot()
+    assert list(snapshot['phases']) == ['imports', 'database']
+    assert snapshot['phases']['database'] >= 0.01
+    assert snapshot['extensions'] == {'cogs.activities': 0.2}
+    assert snapshot['total'] == total
+    assert len(warnings) == 1
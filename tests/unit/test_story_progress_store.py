@@ -0,0 +1,105 @@
+"""
+Testes para o armazenamento incremental do progresso da história.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+@pytest.fixture
+def story():
+    from utils.persistence import dynamodb_story
+    table = MagicMock()
+    table.update_item = AsyncMock(return_value={})
+    table.get_item = AsyncMock(return_value={})
+    with patch.object(dynamodb_story, '_story_table', table):
+        yield dynamodb_story, table
+
+
+@pytest.mark.asyncio
+async def test_delta_writes_only_changed_fields(story):
+    """Somente os campos alterados são escritos, com ADD e list_append."""
+    dynamodb_story, table = story
+    before = {
+        'current_chapter': '1_1',
+        'completed_chapters': ['1_1'],
+        'story_choices': {'1_1': {'ajudar': 'sim'}},
+        'character_relationships': {'Junie': 10}
+    }
+    after = {
+        'current_chapter': '1_2',
+        'completed_chapters': ['1_1', '1_2'],
+        'story_choices': {'1_1': {'ajudar': 'sim'}, '1_2': {'lado': 'norte'}},
+        'character_relationships': {'Junie': 10}
+    }
+
+    assert await dynamodb_story.save_story_progress_delta('1', before, after)
+
+    kwargs = table.update_item.call_args.kwargs
+    names = kwargs['ExpressionAttributeNames']
+    values = kwargs['ExpressionAttributeValues']
+    assert 'character_relationships' not in names.values()
+    assert 'list_append' in kwargs['UpdateExpression']
+    assert ' ADD ' in kwargs['UpdateExpression']
+    assert {'1_2'} in values.values()
+    entries = [v for v in values.values() if isinstance(v, list) and v]
+    assert entries[0][0]['chapter'] == '1_2' and entries[0][0]['key'] == 'lado'
+
+
+@pytest.mark.asyncio
+async def test_unchanged_progress_does_not_write(story):
+    """Sem mudanças, nenhuma escrita é feita."""
+    dynamodb_story, table = story
+    progress = {'current_chapter': '1_1', 'completed_chapters': ['1_1']}
+    assert await dynamodb_story.save_story_progress_delta('1', progress, dict(progress))
+    table.update_item.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_read_model_replays_choice_log(story):
+    """A leitura converte conjuntos em listas e reconstrói as escolhas a partir do log."""
+    dynamodb_story, table = story
+    table.get_item.return_value = {'Item': {
+        'PK': 'PLAYER#1', 'SK': 'STORY_PROGRESS',
+        'completed_chapters': {'1_2', '1_1'},
+        'choice_log': [
+            {'attribute': 'story_choices', 'chapter': '1_1', 'key': 'ajudar', 'value': 'não'},
+            {'attribute': 'story_choices', 'chapter': '1_1', 'key': 'ajudar', 'value': 'sim'}
+        ]
+    }}
+
+    progress = await dynamodb_story.get_story_progress('1')
+
+    assert progress['completed_chapters'] == ['1_1', '1_2']
+    assert progress['story_choices'] == {'1_1': {'ajudar': 'sim'}}
+    assert 'choice_log' not in progress
+
+
+def test_merge_with_legacy_copy():
+    """O progresso armazenado sobrepõe a cópia antiga do item do jogador."""
+    from utils.persistence.dynamodb_story import merge_story_progress
+    legacy = '{"current_chapter": "1_1", "completed_chapters": ["1_1"], "npc_interactions": {"Diretor": {}}}'
+    merged = merge_story_progress(legacy, {'current_chapter': '1_3', 'completed_chapters': ['1_2']})
+
+    assert merged['current_chapter'] == '1_3'
+    assert merged['completed_chapters'] == ['1_1', '1_2']
+    assert merged['npc_interactions'] == {'Diretor': {}}
+
+
+@pytest.mark.asyncio
+async def test_all_story_progress_keyed_by_player(story):
+    """A leitura em massa agrupa os itens de progresso por jogador e ignora os demais itens."""
+    dynamodb_story, table = story
+    table.scan = AsyncMock(side_effect=[
+        {'Items': [{'PK': 'PLAYER#1', 'SK': 'STORY_PROGRESS', 'current_chapter': '1_2',
+                    'choice_log': [{'chapter': '1_1', 'key': 'lado', 'value': 'norte', 'attribute': 'choices'}]}],
+         'LastEvaluatedKey': {'PK': 'PLAYER#1'}},
+        {'Items': [{'PK': 'PLAYER#2', 'SK': 'STORY_PROGRESS', 'completed_chapters': {'1_1'}},
+                   {'PK': 'PLAYER#3', 'SK': 'PROFILE'}]},
+    ])
+
+    progress = await dynamodb_story.get_all_story_progress()
+
+    assert set(progress) == {'1', '2'}
+    assert progress['1']['choices'] == {'1_1': {'lado': 'norte'}}
+    assert progress['2']['completed_chapters'] == ['1_1']
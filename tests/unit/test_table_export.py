@@ -0,0 +1,95 @@
+"""
+Testes para a exportação de tabelas em snapshots JSONL.
+"""
+
+import pytest
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+
+def _table(items_by_segment):
+    """Cria uma tabela falsa cujo scan devolve os itens de cada segmento."""
+    table = MagicMock()
+    table.scan.side_effect = lambda **kwargs: {'Items': list(items_by_segment.get(kwargs['Segment'], []))}
+    return table
+
+
+@pytest.mark.asyncio
+async def test_full_export_writes_chunks_and_manifest(tmp_path):
+    """A exportação completa gera arquivos por segmento e um manifesto."""
+    from utils.persistence.table_export import TableExporter, latest_manifest, load_snapshot
+    table = _table({
+        0: [{'PK': 'EVENT#1', 'SK': 'INFO', 'points': Decimal('10')},
+            {'PK': 'EVENT#2', 'SK': 'INFO', 'points': Decimal('1.5')}],
+        1: [{'PK': 'EVENT#3', 'SK': 'INFO', 'tags': {'a', 'b'}}]
+    })
+    exporter = TableExporter('events', table, output_dir=str(tmp_path), segments=2, chunk_size=1)
+
+    manifest = await exporter.export()
+
+    assert manifest['type'] == 'full'
+    assert manifest['total_items'] == 3
+    assert len(manifest['files']) == 3
+    assert latest_manifest('events', str(tmp_path))['snapshot_id'] == manifest['snapshot_id']
+
+    items = load_snapshot('events', str(tmp_path))
+    assert items[('EVENT#1', 'INFO')]['points'] == 10
+    assert items[('EVENT#2', 'INFO')]['points'] == 1.5
+    assert items[('EVENT#3', 'INFO')]['tags'] == ['a', 'b']
+
+
+@pytest.mark.asyncio
+async def test_incremental_export_is_merged_on_base(tmp_path):
+    """Exportações incrementais filtram pelo timestamp da tabela e sobrepõem o snapshot base."""
+    from utils.persistence.table_export import TableExporter, load_snapshot
+    output_dir = str(tmp_path)
+    await TableExporter('votes', _table({0: [
+        {'PK': 'VOTE#1', 'SK': 'A', 'count': Decimal('1')},
+        {'PK': 'VOTE#2', 'SK': 'A', 'count': Decimal('1')}
+    ]}), output_dir=output_dir, segments=1).export()
+
+    table = _table({0: [{'PK': 'VOTE#1', 'SK': 'A', 'count': Decimal('5')}]})
+    manifest = await TableExporter('votes', table, output_dir=output_dir, segments=1).export(incremental=True)
+
+    assert manifest['type'] == 'incremental'
+    # Votos são gravados com timestamp, não com updated_at
+    scan = table.scan.call_args.kwargs
+    assert scan['FilterExpression'] == '#updated0 > :since'
+    assert scan['ExpressionAttributeNames'] == {'#updated0': 'timestamp'}
+    items = load_snapshot('votes', output_dir)
+    assert items[('VOTE#1', 'A')]['count'] == 5
+    assert items[('VOTE#2', 'A')]['count'] == 1
+
+
+@pytest.mark.asyncio
+async def test_incremental_uses_every_timestamp_of_the_table(tmp_path):
+    """Jogadores novos só têm created_at; tabelas sem timestamp recusam a exportação incremental."""
+    from utils.persistence.table_export import TableExporter
+    output_dir = str(tmp_path)
+    await TableExporter('players', _table({}), output_dir=output_dir, segments=1).export()
+
+    table = _table({})
+    await TableExporter('players', table, output_dir=output_dir, segments=1).export(incremental=True)
+    scan = table.scan.call_args.kwargs
+    assert scan['FilterExpression'] == '#updated0 > :since OR #updated1 > :since'
+    assert scan['ExpressionAttributeNames'] == {'#updated0': 'updated_at', '#updated1': 'created_at'}
+
+    with pytest.raises(ValueError):
+        await TableExporter('events', _table({}), output_dir=output_dir, segments=1).export(incremental=True)
+
+
+@pytest.mark.asyncio
+async def test_upload_uses_s3_client(tmp_path):
+    """Com um cliente S3, os arquivos e o manifesto são enviados."""
+    from utils.persistence.table_export import TableExporter
+    s3_client = MagicMock()
+    s3_client.upload_file.return_value = True
+    exporter = TableExporter('clubs', _table({0: [{'PK': 'CLUB#1', 'SK': 'INFO'}]}),
+                             output_dir=str(tmp_path), segments=1)
+
+    manifest = await exporter.export(s3_client=s3_client)
+
+    assert manifest['uploaded']
+    keys = [call.args[1] for call in s3_client.upload_file.call_args_list]
+    assert keys[-1].endswith('/manifest.json')
+    assert keys[0].startswith(f"snapshots/clubs/{manifest['snapshot_id']}/part-000-00000")
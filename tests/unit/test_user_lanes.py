@@ -0,0 +1,78 @@
+"""
+Testes para as filas de execução por usuário.
+"""
+
+import asyncio
+import pytest
+
+
+@pytest.fixture
+def lanes():
+    from utils.user_lanes import UserLanes
+    return UserLanes(idle_ttl=60, timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_same_user_is_serialized(lanes):
+    """Dois handlers do mesmo usuário não se sobrepõem e a espera é registrada."""
+    player = {'coins': 0}
+
+    async def add_coins():
+        async with lanes.hold(42, name='treinar'):
+            coins = player['coins']
+            await asyncio.sleep(0.01)
+            player['coins'] = coins + 10
+
+    await asyncio.gather(add_coins(), add_coins(), add_coins())
+
+    # Sem a fila, as três leituras veriam 0 e uma atualização sobrescreveria a outra
+    assert player['coins'] == 30
+    stats = lanes.stats.snapshot()['handlers']['treinar']
+    assert stats['acquisitions'] == 3
+    assert stats['contended'] == 2
+    assert stats['max_wait_seconds'] >= 0.01
+
+
+@pytest.mark.asyncio
+async def test_different_users_run_in_parallel(lanes):
+    """Usuários diferentes não esperam uns pelos outros."""
+    running = []
+    peak = []
+
+    async def handler(user_id):
+        async with lanes.hold(user_id, name='explorar'):
+            running.append(user_id)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(user_id)
+
+    await asyncio.gather(*(handler(user_id) for user_id in range(5)))
+
+    assert max(peak) == 5
+    assert lanes.stats.snapshot()['handlers']['explorar']['contended'] == 0
+    assert lanes.stats.snapshot()['peak_lanes'] == 5
+
+
+@pytest.mark.asyncio
+async def test_reentrant_multi_user_and_timeout(lanes):
+    """Filas são reentrantes, duelos travam os dois jogadores e a espera tem limite."""
+    from utils.user_lanes import LaneTimeoutError
+
+    async with lanes.hold(1, 2, name='duelar'):
+        # O mesmo task pode entrar de novo na fila de um jogador que já segura
+        async with lanes.hold(2, name='bet_duel_payout'):
+            assert lanes.is_held(1) and lanes.is_held(2)
+
+        # Outro task precisa esperar e desiste após o timeout
+        with pytest.raises(LaneTimeoutError):
+            await asyncio.create_task(_hold_briefly(lanes, 2))
+
+    assert lanes.stats.snapshot()['handlers']['outro']['timeouts'] == 1
+    # Depois de liberadas, as filas ficam livres para outros tasks
+    await asyncio.create_task(_hold_briefly(lanes, 2))
+    assert not lanes.is_held(1)
+
+
+async def _hold_briefly(lanes, user_id):
+    async with lanes.hold(user_id, name='outro', timeout=0.05):
+        pass